@@ -1,12 +1,20 @@
 ﻿from __future__ import annotations
 
+import os
 import time
-from typing import Any, Dict
+from typing import Any, Dict, Mapping, Optional
 
-from fastapi import FastAPI
+from fastapi import FastAPI, HTTPException, Query, Response, WebSocket, WebSocketDisconnect
+from fastapi.responses import StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
 
 from ..core.system_state import SystemState
+from ..core.courbes import codec
+from ..core.courbes.downsample import METHODS, downsample
+from ..hardware.storage import bdf_tiers
+from ..hardware.storage.sqlite_pool import read_connection, writers_metrics
+from ..utils.paths import BRUIT_FOND_DB_PATH
+from .stream import StateStream
 
 from ..boot.loader import load_config
 from ..boot.starter import Gev5System
@@ -18,18 +26,54 @@ app = FastAPI(
 )
 
 system: Gev5System | None = None
+stream: StateStream | None = None
+
+
+def _str_keys(d: Mapping[Any, Any]) -> Dict[str, Any]:
+    return {str(k): v for k, v in d.items()}
+
+
+def _collect_state() -> Dict[str, Dict[str, Any]]:
+    """État diffusé par /stream et /ws/state (sans les courbes), depuis le snapshot."""
+    snap = SystemState.get_snapshot()
+    return {
+        "counts": _str_keys(snap.counts),
+        "raw_counts": _str_keys(snap.raw_counts),
+        "alarm_states": _str_keys(snap.alarm_states),
+        "alarm_measures": _str_keys(snap.measures),
+        "background": _str_keys(snap.fond),
+        "thresholds": _str_keys(snap.seuils),
+        "defauts": _str_keys(snap.defauts),
+        "cells": {"1": snap.cells[0], "2": snap.cells[1]},
+        "speed": _str_keys(snap.speed),
+    }
+
 
 @app.on_event("startup")
-def _startup() -> None:
+async def _startup() -> None:
     """
     Démarre le moteur GeV5 dans le MÊME process que l'API
-    pour que SystemState reflète l'état réel (threads en cours).
+    pour que SystemState reflète l'état réel (threads en cours),
+    puis le diffuseur d'état (SSE / WebSocket).
     """
-    global system
+    global system, stream
     cfg = load_config()     # utilise PARAM_DB_PATH par défaut
     system = Gev5System(cfg)
     system.start_all()
 
+    stream = StateStream(
+        _collect_state,
+        period_s=float(getattr(cfg, "stream_period_s", 0.5)),
+        version=SystemState.get_version,
+    )
+    stream.start()
+
+
+@app.on_event("shutdown")
+async def _shutdown() -> None:
+    if stream is not None:
+        await stream.stop()
+
 # CORS (si tu fais une UI web)
 app.add_middleware(
     CORSMiddleware,
@@ -49,17 +93,36 @@ def health() -> Dict[str, Any]:
 def state() -> Dict[str, Any]:
     """
     Snapshot global (léger). Évite d’envoyer les courbes complètes.
+    Toutes les sections proviennent du même snapshot versionné (cohérentes).
     """
+    snap = SystemState.get_snapshot()
+    if not snap.version:
+        return {
+            "ts": time.time(),
+            "version": 0,
+            "counts": SystemState.get_counts(),
+            "raw_counts": SystemState.get_raw_counts(),
+            "alarms": {
+                "states": SystemState.get_alarm_states(),
+                "measures": SystemState.get_alarm_measures(),
+                "background": SystemState.get_background(),
+            },
+            "defauts": SystemState.get_defauts(),
+        }
     return {
-        "ts": time.time(),
-        "counts": SystemState.get_counts(),
-        "raw_counts": SystemState.get_raw_counts(),
+        "ts": snap.ts,
+        "version": snap.version,
+        "counts": snap.counts,
+        "raw_counts": snap.raw_counts,
         "alarms": {
-            "states": SystemState.get_alarm_states(),
-            "measures": SystemState.get_alarm_measures(),
-            "background": SystemState.get_background(),
+            "states": snap.alarm_states,
+            "measures": snap.measures,
+            "background": snap.fond,
+            "thresholds": snap.seuils,
         },
-        "defauts": SystemState.get_defauts(),
+        "defauts": snap.defauts,
+        "cells": list(snap.cells),
+        "speed": snap.speed,
     }
 
 
@@ -87,10 +150,181 @@ def defauts() -> Dict[str, Any]:
     return {"ts": time.time(), "defauts": SystemState.get_defauts()}
 
 
+@app.get("/engine/stats")
+def engine_stats() -> Dict[str, Any]:
+    """
+    Latences par tick du moteur temps réel (si cfg.tick_engine == 1).
+    """
+    moteur = system.moteur_thread if system is not None else None
+    return {
+        "ts": time.time(),
+        "enabled": moteur is not None,
+        "stats": moteur.get_stats() if moteur is not None else {},
+    }
+
+
+@app.get("/comptage/jitter")
+def comptage_jitter() -> Dict[str, Any]:
+    """
+    Retard (ms) des clôtures de fenêtre de comptage par voie
+    (mode échéances fixes : cfg.comptage_monotone == 1 ou source d'impulsions).
+    """
+    return {
+        "ts": time.time(),
+        "jitter": SystemState.get_count_jitter(),
+    }
+
+
+@app.get("/stream")
+async def state_stream() -> StreamingResponse:
+    """
+    Server-Sent Events : snapshot complet à la connexion puis diffs
+    (counts, alarmes, défauts, cellules, vitesse) à la cadence
+    cfg.stream_period_s. Même message sérialisé pour tous les abonnés.
+    """
+    st = stream
+    if st is None:
+        raise HTTPException(status_code=503, detail="diffusion non démarrée")
+
+    q = st.subscribe()
+
+    async def _events():
+        try:
+            while True:
+                msg = await q.get()
+                yield f"data: {msg}\n\n"
+        finally:
+            st.unsubscribe(q)
+
+    return StreamingResponse(
+        _events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@app.websocket("/ws/state")
+async def state_ws(ws: WebSocket) -> None:
+    """Même flux que /stream, sur WebSocket (texte JSON)."""
+    if stream is None:
+        await ws.close(code=1013)
+        return
+
+    await ws.accept()
+    q = stream.subscribe()
+    try:
+        while True:
+            await ws.send_text(await q.get())
+    except WebSocketDisconnect:
+        pass
+    finally:
+        stream.unsubscribe(q)
+
+
+@app.get("/stream/stats")
+def stream_stats() -> Dict[str, Any]:
+    return {"ts": time.time(), "stats": dict(stream.stats) if stream is not None else {}}
+
+
+@app.get("/storage/stats")
+def storage_stats() -> Dict[str, Any]:
+    """Files d'écriture SQLite : attente, lots, durées, pertes."""
+    return {"ts": time.time(), "writers": writers_metrics()}
+
+
+@app.get("/bdf/stats")
+def bdf_stats() -> Dict[str, Any]:
+    """Statistiques glissantes du fond par voie (mémoire, sans SQLite)."""
+    return {"ts": time.time(), "stats": SystemState.get_background_stats()}
+
+
+@app.get("/bdf/trend")
+def bdf_trend(
+    t0: Optional[float] = Query(None, description="début (epoch s) ; défaut : t1 - 24 h"),
+    t1: Optional[float] = Query(None, description="fin (epoch s, exclue) ; défaut : maintenant"),
+    max_points: int = Query(500, ge=1, le=10000, description="points max par voie"),
+    channels: Optional[str] = Query(None, description="voies, ex. 1,2,5 (toutes par défaut)"),
+) -> Dict[str, Any]:
+    """
+    Tendance du bruit de fond (min / moyenne / max par voie), lue sur le
+    palier d'historique adapté à la plage : brut 30 s, 5 min ou 1 h.
+    """
+    end = time.time() if t1 is None else t1
+    start = end - 86400.0 if t0 is None else t0
+    if start >= end:
+        raise HTTPException(status_code=400, detail="t0 doit précéder t1")
+    wanted = None
+    if channels:
+        try:
+            wanted = [int(c) for c in channels.split(",") if c.strip()]
+        except ValueError:
+            raise HTTPException(status_code=400, detail="channels: liste d'entiers")
+
+    if not os.path.exists(BRUIT_FOND_DB_PATH):
+        return {"ts": time.time(), "tier": None, "step_s": 0, "t": [], "channels": {}}
+    data = bdf_tiers.trend(read_connection(BRUIT_FOND_DB_PATH), start, end, max_points, wanted)
+    return {"ts": time.time(), **data}
+
+
 @app.get("/curves")
-def curves() -> Dict[str, Any]:
+def curves(
+    channels: Optional[str] = Query(None, description="voies, ex. 1,2,5 (toutes par défaut)"),
+    t0: Optional[float] = Query(None, description="début (epoch s, inclus)"),
+    t1: Optional[float] = Query(None, description="fin (epoch s, inclus)"),
+    since: Optional[float] = Query(None, description="curseur : points strictement après ce ts"),
+    max_points: int = Query(0, ge=0, description="points max par voie (0 = tous)"),
+    method: str = Query("lttb", description="réduction : lttb | minmax"),
+    format: str = Query("json", description="json | f32 | delta"),
+) -> Any:
     """
-    Attention: payload potentiellement lourd (12 voies * 3600 points).
-    Pour UI, on préférera un endpoint paginé ou downsample.
+    Courbes par voie, filtrées et réduites côté serveur.
+
+    - `since` : un client qui rafraîchit ne reçoit que les nouveaux points ;
+      il renvoie le `cursor` de la réponse précédente.
+    - `max_points` : réduction LTTB ou min/max (pics conservés).
+    - `format=f32|delta` : trame binaire (voir core/courbes/codec.py),
+      curseur dans l'en-tête X-GeV5-Cursor.
     """
-    return {"ts": time.time(), "curves": SystemState.get_curves()}
+    if method not in METHODS:
+        raise HTTPException(status_code=400, detail=f"method: {', '.join(METHODS)}")
+    if format != "json" and format not in codec.FORMATS:
+        raise HTTPException(status_code=400, detail="format: json | f32 | delta")
+
+    rings = SystemState.get_curve_rings()
+    if channels:
+        try:
+            wanted = [int(c) for c in channels.split(",") if c.strip()]
+        except ValueError:
+            raise HTTPException(status_code=400, detail="channels: liste d'entiers")
+    else:
+        wanted = sorted(rings)
+
+    selected = {}
+    cursor = since or 0.0
+    for ch in wanted:
+        ring = rings.get(ch)
+        if ring is None:
+            continue
+        ts, vals = ring.since(since) if since is not None else ring.between(t0, t1)
+        if since is not None and t1 is not None:
+            keep = ts <= t1
+            ts, vals = ts[keep], vals[keep]
+        if len(ts):
+            cursor = max(cursor, float(ts[-1]))
+        selected[ch] = downsample(ts, vals, max_points, method)
+
+    if format != "json":
+        return Response(
+            content=codec.encode(selected, codec.FORMATS[format]),
+            media_type="application/octet-stream",
+            headers={"X-GeV5-Cursor": repr(cursor)},
+        )
+
+    return {
+        "ts": time.time(),
+        "cursor": cursor,
+        "curves": {
+            str(ch): {"t": ts.tolist(), "v": vals.tolist()}
+            for ch, (ts, vals) in selected.items()
+        },
+    }
@@ -0,0 +1,159 @@
+from __future__ import annotations
+
+"""
+Diffusion "push" de l'état de supervision (SSE / WebSocket).
+
+Un seul producteur (tâche asyncio) collecte l'état à cadence fixe, calcule
+le diff avec l'état précédent et le sérialise UNE fois ; la même chaîne
+JSON est ensuite déposée dans la file de chaque abonné. Le coût CPU ne
+dépend donc pas du nombre de tableaux de bord connectés.
+
+Messages (JSON) :
+  {"type": "snapshot", "seq": n, "ts": ..., "data": {section: {clé: valeur}}}
+  {"type": "diff",     "seq": n, "ts": ..., "data": {section: {clé modifiées}}}
+
+Un client qui se (re)connecte reçoit d'abord le snapshot complet courant ;
+un client trop lent (file pleine) est resynchronisé par un snapshot.
+"""
+
+import asyncio
+import json
+import time
+from logging import Logger
+from typing import Any, Callable, Dict, Optional, Set
+
+from ..utils.logging import get_logger
+
+logger: Logger = get_logger("gev5.api.stream")
+
+State = Dict[str, Dict[str, Any]]
+
+_MISSING = object()
+
+
+def diff_state(prev: State, cur: State) -> State:
+    """Sections / clés de cur dont la valeur diffère de prev."""
+    out: State = {}
+    for section, values in cur.items():
+        old = prev.get(section, {})
+        changed = {k: v for k, v in values.items() if old.get(k, _MISSING) != v}
+        if changed:
+            out[section] = changed
+    return out
+
+
+class StateStream:
+    """
+    Producteur unique + files par abonné.
+
+    - collect   : callable renvoyant l'état courant {section: {clé: valeur}}
+                  (clés str : directement sérialisables en JSON)
+    - period_s  : cadence de collecte / diffusion
+    - queue_max : messages en attente par abonné avant resynchronisation
+    - version   : callable optionnel (version du snapshot) ; si elle n'a pas
+                  changé depuis la dernière collecte, rien n'est recalculé
+    """
+
+    def __init__(
+        self,
+        collect: Callable[[], State],
+        period_s: float = 0.5,
+        queue_max: int = 32,
+        version: Optional[Callable[[], int]] = None,
+    ) -> None:
+        self._collect = collect
+        self._version = version
+        self._last_version: Optional[int] = None
+        self.period_s = max(0.05, float(period_s))
+        self.queue_max = int(queue_max)
+
+        self._subscribers: Set[asyncio.Queue] = set()
+        self._state: State = {}
+        self._seq = 0
+        self._snapshot_msg: Optional[str] = None
+        self._task: Optional[asyncio.Task] = None
+
+        self.stats: Dict[str, float] = {"subscribers": 0, "messages": 0, "resyncs": 0, "encode_ms": 0.0}
+
+    # ------------------------------------------------------------------ #
+    # Abonnés
+    # ------------------------------------------------------------------ #
+    def subscribe(self) -> asyncio.Queue:
+        """Nouvelle file ; le snapshot complet courant y est déposé d'abord."""
+        q: asyncio.Queue = asyncio.Queue(maxsize=self.queue_max)
+        q.put_nowait(self._get_snapshot_msg())
+        self._subscribers.add(q)
+        self.stats["subscribers"] = float(len(self._subscribers))
+        return q
+
+    def unsubscribe(self, q: asyncio.Queue) -> None:
+        self._subscribers.discard(q)
+        self.stats["subscribers"] = float(len(self._subscribers))
+
+    # ------------------------------------------------------------------ #
+    # Production
+    # ------------------------------------------------------------------ #
+    def _encode(self, kind: str, data: State) -> str:
+        return json.dumps(
+            {"type": kind, "seq": self._seq, "ts": time.time(), "data": data},
+            separators=(",", ":"),
+            default=str,
+        )
+
+    def _get_snapshot_msg(self) -> str:
+        if self._snapshot_msg is None:
+            self._snapshot_msg = self._encode("snapshot", self._state)
+        return self._snapshot_msg
+
+    def publish_once(self) -> Optional[str]:
+        """
+        Collecte l'état, diffuse le diff s'il y en a un.
+        Renvoie le message diffusé (None si rien n'a changé).
+        """
+        if self._version is not None:
+            v = self._version()
+            if v and v == self._last_version:
+                return None
+            self._last_version = v
+
+        cur = self._collect()
+        changes = diff_state(self._state, cur)
+        if not changes:
+            return None
+
+        t0 = time.perf_counter()
+        self._seq += 1
+        self._state = cur
+        self._snapshot_msg = None          # régénéré à la demande
+        msg = self._encode("diff", changes)
+        self.stats["encode_ms"] = (time.perf_counter() - t0) * 1000.0
+
+        for q in list(self._subscribers):
+            try:
+                q.put_nowait(msg)
+            except asyncio.QueueFull:
+                # abonné trop lent : on vide et on repart d'un snapshot
+                while not q.empty():
+                    q.get_nowait()
+                q.put_nowait(self._get_snapshot_msg())
+                self.stats["resyncs"] += 1
+        self.stats["messages"] += 1
+        return msg
+
+    async def run(self) -> None:
+        while True:
+            try:
+                self.publish_once()
+            except Exception as e:
+                logger.error("Stream: erreur collecte : %s", e)
+            await asyncio.sleep(self.period_s)
+
+    def start(self) -> None:
+        """À appeler depuis la boucle asyncio (startup FastAPI)."""
+        if self._task is None:
+            self._task = asyncio.get_running_loop().create_task(self.run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
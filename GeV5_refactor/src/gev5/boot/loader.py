@@ -166,6 +166,23 @@ def load_config(db_path: Optional[str] = None) -> SystemConfig:
     # Simulation
     sim = _safe_int(raw.get("SIM", "0"))
     suiv_block = _safe_int(raw.get("suiv_block", "0"))
+    tick_engine = _safe_int(raw.get("tick_engine", "0"))
+    alarmes_vectorisees = _safe_int(raw.get("alarmes_vectorisees", "0"))
+    moteur_comptage_s = _safe_float(raw.get("moteur_comptage_s", ""), default=0.01)
+    moteur_alarmes_s = _safe_float(raw.get("moteur_alarmes_s", ""), default=0.1)
+    moteur_defauts_s = _safe_float(raw.get("moteur_defauts_s", ""), default=60.0)
+    moteur_courbes_s = _safe_float(raw.get("moteur_courbes_s", ""), default=1.0)
+    comptage_source = str(raw.get("comptage_source", "") or "").strip().lower()
+    comptage_monotone = _safe_int(raw.get("comptage_monotone", "0"))
+    stream_period_s = _safe_float(raw.get("stream_period_s", ""), default=0.5)
+    bdf_retention_brut_j = _safe_int(raw.get("bdf_retention_brut_j", "30"), default=30)
+    bdf_retention_5m_j = _safe_int(raw.get("bdf_retention_5m_j", "400"), default=400)
+    bdf_retention_1h_j = _safe_int(raw.get("bdf_retention_1h_j", "0"))
+    fond_stats_fenetre_s = _safe_float(raw.get("fond_stats_fenetre_s", ""), default=1500.0)
+    fond_stats_percentiles = str(raw.get("fond_stats_percentiles", "") or "").strip()
+    rapport_workers = _safe_int(raw.get("rapport_workers", "1"), default=1)
+    rapport_file_max = _safe_int(raw.get("rapport_file_max", "4"), default=4)
+    f2c = _safe_int(raw.get("f2c", "0"))
 
     # RÃ©seaux / EVOK
     Rem_IP = raw.get("Rem_IP", "")
@@ -259,6 +276,25 @@ def load_config(db_path: Optional[str] = None) -> SystemConfig:
 
         # Divers
         db_path=db_path,
+
+        # Moteur temps réel
+        tick_engine=tick_engine,
+        alarmes_vectorisees=alarmes_vectorisees,
+        moteur_comptage_s=moteur_comptage_s,
+        moteur_alarmes_s=moteur_alarmes_s,
+        moteur_defauts_s=moteur_defauts_s,
+        moteur_courbes_s=moteur_courbes_s,
+        comptage_source=comptage_source,
+        comptage_monotone=comptage_monotone,
+        stream_period_s=stream_period_s,
+        bdf_retention_brut_j=bdf_retention_brut_j,
+        bdf_retention_5m_j=bdf_retention_5m_j,
+        bdf_retention_1h_j=bdf_retention_1h_j,
+        fond_stats_fenetre_s=fond_stats_fenetre_s,
+        fond_stats_percentiles=fond_stats_percentiles,
+        rapport_workers=rapport_workers,
+        rapport_file_max=rapport_file_max,
+        f2c=f2c,
     )
 
     return cfg
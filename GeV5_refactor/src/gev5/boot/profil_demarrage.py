@@ -0,0 +1,114 @@
+# src/gev5/boot/profil_demarrage.py
+from __future__ import annotations
+
+"""
+Profil du démarrage à froid (reprise après coupure secteur).
+
+- phases  : durée de chaque étape de Gev5System.start_all, loguée en fin
+            de démarrage et gardée dans system.phases ;
+- imports : rapport façon `python -X importtime`, mesuré dans un
+            interpréteur neuf (aucun module en cache) : modules les plus
+            lents en cumulé et en propre, et threads lancés par l'import
+            (doit rester 0 : les modules n'ont pas d'effet de bord).
+
+Usage (depuis GeV5_refactor/src) :
+    python -m gev5.boot.profil_demarrage [module] [n]
+"""
+
+import os
+import re
+import subprocess
+import sys
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+
+SRC_DIR = Path(__file__).resolve().parents[2]
+
+_LIGNE = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|( *)(\S+)\s*$")
+
+
+class Phases:
+    """Durées (ms) des étapes, dans l'ordre d'exécution."""
+
+    def __init__(self) -> None:
+        self.durees: Dict[str, float] = {}
+
+    @contextmanager
+    def mesure(self, nom: str) -> Iterator[None]:
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.durees[nom] = round((time.perf_counter() - t0) * 1000.0, 1)
+
+    def total_ms(self) -> float:
+        return round(sum(self.durees.values()), 1)
+
+    def resume(self) -> str:
+        etapes = ", ".join(f"{nom} {ms:.0f}" for nom, ms in self.durees.items())
+        return f"{self.total_ms():.0f} ms ({etapes})"
+
+
+@dataclass(frozen=True)
+class ImportMesure:
+    module: str
+    propre_us: int
+    cumul_us: int
+    profondeur: int
+
+
+def parser_importtime(texte: str) -> List[ImportMesure]:
+    """Lignes `import time: self | cumulative | package` de -X importtime."""
+    out = []
+    for ligne in texte.splitlines():
+        m = _LIGNE.match(ligne)
+        if m:
+            propre, cumul, indent, module = m.groups()
+            out.append(ImportMesure(module, int(propre), int(cumul), len(indent) // 2))
+    return out
+
+
+def profiler_imports(module: str = "gev5.boot", python: Optional[str] = None) -> Tuple[List[ImportMesure], int]:
+    """(mesures d'import, threads lancés par l'import) dans un interpréteur neuf."""
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(p for p in (str(SRC_DIR), env.get("PYTHONPATH", "")) if p)
+    code = f"import threading; import {module}; print(threading.active_count() - 1)"
+    res = subprocess.run(
+        [python or sys.executable, "-X", "importtime", "-c", code],
+        capture_output=True, text=True, env=env, cwd=str(SRC_DIR), timeout=120,
+    )
+    if res.returncode != 0:
+        raise RuntimeError(f"import {module} impossible :\n{res.stderr[-2000:]}")
+    return parser_importtime(res.stderr), int(res.stdout.strip().splitlines()[-1])
+
+
+def rapport_imports(mesures: List[ImportMesure], module: str, threads: int = 0, n: int = 15) -> str:
+    cible = next((m.cumul_us for m in mesures if m.module == module), 0)
+    total = sum(m.cumul_us for m in mesures if m.profondeur == 0)
+    lignes = [
+        f"import {module} : {cible / 1000:.0f} ms ({len(mesures)} modules, {total / 1000:.0f} ms pour tous les imports, site compris)",
+        f"threads lancés à l'import : {threads}",
+        "",
+        f"{'cumulé (ms)':>12} {'propre (ms)':>12}  module",
+    ]
+    for m in sorted(mesures, key=lambda m: m.cumul_us, reverse=True)[:n]:
+        lignes.append(f"{m.cumul_us / 1000:12.1f} {m.propre_us / 1000:12.1f}  {'  ' * m.profondeur}{m.module}")
+    lignes += ["", "plus coûteux en propre :"]
+    for m in sorted(mesures, key=lambda m: m.propre_us, reverse=True)[:n]:
+        lignes.append(f"{m.propre_us / 1000:12.1f}  {m.module}")
+    return "\n".join(lignes)
+
+
+def main(module: str = "gev5.boot", n: int = 15) -> None:
+    mesures, threads = profiler_imports(module)
+    print(rapport_imports(mesures, module, threads, n))
+
+
+if __name__ == "__main__":
+    main(
+        sys.argv[1] if len(sys.argv) > 1 else "gev5.boot",
+        int(sys.argv[2]) if len(sys.argv) > 2 else 15,
+    )
@@ -25,31 +25,44 @@ from __future__ import annotations
 import threading
 import time
 from logging import Logger
-from typing import Dict, List, Callable
+from typing import Dict, List, Callable, Sequence
 
 from ..utils.config import SystemConfig
 from ..utils.logging import get_logger
 
 from ..core.comptage.build import build_all_comptages
 from ..core.comptage.comptage import ComptageThread
+from ..core.comptage.impulsions import (
+    PulseSource,
+    GpioPulseSource,
+    EvokCounterSource,
+    SimPulseSource,
+)
 from ..core.alarmes.build import build_all_alarmes
 from ..core.defauts.build import build_all_defauts
 from ..core.courbes.build import build_all_courbes
 
 from ..core.alarmes.alarmes import AlarmeThread
+from ..core.alarmes.fond_stats import FondStats
 from ..core.defauts.defauts import DefautThread
 from ..core.courbes.courbes import CourbeThread
+from ..core.moteur.moteur import MoteurConfig, MoteurThread
+from ..core.snapshot import SnapshotStore, SnapshotThread
 
 from ..hardware.storage.collect_bdf_v2 import BdfCollectorV2
+from ..hardware.storage.bdf_tiers import RetentionPolicy
 from ..hardware.storage.db_write_v2 import PassageRecorderV2
 from ..hardware.storage.rapport_pdf import ReportThread
 
 from ..hardware.io import create_hardware
 from ..hardware.passage import PassageService, PassageConfig
+from ..hardware.passage_bus import PassageBus
 from ..hardware.vitesse_chargement import ListWatcher
 
 from ..core.acquittement.acquittement import AcquittementThread, AcquittementConfig
 
+from .profil_demarrage import Phases
+
 logger: Logger = get_logger("gev5.starter")
 
 
@@ -59,6 +72,8 @@ class Gev5System:
     def __init__(self, cfg: SystemConfig) -> None:
         self.cfg = cfg
         self.threads: List[threading.Thread] = []
+        # durées des étapes de start_all (profil du démarrage à froid)
+        self.phases = Phases()
 
         # Références vers les threads par famille (types spécifiques)
         self.comptage_threads: List[ComptageThread] = []
@@ -66,6 +81,10 @@ class Gev5System:
         self.defaut_threads: List[DefautThread] = []
         self.courbe_threads: List[CourbeThread] = []
 
+        # Moteur tick (opt-in) : un seul thread pilote les 4 familles
+        self.use_moteur = int(getattr(cfg, "tick_engine", 0)) == 1
+        self.moteur_thread: MoteurThread | None = None
+        self.snapshot_thread: SnapshotThread | None = None
 
         # Stockage V2
         self.bdf_thread: threading.Thread | None = None
@@ -77,16 +96,24 @@ class Gev5System:
         # Backend hardware (simu / prod) + service passage
         self.hw = create_hardware(cfg.sim)
         self.passage_service = PassageService(self.hw, PassageConfig())
+        # seul lecteur des cellules : diffuse START / STOP / fronts aux consommateurs
+        self.passage_bus = PassageBus(self.passage_service)
 
         # Acquittement & vitesse
         self.acq_thread: threading.Thread | None = None
         self.vitesse_thread: threading.Thread | None = None
+        self.photo_thread: threading.Thread | None = None
 
         # Hardware threads (prod)
         self.svr_unipi_thread = None
         self.relais_thread = None
         self.check_cell_thread = None
         self.interface_thread = None
+        # watchers cellules (etat_cellule_1 / 2), démarrés ici et plus à l'import
+        self.watchers: List[threading.Thread] = []
+
+        # Protocoles SCADA
+        self.passerelle_thread = None
 
     # ------------------------------------------------------------------ #
     # Helpers de mapping
@@ -110,6 +137,33 @@ class Gev5System:
             pins[ch] = 0
         return pins
 
+    def _build_pulse_sources(self, pins: Dict[int, int]) -> Dict[int, PulseSource]:
+        """
+        Sources d'impulsions par voie selon cfg.comptage_source :
+          - ""   : aucune (polling 10 ms historique)
+          - gpio : interruption sur PIN_n (voies avec pin != 0)
+          - evok : compteur de la DI EVOK n° PIN_n (voies avec pin != 0)
+          - sim  : impulsions simulées sur les 12 voies
+        """
+        mode = str(getattr(self.cfg, "comptage_source", "") or "")
+        sources: Dict[int, PulseSource] = {}
+        if not mode:
+            return sources
+
+        for ch, pin in pins.items():
+            if mode == "sim":
+                sources[ch] = SimPulseSource()
+            elif pin == 0:
+                continue
+            elif mode == "gpio":
+                sources[ch] = GpioPulseSource(pin)
+            elif mode == "evok":
+                sources[ch] = EvokCounterSource(pin)
+            else:
+                logger.warning("Comptage: source d'impulsions inconnue '%s' (polling)", mode)
+                return {}
+        return sources
+
     def _build_d_on_flags(self) -> Dict[int, int]:
         """Mapping {voie: Dn_ON} à partir de SystemConfig."""
         return {
@@ -130,24 +184,36 @@ class Gev5System:
     def _build_passage_flags(self) -> Dict[int, Callable[[], bool]]:
         """
         Construit un dict {voie: callable_bool} indiquant si un passage
-        est en cours, basé sur PassageService.
+        est en cours, basé sur le bus de passage (état de sa dernière lecture).
 
         Même logique pour toutes les voies :
         les cellules pilotent le portique entier.
         """
 
         def passage_actif() -> bool:
-            return self.passage_service.is_passage()
+            return self.passage_bus.is_passage()
 
         return {ch: passage_actif for ch in range(1, 13)}
 
+    def _start_family(self, threads: Sequence[threading.Thread]) -> None:
+        """
+        Démarre une famille de threads "cœur temps réel".
+        En mode moteur tick, les objets sont seulement construits :
+        c'est MoteurThread qui appelle leur step().
+        """
+        if self.use_moteur:
+            return
+        for t in threads:
+            t.start()
+            self.threads.append(t)
+
     # ------------------------------------------------------------------ #
     # Démarrage hardware (Svr_Unipi, Relais, Cellules, Interface)
     # ------------------------------------------------------------------ #
     def start_hardware(self) -> None:
         """
         Démarre les threads hardware nécessaires en mode prod (sim=0) :
-        - Svr_Unipi : poll REST des DI sur EVOK (:8080)
+        - Svr_Unipi : DI EVOK (:8080) en push WebSocket, REST en contrôle / secours
         - Relais    : commande des RO via WebSocket EVOK (:8080)
         - Check_open_cell : surveillance cellules ouvertes trop longtemps
         - Interface : supervision (collecte états pour l'API web)
@@ -159,11 +225,11 @@ class Gev5System:
             logger.info("Mode SIM=1 → hardware threads non démarrés")
             return
 
-        # ── 1. Svr_Unipi (poll REST des DI) — DOIT démarrer en premier ──
+        # ── 1. Svr_Unipi (DI EVOK : WS push + REST) — DOIT démarrer en premier ──
         try:
             from ..hardware.Svr_Unipi import demarrage_Srv_Unipi
             self.svr_unipi_thread = demarrage_Srv_Unipi()
-            logger.info("Svr_Unipi démarré (poll REST DI3/DI4/DI5)")
+            logger.info("Svr_Unipi démarré (DI3/DI4/DI5 : push WS, contrôle REST)")
         except Exception as e:
             logger.error("Échec démarrage Svr_Unipi: %s", e)
 
@@ -176,7 +242,7 @@ class Gev5System:
             self.relais_thread = Relais()
             self.relais_thread.start()
             self.threads.append(self.relais_thread)
-            logger.info("Relais démarré (commande RO via WebSocket)")
+            logger.info("Relais démarré (RO via WebSocket, sur changement de snapshot)")
         except Exception as e:
             logger.error("Échec démarrage Relais: %s", e)
 
@@ -184,7 +250,8 @@ class Gev5System:
         try:
             from ..hardware.Check_open_cell import etat_cellule_check
             self.check_cell_thread = etat_cellule_check(
-                Mode_sans_cellules=int(self.cfg.mode_sans_cellules)
+                Mode_sans_cellules=int(self.cfg.mode_sans_cellules),
+                bus=self.passage_bus,
             )
             self.check_cell_thread.start()
             self.threads.append(self.check_cell_thread)
@@ -202,6 +269,22 @@ class Gev5System:
         except Exception as e:
             logger.error("Échec démarrage Interface: %s", e)
 
+    def start_watchers(self) -> None:
+        """
+        Watchers cellules S1 / S2 (InputWatcher.cellules, lus par les
+        modules historiques et les chemins sans bus). Les modules etat_cellule_*
+        n'ont plus d'effet de bord à l'import : ils sont lancés ici, avec le
+        mode sim de la config déjà chargée (pas de relecture de Parametres.db).
+        """
+        from ..hardware import etat_cellule_1, etat_cellule_2
+
+        for module in (etat_cellule_1, etat_cellule_2):
+            watcher = module.demarrer(sim=int(self.cfg.sim))
+            if watcher not in self.watchers:
+                self.watchers.append(watcher)
+                self.threads.append(watcher)
+        logger.info("Watchers cellules démarrés (%d).", len(self.watchers))
+
     # ------------------------------------------------------------------ #
     # Démarrage des familles "cœur temps réel"
     # ------------------------------------------------------------------ #
@@ -220,13 +303,23 @@ class Gev5System:
             pins=pins,
             d_on_flags=d_on,
             sim=self.cfg.sim,
+            sources=self._build_pulse_sources(pins),
+            monotonic=int(getattr(self.cfg, "comptage_monotone", 0)) == 1,
         )
 
-        for t in self.comptage_threads:
-            t.start()
-            self.threads.append(t)
+        # moteur tick : les sources doivent être armées ici (pas de run())
+        if self.use_moteur:
+            for t in self.comptage_threads:
+                if t.source is not None:
+                    t.source.start()
+
+        self._start_family(self.comptage_threads)
 
-        logger.info("Comptage: %d threads démarrés", len(self.comptage_threads))
+        logger.info(
+            "Comptage: %d %s",
+            len(self.comptage_threads),
+            "voies (moteur tick)" if self.use_moteur else "threads démarrés",
+        )
 
     def start_defauts(self) -> None:
         """
@@ -262,11 +355,26 @@ class Gev5System:
             period_s=60.0,  # comme le time.sleep(60) des Defaut_X V1
         )
 
-        for t in self.defaut_threads:
-            t.start()
-            self.threads.append(t)
+        self._start_family(self.defaut_threads)
+
+        logger.info(
+            "Défauts: %d %s",
+            len(self.defaut_threads),
+            "voies (moteur tick)" if self.use_moteur else "threads démarrés",
+        )
 
-        logger.info("Défauts: %d threads démarrés", len(self.defaut_threads))
+    def _configure_fond_stats(self) -> None:
+        percentiles = []
+        for p in str(getattr(self.cfg, "fond_stats_percentiles", "") or "").split(","):
+            try:
+                if p.strip():
+                    percentiles.append(float(p))
+            except ValueError:
+                logger.warning("fond_stats_percentiles : valeur ignorée %r", p)
+        FondStats.configure(
+            window_s=float(getattr(self.cfg, "fond_stats_fenetre_s", 1500.0)),
+            percentiles=percentiles,
+        )
 
     def start_alarmes(self) -> None:
         """
@@ -283,8 +391,10 @@ class Gev5System:
         - tempo_s         = 0 (instantané, on pourra faire évoluer)
         - multiple        = cfg.multiple (seuil suiveur = fond * multiple)
         - get_passage_flags basé sur PassageService si mode_sans_cellules == 0
+        - statistiques glissantes du fond (FondStats) selon la config
         """
         d_on_flags = self._build_d_on_flags()
+        self._configure_fond_stats()
 
         seuil_n1 = float(self.cfg.seuil2)
         seuils_haut = {i: seuil_n1 for i in range(1, 13)}
@@ -312,7 +422,8 @@ class Gev5System:
             seuils_bas=seuils_bas,
             get_vals=get_vals,
             enabled_flags=enabled_flags,
-            period_s=0.1,                    # même rythme que le comptage
+            # même rythme que le comptage ; en moteur tick, celui du moteur (tempo)
+            period_s=float(self.cfg.moteur_alarmes_s) if self.use_moteur else 0.1,
             hysteresis=0.0,                  # hystérésis déjà géré via seuil_bas
             tempo_s=0.0,                     # instantané pour l'instant
             multiple=float(self.cfg.multiple),
@@ -320,11 +431,13 @@ class Gev5System:
             get_passage_flags=get_passage_flags,
         )
 
-        for t in self.alarme_threads:
-            t.start()
-            self.threads.append(t)
+        self._start_family(self.alarme_threads)
 
-        logger.info("Alarmes: %d threads démarrés", len(self.alarme_threads))
+        logger.info(
+            "Alarmes: %d %s",
+            len(self.alarme_threads),
+            "voies (moteur tick)" if self.use_moteur else "threads démarrés",
+        )
 
     def start_courbes(self) -> None:
         """
@@ -344,11 +457,65 @@ class Gev5System:
             period_s=1.0,
          )
 
-        for t in self.courbe_threads:
-            t.start()
-            self.threads.append(t)
+        self._start_family(self.courbe_threads)
+
+        logger.info(
+            "Courbes: %d %s",
+            len(self.courbe_threads),
+            "voies (moteur tick)" if self.use_moteur else "threads démarrés",
+        )
 
-        logger.info("Courbes: %d threads démarrés", len(self.courbe_threads))
+    def start_moteur(self) -> None:
+        """
+        Démarre le moteur tick (si cfg.tick_engine == 1).
+
+        Cadences (Parametres, défauts alignés sur le mode threads) :
+        - comptage : moteur_comptage_s (10 ms)
+        - alarmes  : moteur_alarmes_s (0.1 s, aussi period_s des AlarmeThread
+                     → tempo identique)
+        - défauts  : moteur_defauts_s (60 s)
+        - courbes  : moteur_courbes_s (1 s)
+
+        cfg.alarmes_vectorisees == 1 → alarmes évaluées par AlarmesVectorisees.
+        """
+        if not self.use_moteur:
+            return
+
+        self.moteur_thread = MoteurThread(
+            MoteurConfig(
+                comptage_period_s=float(self.cfg.moteur_comptage_s),
+                alarme_period_s=float(self.cfg.moteur_alarmes_s),
+                defaut_period_s=float(self.cfg.moteur_defauts_s),
+                courbe_period_s=float(self.cfg.moteur_courbes_s),
+                alarmes_vectorisees=int(getattr(self.cfg, "alarmes_vectorisees", 0)) == 1,
+            ),
+            comptages=self.comptage_threads,
+            alarmes=self.alarme_threads,
+            defauts=self.defaut_threads,
+            courbes=self.courbe_threads,
+        )
+        self.moteur_thread.start()
+        self.threads.append(self.moteur_thread)
+        logger.info("Moteur tick démarré (1 thread pour les 12 voies).")
+
+    def start_snapshot(self) -> None:
+        """
+        Snapshot versionné de l'état (core.snapshot) :
+        - cellules / vitesse fournies ici (le cœur ne dépend pas du hardware)
+        - moteur tick : publié par MoteurThread à chaque tick
+        - threads par voie : SnapshotThread toutes les 100 ms
+        """
+        SnapshotStore.set_sources(
+            cells=self.passage_bus.get_cells,
+            speed=lambda: ListWatcher.vitesse,
+        )
+        if self.use_moteur:
+            return
+
+        self.snapshot_thread = SnapshotThread(period_s=0.1)
+        self.snapshot_thread.start()
+        self.threads.append(self.snapshot_thread)
+        logger.info("Snapshot: publication périodique (100 ms)")
 
     # ------------------------------------------------------------------ #
     # Démarrage stockage V2 + rapport PDF
@@ -357,9 +524,15 @@ class Gev5System:
         """
         Démarre le collecteur V2 du bruit de fond.
 
-        Il lit AlarmeThread.fond[1..12] et écrit dans Bruit_de_fond.db.
+        Il lit AlarmeThread.fond[1..12] et écrit dans Bruit_de_fond.db
+        (brut + agrégats 5 min / 1 h, rétention selon la config).
         """
-        self.bdf_thread = BdfCollectorV2(interval=30)
+        retention = RetentionPolicy(
+            raw_days=int(getattr(self.cfg, "bdf_retention_brut_j", 30)),
+            m5_days=int(getattr(self.cfg, "bdf_retention_5m_j", 400)),
+            h1_days=int(getattr(self.cfg, "bdf_retention_1h_j", 0)),
+        )
+        self.bdf_thread = BdfCollectorV2(interval=30, retention=retention)
         self.bdf_thread.start()
         self.threads.append(self.bdf_thread)
         logger.info("BdfCollectorV2 démarré (interval=30s).")
@@ -368,9 +541,16 @@ class Gev5System:
         """
         Démarre l'enregistreur V2 des passages.
 
-        Il détecte les passages via les cellules et logge dans passages_v2.
+        Il suit les START / STOP du bus de passage et logge dans passages_v2,
+        avec la mesure de vitesse (fronts datés à la source) si les
+        cellules sont utilisées.
         """
-        self.passage_thread = PassageRecorderV2()
+        mss = int(self.cfg.mode_sans_cellules)
+        self.passage_thread = PassageRecorderV2(
+            sample_s=self.cfg.sample_time,
+            bus=self.passage_bus,
+            distance_m=float(self.cfg.distance_cellules) if mss == 0 else None,
+        )
         self.passage_thread.start()
         self.threads.append(self.passage_thread)
         logger.info("PassageRecorderV2 démarré.")
@@ -401,6 +581,8 @@ class Gev5System:
             noms_detecteurs=noms_detecteurs,
             seuil2=self.cfg.seuil2,
             language=self.cfg.language,
+            workers=int(getattr(self.cfg, "rapport_workers", 1)),
+            max_pending=int(getattr(self.cfg, "rapport_file_max", 4)),
         )
         self.report_thread.start()
         self.threads.append(self.report_thread)
@@ -416,9 +598,11 @@ class Gev5System:
             confirm_timeout_s=15.0,
         )
 
+        # le bus expose is_passage / are_cells_free_and_stable sans relire
+        # les cellules ni toucher aux fronts du service
         self.acq_thread = AcquittementThread(
             hw=self.hw,
-            passage_service=self.passage_service,
+            passage_service=self.passage_bus,
             config=cfg,
         )
 
@@ -436,42 +620,135 @@ class Gev5System:
         distance = float(self.cfg.distance_cellules)
         mss = int(self.cfg.mode_sans_cellules)
 
-        self.vitesse_thread = ListWatcher(distance, mss, self.passage_service)
+        self.vitesse_thread = ListWatcher(distance, mss, self.passage_service, bus=self.passage_bus)
         self.vitesse_thread.start()
         self.threads.append(self.vitesse_thread)
         logger.info("ListWatcher (vitesse) démarré.")
 
+    def start_photo(self) -> None:
+        """
+        Démarre PrisePhoto (camera=1 et RTSP renseigné) : photo sur START
+        du bus de passage, rattachée au passage par PassageRecorderV2.
+        """
+        if int(getattr(self.cfg, "camera", 0)) != 1 or not getattr(self.cfg, "RTSP", ""):
+            return
+
+        from ..hardware.prise_photo import PrisePhoto
+
+        self.photo_thread = PrisePhoto(
+            self.cfg.RTSP,
+            int(self.cfg.mode_sans_cellules),
+            bus=self.passage_bus,
+        )
+        self.photo_thread.start()
+        self.threads.append(self.photo_thread)
+        logger.info("PrisePhoto démarré (sur START du bus de passage).")
+
+    def start_passage_bus(self) -> None:
+        """
+        Démarre le bus de passage : seul thread qui lit les cellules
+        (PassageService.poll, 100 Hz). Les consommateurs (passages, vitesse,
+        photo) s'abonnent à leur construction : le bus est démarré après
+        eux, ils voient donc tous les mêmes événements dès le premier.
+        """
+        self.passage_bus.start()
+        self.threads.append(self.passage_bus)
+        logger.info("PassageBus démarré (%.0f Hz).", 1.0 / self.passage_bus.period_s)
+
+    # ------------------------------------------------------------------ #
+    # Protocoles SCADA
+    # ------------------------------------------------------------------ #
+    def start_passerelle(self) -> None:
+        """
+        Passerelle protocoles (hardware.passerelle) : un thread, une boucle
+        asyncio, une attente de snapshot pour tous les protocoles activés :
+        - Modbus/TCP (modbus=1) : registres mis à jour en place, acquittement
+          (registre 99) traité à la réception de l'écriture
+        - eVx (eVx=1)           : réponses préparées par version de snapshot
+        - F2C (f2c=1)           : trames FR21 des 12 voies en cache
+        """
+        from ..hardware.passerelle import Passerelle
+
+        passerelle = Passerelle()
+
+        if int(getattr(self.cfg, "modbus", 0)) == 1:
+            from ..hardware.modbus_async import MODBUS_PORT, ModbusServeur
+
+            def defaut_cell() -> int:
+                if self.check_cell_thread is None:
+                    return 0
+                return int(type(self.check_cell_thread).defaut_cell.get(1, 0))
+
+            passerelle.ajouter(ModbusServeur(echeance=int(self.cfg.echeance), defaut_cell=defaut_cell), MODBUS_PORT)
+
+        if int(getattr(self.cfg, "eVx", 0)) == 1:
+            from ..hardware.evx_async import EVX_PORT, EvxServeur
+            passerelle.ajouter(EvxServeur(), EVX_PORT)
+
+        if int(getattr(self.cfg, "f2c", 0)) == 1:
+            from ..hardware.f2c_async import F2C_PORT, F2CServeur
+            passerelle.ajouter(F2CServeur(), F2C_PORT)
+
+        if not passerelle.serveurs:
+            return
+        self.passerelle_thread = passerelle
+        passerelle.start()
+        self.threads.append(passerelle)
+        # chaque protocole échoue seul : on journalise ce qui écoute vraiment
+        passerelle.attendre_pret(2.0)
+        for nom, erreur in passerelle.echecs.items():
+            logger.error("Passerelle : %s non démarré (%s)", nom, erreur)
+        if passerelle.ports:
+            logger.info(
+                "Passerelle protocoles démarrée (%s).",
+                ", ".join(f"{nom}:{port}" for nom, port in passerelle.ports.items()),
+            )
+
     # ------------------------------------------------------------------ #
     # Démarrage global
     # ------------------------------------------------------------------ #
+    def _etape(self, start: Callable[[], None]) -> None:
+        with self.phases.mesure(start.__name__):
+            start()
+
     def start_all(self) -> None:
         logger.info("Démarrage GeV5 (cœur voies + stockage V2 + rapport PDF)")
 
         # ── Hardware (Svr_Unipi, Relais, Cellules, Interface) ──
         # DOIT démarrer EN PREMIER pour que les DI soient disponibles
-        self.start_hardware()
+        self._etape(self.start_hardware)
+        self._etape(self.start_watchers)
 
         # Cœur temps réel
-        self.start_comptage()
-        self.start_defauts()
-        self.start_alarmes()
-        self.start_courbes()
+        self._etape(self.start_comptage)
+        self._etape(self.start_defauts)
+        self._etape(self.start_alarmes)
+        self._etape(self.start_courbes)
+        self._etape(self.start_snapshot)
+        self._etape(self.start_moteur)
+
+        # Protocoles SCADA (lisent le snapshot)
+        self._etape(self.start_passerelle)
 
         # Stockage V2 (fond + passages)
-        self.start_bdf_collector()
-        self.start_passage_recorder()
+        self._etape(self.start_bdf_collector)
+        self._etape(self.start_passage_recorder)
 
         # Rapport PDF (comme avant, mais basé sur V2)
-        self.start_report_thread()
+        self._etape(self.start_report_thread)
 
         # Acquittement + vitesse
-        self.start_acquittement()
-        self.start_vitesse()
+        self._etape(self.start_acquittement)
+        self._etape(self.start_vitesse)
+        self._etape(self.start_photo)
+
+        # Bus de passage : après ses abonnés (aucun événement perdu)
+        self._etape(self.start_passage_bus)
 
         logger.info(
             "Tous les threads GeV5 (hardware + voies + stockage V2 + rapport PDF + acquittement + vitesse) sont démarrés."
         )
-
+        logger.info("Temps de démarrage par phase (ms) : %s", self.phases.resume())
 
 def start_all(cfg: SystemConfig) -> Gev5System:
     """
@@ -22,10 +22,11 @@ Différences par rapport à la V1 :
 import threading
 import time
 from dataclasses import dataclass
-from typing import Dict
+from typing import Dict, Union
 
 from ...hardware.io import HardwarePort
 from ...hardware.passage import PassageService
+from ...hardware.passage_bus import PassageBus
 from ..alarmes.alarmes import AlarmeThread  
 
 
@@ -51,7 +52,7 @@ class AcquittementThread(threading.Thread):
     def __init__(
         self,
         hw: HardwarePort,
-        passage_service: PassageService,
+        passage_service: Union[PassageService, PassageBus],
         config: AcquittementConfig | None = None,
     ) -> None:
         super().__init__(name="AcquittementThread")
@@ -1,5 +1,6 @@
 
 from .alarmes import AlarmeConfig, AlarmeThread
 from .build import build_all_alarmes
+from .fond_stats import FondStats, RunningStats
 
-__all__ = ["AlarmeConfig", "AlarmeThread", "build_all_alarmes"]
+__all__ = ["AlarmeConfig", "AlarmeThread", "build_all_alarmes", "FondStats", "RunningStats"]
@@ -5,6 +5,8 @@ import time
 from dataclasses import dataclass
 from typing import Dict, Callable, Optional
 
+from .fond_stats import FondStats
+
 
 @dataclass
 class AlarmeConfig:
@@ -46,6 +48,7 @@ class AlarmeThread(threading.Thread):
       - pdf_gen[id]         : flag à 1 quand une alarme vient d’être déclenchée
                               (à consommer par la logique PDF)
       - fond[id]            : estimation du fond radiologique
+      - seuil_effectif[id]  : seuil de déclenchement courant (max(seuil, suiveur))
 
     NOUVELLES PARTIES :
       - seuil suiveur : threshold_suiveur = fond * multiple
@@ -63,6 +66,7 @@ class AlarmeThread(threading.Thread):
     email_send_alarm: Dict[int, int] = {}      # 0=non envoyé, 1=à envoyer
     pdf_gen: Dict[int, int] = {}               # 0=pas de PDF, 1=PDF à générer
     fond: Dict[int, float] = {}                # estimation du fond par voie
+    seuil_effectif: Dict[int, float] = {}      # seuil courant (absolu / suiveur)
 
     def __init__(
         self,
@@ -87,6 +91,7 @@ class AlarmeThread(threading.Thread):
         self.email_send_alarm.setdefault(cid, 0)
         self.pdf_gen.setdefault(cid, 0)
         self.fond.setdefault(cid, 0.0)
+        self.seuil_effectif.setdefault(cid, float(self.cfg.seuil_haut))
 
         # timers internes pour la tempo
         self._timer_above = 0.0
@@ -152,6 +157,7 @@ class AlarmeThread(threading.Thread):
             new_fond = old_fond + alpha * (val - old_fond)
 
         self.fond[cid] = new_fond
+        FondStats.update(cid, new_fond)
 
     def _compute_effective_threshold(self, cid: int) -> float:
         """
@@ -228,61 +234,65 @@ class AlarmeThread(threading.Thread):
         cls.pdf_gen[channel_id] = 0
 
     # ------------------------------------------------------------------ #
-    # Boucle principale
+    # Pas d'évaluation (utilisé par run() et par le moteur à tick)
     # ------------------------------------------------------------------ #
-    def run(self) -> None:
+    def step(self) -> None:
+        """Une évaluation complète de l'alarme de la voie (lecture, fond, état)."""
         cid = self.cfg.channel_id
 
-        while True:
-            time.sleep(self._period_s)
+        if not self._is_enabled():
+            # voie désactivée → on force à 0
+            if self.alarme_resultat.get(cid, 0) != 0:
+                # si on passe de état alarmé à désactivé → on "nettoie"
+                self.alarme_resultat[cid] = 0
+                self.email_send_alarm[cid] = 0
+                self.pdf_gen[cid] = 0
+            return
+
+        # Lecture de la valeur (typiquement ComptageThread.compteur[cid])
+        try:
+            val = float(self._get_val())
+        except Exception:
+            val = 0.0
+
+        self.alarme_mesure[cid] = val
+
+        # État de passage (en fonction des cellules / mode sans cellules)
+        passage_actif = self._is_passage_active()
 
-            if not self._is_enabled():
-                # voie désactivée → on force à 0
-                if self.alarme_resultat.get(cid, 0) != 0:
-                    # si on passe de état alarmé à désactivé → on "nettoie"
-                    self.alarme_resultat[cid] = 0
-                    self.email_send_alarm[cid] = 0
-                    self.pdf_gen[cid] = 0
-                continue
-
-            # Lecture de la valeur (typiquement ComptageThread.compteur[cid])
-            try:
-                val = float(self._get_val())
-            except Exception:
-                val = 0.0
-
-            self.alarme_mesure[cid] = val
-
-            # État de passage (en fonction des cellules / mode sans cellules)
-            passage_actif = self._is_passage_active()
-
-            # Mise à jour du fond (hors alarme, sous seuil haut, typiquement hors passage)
-            self._update_fond(val, passage_actif)
-
-            # Calcul du nouvel état d'alarme
-            old_state = self.alarme_resultat.get(cid, 0)
-            new_state = self._compute_alarm_state(val, passage_actif)
-
-            # Hystérésis basique : si l'alarme est active mais que l'on
-            # repasse franchement sous le seuil bas, on retombe à 0.
-            if new_state == 0 and old_state != 0:
-                if val <= self.cfg.seuil_bas - self.cfg.hysteresis:
-                    # retour à la normale
-                    self.alarme_resultat[cid] = 0
-                    self.email_send_alarm[cid] = 0
-                    self.pdf_gen[cid] = 0
-                else:
-                    # on maintient l'ancien état tant qu'on n'est pas vraiment descendu
-                    new_state = old_state
-
-            # Mise à jour des états
-            if new_state != old_state:
-                self.alarme_resultat[cid] = new_state
-
-                # Front montant d'alarme : on lève les flags
-                if old_state == 0 and new_state in (1, 2):
-                    self.email_send_alarm[cid] = 1
-                    self.pdf_gen[cid] = 1
+        # Mise à jour du fond (hors alarme, sous seuil haut, typiquement hors passage)
+        self._update_fond(val, passage_actif)
+        self.seuil_effectif[cid] = self._compute_effective_threshold(cid)
+
+        # Calcul du nouvel état d'alarme
+        old_state = self.alarme_resultat.get(cid, 0)
+        new_state = self._compute_alarm_state(val, passage_actif)
+
+        # Hystérésis basique : si l'alarme est active mais que l'on
+        # repasse franchement sous le seuil bas, on retombe à 0.
+        if new_state == 0 and old_state != 0:
+            if val <= self.cfg.seuil_bas - self.cfg.hysteresis:
+                # retour à la normale
+                self.alarme_resultat[cid] = 0
+                self.email_send_alarm[cid] = 0
+                self.pdf_gen[cid] = 0
             else:
-                # pas de changement : on ne fait rien de spécial
-                pass
+                # on maintient l'ancien état tant qu'on n'est pas vraiment descendu
+                new_state = old_state
+
+        # Mise à jour des états
+        if new_state != old_state:
+            self.alarme_resultat[cid] = new_state
+
+            # Front montant d'alarme : on lève les flags
+            if old_state == 0 and new_state in (1, 2):
+                self.email_send_alarm[cid] = 1
+                self.pdf_gen[cid] = 1
+
+    # ------------------------------------------------------------------ #
+    # Boucle principale
+    # ------------------------------------------------------------------ #
+    def run(self) -> None:
+        while True:
+            time.sleep(self._period_s)
+            self.step()
@@ -0,0 +1,170 @@
+from __future__ import annotations
+
+"""
+Statistiques glissantes du bruit de fond, en mémoire.
+
+Alimentées à chaque mise à jour du fond (AlarmeThread._update_fond ou
+AlarmesVectorisees.step) ; lues par le PDF, l'API et le Modbus sans
+requête SQLite :
+
+- moyenne / variance : Welford sur la fenêtre (ajout ET retrait en O(1))
+- min / max          : files monotones (O(1) amorti)
+- percentiles        : optionnels, liste triée de la fenêtre (bisect)
+"""
+
+import math
+import threading
+import time
+from bisect import bisect_left, insort
+from collections import deque
+from typing import Deque, Dict, List, Optional, Sequence, Tuple
+
+
+class RunningStats:
+    """
+    Statistiques d'une voie sur les `window_s` dernières secondes.
+
+    Un seul écrivain (le thread d'alarme de la voie) ; les lectures
+    (summary) se font sous le verrou de la voie.
+    """
+
+    __slots__ = (
+        "window_s", "max_samples", "percentiles", "_lock", "_samples",
+        "_n", "_mean", "_m2", "_minq", "_maxq", "_sorted", "_last", "_seq",
+    )
+
+    def __init__(
+        self,
+        window_s: float = 1500.0,
+        percentiles: Sequence[float] = (),
+        max_samples: int = 20000,
+    ) -> None:
+        self.window_s = float(window_s)
+        self.max_samples = int(max_samples)
+        self.percentiles: Tuple[float, ...] = tuple(float(p) for p in percentiles)
+        self._lock = threading.Lock()
+        # (n° d'ordre, date, valeur) ; les files min / max portent le n° d'ordre
+        self._samples: Deque[Tuple[int, float, float]] = deque()
+        self._n = 0
+        self._mean = 0.0
+        self._m2 = 0.0
+        self._minq: Deque[Tuple[int, float]] = deque()
+        self._maxq: Deque[Tuple[int, float]] = deque()
+        self._sorted: List[float] = []
+        self._last = 0.0
+        self._seq = 0
+
+    def __len__(self) -> int:
+        return self._n
+
+    # ------------------------------------------------------------------ #
+    # Écriture
+    # ------------------------------------------------------------------ #
+    def _remove_oldest(self) -> None:
+        seq, _ts, x = self._samples.popleft()
+        n = self._n - 1
+        if n == 0:
+            self._n, self._mean, self._m2 = 0, 0.0, 0.0
+        else:
+            delta = x - self._mean
+            self._mean -= delta / n
+            self._m2 = max(0.0, self._m2 - delta * (x - self._mean))
+            self._n = n
+        if self._minq and self._minq[0][0] <= seq:
+            self._minq.popleft()
+        if self._maxq and self._maxq[0][0] <= seq:
+            self._maxq.popleft()
+        if self.percentiles:
+            del self._sorted[bisect_left(self._sorted, x)]
+
+    def push(self, x: float, ts: Optional[float] = None) -> None:
+        if ts is None:
+            ts = time.monotonic()
+        x = float(x)
+        with self._lock:
+            # fenêtre : retrait des échantillons trop anciens
+            limit = ts - self.window_s
+            samples = self._samples
+            while samples and (samples[0][1] < limit or len(samples) >= self.max_samples):
+                self._remove_oldest()
+
+            seq = self._seq = self._seq + 1
+            samples.append((seq, ts, x))
+            self._n += 1
+            delta = x - self._mean
+            self._mean += delta / self._n
+            self._m2 += delta * (x - self._mean)
+
+            minq = self._minq
+            while minq and minq[-1][1] >= x:
+                minq.pop()
+            minq.append((seq, x))
+            maxq = self._maxq
+            while maxq and maxq[-1][1] <= x:
+                maxq.pop()
+            maxq.append((seq, x))
+
+            if self.percentiles:
+                insort(self._sorted, x)
+            self._last = x
+
+    # ------------------------------------------------------------------ #
+    # Lecture
+    # ------------------------------------------------------------------ #
+    def summary(self) -> Dict[str, float]:
+        """{"n", "avg", "std", "min", "max", "last"[, "p50", ...]}."""
+        with self._lock:
+            n = self._n
+            if n == 0:
+                out = {"n": 0.0, "avg": 0.0, "std": 0.0, "min": 0.0, "max": 0.0, "last": 0.0}
+                for p in self.percentiles:
+                    out[f"p{p:g}"] = 0.0
+                return out
+            out = {
+                "n": float(n),
+                "avg": self._mean,
+                "std": math.sqrt(self._m2 / (n - 1)) if n > 1 else 0.0,
+                "min": self._minq[0][1],
+                "max": self._maxq[0][1],
+                "last": self._last,
+            }
+            for p in self.percentiles:
+                # rang le plus proche
+                k = min(n - 1, max(0, int(math.ceil(p / 100.0 * n)) - 1))
+                out[f"p{p:g}"] = self._sorted[k]
+            return out
+
+
+class FondStats:
+    """
+    Registre partagé des statistiques de fond par voie (dicts de classe,
+    comme AlarmeThread.fond). configure() est appelé au boot ; les voies
+    sont créées à la première mise à jour.
+    """
+
+    window_s: float = 1500.0          # 50 collectes de 30 s (ancien rapport)
+    percentiles: Tuple[float, ...] = ()
+    stats: Dict[int, RunningStats] = {}
+
+    @classmethod
+    def configure(cls, window_s: float = 1500.0, percentiles: Sequence[float] = ()) -> None:
+        cls.window_s = float(window_s)
+        cls.percentiles = tuple(percentiles)
+        cls.stats = {}
+
+    @classmethod
+    def update(cls, channel_id: int, value: float, ts: Optional[float] = None) -> None:
+        rs = cls.stats.get(channel_id)
+        if rs is None:
+            rs = cls.stats.setdefault(channel_id, RunningStats(cls.window_s, cls.percentiles))
+        rs.push(value, ts)
+
+    @classmethod
+    def get(cls, channel_id: int) -> Optional[Dict[str, float]]:
+        rs = cls.stats.get(channel_id)
+        return rs.summary() if rs is not None and len(rs) else None
+
+    @classmethod
+    def snapshot(cls) -> Dict[int, Dict[str, float]]:
+        """{voie: summary} des voies ayant au moins un échantillon."""
+        return {cid: rs.summary() for cid, rs in list(cls.stats.items()) if len(rs)}
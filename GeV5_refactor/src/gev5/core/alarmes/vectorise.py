@@ -0,0 +1,235 @@
+from __future__ import annotations
+
+from typing import Callable, List, Optional, Sequence
+
+import numpy as np
+
+from .alarmes import AlarmeConfig, AlarmeThread
+from .fond_stats import FondStats
+
+
+class AlarmesVectorisees:
+    """
+    Évaluation groupée des alarmes des 12 voies sur tableaux NumPy.
+
+    Même logique que AlarmeThread.step(), appliquée à toutes les voies en
+    une seule passe vectorisée :
+      - fond EMA (alpha = 0.05) hors alarme / hors passage / sous seuil haut
+      - seuil suiveur = fond * multiple, seuil effectif = max(seuil_haut, suiveur)
+      - tempo (timer au-dessus du seuil), N1 / N2 (n2_factor)
+      - retour à 0 par hystérésis sur seuil_bas
+      - flags email_send_alarm / pdf_gen sur front montant
+
+    Les transitions sont identiques bit à bit à celles de AlarmeThread
+    (mêmes opérations flottantes IEEE, voie par voie). Les dicts de classe
+    de AlarmeThread restent la référence partagée : les états sont relus
+    au début de chaque pas (acquittement, ReportThread) et seules les
+    valeurs modifiées sont réécrites.
+    """
+
+    ALPHA = 0.05
+
+    def __init__(
+        self,
+        configs: Sequence[AlarmeConfig],
+        get_vals: Sequence[Callable[[], float]],
+        enabled_flags: Optional[Sequence[Optional[Callable[[], bool]]]] = None,
+        get_passages: Optional[Sequence[Optional[Callable[[], bool]]]] = None,
+        period_s: float = 0.1,
+    ) -> None:
+        n = len(configs)
+        self.channel_ids: List[int] = [c.channel_id for c in configs]
+        self.n = n
+        self._period_s = float(period_s)
+
+        self._get_vals = list(get_vals)
+        self._enabled_flags = list(enabled_flags) if enabled_flags is not None else [None] * n
+        self._get_passages = list(get_passages) if get_passages is not None else [None] * n
+
+        # Configuration par voie
+        self.seuil_haut = np.array([c.seuil_haut for c in configs], dtype=np.float64)
+        self.seuil_bas = np.array([c.seuil_bas for c in configs], dtype=np.float64)
+        self.hysteresis = np.array([c.hysteresis for c in configs], dtype=np.float64)
+        self.tempo_s = np.array([c.tempo_s for c in configs], dtype=np.float64)
+        self.n2_factor = np.array([c.n2_factor for c in configs], dtype=np.float64)
+        self.multiple = np.array([c.multiple for c in configs], dtype=np.float64)
+        self.sans_cellules = np.array([c.mode_sans_cellules == 1 for c in configs], dtype=bool)
+        self._tempo_active = self.tempo_s > 0.0
+        self._suiveur_on = self.multiple > 0.0
+        self._seuil_retour = self.seuil_bas - self.hysteresis
+        self._sans_cellules_l = self.sans_cellules.tolist()
+
+        # États internes
+        self.fond = np.array(
+            [float(AlarmeThread.fond.get(cid, 0.0)) for cid in self.channel_ids],
+            dtype=np.float64,
+        )
+        self.timer_above = np.zeros(n, dtype=np.float64)
+        self.seuil_eff = self.seuil_haut.copy()
+        self.state = np.zeros(n, dtype=np.int64)
+        self.mesure = np.zeros(n, dtype=np.float64)
+
+        for cid in self.channel_ids:
+            AlarmeThread.alarme_resultat.setdefault(cid, 0)
+            AlarmeThread.alarme_mesure.setdefault(cid, 0.0)
+            AlarmeThread.email_send_alarm.setdefault(cid, 0)
+            AlarmeThread.pdf_gen.setdefault(cid, 0)
+            AlarmeThread.fond.setdefault(cid, 0.0)
+        for cid, seuil in zip(self.channel_ids, self.seuil_haut.tolist()):
+            AlarmeThread.seuil_effectif.setdefault(cid, seuil)
+
+    @classmethod
+    def from_threads(cls, threads: Sequence[AlarmeThread]) -> "AlarmesVectorisees":
+        """
+        Construit l'évaluateur à partir des AlarmeThread de build_all_alarmes
+        (mêmes configs, mêmes callables). Les threads ne doivent pas être démarrés.
+        """
+        periods = {t._period_s for t in threads}
+        if len(periods) > 1:
+            raise ValueError("period_s différent selon les voies : non supporté")
+        return cls(
+            configs=[t.cfg for t in threads],
+            get_vals=[t._get_val for t in threads],
+            enabled_flags=[t._enabled_flag for t in threads],
+            get_passages=[t._get_passage for t in threads],
+            period_s=periods.pop() if periods else 0.1,
+        )
+
+    # ------------------------------------------------------------------ #
+    # Lecture des entrées (mêmes règles de repli que AlarmeThread)
+    # ------------------------------------------------------------------ #
+    @staticmethod
+    def _call_bool(fn: Optional[Callable[[], bool]]) -> bool:
+        if fn is None:
+            return True
+        try:
+            return bool(fn())
+        except Exception:
+            return True
+
+    @staticmethod
+    def _call_float(fn: Callable[[], float]) -> float:
+        try:
+            return float(fn())
+        except Exception:
+            return 0.0
+
+    def _read_inputs(self) -> tuple[list, list, list]:
+        enabled = [self._call_bool(f) for f in self._enabled_flags]
+        vals = [
+            self._call_float(f) if en else 0.0
+            for f, en in zip(self._get_vals, enabled)
+        ]
+        passage = [
+            True if (sc or not en) else self._call_bool(h)
+            for h, en, sc in zip(self._get_passages, enabled, self._sans_cellules_l)
+        ]
+        return vals, enabled, passage
+
+    # ------------------------------------------------------------------ #
+    # Pas vectorisé
+    # ------------------------------------------------------------------ #
+    def step(
+        self,
+        vals: Optional[Sequence[float]] = None,
+        enabled: Optional[Sequence[bool]] = None,
+        passage: Optional[Sequence[bool]] = None,
+    ) -> None:
+        """
+        Évalue les alarmes de toutes les voies.
+
+        Si vals / enabled / passage ne sont pas fournis, ils sont lus via les
+        callables (comme AlarmeThread). En mode sans cellules, passage est
+        forcé à True quelle que soit l'entrée.
+        """
+        if vals is None or enabled is None or passage is None:
+            r_vals, r_enabled, r_passage = self._read_inputs()
+            vals = r_vals if vals is None else vals
+            enabled = r_enabled if enabled is None else enabled
+            passage = r_passage if passage is None else passage
+
+        v = np.asarray(vals, dtype=np.float64)
+        en = np.asarray(enabled, dtype=bool)
+        pa = np.asarray(passage, dtype=bool) | self.sans_cellules
+
+        ids = self.channel_ids
+        res = AlarmeThread.alarme_resultat
+        email = AlarmeThread.email_send_alarm
+        pdf = AlarmeThread.pdf_gen
+
+        # États partagés (peuvent avoir été modifiés par l'acquittement / le PDF)
+        old_l = [res.get(cid, 0) for cid in ids]
+        email_l = [email.get(cid, 0) for cid in ids]
+        pdf_l = [pdf.get(cid, 0) for cid in ids]
+        old = np.asarray(old_l, dtype=np.int64)
+
+        # ── Fond EMA : hors alarme, hors passage (mode cellules), sous seuil haut ──
+        fond = self.fond
+        upd = en & (old == 0) & (self.sans_cellules | ~pa) & (v < self.seuil_haut)
+        fond = np.where(upd, np.where(fond <= 0.0, v, fond + self.ALPHA * (v - fond)), fond)
+        self.fond = fond
+
+        # ── Seuil effectif = max(seuil_haut, fond * multiple) ──
+        seuil_eff = np.where(
+            self._suiveur_on & (fond > 0.0),
+            np.maximum(self.seuil_haut, fond * self.multiple),
+            self.seuil_haut,
+        )
+        self.seuil_eff = seuil_eff
+
+        # ── Tempo : hors passage (mode cellules) ou sous le seuil → remise à 0 ──
+        armed = en & pa
+        above = armed & (v >= seuil_eff + self.hysteresis)
+        self.timer_above = np.where(
+            above, self.timer_above + self._period_s, np.where(en, 0.0, self.timer_above)
+        )
+
+        # ── État calculé 0/1/2 ──
+        active_n1 = armed & np.where(self._tempo_active, self.timer_above >= self.tempo_s, v >= seuil_eff)
+        computed = np.where(active_n1, np.where(v >= seuil_eff * self.n2_factor, 2, 1), 0)
+
+        # ── Hystérésis de retour sur seuil_bas ──
+        falling = en & (computed == 0) & (old != 0)
+        back_to_zero = falling & (v <= self._seuil_retour)
+        computed = np.where(falling & ~back_to_zero, old, computed)
+
+        # voie désactivée → 0 (nettoyage si elle était alarmée)
+        state = np.where(en, computed, 0)
+        rising = en & (old == 0) & (computed != 0)
+        cleared = (~en & (old != 0)) | back_to_zero
+
+        self.state = state
+        self.mesure = np.where(en, v, self.mesure)
+
+        # ── Publication (uniquement ce qui change) ──
+        state_l = state.tolist()
+        rising_l = rising.tolist()
+        cleared_l = cleared.tolist()
+        en_l = en.tolist()
+        upd_l = upd.tolist()
+        v_l = v.tolist()
+        fond_l = fond.tolist()
+        seuil_l = seuil_eff.tolist()
+
+        fond_d = AlarmeThread.fond
+        mesure_d = AlarmeThread.alarme_mesure
+        seuil_d = AlarmeThread.seuil_effectif
+        for i, cid in enumerate(ids):
+            if en_l[i]:
+                mesure_d[cid] = v_l[i]
+                fond_d[cid] = fond_l[i]
+                seuil_d[cid] = seuil_l[i]
+            if upd_l[i]:
+                FondStats.update(cid, fond_l[i])
+            if state_l[i] != old_l[i]:
+                res[cid] = state_l[i]
+            if rising_l[i]:
+                flag = 1
+            elif cleared_l[i]:
+                flag = 0
+            else:
+                continue
+            if email_l[i] != flag:
+                email[cid] = flag
+            if pdf_l[i] != flag:
+                pdf[cid] = flag
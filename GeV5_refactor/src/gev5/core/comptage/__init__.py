@@ -1,5 +1,20 @@
-
 from .comptage import ComptageConfig, ComptageThread
 from .build import build_all_comptages
+from .impulsions import (
+    PulseRing,
+    PulseSource,
+    GpioPulseSource,
+    EvokCounterSource,
+    SimPulseSource,
+)
 
-__all__ = ["ComptageConfig", "ComptageThread", "build_all_comptages"]
+__all__ = [
+    "ComptageConfig",
+    "ComptageThread",
+    "build_all_comptages",
+    "PulseRing",
+    "PulseSource",
+    "GpioPulseSource",
+    "EvokCounterSource",
+    "SimPulseSource",
+]
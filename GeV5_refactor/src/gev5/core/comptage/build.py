@@ -1,9 +1,10 @@
 
 from __future__ import annotations
 
-from typing import Dict, List
+from typing import Dict, List, Optional
 
 from .comptage import ComptageConfig, ComptageThread
+from .impulsions import PulseSource
 
 
 def build_all_comptages(
@@ -11,6 +12,8 @@ def build_all_comptages(
     pins: Dict[int, int],
     d_on_flags: Dict[int, int],
     sim: int,
+    sources: Optional[Dict[int, PulseSource]] = None,
+    monotonic: bool = False,
 ) -> List[ComptageThread]:
     """Construit les 12 threads de comptage (1 par voie).
 
@@ -18,6 +21,10 @@ def build_all_comptages(
     - pins       : {1: pin_D1, 2: pin_D2, ...}
     - d_on_flags : {1: D1_ON, 2: D2_ON, ...}
     - sim        : 0/1
+    - sources    : {voie: PulseSource} optionnel (mode événementiel) ;
+                   les voies absentes restent en polling
+    - monotonic  : fenêtres à échéances fixes (monotonic_ns) en polling
+                   (toujours le cas en mode source)
     """
     threads: List[ComptageThread] = []
 
@@ -29,8 +36,13 @@ def build_all_comptages(
             sampling=sampling,
             pin=pins[channel_id],
             sim=sim,
+            monotonic=monotonic,
+        )
+        t = ComptageThread(
+            cfg,
+            d_on_flag=d_on_flags.get(channel_id, 1),
+            source=(sources or {}).get(channel_id),
         )
-        t = ComptageThread(cfg, d_on_flag=d_on_flags.get(channel_id, 1))
         threads.append(t)
 
     return threads
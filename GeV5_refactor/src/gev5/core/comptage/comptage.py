@@ -2,8 +2,11 @@ from __future__ import annotations
 
 import threading
 import time
+from collections import deque
 from dataclasses import dataclass
-from typing import Dict, Optional
+from typing import Deque, Dict, Optional
+
+from .impulsions import PulseSource
 
 
 @dataclass
@@ -14,6 +17,7 @@ class ComptageConfig:
     sampling: float
     pin: int
     sim: int
+    monotonic: bool = False   # fenêtres à échéances fixes (monotonic_ns)
 
 
 class ComptageThread(threading.Thread):
@@ -25,14 +29,36 @@ class ComptageThread(threading.Thread):
     - gère les hooks :
         * is_pdf_running() → fige le comptage
         * is_defaut_active() → compteur=0 si défaut
+
+    Deux modes d'acquisition :
+      - polling (défaut) : read_impulsion() toutes les 10 ms
+      - source (source=PulseSource) : les impulsions sont horodatées par la
+        source (interruption GPIO, compteur EVOK, simulation) ; le thread
+        dort jusqu'à la fin de la fenêtre et compte dans le tampon
+
+    Fenêtres :
+      - historique : time.time() - t0 >= sampling puis t0 = time.time()
+        (dérive de la durée de boucle, sensible aux sauts NTP)
+      - échéances fixes (cfg.monotonic ou mode source) : time.monotonic_ns,
+        échéance k = t0 + k*sampling, fréquence normalisée par la durée
+        réelle de la fenêtre, retard de chaque clôture publié dans jitter
     """
 
     # États partagés entre toutes les voies
     compteur: Dict[int, float] = {}
     compteur_brut: Dict[int, float] = {}        # brut non filtré (optionnel)
     cpt_impulsions: Dict[int, int] = {}  # impulsions accumulées dans sampling
+    jitter: Dict[int, Dict[str, float]] = {}  # retard des clôtures (ms) par voie
 
-    def __init__(self, cfg: ComptageConfig, d_on_flag: int = 1) -> None:
+    POLL_NS = 10_000_000     # 10 ms : lecture des impulsions en polling
+    JITTER_WINDOW = 256      # nb de fenêtres pour mean / p99
+
+    def __init__(
+        self,
+        cfg: ComptageConfig,
+        d_on_flag: int = 1,
+        source: Optional[PulseSource] = None,
+    ) -> None:
         super().__init__(name=f"Comptage_{cfg.channel_id}")
         self.cfg = cfg
         self.channel_id = cfg.channel_id
@@ -41,12 +67,24 @@ class ComptageThread(threading.Thread):
         self.pin = cfg.pin
         self.sim = cfg.sim
         self.d_on_flag = d_on_flag
+        self.source = source
+        self.deadline_mode = bool(getattr(cfg, "monotonic", False)) or source is not None
 
         # init des dicts
         self.compteur.setdefault(self.channel_id, 0.0)
         self.compteur_brut.setdefault(self.raw_key, 0.0)
         self.cpt_impulsions.setdefault(self.channel_id, 0)
 
+        # début de la fenêtre courante
+        self._t0 = time.time()
+
+        # échéances fixes (horloge monotone, ns)
+        self._period_ns = max(1, int(round(self.sampling * 1e9)))
+        self._late_ms: Deque[float] = deque(maxlen=self.JITTER_WINDOW)
+        self._windows = 0
+        self._missed = 0
+        self._arm_deadline(time.monotonic_ns())
+
     # ------------------------------------------------------------------ #
     # Hooks intégrés
     # ------------------------------------------------------------------ #
@@ -84,44 +122,146 @@ class ComptageThread(threading.Thread):
         return 1 if self.pin != 0 else 0
 
     # ------------------------------------------------------------------ #
-    # Boucle principale
+    # Pas de comptage (utilisé par run() et par le moteur à tick)
     # ------------------------------------------------------------------ #
-    def run(self) -> None:
-        t0 = time.time()
+    def step(self, now: Optional[float] = None) -> None:
+        """
+        Un pas de comptage : lecture d'une impulsion puis clôture de la
+        fenêtre si la période d'échantillonnage est atteinte.
+        """
+        if now is None:
+            now = time.time()
 
-        while True:
-            time.sleep(0.01)  # haute résolution impulsions
+        # voie désactivée ?
+        if self.d_on_flag == 0:
+            self.compteur[self.channel_id] = 0
+            return
+
+        # comptage impulsions (en mode source, c'est la source qui compte)
+        if self.source is None and self.read_impulsion():
+            self.cpt_impulsions[self.channel_id] += 1
+
+        if self.deadline_mode:
+            self._deadline_step(time.monotonic_ns())
+            return
+
+        # période atteinte ?
+        if now - self._t0 >= self.sampling:
+            self._t0 = now
+            self._close_window()
+
+    # ------------------------------------------------------------------ #
+    # Fenêtres à échéances fixes
+    # ------------------------------------------------------------------ #
+    def _arm_deadline(self, now_ns: int) -> None:
+        """Origine de la grille : échéance k = now_ns + k*sampling."""
+        self._win_start_ns = now_ns
+        self._next_deadline_ns = now_ns + self._period_ns
 
-            # voie désactivée ?
-            if self.d_on_flag == 0:
-                self.compteur[self.channel_id] = 0
-                continue
+    def _deadline_step(self, now_ns: int) -> None:
+        """Clôture la fenêtre si l'échéance courante est atteinte."""
+        deadline = self._next_deadline_ns
+        if now_ns < deadline:
+            return
 
-            # comptage impulsions
-            if self.read_impulsion():
-                self.cpt_impulsions[self.channel_id] += 1
+        # échéance suivante sur la grille (échéances ratées sautées et comptées)
+        nxt = deadline + self._period_ns
+        if nxt <= now_ns:
+            missed = (now_ns - nxt) // self._period_ns + 1
+            nxt += missed * self._period_ns
+            self._missed += missed
+        self._next_deadline_ns = nxt
 
-            # période atteinte ?
-            if time.time() - t0 >= self.sampling:
-                impulses = self.cpt_impulsions[self.channel_id]
-                t0 = time.time()
+        start_ns, self._win_start_ns = self._win_start_ns, now_ns
+        self._record_jitter(now_ns - deadline)
 
-                # brut → historique V1 : raw_key = 10,20,30...
-                self.compteur_brut[self.raw_key] = impulses
+        if self.source is not None:
+            self._close_window_source(start_ns / 1e9, now_ns / 1e9)
+        else:
+            self._close_window((now_ns - start_ns) / 1e9)
 
-                # PDF en cours → fige la valeur (ne touche pas compteur)
-                if self.is_pdf_running():
-                    self.cpt_impulsions[self.channel_id] = 0
-                    continue
+    def _record_jitter(self, late_ns: int) -> None:
+        """Publie le retard de la clôture par rapport à son échéance."""
+        late_ms = late_ns / 1e6
+        self._late_ms.append(late_ms)
+        self._windows += 1
 
-                # défaut actif → compteur = 0
-                if self.is_defaut_active():
-                    self.compteur[self.channel_id] = 0
-                    self.cpt_impulsions[self.channel_id] = 0
-                    continue
+        values = sorted(self._late_ms)
+        n = len(values)
+        self.jitter[self.channel_id] = {
+            "windows": float(self._windows),
+            "missed": float(self._missed),
+            "last_ms": late_ms,
+            "mean_ms": sum(values) / n,
+            "p99_ms": values[min(n - 1, int(0.99 * n))],
+            "max_ms": values[-1],
+        }
 
-                # calcul fréquence (simple)
-                freq = impulses / self.sampling
+    def _close_window_source(self, start: float, end: float) -> None:
+        """
+        Fin de fenêtre en mode source : compte les impulsions horodatées
+        dans [start, end[ (secondes monotones) et normalise par end - start.
+        """
+        source = self.source
+        assert source is not None
+        source.poll(end)
+        self.cpt_impulsions[self.channel_id] = source.ring.count_between(start, end)
+        self._close_window(end - start)
 
-                self.compteur[self.channel_id] = freq
-                self.cpt_impulsions[self.channel_id] = 0
+    def _close_window(self, elapsed: Optional[float] = None) -> None:
+        """
+        Fin de fenêtre : publie brut + fréquence et remet l'accumulateur à 0.
+        elapsed : durée réelle de la fenêtre (défaut : sampling).
+        """
+        impulses = self.cpt_impulsions[self.channel_id]
+
+        # brut → historique V1 : raw_key = 10,20,30...
+        self.compteur_brut[self.raw_key] = impulses
+
+        # PDF en cours → fige la valeur (ne touche pas compteur)
+        if self.is_pdf_running():
+            self.cpt_impulsions[self.channel_id] = 0
+            return
+
+        # défaut actif → compteur = 0
+        if self.is_defaut_active():
+            self.compteur[self.channel_id] = 0
+            self.cpt_impulsions[self.channel_id] = 0
+            return
+
+        # calcul fréquence (simple)
+        freq = impulses / (elapsed if elapsed and elapsed > 0 else self.sampling)
+
+        self.compteur[self.channel_id] = freq
+        self.cpt_impulsions[self.channel_id] = 0
+
+    # ------------------------------------------------------------------ #
+    # Boucle principale
+    # ------------------------------------------------------------------ #
+    def run(self) -> None:
+        if self.deadline_mode:
+            self._run_deadline()
+            return
+
+        self._t0 = time.time()
+
+        while True:
+            time.sleep(0.01)  # haute résolution impulsions
+            self.step()
+
+    def _run_deadline(self) -> None:
+        """
+        Boucle à échéances fixes : en polling, lecture toutes les 10 ms sans
+        dépasser l'échéance ; en mode source, un seul réveil par fenêtre.
+        """
+        if self.source is not None:
+            self.source.start()
+        self._arm_deadline(time.monotonic_ns())
+
+        while True:
+            wait_ns = self._next_deadline_ns - time.monotonic_ns()
+            if self.source is None:
+                wait_ns = min(wait_ns, self.POLL_NS)
+            if wait_ns > 0:
+                time.sleep(wait_ns / 1e9)
+            self.step()
@@ -0,0 +1,303 @@
+from __future__ import annotations
+
+"""
+Sources d'impulsions événementielles pour le comptage.
+
+Au lieu de "poller" une entrée toutes les 10 ms (≤ 100 impulsions/s),
+une source pousse des horodatages dans un tampon circulaire par voie :
+
+- GpioPulseSource  : interruption sur front GPIO (RPi.GPIO, callback)
+- EvokCounterSource: compteur DI EVOK relevé par un thread de lecture,
+                     delta poussé à chaque fin de fenêtre
+- SimPulseSource   : génération à fréquence donnée (mode simulation)
+
+Le thread de comptage dort jusqu'à la fin de la fenêtre puis compte les
+impulsions horodatées dans [début, fin[ : coût CPU quasi nul au repos et
+comptage correct à plusieurs kHz.
+
+Horloge : toutes les dates sont en time.monotonic().
+"""
+
+import json
+import threading
+import time
+import urllib.request
+from abc import ABC, abstractmethod
+from array import array
+from typing import Callable, Optional, Union
+
+
+class PulseRing:
+    """
+    Tampon circulaire d'horodatages d'impulsions (1 producteur / N lecteurs).
+
+    Chaque case contient (date, nombre d'impulsions, cumul après la case) :
+    - une interruption pousse 1 impulsion
+    - une lecture groupée de compteur pousse n impulsions datées en une case
+
+    Sans verrou : le producteur écrit la case PUIS publie l'index (_total),
+    un lecteur ne lit que les cases déjà publiées. Le comptage d'une fenêtre
+    se fait par dichotomie sur les dates (O(log n)).
+    """
+
+    def __init__(self, capacity: int = 65536) -> None:
+        self._cap = int(capacity)
+        self._ts = array("d", bytes(8 * self._cap))
+        self._n = array("q", bytes(8 * self._cap))
+        self._cum = array("q", bytes(8 * self._cap))
+        self._total = 0      # nb de cases écrites (publié en dernier)
+        self._pulses = 0     # cumul d'impulsions
+
+    def __len__(self) -> int:
+        return min(self._total, self._cap)
+
+    @property
+    def pulses(self) -> int:
+        """Nombre total d'impulsions reçues depuis la création."""
+        return self._pulses
+
+    def push(self, ts: float, n: int = 1) -> None:
+        """Ajoute n impulsions datées ts (appelé par le seul producteur)."""
+        if n <= 0:
+            return
+        i = self._total % self._cap
+        cum = self._pulses + n
+        self._ts[i] = ts
+        self._n[i] = n
+        self._cum[i] = cum
+        self._pulses = cum
+        self._total += 1
+
+    # ------------------------------------------------------------------ #
+    # Lecture
+    # ------------------------------------------------------------------ #
+    def _cum_before(self, t: float, lo: int, hi: int) -> int:
+        """Cumul des impulsions datées strictement avant t."""
+        cap = self._cap
+        ts = self._ts
+        a, b = lo, hi
+        while a < b:
+            mid = (a + b) // 2
+            if ts[mid % cap] < t:
+                a = mid + 1
+            else:
+                b = mid
+        if a == lo:
+            # tout ce qui reste dans le tampon est ≥ t
+            j = lo % cap
+            return self._cum[j] - self._n[j] if hi > lo else self._pulses
+        return self._cum[(a - 1) % cap]
+
+    def count_between(self, t0: float, t1: float) -> int:
+        """Nombre d'impulsions datées dans [t0, t1[."""
+        hi = self._total
+        lo = max(0, hi - self._cap)
+        if hi == lo:
+            return 0
+        return self._cum_before(t1, lo, hi) - self._cum_before(t0, lo, hi)
+
+    def rate(self, window_s: float, now: Optional[float] = None) -> float:
+        """Fréquence (imp/s) sur les window_s dernières secondes."""
+        if now is None:
+            now = time.monotonic()
+        if window_s <= 0:
+            return 0.0
+        return self.count_between(now - window_s, now + 1e-9) / window_s
+
+
+# --------------------------------------------------------------------------- #
+# Sources
+# --------------------------------------------------------------------------- #
+class PulseSource(ABC):
+    """
+    Source d'impulsions pour une voie.
+
+    - start() : arme la source (interruption, connexion...)
+    - poll()  : pour les sources groupées, lit le compteur et pousse le delta
+                (appelé par le comptage en fin de fenêtre ; no-op sinon)
+    - stop()  : désarme
+    """
+
+    def __init__(self, ring: Optional[PulseRing] = None) -> None:
+        self.ring = ring if ring is not None else PulseRing()
+
+    @abstractmethod
+    def start(self) -> None:
+        raise NotImplementedError
+
+    def poll(self, now: Optional[float] = None) -> None:
+        return
+
+    def stop(self) -> None:
+        return
+
+
+class GpioPulseSource(PulseSource):
+    """
+    Interruption sur front montant GPIO (RPi.GPIO, numérotation BCM).
+    Chaque front pousse sa date dans le tampon depuis le callback.
+    """
+
+    def __init__(self, pin: int, ring: Optional[PulseRing] = None, bouncetime_ms: int = 0) -> None:
+        super().__init__(ring)
+        self.pin = int(pin)
+        self.bouncetime_ms = int(bouncetime_ms)
+        self._gpio = None
+
+    def _on_edge(self, channel: int) -> None:
+        self.ring.push(time.monotonic())
+
+    def start(self) -> None:
+        try:
+            import RPi.GPIO as GPIO  # type: ignore
+        except Exception as e:
+            print(f"[IMPULSIONS] RPi.GPIO indisponible (pin {self.pin}) : {e}")
+            return
+
+        GPIO.setmode(GPIO.BCM)
+        GPIO.setup(self.pin, GPIO.IN)
+        if self.bouncetime_ms > 0:
+            GPIO.add_event_detect(
+                self.pin, GPIO.RISING, callback=self._on_edge, bouncetime=self.bouncetime_ms
+            )
+        else:
+            GPIO.add_event_detect(self.pin, GPIO.RISING, callback=self._on_edge)
+        self._gpio = GPIO
+
+    def stop(self) -> None:
+        if self._gpio is not None:
+            try:
+                self._gpio.remove_event_detect(self.pin)
+            except Exception:
+                pass
+            self._gpio = None
+
+
+class EvokCounterSource(PulseSource):
+    """
+    Lecture groupée du compteur d'une DI EVOK (champ "counter").
+
+    Un thread de lecture (lancé par start()) relève le compteur toutes les
+    read_period_s, hors du thread de comptage / du moteur : une EVOK lente
+    ne bloque pas l'ordonnanceur. poll() consomme seulement la dernière
+    valeur lue : le delta depuis le poll précédent est poussé en une case
+    datée au milieu de la fenêtre qui se ferme (comptée dans [début, fin[).
+    """
+
+    URLS = ("{base}/rest/di/{c}", "{base}/rest/input/{c}")
+    COUNTER_MODULO = 1 << 32
+    READ_PERIOD_S = 0.05
+
+    def __init__(
+        self,
+        circuit: int,
+        ring: Optional[PulseRing] = None,
+        base_url: str = "http://127.0.0.1:8080",
+        timeout: float = 0.3,
+        read_period_s: float = READ_PERIOD_S,
+    ) -> None:
+        super().__init__(ring)
+        self.circuit = int(circuit)
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+        self.read_period_s = float(read_period_s)
+        self._latest: Optional[int] = None      # dernière valeur lue (thread de lecture)
+        self._last: Optional[int] = None        # valeur consommée au poll précédent
+        self._last_poll: Optional[float] = None
+        self._url: Optional[str] = None
+        self._stop_evt = threading.Event()
+        self._reader: Optional[threading.Thread] = None
+
+    def _read_counter(self) -> Optional[int]:
+        urls = [self._url] if self._url else [
+            u.format(base=self.base_url, c=self.circuit) for u in self.URLS
+        ]
+        for url in urls:
+            try:
+                req = urllib.request.Request(url, headers={"Accept": "application/json"})
+                with urllib.request.urlopen(req, timeout=self.timeout) as r:
+                    data = json.loads(r.read().decode("utf-8", errors="ignore"))
+                self._url = url
+                return int(data.get("counter", 0))
+            except Exception:
+                continue
+        self._url = None
+        return None
+
+    def _lire(self) -> None:
+        value = self._read_counter()
+        if value is not None:
+            self._latest = value
+
+    def _run_reader(self) -> None:
+        while not self._stop_evt.wait(self.read_period_s):
+            self._lire()
+
+    def start(self) -> None:
+        self._lire()
+        self._last = self._latest
+        self._last_poll = time.monotonic()
+        if self._reader is None:
+            self._stop_evt.clear()
+            self._reader = threading.Thread(
+                target=self._run_reader, name=f"EvokCounter[{self.circuit}]", daemon=True
+            )
+            self._reader.start()
+
+    def poll(self, now: Optional[float] = None) -> None:
+        if now is None:
+            now = time.monotonic()
+        prev = self._last_poll if self._last_poll is not None else now
+        self._last_poll = now
+        value = self._latest
+        if value is None:
+            return
+        if self._last is not None:
+            delta = (value - self._last) % self.COUNTER_MODULO
+            self.ring.push(prev + (now - prev) / 2.0, delta)
+        self._last = value
+
+    def stop(self) -> None:
+        self._stop_evt.set()
+        self._reader = None
+
+
+class SimPulseSource(PulseSource):
+    """
+    Impulsions simulées à fréquence donnée (float ou callable → imp/s).
+    Par défaut 100 imp/s, comme read_impulsion() en mode sim (1 / 10 ms).
+    """
+
+    def __init__(
+        self,
+        ring: Optional[PulseRing] = None,
+        rate_hz: Union[float, Callable[[], float]] = 100.0,
+    ) -> None:
+        super().__init__(ring)
+        self._rate = rate_hz
+        self._last: Optional[float] = None
+        self._frac = 0.0
+        self._lock = threading.Lock()
+
+    def _rate_hz(self) -> float:
+        try:
+            return float(self._rate() if callable(self._rate) else self._rate)
+        except Exception:
+            return 0.0
+
+    def start(self) -> None:
+        self._last = time.monotonic()
+
+    def poll(self, now: Optional[float] = None) -> None:
+        if now is None:
+            now = time.monotonic()
+        with self._lock:
+            if self._last is None:
+                self._last = now
+                return
+            expected = self._rate_hz() * (now - self._last) + self._frac
+            n = int(expected)
+            self._frac = expected - n
+            # date au milieu de l'intervalle (reste dans la fenêtre courante)
+            self.ring.push(self._last + (now - self._last) / 2.0, n)
+            self._last = now
@@ -1,5 +1,5 @@
-
 from .courbes import CourbeConfig, CourbeThread
 from .build import build_all_courbes
+from .ring import CurveRing
 
-__all__ = ["CourbeConfig", "CourbeThread", "build_all_courbes"]
+__all__ = ["CourbeConfig", "CourbeThread", "build_all_courbes", "CurveRing"]
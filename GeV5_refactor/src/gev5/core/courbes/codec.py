@@ -0,0 +1,87 @@
+from __future__ import annotations
+
+"""
+Encodage binaire compact des courbes (endpoint /curves?format=...).
+
+Trame (little-endian) :
+
+    en-tête : b"GV5C" | version u8 | codage u8 | nb voies u16
+    par voie : voie u16 | n u32 | t0 f64 | données
+
+    codage 1 (f32)   : dt f32[n] (s depuis t0) | valeurs f32[n]
+    codage 2 (delta) : échelle f32 | dt i32[n] (ms, delta avec le point
+                       précédent, 1er = 0) | valeurs i32[n] (round(v*échelle),
+                       delta avec la valeur précédente, 1re en absolu)
+
+Le décodage "delta" reconstitue par somme cumulée : t = t0 + cumsum(dt)/1000,
+v = cumsum(valeurs) / échelle.
+"""
+
+import struct
+from typing import Dict, Tuple
+
+import numpy as np
+
+MAGIC = b"GV5C"
+VERSION = 1
+CODAGE_F32 = 1
+CODAGE_DELTA = 2
+
+FORMATS = {"f32": CODAGE_F32, "delta": CODAGE_DELTA}
+
+Curves = Dict[int, Tuple[np.ndarray, np.ndarray]]
+
+
+def encode(curves: Curves, codage: int, scale: float = 100.0) -> bytes:
+    """Encode {voie: (ts, valeurs)} selon le codage demandé."""
+    if codage not in (CODAGE_F32, CODAGE_DELTA):
+        raise ValueError(f"codage inconnu : {codage}")
+
+    parts = [MAGIC, struct.pack("<BBH", VERSION, codage, len(curves))]
+    for ch, (ts, vals) in curves.items():
+        n = len(ts)
+        t0 = float(ts[0]) if n else 0.0
+        parts.append(struct.pack("<HId", int(ch), n, t0))
+
+        if codage == CODAGE_F32:
+            parts.append((np.asarray(ts, dtype=np.float64) - t0).astype("<f4").tobytes())
+            parts.append(np.asarray(vals).astype("<f4").tobytes())
+            continue
+
+        parts.append(struct.pack("<f", scale))
+        t_ms = np.rint((np.asarray(ts, dtype=np.float64) - t0) * 1000.0).astype(np.int64)
+        q = np.rint(np.asarray(vals, dtype=np.float64) * scale).astype(np.int64)
+        parts.append(np.diff(t_ms, prepend=0).astype("<i4").tobytes())
+        parts.append(np.diff(q, prepend=0).astype("<i4").tobytes())
+
+    return b"".join(parts)
+
+
+def decode(payload: bytes) -> Curves:
+    """Décodage de référence (tests / clients Python)."""
+    if payload[:4] != MAGIC:
+        raise ValueError("trame GV5C invalide")
+    _, codage, nch = struct.unpack_from("<BBH", payload, 4)
+    off = 8
+    out: Curves = {}
+    for _ in range(nch):
+        ch, n, t0 = struct.unpack_from("<HId", payload, off)
+        off += 14
+        if codage == CODAGE_F32:
+            dt = np.frombuffer(payload, "<f4", n, off)
+            off += 4 * n
+            vals = np.frombuffer(payload, "<f4", n, off).astype(np.float64)
+            off += 4 * n
+            out[ch] = (t0 + dt.astype(np.float64), vals)
+            continue
+        (scale,) = struct.unpack_from("<f", payload, off)
+        off += 4
+        dt = np.frombuffer(payload, "<i4", n, off)
+        off += 4 * n
+        dq = np.frombuffer(payload, "<i4", n, off)
+        off += 4 * n
+        out[ch] = (
+            t0 + np.cumsum(dt, dtype=np.int64) / 1000.0,
+            np.cumsum(dq, dtype=np.int64) / float(scale),
+        )
+    return out
@@ -3,8 +3,10 @@ from __future__ import annotations
 
 import threading
 import time
-from dataclasses import dataclass, field
-from typing import Callable, Dict, List
+from dataclasses import dataclass
+from typing import Callable, Dict
+
+from .ring import CurveRing
 
 
 @dataclass
@@ -17,11 +19,12 @@ class CourbeConfig:
 class CourbeThread(threading.Thread):
     """Thread de courbe générique pour 1 voie.
 
-    Il lit périodiquement une valeur (comptage) et la stocke
-    dans une liste courbes[channel_id].
+    Il lit périodiquement une valeur (comptage) et la stocke, horodatée,
+    dans le tampon circulaire curves[channel_id] (CurveRing : ajout O(1),
+    vues sans copie, décimations 1 s / 10 s / 60 s).
     """
 
-    curves: Dict[int, List[float]] = {}
+    curves: Dict[int, CurveRing] = {}
 
     def __init__(
         self,
@@ -32,13 +35,15 @@ class CourbeThread(threading.Thread):
         self.cfg = config
         self._get_val = get_val
 
-        self.curves.setdefault(self.cfg.channel_id, [])
+        ring = self.curves.get(self.cfg.channel_id)
+        if ring is None or ring.capacity != self.cfg.max_points:
+            self.curves[self.cfg.channel_id] = CurveRing(self.cfg.max_points)
+
+    def step(self) -> None:
+        """Ajoute un point horodaté à la courbe de la voie."""
+        self.curves[self.cfg.channel_id].append(float(self._get_val()), time.time())
 
     def run(self) -> None:
         while True:
             time.sleep(self.cfg.period_s)
-            val = float(self._get_val())
-            lst = self.curves[self.cfg.channel_id]
-            lst.append(val)
-            if len(lst) > self.cfg.max_points:
-                del lst[0: len(lst) - self.cfg.max_points]
+            self.step()
@@ -0,0 +1,88 @@
+from __future__ import annotations
+
+"""
+Réduction du nombre de points d'une courbe pour l'affichage.
+
+- lttb   : Largest-Triangle-Three-Buckets (préserve la forme visuelle)
+- minmax : min et max de chaque tranche (préserve les pics, utile pour
+           ne pas "lisser" un passage en alarme)
+
+Entrées / sorties : tableaux NumPy (ts, valeurs) triés par ts.
+"""
+
+from typing import Tuple
+
+import numpy as np
+
+METHODS = ("lttb", "minmax")
+
+
+def lttb(ts: np.ndarray, vals: np.ndarray, n_out: int) -> Tuple[np.ndarray, np.ndarray]:
+    """LTTB : n_out points (premier et dernier conservés)."""
+    n = len(ts)
+    if n_out >= n or n_out < 3:
+        return ts, vals
+
+    idx = np.empty(n_out, dtype=np.int64)
+    idx[0] = 0
+    idx[-1] = n - 1
+
+    # n_out - 2 tranches sur les points intérieurs
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.int64)
+    a = 0
+    for i in range(n_out - 2):
+        lo, hi = edges[i], max(edges[i + 1], edges[i] + 1)
+        # moyenne de la tranche suivante (ou dernier point)
+        nlo, nhi = edges[i + 1], (edges[i + 2] if i + 2 < len(edges) else n)
+        if nhi <= nlo:
+            nhi = nlo + 1
+        avg_t = ts[nlo:nhi].mean()
+        avg_v = vals[nlo:nhi].mean()
+
+        t_a, v_a = ts[a], vals[a]
+        area = np.abs(
+            (t_a - avg_t) * (vals[lo:hi] - v_a) - (t_a - ts[lo:hi]) * (avg_v - v_a)
+        )
+        a = lo + int(np.argmax(area))
+        idx[i + 1] = a
+
+    return ts[idx], vals[idx]
+
+
+def minmax(ts: np.ndarray, vals: np.ndarray, n_out: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Min + max par tranche : au plus n_out points, dans l'ordre des ts."""
+    n = len(ts)
+    if n_out >= n or n_out < 2:
+        return ts, vals
+
+    n_buckets = n_out // 2
+    edges = np.linspace(0, n, n_buckets + 1).astype(np.int64)
+    keep = []
+    for lo, hi in zip(edges[:-1], edges[1:]):
+        if hi <= lo:
+            continue
+        seg = vals[lo:hi]
+        i_min = lo + int(np.argmin(seg))
+        i_max = lo + int(np.argmax(seg))
+        if i_min == i_max:
+            keep.append(i_min)
+        else:
+            keep.extend((i_min, i_max) if i_min < i_max else (i_max, i_min))
+    idx = np.asarray(keep, dtype=np.int64)
+    return ts[idx], vals[idx]
+
+
+def downsample(
+    ts: np.ndarray,
+    vals: np.ndarray,
+    max_points: int,
+    method: str = "lttb",
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Réduit à max_points (0 = inchangé) avec la méthode demandée."""
+    if max_points <= 0 or len(ts) <= max_points:
+        return ts, vals
+    if method == "minmax":
+        return minmax(ts, vals, max_points)
+    if method == "lttb":
+        return lttb(ts, vals, max_points)
+    raise ValueError(f"méthode de réduction inconnue : {method}")
@@ -0,0 +1,157 @@
+from __future__ import annotations
+
+import time
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+
+class _Ring:
+    """
+    Tampon circulaire préalloué à colonnes float64, écrit en miroir.
+
+    Chaque ligne est écrite en i ET en i + capacity : les `n` dernières
+    lignes sont donc toujours contiguës dans data[head - n : head] et
+    peuvent être rendues en vue NumPy (aucune copie), même après le
+    rebouclage. Un seul écrivain ; les lecteurs prennent des vues.
+    """
+
+    __slots__ = ("capacity", "data", "_count", "_pos")
+
+    def __init__(self, capacity: int, ncols: int) -> None:
+        self.capacity = max(1, int(capacity))
+        self.data = np.zeros((ncols, 2 * self.capacity), dtype=np.float64)
+        self._count = 0
+        self._pos = 0       # prochaine case d'écriture (0..capacity-1)
+
+    def __len__(self) -> int:
+        return min(self._count, self.capacity)
+
+    def append(self, row: Sequence[float]) -> None:
+        i = self._pos
+        j = i + self.capacity
+        data = self.data
+        for c, v in enumerate(row):
+            data[c, i] = v
+            data[c, j] = v
+        self._pos = i + 1 if i + 1 < self.capacity else 0
+        self._count += 1
+
+    def view(self, n: Optional[int] = None) -> np.ndarray:
+        """Vue (ncols, n) des n dernières lignes, de la plus ancienne à la plus récente."""
+        size = len(self)
+        n = size if n is None else max(0, min(int(n), size))
+        head = self._pos + self.capacity   # fin (exclue) dans la moitié haute
+        return self.data[:, head - n: head]
+
+
+class CurveRing:
+    """
+    Courbe d'une voie : (horodatage, valeur) dans un tampon circulaire
+    préalloué + niveaux de décimation min / max / moyenne.
+
+    - append() en O(1) (pas de `del lst[0:k]`)
+    - view() / since() / between() : vues NumPy sans copie
+    - level(10) : agrégats par tranches de 10 s (ts début, min, max, moyenne)
+
+    Se comporte aussi comme une séquence de valeurs (len, itération,
+    indexation, tolist()) pour les consommateurs historiques de
+    CourbeThread.curves.
+
+    Les vues référencent le tampon : un point ajouté après coup peut
+    écraser la plus ancienne case d'une vue. Copier (np.array(v)) si une
+    image figée est nécessaire.
+    """
+
+    LEVELS_S: Tuple[int, ...] = (1, 10, 60)
+
+    def __init__(
+        self,
+        capacity: int = 3600,
+        levels_s: Sequence[int] = LEVELS_S,
+        level_capacity: Optional[int] = None,
+    ) -> None:
+        self.capacity = max(1, int(capacity))
+        self._ring = _Ring(self.capacity, 2)   # ts, valeur
+
+        lcap = self.capacity if level_capacity is None else int(level_capacity)
+        self._levels: Dict[int, _Ring] = {int(s): _Ring(lcap, 4) for s in levels_s}
+        # tranche en cours par niveau : [n° de tranche, min, max, somme, n]
+        self._acc: Dict[int, List[float]] = {}
+
+    # ------------------------------------------------------------------ #
+    # Écriture
+    # ------------------------------------------------------------------ #
+    def append(self, value: float, ts: Optional[float] = None) -> None:
+        if ts is None:
+            ts = time.time()
+        value = float(value)
+        self._ring.append((ts, value))
+
+        for step, ring in self._levels.items():
+            bucket = ts // step
+            acc = self._acc.get(step)
+            if acc is None or acc[0] != bucket:
+                if acc is not None:
+                    ring.append((acc[0] * step, acc[1], acc[2], acc[3] / acc[4]))
+                self._acc[step] = [bucket, value, value, value, 1]
+                continue
+            if value < acc[1]:
+                acc[1] = value
+            if value > acc[2]:
+                acc[2] = value
+            acc[3] += value
+            acc[4] += 1
+
+    # ------------------------------------------------------------------ #
+    # Lecture (vues)
+    # ------------------------------------------------------------------ #
+    def view(self, n: Optional[int] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """(ts, valeurs) des n derniers points (tous par défaut)."""
+        v = self._ring.view(n)
+        return v[0], v[1]
+
+    def between(self, t0: Optional[float] = None, t1: Optional[float] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """(ts, valeurs) des points avec t0 <= ts <= t1 (bornes optionnelles)."""
+        ts, vals = self.view()
+        lo = 0 if t0 is None else int(np.searchsorted(ts, t0, side="left"))
+        hi = len(ts) if t1 is None else int(np.searchsorted(ts, t1, side="right"))
+        return ts[lo:hi], vals[lo:hi]
+
+    def since(self, ts_cursor: float) -> Tuple[np.ndarray, np.ndarray]:
+        """(ts, valeurs) des points strictement postérieurs à ts_cursor."""
+        ts, vals = self.view()
+        lo = int(np.searchsorted(ts, ts_cursor, side="right"))
+        return ts[lo:], vals[lo:]
+
+    def level(self, step_s: int, n: Optional[int] = None) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """(ts début, min, max, moyenne) des n dernières tranches closes de step_s secondes."""
+        v = self._levels[int(step_s)].view(n)
+        return v[0], v[1], v[2], v[3]
+
+    @property
+    def levels(self) -> Tuple[int, ...]:
+        return tuple(self._levels)
+
+    @property
+    def last_ts(self) -> float:
+        ts, _ = self.view(1)
+        return float(ts[0]) if len(ts) else 0.0
+
+    # ------------------------------------------------------------------ #
+    # Compatibilité séquence (ancienne List[float])
+    # ------------------------------------------------------------------ #
+    def __len__(self) -> int:
+        return len(self._ring)
+
+    def __iter__(self) -> Iterator[float]:
+        return iter(self.tolist())
+
+    def __getitem__(self, idx):
+        return self.view()[1][idx]
+
+    def tolist(self) -> List[float]:
+        return self.view()[1].tolist()
+
+    def __repr__(self) -> str:
+        return f"CurveRing(len={len(self)}, capacity={self.capacity})"
@@ -58,43 +58,45 @@ class DefautThread(threading.Thread):
     # â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€
     # Boucle principale
     # â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€
+    def step(self) -> None:
+        """Un test de defaut (lecture brut + mise a jour de l'etat)."""
+        # Si la voie est coupÃ©e â†’ on reset et on sort
+        if self._get_d_on() == 0:
+            self.defaut_resultat[self.cfg.channel_id] = 0
+            self.defaut_valeur[self.cfg.raw_key] = 0
+            self.email_send_defaut[self.cfg.channel_id] = 0
+            return
+
+        # lecture valeur brute (comptage brut)
+        val = float(self._get_val())
+        self.valeur = val
+
+        # calcul Ã©tat dÃ©faut
+        if val < self.cfg.limite_inferieure:
+            new_state = 1  # dÃ©faut bas
+        elif val > self.cfg.limite_superieure:
+            new_state = 2  # dÃ©faut haut
+        else:
+            new_state = 0  # OK
+
+        old_state = self.defaut_resultat[self.cfg.channel_id]
+
+        if new_state != 0:
+            # on enregistre le dÃ©faut pour la voie + valeur brute
+            self.defaut_resultat[self.cfg.channel_id] = new_state
+            self.defaut_valeur[self.cfg.raw_key] = val
+
+            # front montant â†’ lever le flag mail
+            if old_state == 0 and self.email_send_defaut[self.cfg.channel_id] == 0:
+                self.email_send_defaut[self.cfg.channel_id] = 1
+
+        else:
+            # retour Ã  la normale pour CETTE voie
+            self.defaut_resultat[self.cfg.channel_id] = 0
+            self.defaut_valeur[self.cfg.raw_key] = 0
+            self.email_send_defaut[self.cfg.channel_id] = 0
+
     def run(self) -> None:
         while True:
-            # Si la voie est coupÃ©e â†’ on reset et on sort
-            if self._get_d_on() == 0:
-                self.defaut_resultat[self.cfg.channel_id] = 0
-                self.defaut_valeur[self.cfg.raw_key] = 0
-                self.email_send_defaut[self.cfg.channel_id] = 0
-                time.sleep(self.cfg.period_s)
-                continue
-
-            # lecture valeur brute (comptage brut)
-            val = float(self._get_val())
-            self.valeur = val
-
-            # calcul Ã©tat dÃ©faut
-            if val < self.cfg.limite_inferieure:
-                new_state = 1  # dÃ©faut bas
-            elif val > self.cfg.limite_superieure:
-                new_state = 2  # dÃ©faut haut
-            else:
-                new_state = 0  # OK
-
-            old_state = self.defaut_resultat[self.cfg.channel_id]
-
-            if new_state != 0:
-                # on enregistre le dÃ©faut pour la voie + valeur brute
-                self.defaut_resultat[self.cfg.channel_id] = new_state
-                self.defaut_valeur[self.cfg.raw_key] = val
-
-                # front montant â†’ lever le flag mail
-                if old_state == 0 and self.email_send_defaut[self.cfg.channel_id] == 0:
-                    self.email_send_defaut[self.cfg.channel_id] = 1
-
-            else:
-                # retour Ã  la normale pour CETTE voie
-                self.defaut_resultat[self.cfg.channel_id] = 0
-                self.defaut_valeur[self.cfg.raw_key] = 0
-                self.email_send_defaut[self.cfg.channel_id] = 0
-
+            self.step()
             time.sleep(self.cfg.period_s)
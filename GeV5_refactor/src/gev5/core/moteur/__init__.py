@@ -0,0 +1,3 @@
+from .moteur import MoteurConfig, MoteurThread
+
+__all__ = ["MoteurConfig", "MoteurThread"]
@@ -0,0 +1,279 @@
+from __future__ import annotations
+
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+from logging import Logger
+from typing import Callable, Deque, Dict, List, Sequence
+
+from ..comptage.comptage import ComptageThread
+from ..alarmes.alarmes import AlarmeThread
+from ..defauts.defauts import DefautThread
+from ..courbes.courbes import CourbeThread
+from ..snapshot import SnapshotStore
+from ...utils.logging import get_logger
+
+logger: Logger = get_logger("gev5.moteur")
+
+
+@dataclass
+class MoteurConfig:
+    """
+    Configuration du moteur temps réel à ordonnanceur unique.
+
+    - comptage_period_s : période de lecture des impulsions (équivalent
+                          du sleep(0.01) de ComptageThread)
+    - alarme_period_s   : période d'évaluation des alarmes (doit être égale
+                          au period_s des AlarmeThread pour la tempo)
+    - defaut_period_s   : période des tests de défaut
+    - courbe_period_s   : période d'échantillonnage des courbes
+    - alarmes_vectorisees : True → les 12 alarmes sont évaluées en un seul
+                          pas NumPy (AlarmesVectorisees) au lieu de 12 step()
+    - stats_window      : nombre de ticks conservés pour les stats de latence
+    - stats_refresh_s   : période de recalcul de MoteurThread.stats
+    - publier_snapshot  : publie le snapshot versionné (SnapshotStore)
+                          à la fin de chaque tick
+    """
+    comptage_period_s: float = 0.01
+    alarme_period_s: float = 0.1
+    defaut_period_s: float = 60.0
+    courbe_period_s: float = 1.0
+    alarmes_vectorisees: bool = False
+    stats_window: int = 1000
+    stats_refresh_s: float = 1.0
+    publier_snapshot: bool = True
+
+
+class _Tache:
+    """Tâche périodique ordonnancée sur une grille fixe (sans dérive)."""
+
+    __slots__ = ("name", "period_s", "fn", "next_deadline", "last_ms", "overruns", "errors")
+
+    def __init__(self, name: str, period_s: float, fn: Callable[[float], None]) -> None:
+        self.name = name
+        self.period_s = float(period_s)
+        self.fn = fn
+        self.next_deadline = 0.0
+        self.last_ms = 0.0
+        self.overruns = 0
+        self.errors = 0
+
+
+class MoteurThread(threading.Thread):
+    """
+    Moteur "tick" : un seul thread pilote comptage, défauts, alarmes et
+    courbes des 12 voies, en remplacement des 48 threads de polling.
+
+    Les objets ComptageThread / AlarmeThread / DefautThread / CourbeThread
+    sont construits comme d'habitude mais NE sont PAS démarrés : le moteur
+    appelle leur méthode step() à la cadence configurée. Les dicts de
+    classe (compteur, alarme_resultat, defaut_resultat, curves, ...) restent
+    donc alimentés à l'identique.
+
+    Ordre d'exécution dans un tick : comptage → défauts → alarmes → courbes
+    (chaque famille lit ce que la précédente vient de publier), puis
+    publication du snapshot versionné (core.snapshot).
+
+    Expose :
+      - MoteurThread.stats : latences par tick (ms), retards, dépassements
+    """
+
+    stats: Dict[str, float] = {}
+
+    def __init__(
+        self,
+        config: MoteurConfig,
+        comptages: Sequence[ComptageThread] = (),
+        alarmes: Sequence[AlarmeThread] = (),
+        defauts: Sequence[DefautThread] = (),
+        courbes: Sequence[CourbeThread] = (),
+    ) -> None:
+        super().__init__(name="MoteurTick", daemon=True)
+        self.cfg = config
+        self._stop_evt = threading.Event()
+
+        self._durations: Deque[float] = deque(maxlen=max(1, int(config.stats_window)))
+        self._lateness: Deque[float] = deque(maxlen=max(1, int(config.stats_window)))
+        self._ticks = 0
+        self._armed = False
+
+        self._comptages = tuple(comptages)
+        self._alarmes = tuple(alarmes)
+        self._defauts = tuple(defauts)
+        self._courbes = tuple(courbes)
+
+        # Évaluateur groupé (import paresseux : numpy seulement si demandé)
+        self._alarmes_vect = None
+        if config.alarmes_vectorisees and self._alarmes:
+            from ..alarmes.vectorise import AlarmesVectorisees
+            self._alarmes_vect = AlarmesVectorisees.from_threads(self._alarmes)
+
+        self._taches: List[_Tache] = []
+        if self._comptages:
+            self._taches.append(_Tache("comptage", config.comptage_period_s, self._step_comptages))
+        if self._defauts:
+            self._taches.append(_Tache("defauts", config.defaut_period_s, self._step_defauts))
+        if self._alarmes:
+            self._taches.append(_Tache("alarmes", config.alarme_period_s, self._step_alarmes))
+        if self._courbes:
+            self._taches.append(_Tache("courbes", config.courbe_period_s, self._step_courbes))
+
+    # ------------------------------------------------------------------ #
+    # Tâches (1 passe sur les 12 voies)
+    # ------------------------------------------------------------------ #
+    def _step_comptages(self, now: float) -> None:
+        for c in self._comptages:
+            c.step(now)
+
+    def _step_defauts(self, now: float) -> None:
+        for d in self._defauts:
+            d.step()
+
+    def _step_alarmes(self, now: float) -> None:
+        if self._alarmes_vect is not None:
+            self._alarmes_vect.step()
+            return
+        for a in self._alarmes:
+            a.step()
+
+    def _step_courbes(self, now: float) -> None:
+        for c in self._courbes:
+            c.step()
+
+    # ------------------------------------------------------------------ #
+    # Ordonnancement
+    # ------------------------------------------------------------------ #
+    def _arm(self, t_start: float) -> None:
+        """
+        Première échéance de chaque tâche.
+        Les défauts sont testés dès le démarrage (comme DefautThread.run),
+        les autres familles après une période (comme leur sleep initial).
+        """
+        for t in self._taches:
+            if t.name == "defauts":
+                t.next_deadline = t_start
+            else:
+                t.next_deadline = t_start + t.period_s
+        self._armed = True
+
+    def _run_due(self, now: float) -> None:
+        wall = time.time()
+        for t in self._taches:
+            if t.next_deadline > now:
+                continue
+
+            t0 = time.perf_counter()
+            try:
+                t.fn(wall)
+            except Exception as e:
+                t.errors += 1
+                logger.error("Moteur: erreur tâche %s : %s", t.name, e)
+            t.last_ms = (time.perf_counter() - t0) * 1000.0
+
+            # grille fixe t_start + k*period : pas de dérive ; si on a raté
+            # plusieurs échéances, on les saute (et on les compte)
+            t.next_deadline += t.period_s
+            if t.next_deadline <= now:
+                missed = int((now - t.next_deadline) // t.period_s) + 1
+                t.next_deadline += missed * t.period_s
+                t.overruns += missed
+
+    def tick(self, now: float | None = None) -> None:
+        """
+        Exécute un passage de l'ordonnanceur (toutes les tâches échues).
+        Exposé pour les tests / outils ; run() l'appelle en boucle.
+        """
+        if now is None:
+            now = time.monotonic()
+        if not self._armed:
+            self._arm(now)
+        self._run_due(now)
+        self._publish_snapshot()
+        self._ticks += 1
+
+    def _publish_snapshot(self) -> None:
+        if not self.cfg.publier_snapshot:
+            return
+        try:
+            SnapshotStore.publish()
+        except Exception as e:
+            logger.error("Moteur: erreur publication snapshot : %s", e)
+
+    # ------------------------------------------------------------------ #
+    # Statistiques
+    # ------------------------------------------------------------------ #
+    def _record(self, duration_s: float, lateness_s: float) -> None:
+        self._durations.append(duration_s)
+        self._lateness.append(lateness_s)
+
+    def _publish_stats(self) -> None:
+        durations = sorted(self._durations)
+        lateness = sorted(self._lateness)
+        n = len(durations)
+        if n == 0:
+            return
+
+        def _pct(values: List[float], q: float) -> float:
+            idx = min(len(values) - 1, int(q * len(values)))
+            return values[idx] * 1000.0
+
+        st: Dict[str, float] = {
+            "ticks": float(self._ticks),
+            "window": float(n),
+            "tick_mean_ms": sum(durations) / n * 1000.0,
+            "tick_p99_ms": _pct(durations, 0.99),
+            "tick_max_ms": durations[-1] * 1000.0,
+            "late_mean_ms": sum(lateness) / n * 1000.0,
+            "late_p99_ms": _pct(lateness, 0.99),
+            "late_max_ms": lateness[-1] * 1000.0,
+        }
+        for t in self._taches:
+            st[f"{t.name}_last_ms"] = t.last_ms
+            st[f"{t.name}_overruns"] = float(t.overruns)
+            st[f"{t.name}_errors"] = float(t.errors)
+
+        MoteurThread.stats = st
+
+    @classmethod
+    def get_stats(cls) -> Dict[str, float]:
+        return dict(cls.stats)
+
+    # ------------------------------------------------------------------ #
+    # Boucle principale
+    # ------------------------------------------------------------------ #
+    def run(self) -> None:
+        if not self._taches:
+            logger.warning("Moteur: aucune tâche à ordonnancer")
+            return
+
+        t_start = time.monotonic()
+        self._arm(t_start)
+        next_stats = t_start + self.cfg.stats_refresh_s
+
+        logger.info(
+            "Moteur tick démarré (%s)",
+            ", ".join(f"{t.name}={t.period_s:g}s" for t in self._taches),
+        )
+
+        while not self._stop_evt.is_set():
+            deadline = min(t.next_deadline for t in self._taches)
+            now = time.monotonic()
+            if deadline > now:
+                self._stop_evt.wait(deadline - now)
+                continue
+
+            t0 = time.perf_counter()
+            self._run_due(now)
+            self._publish_snapshot()
+            self._ticks += 1
+            self._record(time.perf_counter() - t0, now - deadline)
+
+            if now >= next_stats:
+                self._publish_stats()
+                next_stats = now + self.cfg.stats_refresh_s
+
+        logger.info("Moteur tick arrêté.")
+
+    def stop(self) -> None:
+        self._stop_evt.set()
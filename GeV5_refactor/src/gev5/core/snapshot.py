@@ -0,0 +1,168 @@
+from __future__ import annotations
+
+"""
+Snapshot versionné de l'état temps réel.
+
+Le moteur (ou, en mode threads, SnapshotThread) publie une fois par tick un
+objet Snapshot immuable : toutes les valeurs sont copiées au même instant,
+sous verrou, puis la référence courante est remplacée d'un bloc. Les
+lecteurs (API, Modbus, eVx, F2C, relais, Interface) récupèrent la référence
+sans copie et comparent `version` pour sauter leur travail si rien n'a
+changé depuis leur dernier passage, ou attendent la version suivante
+(wait_new) pour réagir dans le tick qui a produit le changement.
+
+Les dicts d'un Snapshot appartiennent au snapshot : ne jamais les modifier.
+"""
+
+import threading
+import time
+from dataclasses import dataclass, field
+from logging import Logger
+from typing import Any, Callable, Mapping, Optional, Tuple
+
+from .comptage.comptage import ComptageThread
+from .alarmes.alarmes import AlarmeThread
+from .defauts.defauts import DefautThread
+from ..utils.logging import get_logger
+
+logger: Logger = get_logger("gev5.snapshot")
+
+
+@dataclass(frozen=True)
+class Snapshot:
+    """État cohérent des 12 voies à un instant donné (lecture seule)."""
+    version: int = 0
+    ts: float = 0.0
+    counts: Mapping[int, float] = field(default_factory=dict)
+    raw_counts: Mapping[int, float] = field(default_factory=dict)
+    measures: Mapping[int, float] = field(default_factory=dict)
+    fond: Mapping[int, float] = field(default_factory=dict)
+    seuils: Mapping[int, float] = field(default_factory=dict)
+    alarm_states: Mapping[int, int] = field(default_factory=dict)
+    defauts: Mapping[int, int] = field(default_factory=dict)
+    cells: Tuple[int, int] = (0, 0)
+    speed: Mapping[int, Any] = field(default_factory=dict)
+
+    def content(self) -> Tuple[Any, ...]:
+        """Contenu comparable (sans version ni horodatage)."""
+        return (
+            self.counts, self.raw_counts, self.measures, self.fond, self.seuils,
+            self.alarm_states, self.defauts, self.cells, self.speed,
+        )
+
+
+@dataclass
+class _Sources:
+    """Fonctions de lecture hors cœur (cellules, vitesse), fournies par le boot."""
+    cells: Optional[Callable[[], Tuple[int, int]]] = None
+    speed: Optional[Callable[[], Mapping[int, Any]]] = None
+
+
+class SnapshotStore:
+    """
+    Publication / lecture du snapshot courant.
+
+    - publish()      : capture les dicts de classe ; nouvelle version
+                       seulement si le contenu a changé
+    - get()          : référence courante (aucune copie)
+    - wait_new(v)    : attend une version > v (réveil à la publication)
+    - set_sources()  : cellules / vitesse (fournies par le boot, le cœur
+                       ne dépend pas du hardware)
+    """
+
+    _lock = threading.Lock()
+    _changed = threading.Condition(_lock)
+    _current: Snapshot = Snapshot()
+    _sources = _Sources()
+
+    @classmethod
+    def set_sources(
+        cls,
+        cells: Optional[Callable[[], Tuple[int, int]]] = None,
+        speed: Optional[Callable[[], Mapping[int, Any]]] = None,
+    ) -> None:
+        cls._sources = _Sources(cells=cells, speed=speed)
+
+    @classmethod
+    def get(cls) -> Snapshot:
+        return cls._current
+
+    @classmethod
+    def version(cls) -> int:
+        return cls._current.version
+
+    @classmethod
+    def wait_new(cls, version: int, timeout: Optional[float] = None) -> Snapshot:
+        """Premier snapshot de version > version ; le courant si timeout écoulé."""
+        with cls._changed:
+            cls._changed.wait_for(lambda: cls._current.version > version, timeout)
+            return cls._current
+
+    @classmethod
+    def _read_cells(cls) -> Tuple[int, int]:
+        fn = cls._sources.cells
+        if fn is None:
+            return (0, 0)
+        try:
+            s1, s2 = fn()
+            return (int(s1), int(s2))
+        except Exception:
+            return (0, 0)
+
+    @classmethod
+    def _read_speed(cls) -> Mapping[int, Any]:
+        fn = cls._sources.speed
+        if fn is None:
+            return {}
+        try:
+            return dict(fn())
+        except Exception:
+            return {}
+
+    @classmethod
+    def publish(cls, now: Optional[float] = None) -> Snapshot:
+        """Capture l'état courant ; renvoie le snapshot en vigueur."""
+        with cls._lock:
+            cur = cls._current
+            candidate = Snapshot(
+                version=cur.version,
+                ts=time.time() if now is None else now,
+                counts=dict(ComptageThread.compteur),
+                raw_counts=dict(ComptageThread.compteur_brut),
+                measures=dict(AlarmeThread.alarme_mesure),
+                fond=dict(AlarmeThread.fond),
+                seuils=dict(AlarmeThread.seuil_effectif),
+                alarm_states=dict(AlarmeThread.alarme_resultat),
+                defauts=dict(DefautThread.defaut_resultat),
+                cells=cls._read_cells(),
+                speed=cls._read_speed(),
+            )
+            if cur.version and candidate.content() == cur.content():
+                return cur
+
+            snap = Snapshot(**{**candidate.__dict__, "version": cur.version + 1})
+            cls._current = snap
+            cls._changed.notify_all()
+            return snap
+
+
+class SnapshotThread(threading.Thread):
+    """
+    Publication périodique du snapshot en mode threads par voie
+    (en mode moteur tick, c'est MoteurThread qui publie à chaque tick).
+    """
+
+    def __init__(self, period_s: float = 0.1) -> None:
+        super().__init__(name="Snapshot", daemon=True)
+        self.period_s = float(period_s)
+        self._stop_evt = threading.Event()
+
+    def run(self) -> None:
+        while not self._stop_evt.wait(self.period_s):
+            try:
+                SnapshotStore.publish()
+            except Exception as e:
+                logger.error("Snapshot: erreur publication : %s", e)
+
+    def stop(self) -> None:
+        self._stop_evt.set()
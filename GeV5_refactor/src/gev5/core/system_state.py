@@ -1,11 +1,14 @@
 ﻿from __future__ import annotations
 
-from typing import Dict, List
+from typing import Dict, List, Mapping
 
 from .comptage.comptage import ComptageThread
 from .alarmes.alarmes import AlarmeThread
+from .alarmes.fond_stats import FondStats
 from .defauts.defauts import DefautThread
 from .courbes.courbes import CourbeThread
+from .courbes.ring import CurveRing
+from .snapshot import Snapshot, SnapshotStore
 
 
 class SystemState:
@@ -16,44 +19,83 @@ class SystemState:
       - supervision
       - PDF
       - tests
+
+    Les getters voies (comptage, alarmes, défauts) renvoient les dicts du
+    dernier Snapshot publié (référence, sans copie, à ne pas modifier) ;
+    tant qu'aucun snapshot n'est publié, une copie des dicts de classe.
+    Pour un état cohérent entre sections : get_snapshot().
     """
 
+    # ───────────────────────────
+    # Snapshot versionné
+    # ───────────────────────────
+    @staticmethod
+    def get_snapshot() -> Snapshot:
+        return SnapshotStore.get()
+
+    @staticmethod
+    def get_version() -> int:
+        return SnapshotStore.version()
+
+    @staticmethod
+    def _from_snapshot(name: str, live: Mapping) -> Mapping:
+        snap = SnapshotStore.get()
+        return getattr(snap, name) if snap.version else dict(live)
+
     # ───────────────────────────
     # Comptage
     # ───────────────────────────
     @staticmethod
-    def get_counts() -> Dict[int, float]:
-        return dict(ComptageThread.compteur)
+    def get_counts() -> Mapping[int, float]:
+        return SystemState._from_snapshot("counts", ComptageThread.compteur)
 
     @staticmethod
-    def get_raw_counts() -> Dict[int, float]:
-        return dict(ComptageThread.compteur_brut)
+    def get_raw_counts() -> Mapping[int, float]:
+        return SystemState._from_snapshot("raw_counts", ComptageThread.compteur_brut)
+
+    @staticmethod
+    def get_count_jitter() -> Dict[int, Dict[str, float]]:
+        return {k: dict(v) for k, v in ComptageThread.jitter.items()}
 
     # ───────────────────────────
     # Alarmes
     # ───────────────────────────
     @staticmethod
-    def get_alarm_states() -> Dict[int, int]:
-        return dict(AlarmeThread.alarme_resultat)
+    def get_alarm_states() -> Mapping[int, int]:
+        return SystemState._from_snapshot("alarm_states", AlarmeThread.alarme_resultat)
+
+    @staticmethod
+    def get_alarm_measures() -> Mapping[int, float]:
+        return SystemState._from_snapshot("measures", AlarmeThread.alarme_mesure)
 
     @staticmethod
-    def get_alarm_measures() -> Dict[int, float]:
-        return dict(AlarmeThread.alarme_mesure)
+    def get_background() -> Mapping[int, float]:
+        return SystemState._from_snapshot("fond", AlarmeThread.fond)
 
     @staticmethod
-    def get_background() -> Dict[int, float]:
-        return dict(AlarmeThread.fond)
+    def get_thresholds() -> Mapping[int, float]:
+        return SystemState._from_snapshot("seuils", AlarmeThread.seuil_effectif)
+
+    @staticmethod
+    def get_background_stats() -> Dict[int, Dict[str, float]]:
+        """Statistiques glissantes du fond (FondStats), sans SQLite."""
+        return FondStats.snapshot()
 
     # ───────────────────────────
     # Défauts
     # ───────────────────────────
     @staticmethod
-    def get_defauts() -> Dict[int, int]:
-        return dict(DefautThread.defaut_resultat)
+    def get_defauts() -> Mapping[int, int]:
+        return SystemState._from_snapshot("defauts", DefautThread.defaut_resultat)
 
     # ───────────────────────────
     # Courbes
     # ───────────────────────────
     @staticmethod
     def get_curves() -> Dict[int, List[float]]:
+        return {ch: ring.tolist() for ch, ring in CourbeThread.curves.items()}
+
+    @staticmethod
+    def get_curve_rings() -> Dict[int, CurveRing]:
+        """Tampons des courbes (sans copie) : vues, curseur, décimations."""
         return dict(CourbeThread.curves)
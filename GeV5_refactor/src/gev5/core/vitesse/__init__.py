@@ -1 +1,3 @@
-"""Core module: vitesse. À remplir progressivement lors du refactor."""
+from .estimation import QUALITE_DEGRADEE, QUALITE_INVALIDE, QUALITE_OK, Front, MesureVitesse, estimer
+
+__all__ = ["QUALITE_DEGRADEE", "QUALITE_INVALIDE", "QUALITE_OK", "Front", "MesureVitesse", "estimer"]
@@ -0,0 +1,125 @@
+# src/gev5/core/vitesse/estimation.py
+from __future__ import annotations
+
+"""
+Vitesse, sens et longueur d'un véhicule à partir des fronts des cellules.
+
+Entrée : les fronts S1/S2 d'un passage (montants et descendants), datés
+au plus près de la source (événement EVOK / GPIO) avec leur résolution.
+
+    vitesse  = distance / écart des fronts montants, et / écart des
+               fronts descendants quand ils sont là (moyenne des deux)
+    sens     = ordre des fronts montants
+    longueur = vitesse × durée moyenne d'occultation d'une cellule
+               (épaisseur du faisceau négligée)
+
+Qualité :
+    ok        montants et descendants cohérents (même sens, vitesses à
+              ECART_MAX près), incertitude <= INCERTITUDE_MAX
+    degradee  mesure sur les seuls montants, montants / descendants
+              incohérents (arrêt, marche arrière) ou incertitude forte
+    invalide  une cellule n'a pas vu le véhicule, ou écart des montants
+              inférieur à la résolution / à DT_MIN_S (rebond)
+
+Module pur : pas de thread, pas d'accès au matériel.
+"""
+
+from dataclasses import dataclass
+from typing import Dict, Iterable, Optional, Tuple
+
+QUALITE_OK = "ok"
+QUALITE_DEGRADEE = "degradee"
+QUALITE_INVALIDE = "invalide"
+
+SENS_12 = "1 -> 2"
+SENS_21 = "2 -> 1"
+
+DT_MIN_S = 0.03             # seuil historique anti-rebond entre S1 et S2
+ECART_MAX = 0.25            # écart relatif max vitesse montants / descendants
+INCERTITUDE_MAX = 0.20      # incertitude relative max pour "ok"
+
+
+@dataclass(frozen=True)
+class Front:
+    """Changement d'état d'une cellule (1 = coupée), t en secondes monotones."""
+    cell: int
+    level: int
+    t: float
+    res_s: float = 0.0      # résolution de la date (période de scrutation, ...)
+    source: str = "bus"
+
+
+@dataclass(frozen=True)
+class MesureVitesse:
+    qualite: str
+    vitesse_kmh: Optional[float] = None
+    sens: Optional[str] = None
+    longueur_m: Optional[float] = None
+    incertitude_kmh: Optional[float] = None
+    source: Optional[str] = None
+
+    @property
+    def valide(self) -> bool:
+        return self.qualite != QUALITE_INVALIDE
+
+
+def _bornes(fronts: Iterable[Front]) -> Dict[int, Tuple[Optional[Front], Optional[Front]]]:
+    """Par cellule : premier front montant, dernier front descendant qui le suit."""
+    out: Dict[int, Tuple[Optional[Front], Optional[Front]]] = {1: (None, None), 2: (None, None)}
+    for f in sorted(fronts, key=lambda f: f.t):
+        if f.cell not in out:
+            continue
+        rise, fall = out[f.cell]
+        if f.level == 1 and rise is None:
+            out[f.cell] = (f, None)
+        elif f.level == 0 and rise is not None:
+            out[f.cell] = (rise, f)
+    return out
+
+
+def estimer(fronts: Iterable[Front], distance_m: float) -> MesureVitesse:
+    """Mesure d'un passage ; voir la docstring du module pour les règles."""
+    b = _bornes(fronts)
+    (r1, f1), (r2, f2) = b[1], b[2]
+    if r1 is None or r2 is None or distance_m <= 0:
+        return MesureVitesse(QUALITE_INVALIDE)
+
+    source = max((r1, r2), key=lambda f: f.res_s).source
+    dt_r = r2.t - r1.t
+    res_r = max(r1.res_s, r2.res_s)      # erreur sur un écart de deux dates
+    if abs(dt_r) < max(DT_MIN_S, res_r):
+        return MesureVitesse(QUALITE_INVALIDE, source=source)
+
+    sens = SENS_12 if dt_r > 0 else SENS_21
+    qualite = QUALITE_OK
+    dt, res = abs(dt_r), res_r
+    longueur = None
+
+    if f1 is not None and f2 is not None:
+        dt_f = f2.t - f1.t
+        res_f = max(f1.res_s, f2.res_s)
+        v_r = distance_m / dt
+        v_f = distance_m / abs(dt_f) if dt_f else 0.0
+        if dt_f * dt_r > 0 and abs(v_r - v_f) <= ECART_MAX * max(v_r, v_f):
+            dt, res = (dt + abs(dt_f)) / 2.0, (res_r + res_f) / 2.0
+        else:
+            qualite = QUALITE_DEGRADEE
+        v = distance_m / dt
+        occultation = ((f1.t - r1.t) + (f2.t - r2.t)) / 2.0
+        longueur = round(v * occultation, 2)
+    else:
+        qualite = QUALITE_DEGRADEE
+
+    v_kmh = distance_m / dt * 3.6
+    incertitude = v_kmh * res / dt
+    if incertitude > INCERTITUDE_MAX * v_kmh:
+        qualite = QUALITE_DEGRADEE
+
+    return MesureVitesse(
+        qualite,
+        vitesse_kmh=round(v_kmh, 2),
+        sens=sens,
+        longueur_m=longueur,
+        incertitude_kmh=round(incertitude, 2),
+        source=source,
+    )
@@ -1,7 +1,9 @@
 import time
 import threading
+from typing import Optional
 
 from . import etat_cellule_1, etat_cellule_2
+from .passage_bus import PassageBus
 
 
 # Etat central (lu par api_flsk.py)
@@ -26,31 +28,37 @@ class etat_cellule_check(threading.Thread):
     t0 = {1: 0}
     defaut_cell = {1: 0}
 
-    def __init__(self, Mode_sans_cellules: int) -> None:
+    def __init__(self, Mode_sans_cellules: int, bus: Optional[PassageBus] = None) -> None:
         super().__init__(name="Check_Open_Cell_Thread", daemon=True)
         self.mss = Mode_sans_cellules
+        self.bus = bus
         self.ticks = 0
 
+    def _occupied(self) -> bool:
+        if self.bus is not None:
+            # Etat de la derniere lecture du bus (convention PassageService : 1 = coupee)
+            return 1 in self.bus.get_cells()
+
+        # Lire les deux cellules (1 et 2)
+        try:
+            c1 = int(etat_cellule_1.InputWatcher.cellules.get(1, 0))
+        except Exception:
+            c1 = 1
+        try:
+            c2 = int(etat_cellule_2.InputWatcher.cellules.get(2, 0))
+        except Exception:
+            c2 = 1
+
+        # Securite positive: 0 = coupe/obstrue/panne, 1 = libre
+        return c1 == 0 or c2 == 0
+
     def run(self) -> None:
         while True:
             if self.mss == 1:
                 time.sleep(1)
                 continue
 
-            # Lire les deux cellules (1 et 2)
-            try:
-                c1 = int(etat_cellule_1.InputWatcher.cellules.get(1, 0))
-            except Exception:
-                c1 = 1
-            try:
-                c2 = int(etat_cellule_2.InputWatcher.cellules.get(2, 0))
-            except Exception:
-                c2 = 1
-
-            # Securite positive: 0 = coupe/obstrue/panne, 1 = libre
-            occupied = (c1 == 0 or c2 == 0)
-
-            if occupied:
+            if self._occupied():
                 self.ticks += 1
                 etat_cellule_check.t0[1] = self.ticks
                 if self.ticks >= THRESHOLD_CELL_OPEN_SEC:
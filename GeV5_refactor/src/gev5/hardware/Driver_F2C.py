@@ -1,4 +1,3 @@
-import datetime
 import time
 import socket
 import threading
@@ -8,23 +7,8 @@ from ..core.alarmes.alarmes import AlarmeThread
 from ..core.comptage.comptage import ComptageThread
 from ..core.defauts.defauts import DefautThread
 from . import etat_cellule_1, etat_cellule_2
-
-
-def format_f2c_value(val):
-    s = "{:.4e}".format(val)
-    return re.sub(r"e([+-])(\d+)", lambda m: f"e{m.group(1)}{int(m.group(2)):03d}", s)
-
-
-def get_system_datetime():
-    now = datetime.datetime.now()
-    return now.strftime("%y%m%d%H%M%S")
-
-
-def calculate_checksum(trame):
-    """Checksum ASCII modulo 256, sur la trame complete sans le checksum ni l'asterisque de fin."""
-    somme = sum(ord(c) for c in trame)
-    csm = somme % 256
-    return f"{csm:02X}"
+# formatage partage avec le serveur asyncio (f2c_async)
+from .f2c_async import calculate_checksum, format_f2c_value, get_system_datetime
 
 
 class F2CThread(threading.Thread):
@@ -2,27 +2,52 @@
 # -*- coding: utf-8 -*-
 """
 Svr_Unipi.py — Version simplifiée et stable
-- Lecture DI 3/4/5 via REST EVOK (poll permanent)
-- AI et WS optionnels (désactivés par défaut)
+- Lecture DI 3/4/5 en push : abonnement WebSocket EVOK (événements de
+  changement, datés à l'arrivée), reconnexion automatique
+- REST EVOK : poll lent de contrôle de cohérence tant que le WS est
+  connecté (resynchro si écart confirmé), poll permanent 200 ms sinon
+- REST via une connexion HTTP keep-alive (RestClient) ; endpoint détecté
+  une fois puis mis en cache, re-sondage des autres seulement en cas
+  d'échec avec backoff exponentiel ; histogramme des durées de poll
 - Inversion logique possible via INVERT_DI
-- Anti-rebond (STABLE_MS) + warmup au démarrage (WARMUP_S)
+- Anti-rebond (STABLE_MS) en mode poll + warmup au démarrage (WARMUP_S) ;
+  en mode WS l'anti-rebond est celui des DI EVOK
 """
 
+import http.client
 import json
 import time
 import threading
-import urllib.request
-from typing import Optional
+import urllib.parse
+from typing import Dict, Optional
+
+from ..utils.latency import LatencyHistogram
+from .cell_edges import journal
+
+try:
+    import websocket  # websocket-client (déjà requis par relais.py)
+except Exception:  # pragma: no cover - optionnel
+    websocket = None
 
 # -------------------- Config --------------------
 REST_BASE       = "http://127.0.0.1:8080"
-REST_DI_BULK    = (f"{REST_BASE}/rest/di", f"{REST_BASE}/rest/input", f"{REST_BASE}/rest/all")
-REST_DI_ONE     = (f"{REST_BASE}/rest/di/{{c}}", f"{REST_BASE}/rest/input/{{c}}")
+REST_DI_BULK_PATHS = ("/rest/di", "/rest/input", "/rest/all")
+REST_DI_ONE_PATHS  = ("/rest/di/{c}", "/rest/input/{c}")
+BACKOFF_S       = (0.5, 30.0)       # re-sondage d'un endpoint en échec (min, max)
+LATENCY_BUCKETS_MS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000)
 
 POLL_PERIOD_S   = 0.2   # 200 ms
 TRACKED_DI      = (3, 4, 5)
 DEBUG_BOOT_PRINTS = 8
 
+# --- Push WebSocket ---
+WS_ENABLED          = True
+WS_URL              = "ws://127.0.0.1:8080/ws"
+WS_RES_S            = 0.02          # cycle de scrutation des DI par EVOK (~50 Hz)
+WS_RECONNECT_S      = (1.0, 10.0)   # backoff de reconnexion (min, max)
+REST_CHECK_PERIOD_S = 5.0           # contrôle REST quand le WS est connecté
+REST_RESYNC_COUNT   = 2             # lectures REST en écart avant resynchro
+
 # --- Options I/O ---
 INVERT_DI = {3: True, 4: True, 5: False}  # inverse les circuits si besoin
 WARMUP_S  = 5
@@ -46,57 +71,169 @@ def _coerce01(v) -> int:
     return 1
 
 
-def _rest_get_one_di(c: int, timeout=0.4) -> Optional[int]:
-    """Lit /rest/di/{c} (ou /rest/input/{c}) et retourne 0/1 ou None si échec."""
-    headers = {"Accept": "application/json"}
-    for tpl in REST_DI_ONE:
-        url = tpl.format(c=c)
+def _parse_di(data) -> Dict[int, int]:
+    """Trame(s) EVOK (REST ou WS) → {circuit: 0/1} pour les devices input/di."""
+    frames = data if isinstance(data, list) else [data]
+    mp = {}
+    for it in frames:
+        if not isinstance(it, dict):
+            continue
+        dev = str(it.get("dev", "")).lower()
+        if dev not in ("input", "di"):
+            continue
         try:
-            with urllib.request.urlopen(urllib.request.Request(url, headers=headers), timeout=timeout) as r:
-                data = json.loads(r.read().decode("utf-8", errors="ignore"))
-                return _coerce01(data.get("value", 0))
+            c = int(str(it.get("circuit", "")).strip())
         except Exception:
             continue
-    return None
+        mp[c] = _coerce01(it.get("value", 0))
+    return mp
 
 
-def _rest_get_all_di(timeout=0.6):
-    """Essaie /rest/di, /rest/input, /rest/all. Fallback par circuit si vide."""
-    headers = {"Accept": "application/json"}
-    for url in REST_DI_BULK:
+class RestClient:
+    """
+    Client REST EVOK : une connexion HTTP keep-alive, réutilisée d'un poll
+    à l'autre (rouverte seulement après une erreur).
+
+    - endpoint DI bulk en cache : seul interrogé tant qu'il répond
+    - en cas d'échec, les autres endpoints (puis la lecture par circuit)
+      sont re-sondés, chacun avec un backoff exponentiel (BACKOFF_S) : un
+      endpoint absent n'est plus retenté à chaque cycle
+    - durée de chaque poll dans un histogramme (get_metrics)
+    """
+
+    def __init__(self, base: str = REST_BASE) -> None:
+        u = urllib.parse.urlsplit(base)
+        self.host = u.hostname or "127.0.0.1"
+        self.port = u.port or 80
+        self.endpoint: Optional[str] = None
+        self._conn: Optional[http.client.HTTPConnection] = None
+        self._retry_at: Dict[str, float] = {}
+        self._backoff: Dict[str, float] = {}
+        self.latency = LatencyHistogram(LATENCY_BUCKETS_MS)
+        self.metrics = {"polls": 0, "errors": 0, "reconnects": 0, "reprobes": 0}
+
+    # --- transport ---
+    def _request(self, path: str, timeout: float) -> bytes:
+        if self._conn is None:
+            self._conn = http.client.HTTPConnection(self.host, self.port, timeout=timeout)
+            self.metrics["reconnects"] += 1
+        conn = self._conn
+        conn.timeout = timeout
+        if conn.sock is not None:
+            conn.sock.settimeout(timeout)
         try:
-            with urllib.request.urlopen(urllib.request.Request(url, headers=headers), timeout=timeout) as r:
-                raw = r.read().decode("utf-8", errors="ignore")
-                data = json.loads(raw)
-                frames = data if isinstance(data, list) else [data]
-                mp = {}
-                for it in frames:
-                    if not isinstance(it, dict):
-                        continue
-                    dev = str(it.get("dev", "")).lower()
-                    if dev not in ("input", "di"):
-                        continue
-                    try:
-                        c = int(str(it.get("circuit", "")).strip())
-                    except Exception:
-                        continue
-                    mp[c] = _coerce01(it.get("value", 0))
-                if mp:
-                    return mp
+            conn.request("GET", path, headers={"Accept": "application/json", "Connection": "keep-alive"})
+            r = conn.getresponse()
+            body = r.read()
         except Exception:
-            continue
-    # Fallback : un par un
-    mp = {}
-    for c in TRACKED_DI:
-        v = _rest_get_one_di(c)
-        if v is not None:
-            mp[c] = v
-    return mp
+            self.close()
+            raise
+        if r.will_close:
+            self.close()
+        if r.status != 200:
+            raise OSError(f"HTTP {r.status} {path}")
+        return body
+
+    def _get_json(self, path: str, timeout: float):
+        return json.loads(self._request(path, timeout).decode("utf-8", errors="ignore"))
+
+    def close(self) -> None:
+        if self._conn is not None:
+            try:
+                self._conn.close()
+            except Exception:
+                pass
+            self._conn = None
+
+    # --- backoff par endpoint ---
+    def _available(self, path: str, now: float) -> bool:
+        return now >= self._retry_at.get(path, 0.0)
+
+    def _ok(self, path: str) -> None:
+        self._retry_at.pop(path, None)
+        self._backoff.pop(path, None)
+
+    def _failed(self, path: str, now: float) -> None:
+        self.metrics["errors"] += 1
+        delay = min(self._backoff.get(path, BACKOFF_S[0] / 2.0) * 2.0, BACKOFF_S[1])
+        self._backoff[path] = delay
+        self._retry_at[path] = now + delay
+
+    # --- lectures DI ---
+    def get_one_di(self, c: int, timeout: float = 0.4) -> Optional[int]:
+        """Lit /rest/di/{c} (ou /rest/input/{c}) et retourne 0/1 ou None si échec."""
+        for tpl in REST_DI_ONE_PATHS:
+            path = tpl.format(c=c)
+            now = time.monotonic()
+            if not self._available(path, now):
+                continue
+            try:
+                v = _coerce01(self._get_json(path, timeout).get("value", 0))
+            except Exception:
+                self._failed(path, now)
+                continue
+            self._ok(path)
+            return v
+        return None
+
+    def get_all_di(self, timeout: float = 0.6) -> Dict[int, int]:
+        """Endpoint en cache, sinon re-sondage des autres ; {} si rien ne répond."""
+        t0 = time.perf_counter()
+        self.metrics["polls"] += 1
+        try:
+            return self._get_all_di(timeout)
+        finally:
+            self.latency.add((time.perf_counter() - t0) * 1000.0)
+
+    def _get_all_di(self, timeout: float) -> Dict[int, int]:
+        cached = self.endpoint
+        paths = ((cached,) if cached else ()) + tuple(p for p in REST_DI_BULK_PATHS if p != cached)
+        for path in paths:
+            now = time.monotonic()
+            if path != cached and not self._available(path, now):
+                continue
+            if path != cached:
+                self.metrics["reprobes"] += 1
+            try:
+                mp = _parse_di(self._get_json(path, timeout))
+            except Exception:
+                mp = {}
+            if not mp:
+                self._failed(path, now)
+                if path == cached:
+                    self.endpoint = None
+                continue
+            self._ok(path)
+            if path != self.endpoint:
+                print(f"[Svr_Unipi] Endpoint DI : {path}")
+                self.endpoint = path
+            return mp
+        # Fallback : un par un
+        mp = {}
+        for c in TRACKED_DI:
+            v = self.get_one_di(c)
+            if v is not None:
+                mp[c] = v
+        return mp
+
+    def get_metrics(self) -> Dict[str, object]:
+        return dict(self.metrics, endpoint=self.endpoint, latency_ms=self.latency.snapshot())
+
+
+_client = RestClient()
+
+
+def _rest_get_one_di(c: int, timeout=0.4) -> Optional[int]:
+    return _client.get_one_di(c, timeout)
+
+
+def _rest_get_all_di(timeout=0.6):
+    return _client.get_all_di(timeout)
 
 
 # -------------------- Classe principale --------------------
 class Svr_Unipi_rec(threading.Thread):
-    """Thread REST (DI + AI placeholder)"""
+    """Thread REST (contrôle / poll) + thread WS (push DI) + AI placeholder"""
     Inp_3 = [0, 0]
     Inp_4 = [0, 0]
     Inp_5 = [0, 0]
@@ -118,23 +255,132 @@ class Svr_Unipi_rec(threading.Thread):
         super().__init__(name="Svr_Unipi_rec", daemon=True)
         self._initialized = True
         self._stop = threading.Event()
+        self._lock = threading.Lock()
 
         # États
         self._boot_ts = time.time()
-        self._di_last = {c: None for c in TRACKED_DI}
+        self._di_last: Dict[int, Optional[int]] = {c: None for c in TRACKED_DI}
         self._di_last_change = {c: 0.0 for c in TRACKED_DI}
-        self._di_stable = {c: None for c in TRACKED_DI}
+        self._di_last_change_mono = {c: 0.0 for c in TRACKED_DI}
+        self._di_stable: Dict[int, Optional[int]] = {c: None for c in TRACKED_DI}
+
+        # Push WS
+        self._ws_thread: Optional[threading.Thread] = None
+        self._ws_up = threading.Event()
+        self._rest_diff = {c: 0 for c in TRACKED_DI}
+        self.metrics = {
+            "ws_connects": 0, "ws_errors": 0, "ws_events": 0,
+            "rest_polls": 0, "rest_resync": 0,
+        }
+
+    # --------- Etat partagé ---------
+    @staticmethod
+    def _set_inp(c: int, v: int) -> None:
+        if c == 3: Svr_Unipi_rec.Inp_3[1] = v
+        elif c == 4: Svr_Unipi_rec.Inp_4[1] = v
+        elif c == 5: Svr_Unipi_rec.Inp_5[1] = v
+
+    def _commit(self, c: int, v: int, t_mono: float, source: str, res_s: float) -> bool:
+        """Nouvel état validé de la DI c, daté de t_mono (journal des fronts)."""
+        with self._lock:
+            if self._di_stable[c] == v:
+                return False
+            self._di_stable[c] = v
+            self._set_inp(c, v)
+        journal.record_di(c, v, t_mono, source=source, res_s=res_s)
+        return True
+
+    def _warmed(self, now: float) -> bool:
+        return (now - self._boot_ts) >= WARMUP_S
+
+    def ws_connected(self) -> bool:
+        return self._ws_up.is_set()
+
+    def get_metrics(self) -> Dict[str, object]:
+        return dict(self.metrics, ws_up=int(self._ws_up.is_set()), rest=_client.get_metrics())
+
+    # --------- Push WebSocket ---------
+    def _on_ws_message(self, raw, t_mono: float) -> None:
+        try:
+            mp = _parse_di(json.loads(raw))
+        except Exception:
+            return
+        now = time.time()
+        for c, v in mp.items():
+            if c not in TRACKED_DI:
+                continue
+            if INVERT_DI.get(c, False):
+                v = 1 - v
+            self.metrics["ws_events"] += 1
+            with self._lock:
+                if self._di_last[c] != v:
+                    self._di_last[c] = v
+                    self._di_last_change[c] = now
+                    self._di_last_change_mono[c] = t_mono
+            # état initial et warmup : laissés au poll REST
+            if self._di_stable[c] is not None and self._warmed(now):
+                self._commit(c, v, t_mono, "ws", WS_RES_S)
 
-    # --------- Thread principal (REST permanent) ---------
+    def _run_ws(self):
+        if websocket is None:
+            return
+        delay = WS_RECONNECT_S[0]
+        while not self._stop.is_set():
+            ws = None
+            try:
+                ws = websocket.create_connection(WS_URL, timeout=2.0)
+                ws.send(json.dumps({"cmd": "filter", "devices": ["input"]}))
+                ws.settimeout(1.0)   # réveil périodique pour stop()
+                self._ws_up.set()
+                self.metrics["ws_connects"] += 1
+                delay = WS_RECONNECT_S[0]
+                print(f"[Svr_Unipi] WS connecté ({WS_URL}) : DI en push.")
+                while not self._stop.is_set():
+                    try:
+                        raw = ws.recv()
+                    except websocket.WebSocketTimeoutException:
+                        continue
+                    if raw:
+                        self._on_ws_message(raw, time.monotonic())
+            except Exception as e:
+                self.metrics["ws_errors"] += 1
+                if self._ws_up.is_set() or self.metrics["ws_errors"] == 1:
+                    print(f"[Svr_Unipi][WS] Déconnecté : {e} (retour au poll REST)")
+            finally:
+                self._ws_up.clear()
+                if ws is not None:
+                    try:
+                        ws.close()
+                    except Exception:
+                        pass
+            self._stop.wait(delay)
+            delay = min(delay * 2.0, WS_RECONNECT_S[1])
+
+    # --------- Thread principal (REST contrôle / poll) ---------
     def run(self):
-        print("[Svr_Unipi] Thread REST démarré (poll permanent).")
+        if WS_ENABLED and websocket is not None:
+            self._ws_thread = threading.Thread(target=self._run_ws, name="Svr_Unipi_ws", daemon=True)
+            self._ws_thread.start()
+            print("[Svr_Unipi] Thread REST démarré (contrôle ; DI en push WS).")
+        else:
+            print("[Svr_Unipi] Thread REST démarré (poll permanent).")
         shown = 0
+        next_check = 0.0
         while not self._stop.is_set():
+            now = time.time()
+            ws_mode = self._ws_up.is_set() and self._warmed(now)
+            if ws_mode and now < next_check:
+                self._stop.wait(POLL_PERIOD_S)
+                continue
+
             mp = _rest_get_all_di(timeout=0.5)
+            self.metrics["rest_polls"] += 1
+            next_check = time.time() + REST_CHECK_PERIOD_S
             if shown < DEBUG_BOOT_PRINTS:
                 shown += 1
 
             now = time.time()
+            mono = time.monotonic()
             for c in TRACKED_DI:
                 v = mp.get(c)
                 if v is None:
@@ -144,35 +390,51 @@ class Svr_Unipi_rec(threading.Thread):
 
                 # init
                 if self._di_last[c] is None:
-                    self._di_last[c] = v
-                    self._di_last_change[c] = now
-                    self._di_stable[c] = v
-                    if c == 3: Svr_Unipi_rec.Inp_3[1] = v
-                    elif c == 4: Svr_Unipi_rec.Inp_4[1] = v
-                    elif c == 5: Svr_Unipi_rec.Inp_5[1] = v
+                    with self._lock:
+                        self._di_last[c] = v
+                        self._di_last_change[c] = now
+                        self._di_last_change_mono[c] = mono
+                        self._di_stable[c] = v
+                        self._set_inp(c, v)
+                    continue
+
+                # WS connecté : contrôle de cohérence, resynchro si l'écart se confirme
+                if ws_mode:
+                    if v != self._di_stable[c]:
+                        self._rest_diff[c] += 1
+                        if self._rest_diff[c] >= REST_RESYNC_COUNT:
+                            self._rest_diff[c] = 0
+                            if self._commit(c, v, mono, "rest", REST_CHECK_PERIOD_S):
+                                self.metrics["rest_resync"] += 1
+                                print(f"[Svr_Unipi] DI{c} resynchronisée par REST (événement WS manqué).")
+                    else:
+                        self._rest_diff[c] = 0
                     continue
 
                 # changement brut
-                if self._di_last[c] != v:
-                    self._di_last[c] = v
-                    self._di_last_change[c] = now
+                with self._lock:
+                    if self._di_last[c] != v:
+                        self._di_last[c] = v
+                        self._di_last_change[c] = now
+                        self._di_last_change_mono[c] = mono
 
                 stable = (now - self._di_last_change[c]) * 1000.0 >= STABLE_MS
-                warmed = (now - self._boot_ts) >= WARMUP_S
+                warmed = self._warmed(now)
 
                 if stable and warmed and self._di_stable[c] != v:
-                    self._di_stable[c] = v
-                    if c == 3: Svr_Unipi_rec.Inp_3[1] = v
-                    elif c == 4: Svr_Unipi_rec.Inp_4[1] = v
-                    elif c == 5: Svr_Unipi_rec.Inp_5[1] = v
+                    # date du changement brut (avant anti-rebond), à une période près
+                    self._commit(c, v, self._di_last_change_mono[c], "rest", POLL_PERIOD_S)
 
-            time.sleep(POLL_PERIOD_S)
+            self._stop.wait(POLL_PERIOD_S)
+        _client.close()
         print("[Svr_Unipi] Thread arrêté.")
 
     def stop(self, wait: bool = True):
         self._stop.set()
         if wait and self.is_alive():
             self.join(timeout=2.0)
+        if wait and self._ws_thread is not None and self._ws_thread.is_alive():
+            self._ws_thread.join(timeout=2.0)
         print("[Svr_Unipi] Arrêt demandé.")
 
 
@@ -181,7 +443,7 @@ _srv_thread: Optional[Svr_Unipi_rec] = None
 _srv_lock = threading.Lock()
 
 def demarrage_Srv_Unipi():
-    """Démarre le listener REST si pas déjà lancé."""
+    """Démarre le listener (WS + REST) si pas déjà lancé."""
     global _srv_thread
     with _srv_lock:
         if _srv_thread is None or not _srv_thread.is_alive():
@@ -0,0 +1,116 @@
+# src/gev5/hardware/cell_edges.py
+from __future__ import annotations
+
+"""
+Fronts des cellules datés à la source.
+
+Le bus de passage voit les cellules après la chaîne d'acquisition
+(scrutation REST 200 ms + anti-rebond 100 ms de Svr_Unipi, puis sa propre
+période) : ses dates ont ±300 ms d'erreur, inutilisables pour une vitesse
+sur 0.75 m. Les backends d'entrée enregistrent donc chaque changement
+validé avec l'instant où il a été vu en premier :
+
+    journal.record_di(3, 1, t, source="rest", res_s=0.2)   # Svr_Unipi
+    journal.record_di(3, 1, t, source="ws", res_s=0.002)   # événement EVOK
+    journal.record(1, 1, t, source="gpio", res_s=0.0)      # callback GPIO
+
+(t = time.monotonic(), même horloge que le bus.)
+
+PassageFronts rapproche ensuite chaque front publié par le bus de la
+date source correspondante (à défaut : date du bus, résolution = sa
+période) et en tire la mesure de vitesse du passage.
+"""
+
+import threading
+from typing import Dict, List, Optional, Tuple
+
+from ..core.vitesse.estimation import Front, MesureVitesse, estimer
+from .passage_bus import S1_FALL, S1_RISE, S2_FALL, S2_RISE, START, PassageEvent
+
+# mapping historique DI → cellule (cf. HardwarePort.read_cellule)
+DI_CELLULE = {3: 1, 4: 2}
+
+# délai max entre la date source et la publication par le bus
+MAX_AGE_S = 1.0
+
+_FRONTS_BUS = {S1_RISE: (1, 1), S1_FALL: (1, 0), S2_RISE: (2, 1), S2_FALL: (2, 0)}
+
+
+class EdgeJournal:
+    """Dernier front daté à la source, par (cellule, niveau)."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._last: Dict[Tuple[int, int], Front] = {}
+        self.metrics: Dict[str, int] = {"recorded": 0, "matched": 0, "missed": 0}
+
+    def record(self, cell: int, level: int, t: float, source: str, res_s: float = 0.0) -> None:
+        f = Front(int(cell), 1 if level else 0, float(t), float(res_s), source)
+        with self._lock:
+            self._last[(f.cell, f.level)] = f
+            self.metrics["recorded"] += 1
+
+    def record_di(self, di: int, level: int, t: float, source: str, res_s: float = 0.0) -> None:
+        cell = DI_CELLULE.get(int(di))
+        if cell is not None:
+            self.record(cell, level, t, source, res_s)
+
+    def lookup(self, cell: int, level: int, t: float, max_age_s: float = MAX_AGE_S) -> Optional[Front]:
+        """Front source de (cell, level) vu au plus max_age_s avant t, sinon None."""
+        with self._lock:
+            f = self._last.get((int(cell), 1 if level else 0))
+            ok = f is not None and t - max_age_s <= f.t <= t
+            self.metrics["matched" if ok else "missed"] += 1
+        return f if ok else None
+
+    def clear(self) -> None:
+        with self._lock:
+            self._last.clear()
+
+    def get_metrics(self) -> Dict[str, int]:
+        with self._lock:
+            return dict(self.metrics)
+
+
+journal = EdgeJournal()
+
+
+class PassageFronts:
+    """
+    Fronts S1/S2 du passage en cours, à partir des événements du bus.
+
+    feed(ev) pour chaque événement ; les fronts publiés avec le START sont
+    conservés, ceux d'avant (cellule qui flotte hors passage) oubliés.
+    """
+
+    KINDS = (START, S1_RISE, S1_FALL, S2_RISE, S2_FALL)
+    MAX_FRONTS = 64
+
+    def __init__(self, bus_res_s: float, edges: Optional[EdgeJournal] = None) -> None:
+        self.bus_res_s = float(bus_res_s)
+        self.edges = edges if edges is not None else journal
+        self._fronts: List[Tuple[float, Front]] = []
+
+    def feed(self, ev: PassageEvent) -> None:
+        if ev.kind == START:
+            self._fronts = [(t, f) for t, f in self._fronts if t >= ev.t]
+            return
+        cl = _FRONTS_BUS.get(ev.kind)
+        if cl is None:
+            return
+        cell, level = cl
+        f = self.edges.lookup(cell, level, ev.t)
+        if f is None:
+            f = Front(cell, level, ev.t, self.bus_res_s, "bus")
+        self._fronts.append((ev.t, f))
+        if len(self._fronts) > self.MAX_FRONTS:
+            del self._fronts[0]
+
+    def fronts(self) -> List[Front]:
+        return [f for _, f in self._fronts]
+
+    def mesure(self, distance_m: float) -> MesureVitesse:
+        return estimer(self.fronts(), distance_m)
+
+    def reset(self) -> None:
+        self._fronts = []
@@ -5,11 +5,7 @@ from __future__ import annotations
 
 import threading
 import time
-from typing import Dict
-
-from gev5.boot.loader import load_config
-
-_cfg = load_config()
+from typing import Dict, Optional
 
 
 class InputWatcher(threading.Thread):
@@ -18,18 +14,27 @@ class InputWatcher(threading.Thread):
 
     - En mode NORMAL (sim=0) : lit Svr_Unipi_rec.Inp_4[1]
     - En mode SIMULATION (sim=1) : lit simulateur.Application.variable2[0]
+
+    Rien n'est lancé à l'import : Gev5System démarre le watcher
+    (demarrer) avec le mode de sa config ; sans mode fourni, la config
+    n'est lue qu'au démarrage du thread.
     """
 
     cellules: Dict[int, int] = {2: 0}
     running: bool = True
     sim_override: int | None = None
 
-    def __init__(self) -> None:
-        super().__init__(daemon=True)
+    def __init__(self, sim: Optional[int] = None) -> None:
+        super().__init__(name="InputWatcher_2", daemon=True)
+        self.sim = sim
 
     def run(self) -> None:
+        if self.sim is None:
+            from gev5.boot.loader import load_config
+            self.sim = int(load_config().sim)
+
         while self.running:
-            sim = int(self.sim_override) if self.sim_override is not None else int(_cfg.sim)
+            sim = int(self.sim_override) if self.sim_override is not None else int(self.sim)
             if sim:
                 # --- MODE SIMULATION ---
                 try:
@@ -49,5 +54,18 @@ class InputWatcher(threading.Thread):
             time.sleep(0.02)
 
 
-watcher = InputWatcher()
-watcher.start()
+watcher: Optional[InputWatcher] = None
+
+
+def demarrer(sim: Optional[int] = None) -> InputWatcher:
+    """Démarre le watcher s'il ne tourne pas déjà ; retourne le thread."""
+    global watcher
+    if watcher is None or not watcher.is_alive():
+        InputWatcher.running = True
+        watcher = InputWatcher(sim)
+        watcher.start()
+    return watcher
+
+
+def arreter() -> None:
+    InputWatcher.running = False
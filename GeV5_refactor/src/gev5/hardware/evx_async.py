@@ -0,0 +1,126 @@
+# src/gev5/hardware/evx_async.py
+from __future__ import annotations
+
+"""
+Serveur eVx asyncio (remplace eVx_Start / eVx_Thread).
+
+- réponses de toutes les commandes préparées une fois par version de
+  snapshot (maj) ; une requête ne fait qu'une recherche dans un dict ;
+- commandes reconnues par une seule expression (table DISPATCH, la plus
+  longue d'abord) : plusieurs commandes reçues dans le même segment,
+  avec ou sans séparateur, sont servies dans l'ordre en une écriture ;
+  une commande coupée entre deux segments est recollée ;
+- une seule boucle pour tous les automates, nombre de connexions borné,
+  client muet fermé après idle_s (protocole_async, passerelle).
+
+Réponses identiques à eVx_Thread, octet pour octet, y compris
+LireValeursRadioactivite_2 (la trame 2 voies, deux fois).
+"""
+
+import asyncio
+import re
+import time
+from typing import Callable, Dict, Tuple
+
+from ..core.snapshot import Snapshot
+from .protocole_async import ServeurProtocole
+
+EVX_PORT = 6789
+
+
+class _Vue:
+    """Lectures entières d'un snapshot, comme eVx_Thread."""
+
+    def __init__(self, snap: Snapshot) -> None:
+        self.snap = snap
+
+    def fond(self, i: int) -> int:
+        return int(self.snap.fond.get(i, 0.0))
+
+    # le seuil suiveur publié par eVx_Thread est le fond
+    suiveur = fond
+
+    def val_max(self, i: int) -> int:
+        return int(self.snap.counts.get(i, 0.0))
+
+    def alerte(self, i: int) -> int:
+        return int(self.snap.alarm_states.get(i, 0))
+
+
+def _trame_2_voies(v: _Vue) -> str:
+    s = "{:6},{:6},{:6},{:6},{:6},{:6},{:6},{:6},{:6},{},{},{}".format(
+        v.fond(1), v.fond(2), v.fond(1) + v.fond(2),
+        v.suiveur(1), v.suiveur(2), v.suiveur(1) + v.suiveur(2),
+        v.val_max(1), v.val_max(2), v.val_max(1) + v.val_max(2),
+        v.alerte(1), v.alerte(2), v.alerte(1) + v.alerte(2),
+    )
+    return "{:3}{}".format(len(s), s)
+
+
+def _par_voie(prefixe: str, suffixe: str, lire: Callable[[_Vue, int], int]) -> Dict[str, Callable[[_Vue], str]]:
+    table: Dict[str, Callable[[_Vue], str]] = {
+        f"{prefixe}{i}": (lambda v, i=i: str(lire(v, i))) for i in range(1, 5)
+    }
+    table[f"{prefixe}{suffixe}"] = lambda v: str(sum(lire(v, i) for i in range(1, 5)))
+    return table
+
+
+DISPATCH: Dict[str, Callable[[_Vue], str]] = {
+    "LireValeursRadioactivite": _trame_2_voies,
+    "LireValeursRadioactivite_2": lambda v: _trame_2_voies(v) * 2,
+    "CON_TEST": lambda v: "OK",
+    **_par_voie("bruitFondV", "Somme", _Vue.fond),
+    **_par_voie("SeuilAlarmeV", "Somme", _Vue.suiveur),
+    **_par_voie("MesureMaxVoie", "Somme", _Vue.val_max),
+    **_par_voie("AlerteV", "Somme", _Vue.alerte),
+}
+
+
+class EvxServeur(ServeurProtocole):
+    nom = "evx"
+
+    def __init__(self, dispatch: Dict[str, Callable[[_Vue], str]] = DISPATCH, **kw) -> None:
+        super().__init__(**kw)
+        self.dispatch = dict(dispatch)
+        noms = sorted(self.dispatch, key=len, reverse=True)
+        self._motif = re.compile(b"|".join(re.escape(n.encode("ascii")) for n in noms))
+        self._garde = max(len(n) for n in noms) - 1
+        self.reponses: Dict[bytes, bytes] = {}
+        self.metrics.update(rebuilds=0, writes=0)
+        self.maj(Snapshot())
+
+    def maj(self, snap: Snapshot) -> int:
+        """Prépare les réponses si la version a changé ; retourne le nombre de réponses refaites."""
+        if snap.version == self.version and self.reponses:
+            return 0
+        vue = _Vue(snap)
+        self.reponses = {n.encode("ascii"): fn(vue).encode("utf-8") for n, fn in self.dispatch.items()}
+        self.version = snap.version
+        self.metrics["updates"] += 1
+        self.metrics["rebuilds"] += 1
+        return len(self.reponses)
+
+    def traiter(self, tampon: bytes) -> Tuple[bytes, bytes]:
+        """(réponses concaténées, reste à garder pour le segment suivant)."""
+        reps = []
+        fin = 0
+        for m in self._motif.finditer(tampon):
+            reps.append(self.reponses[m.group()])
+            fin = m.end()
+        self.metrics["requests"] += len(reps)
+        # début de commande possible seulement dans les _garde derniers octets
+        return b"".join(reps), tampon[max(fin, len(tampon) - self._garde):]
+
+    async def session(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        tampon = b""
+        while True:
+            data = await asyncio.wait_for(reader.read(1024), self.idle_s)
+            if not data:
+                return
+            t0 = time.perf_counter()
+            rep, tampon = self.traiter(tampon + data)
+            if rep:
+                self.servi(t0)
+                writer.write(rep)
+                self.metrics["writes"] += 1
+                await writer.drain()
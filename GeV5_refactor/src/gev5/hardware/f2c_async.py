@@ -0,0 +1,167 @@
+# src/gev5/hardware/f2c_async.py
+from __future__ import annotations
+
+"""
+Serveur F2C asyncio multi-clients (remplace la boucle accept de F2CThread).
+
+Trame FR21 d'une voie :
+
+    *9001000101{mbr}0001FEEF3FFF70{date} {corps de la voie}*{csm}*\\r\\n
+
+- corps des 12 voies (états, valeurs {:.4e}, statuts) et leur somme de
+  contrôle partielle préparés une fois par version de snapshot (maj) ;
+- le checksum est une somme modulo 256 : csm = préfixe + date + corps,
+  la date (à la seconde) n'est ajoutée qu'une fois par seconde ;
+- trames complètes gardées par n° de membre jusqu'au snapshot ou à la
+  seconde suivante : une requête = une recherche dans un dict ;
+- plusieurs requêtes dans un segment → réponses en une écriture.
+
+Réponses identiques à F2CThread (y compris NO_REPLY et la réponse 0002).
+"""
+
+import asyncio
+import datetime
+import re
+import time
+from typing import Callable, Dict, List, Tuple
+
+from ..core.snapshot import Snapshot
+from .protocole_async import ServeurProtocole
+
+F2C_PORT = 9000
+
+RE_REQUETE = re.compile(rb"\*0001900101([0-9]{2})(0001|0002)FEEF3FFF70\*")
+NO_REPLY = "*9001000100000000FEEF3FFF70NO_REPLY*"
+FIXES = ("00002215", "00182221", "00316578")
+STATUTS = (
+    "00:2000", "00:0000", "F0:0000", "00:0000", "00:0000",
+    "00:0000", "00:0000", "00:0000", "00:0000", "00:0000",
+    "00:0000", "00:0000", "00:0000", "00:0000", "00:0000",
+)
+
+
+def format_f2c_value(val):
+    s = "{:.4e}".format(val)
+    return re.sub(r"e([+-])(\d+)", lambda m: f"e{m.group(1)}{int(m.group(2)):03d}", s)
+
+
+def get_system_datetime():
+    now = datetime.datetime.now()
+    return now.strftime("%y%m%d%H%M%S")
+
+
+def calculate_checksum(trame):
+    """Checksum ASCII modulo 256, sur la trame complete sans le checksum ni l'asterisque de fin."""
+    somme = sum(ord(c) for c in trame)
+    csm = somme % 256
+    return f"{csm:02X}"
+
+
+def _somme(s: str) -> int:
+    return sum(s.encode("latin-1"))
+
+
+def _fin(trame: str, somme: int) -> bytes:
+    return f"{trame}{somme % 256:02X}*\r\n".encode("ascii")
+
+
+def _mot(bits: int) -> str:
+    return f"{bits:08X}"
+
+
+def corps_voie(snap: Snapshot, idx: int) -> str:
+    """Champs FR21 après la date (état, mode, système, valeurs, statuts)."""
+    defaut = int(snap.defauts.get(idx, 0))
+    alarme = int(snap.alarm_states.get(idx, 0))
+    s1, s2 = snap.cells
+    champs = [
+        _mot({1: 0x01, 2: 0x02}.get(defaut, 0)),
+        _mot({1: 0x01, 2: 0x02}.get(alarme, 0)),
+        _mot(0x01 if int(s1) == 1 else 0x02 if int(s2) == 1 else 0),
+        format_f2c_value(float(snap.counts.get(idx, 0.0))),
+        format_f2c_value(0.0),
+        format_f2c_value(float(snap.fond.get(idx, 0.0))),
+        *FIXES,
+        format_f2c_value(0.0),
+        *(format_f2c_value(0) for _ in range(5)),
+        *STATUTS,
+    ]
+    return " ".join(champs)
+
+
+class F2CServeur(ServeurProtocole):
+    nom = "f2c"
+
+    def __init__(self, horloge: Callable[[], float] = time.time, **kw) -> None:
+        super().__init__(**kw)
+        self.horloge = horloge
+        self._corps: Dict[int, Tuple[str, int]] = {}
+        self._seconde = -1
+        self._date = ""
+        self._trames: Dict[bytes, bytes] = {}
+        self._suivantes: Dict[bytes, bytes] = {}
+        self.no_reply = _fin(NO_REPLY, _somme(NO_REPLY))
+        self.metrics.update(rebuilds=0, frames_built=0, writes=0)
+        self.maj(Snapshot())
+
+    def maj(self, snap: Snapshot) -> int:
+        """Prépare les corps des 12 voies si la version a changé."""
+        if snap.version == self.version and self._corps:
+            return 0
+        corps = {}
+        for idx in range(1, 13):
+            c = corps_voie(snap, idx)
+            corps[idx] = (c, _somme(c))
+        self._corps = corps
+        self._trames = {}
+        self.version = snap.version
+        self.metrics["updates"] += 1
+        self.metrics["rebuilds"] += 1
+        return len(corps)
+
+    def _horloge(self) -> None:
+        sec = int(self.horloge())
+        if sec != self._seconde:
+            self._seconde = sec
+            self._date = get_system_datetime()
+            self._trames = {}
+
+    def fr21(self, mbr: bytes) -> bytes:
+        """Trame FR21 du membre mbr (2 chiffres, voie bornée à 1..12)."""
+        self._horloge()
+        trame = self._trames.get(mbr)
+        if trame is None:
+            corps, somme = self._corps[min(max(int(mbr), 1), 12)]
+            tete = f"*9001000101{mbr.decode()}0001FEEF3FFF70{self._date} "
+            trame = _fin(f"{tete}{corps}*", _somme(tete) + somme + ord("*"))
+            self._trames[mbr] = trame
+            self.metrics["frames_built"] += 1
+        return trame
+
+    def suivante(self, mbr: bytes) -> bytes:
+        trame = self._suivantes.get(mbr)
+        if trame is None:
+            t = f"*9001000101{mbr.decode()}0002*"
+            trame = self._suivantes[mbr] = _fin(t, _somme(t))
+        return trame
+
+    def traiter(self, data: bytes) -> bytes:
+        """Réponses aux requêtes d'un segment (NO_REPLY si aucune reconnue)."""
+        reps: List[bytes] = []
+        for m in RE_REQUETE.finditer(data):
+            mbr, code = m.groups()
+            reps.append(self.fr21(mbr) if code == b"0001" else self.suivante(mbr))
+        self.metrics["requests"] += max(1, len(reps))
+        return b"".join(reps) if reps else self.no_reply
+
+    async def session(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        while True:
+            data = await asyncio.wait_for(reader.read(1024), self.idle_s)
+            if not data:
+                return
+            t0 = time.perf_counter()
+            rep = self.traiter(data)
+            self.servi(t0)
+            writer.write(rep)
+            self.metrics["writes"] += 1
+            await writer.drain()
@@ -8,7 +8,7 @@ from ..core.comptage.comptage import ComptageThread
 from ..core.defauts.defauts import DefautThread
 from ..core.courbes.courbes import CourbeThread
 from ..core.acquittement.acquittement import AcquittementThread
-from . import etat_cellule_1, etat_cellule_2
+from ..core.snapshot import SnapshotStore
 
 try:
     from . import vitesse_chargement
@@ -47,27 +47,32 @@ class Interface(threading.Thread):
 
     def __init__(self) -> None:
         super().__init__(daemon=True)
+        self._snap_version = -1
 
     def run(self) -> None:
         while True:
-            self.liste_comptage[1] = [
-                float(ComptageThread.compteur.get(i, 0.0)) for i in range(1, 13)
-            ]
-            self.liste_variance[1] = [0.0 for _ in range(12)]
-            self.liste_alarm[1] = [
-                int(AlarmeThread.alarme_resultat.get(i, 0)) for i in range(1, 13)
-            ]
-            self.liste_suiveur[1] = [
-                float(AlarmeThread.fond.get(i, 0.0)) for i in range(1, 13)
-            ]
-            self.liste_val_max[1] = [0.0 for _ in range(12)]
-            self.liste_defaut[1] = [
-                int(DefautThread.defaut_resultat.get(i, 0)) for i in range(1, 13)
-            ]
-            self.list_cell[1] = [
-                int(etat_cellule_1.InputWatcher.cellules.get(1, 0)),
-                int(etat_cellule_2.InputWatcher.cellules.get(2, 0)),
-            ]
+            # Valeurs des voies : snapshot cohérent, recopié seulement s'il a changé
+            snap = SnapshotStore.get()
+            if snap.version == 0 or snap.version != self._snap_version:
+                self._snap_version = snap.version
+                counts = snap.counts if snap.version else ComptageThread.compteur
+                alarms = snap.alarm_states if snap.version else AlarmeThread.alarme_resultat
+                fond = snap.fond if snap.version else AlarmeThread.fond
+                defauts = snap.defauts if snap.version else DefautThread.defaut_resultat
+                mesures = snap.measures if snap.version else AlarmeThread.alarme_mesure
+
+                self.liste_comptage[1] = [float(counts.get(i, 0.0)) for i in range(1, 13)]
+                self.liste_variance[1] = [0.0 for _ in range(12)]
+                self.liste_alarm[1] = [int(alarms.get(i, 0)) for i in range(1, 13)]
+                self.liste_suiveur[1] = [float(fond.get(i, 0.0)) for i in range(1, 13)]
+                self.liste_val_max[1] = [0.0 for _ in range(12)]
+                self.liste_defaut[1] = [int(defauts.get(i, 0)) for i in range(1, 13)]
+                self.list_mesure[1] = [float(mesures.get(i, 0.0)) for i in range(1, 13)]
+                self.list_val_deb_mes[1] = [float(fond.get(i, 0.0)) for i in range(1, 13)]
+
+            # cellules du snapshot (bus de passage, 1 = coupée) : même
+            # convention que l'API et la supervision
+            self.list_cell[1] = [int(snap.cells[0]), int(snap.cells[1])]
 
             if PrisePhoto is not None:
                 self.liste_photo[1] = [
@@ -84,15 +89,10 @@ class Interface(threading.Thread):
                 self.liste_vitesse[1] = ["Vitesse N.A."]
 
             self.list_acq[1] = [AcquittementThread.eta_acq.get(1, 0)]
-            self.list_mesure[1] = [
-                float(AlarmeThread.alarme_mesure.get(i, 0.0)) for i in range(1, 13)
-            ]
             self.list_recal[1] = [0.0 for _ in range(12)]
             self.list_courbe[1] = [
-                CourbeThread.curves.get(i, []) for i in range(1, 13)
-            ]
-            self.list_val_deb_mes[1] = [
-                float(AlarmeThread.fond.get(i, 0.0)) for i in range(1, 13)
+                CourbeThread.curves[i].tolist() if i in CourbeThread.curves else []
+                for i in range(1, 13)
             ]
 
             print("comptage = ", self.liste_comptage[1])
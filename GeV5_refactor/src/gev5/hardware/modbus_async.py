@@ -0,0 +1,386 @@
+# src/gev5/hardware/modbus_async.py
+from __future__ import annotations
+
+"""
+Serveur Modbus/TCP asyncio alimenté par les snapshots du moteur.
+
+Remplace la reconstruction complète de ModbusThread (toutes les 500 ms) :
+
+- plan des registres déclaré une fois (LAYOUT) : nom, adresse, type,
+  échelle et fonction de lecture sur le Snapshot ;
+- image des holding registers (bytearray big-endian) mise à jour en
+  place, champ par champ, seulement quand la valeur encodée change ;
+- réveil sur SnapshotStore.wait_new (dans le tick qui a produit le
+  changement), rafraîchissement de l'heure toutes les REFRESH_S
+  (boucle : passerelle, connexions : protocole_async) ;
+- écriture du registre 99 (acquittement) traitée à la réception de la
+  trame : ETAT_ACQ_MODBUS mis à jour et callback appelé immédiatement.
+
+Adresses 0..97, 99 et 100..135 identiques à ModbusThread. Les comptages
+dépassent 65535 : paires 32 bits (mot de poids fort en premier) à partir
+de 200, en entier (U32) et en flottant IEEE 754 (F32).
+
+Sous-ensemble Modbus/TCP implémenté : FC3 / FC4 (lecture), FC6 / FC16
+(écriture, registre 99 uniquement). Pas de dépendance à pyModbusTCP.
+"""
+
+import asyncio
+import math
+import os
+import platform
+import shutil
+import struct
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Mapping, NamedTuple, Optional, Sequence, Tuple
+
+from ..core.alarmes.fond_stats import FondStats
+from ..core.snapshot import Snapshot
+from .passerelle import Passerelle
+from .protocole_async import ServeurProtocole
+
+MODBUS_PORT = 5200           # 502 redirigé par iptables (port < 1024 sans root)
+ACK_PULSE_S = 0.5            # durée de ETAT_ACQ_MODBUS après un acquittement
+
+REG_ACQ = 99
+# Statistiques glissantes du fond (FondStats) : moyenne 1..12, min 1..12, max 1..12
+REG_FOND_STATS = 100
+REG_32 = 200
+
+U16 = "u16"
+U32 = "u32"
+F32 = "f32"
+
+ETAT_ACQ_MODBUS = {i: 0 for i in range(1, 13)}
+
+VOIES = tuple(range(1, 13))
+
+
+def _setup_iptables_redirect() -> None:
+    if platform.system().lower() != "linux":
+        return
+    if shutil.which("iptables") is None:
+        return
+    try:
+        if os.geteuid() != 0:
+            return
+    except Exception:
+        return
+
+    os.system(f"iptables -A PREROUTING -t nat -p tcp --dport 502 -j REDIRECT --to-port {MODBUS_PORT}")
+
+
+# ---------------------------------------------------------------------- #
+# Plan des registres
+# ---------------------------------------------------------------------- #
+class Contexte(NamedTuple):
+    """Valeurs hors snapshot, lues une fois par mise à jour."""
+    date: time.struct_time
+    echeance: int = 0
+    defaut_cell: int = 0
+    stats: Mapping[int, Mapping[str, float]] = {}
+
+
+Lecture = Callable[[Snapshot, Contexte], float]
+
+
+@dataclass(frozen=True)
+class Registre:
+    nom: str
+    adresse: int
+    lire: Lecture
+    type: str = U16
+    echelle: float = 1.0
+
+    @property
+    def largeur(self) -> int:
+        return 1 if self.type == U16 else 2
+
+    def encoder(self, v: float) -> Tuple[int, ...]:
+        """Mots 16 bits ; entiers tronqués et bornés (négatif → 0)."""
+        x = float(v) * self.echelle
+        if self.type == F32:
+            return struct.unpack(">HH", struct.pack(">f", x))
+        n = int(x) if math.isfinite(x) else 0
+        if self.type == U32:
+            n = min(max(n, 0), 0xFFFFFFFF)
+            return (n >> 16, n & 0xFFFF)
+        return (min(max(n, 0), 0xFFFF),)
+
+
+def _voies(prefixe: str, adresse: int, lire: Callable[[Snapshot, Contexte, int], float],
+           type: str = U16) -> List[Registre]:
+    largeur = 1 if type == U16 else 2
+    return [
+        Registre(f"{prefixe}{i}", adresse + (i - 1) * largeur, (lambda s, c, i=i: lire(s, c, i)), type)
+        for i in VOIES
+    ]
+
+
+def _zero(s: Snapshot, c: Contexte, i: int = 0) -> float:
+    return 0.0
+
+
+def _count(s: Snapshot, c: Contexte, i: int) -> float:
+    return s.counts.get(i, 0.0)
+
+
+def _fond(s: Snapshot, c: Contexte, i: int) -> float:
+    return s.fond.get(i, 0.0)
+
+
+def _alarme(s: Snapshot, c: Contexte, i: int) -> float:
+    return s.alarm_states.get(i, 0)
+
+
+def _defaut(s: Snapshot, c: Contexte, i: int) -> float:
+    return s.defauts.get(i, 0)
+
+
+def _stat(k: str) -> Callable[[Snapshot, Contexte, int], float]:
+    return lambda s, c, i: c.stats.get(i, {}).get(k, 0.0)
+
+
+def _somme(fn: Callable[[Snapshot, Contexte, int], float]) -> Lecture:
+    return lambda s, c: sum(fn(s, c, i) for i in VOIES)
+
+
+def _alarme_globale(s: Snapshot, c: Contexte) -> float:
+    # règle de ModbusThread : max (toujours 0) >= fond avec cellule occupée,
+    # sinon au moins une voie en alarme
+    if 0.0 >= sum(_fond(s, c, i) for i in VOIES) and sum(s.cells) > 0:
+        return 1
+    return 1 if any(_alarme(s, c, i) for i in VOIES) else 0
+
+
+LAYOUT: Tuple[Registre, ...] = tuple(
+    _voies("count", 0, _count)
+    + _voies("fond", 12, _fond)
+    + _voies("max", 24, _zero)
+    + _voies("ld", 36, _zero)
+    + [
+        Registre("cell1", 48, lambda s, c: s.cells[0]),
+        Registre("cell2", 49, lambda s, c: s.cells[1]),
+    ]
+    + _voies("alarme", 50, _alarme)
+    + _voies("defaut", 62, _defaut)
+    + _voies("alarme_ld", 74, _zero)
+    + [
+        Registre("somme_count", 86, _somme(_count)),
+        Registre("somme_max", 87, _zero),
+        Registre("somme_fond", 88, _somme(_fond)),
+        Registre("alarme", 89, _alarme_globale),
+        Registre("echeance", 90, lambda s, c: c.echeance),
+        Registre("jour", 91, lambda s, c: c.date.tm_mday),
+        Registre("mois", 92, lambda s, c: c.date.tm_mon),
+        Registre("annee", 93, lambda s, c: c.date.tm_year),
+        Registre("heure", 94, lambda s, c: c.date.tm_hour),
+        Registre("minute", 95, lambda s, c: c.date.tm_min),
+        Registre("seconde", 96, lambda s, c: c.date.tm_sec),
+        Registre("defaut_cell", 97, lambda s, c: c.defaut_cell),
+        Registre("acq", REG_ACQ, lambda s, c: 0),
+    ]
+    + _voies("fond_avg", REG_FOND_STATS, _stat("avg"))
+    + _voies("fond_min", REG_FOND_STATS + 12, _stat("min"))
+    + _voies("fond_max", REG_FOND_STATS + 24, _stat("max"))
+    + _voies("count32_", REG_32, _count, U32)
+    + [Registre("somme_count32", REG_32 + 24, _somme(_count), U32)]
+    + _voies("count_f_", REG_32 + 26, _count, F32)
+    + _voies("fond_f_", REG_32 + 50, _fond, F32)
+)
+
+
+def verifier_layout(layout: Sequence[Registre]) -> int:
+    """Nombre de registres de l'image ; ValueError si deux champs se chevauchent."""
+    occupe: Dict[int, str] = {}
+    for r in layout:
+        for a in range(r.adresse, r.adresse + r.largeur):
+            if a in occupe:
+                raise ValueError(f"registre {a} : {occupe[a]} et {r.nom}")
+            occupe[a] = r.nom
+    return max(occupe) + 1 if occupe else 0
+
+
+# ---------------------------------------------------------------------- #
+# Serveur
+# ---------------------------------------------------------------------- #
+class ModbusServeur(ServeurProtocole):
+    """
+    Image des registres + protocole Modbus/TCP pour un plan donné.
+
+    maj(snap) et traiter(pdu) s'exécutent dans la boucle asyncio de la
+    passerelle (pas de verrou), qui y amène les snapshots.
+    """
+
+    nom = "modbus"
+
+    def __init__(
+        self,
+        layout: Sequence[Registre] = LAYOUT,
+        echeance: int = 0,
+        defaut_cell: Optional[Callable[[], int]] = None,
+        fond_stats: Callable[[], Mapping[int, Mapping[str, float]]] = FondStats.snapshot,
+        on_ack: Optional[Callable[[int], Any]] = None,
+        **kw: Any,
+    ) -> None:
+        super().__init__(**kw)
+        self.layout = tuple(layout)
+        self.taille = verifier_layout(self.layout)
+        self.image = bytearray(2 * self.taille)
+        self.echeance = int(echeance)
+        self.defaut_cell = defaut_cell
+        self.fond_stats = fond_stats
+        self.on_ack = on_ack
+        self.ecriture: Dict[int, Callable[[int], None]] = {REG_ACQ: self.acquitter}
+
+        self._mots: Dict[str, Tuple[int, ...]] = {}
+        self._ack_reset: Optional[asyncio.TimerHandle] = None
+        self.metrics.update(
+            exceptions=0, registers_changed=0, acks=0, fraicheur_ms=0.0, fraicheur_max_ms=0.0,
+        )
+
+    # ------------------------------------------------------------------ #
+    # Image
+    # ------------------------------------------------------------------ #
+    def contexte(self) -> Contexte:
+        dc = 0
+        if self.defaut_cell is not None:
+            try:
+                dc = int(self.defaut_cell())
+            except Exception:
+                dc = 0
+        try:
+            stats = self.fond_stats()
+        except Exception:
+            stats = {}
+        return Contexte(time.localtime(), self.echeance, dc, stats)
+
+    def maj(self, snap: Snapshot, ctx: Optional[Contexte] = None) -> int:
+        """Réécrit en place les champs dont l'encodage a changé ; retourne le nombre de registres écrits."""
+        ctx = self.contexte() if ctx is None else ctx
+        n = 0
+        for r in self.layout:
+            try:
+                mots = r.encoder(r.lire(snap, ctx))
+            except Exception:
+                mots = (0,) * r.largeur
+            if self._mots.get(r.nom) == mots:
+                continue
+            self._mots[r.nom] = mots
+            struct.pack_into(f">{len(mots)}H", self.image, 2 * r.adresse, *mots)
+            n += len(mots)
+
+        if snap.version != self.version and snap.ts:
+            # publication → registres à jour
+            age_ms = round(max(0.0, (time.time() - snap.ts) * 1000.0), 1)
+            self.metrics["fraicheur_ms"] = age_ms
+            self.metrics["fraicheur_max_ms"] = max(self.metrics["fraicheur_max_ms"], age_ms)
+        self.version = snap.version
+        self.metrics["updates"] += 1
+        self.metrics["registers_changed"] += n
+        return n
+
+    def lire(self, adresse: int, nombre: int = 1) -> Tuple[int, ...]:
+        return struct.unpack_from(f">{nombre}H", self.image, 2 * adresse)
+
+    # ------------------------------------------------------------------ #
+    # Acquittement
+    # ------------------------------------------------------------------ #
+    def acquitter(self, valeur: int) -> None:
+        if not valeur:
+            return
+        for i in VOIES:
+            ETAT_ACQ_MODBUS[i] = valeur
+        self.metrics["acks"] += 1
+        print(f"[MODBUS] Acquittement {valeur} reçu")
+        if self.on_ack is not None:
+            try:
+                self.on_ack(valeur)
+            except Exception as e:
+                print(f"[MODBUS] Erreur callback acquittement : {e}")
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        if self._ack_reset is not None:
+            self._ack_reset.cancel()
+        self._ack_reset = loop.call_later(ACK_PULSE_S, self._fin_acquittement)
+
+    @staticmethod
+    def _fin_acquittement() -> None:
+        for i in VOIES:
+            ETAT_ACQ_MODBUS[i] = 0
+
+    # ------------------------------------------------------------------ #
+    # Protocole
+    # ------------------------------------------------------------------ #
+    def _exception(self, fc: int, code: int) -> bytes:
+        self.metrics["exceptions"] += 1
+        return bytes((fc | 0x80, code))
+
+    def traiter(self, pdu: bytes) -> bytes:
+        """PDU requête → PDU réponse (codes d'exception 1, 2, 3)."""
+        self.metrics["requests"] += 1
+        fc = pdu[0] if pdu else 0
+        if fc in (3, 4):
+            if len(pdu) != 5:
+                return self._exception(fc, 3)
+            adresse, nombre = struct.unpack_from(">HH", pdu, 1)
+            if not 1 <= nombre <= 125:
+                return self._exception(fc, 3)
+            if adresse + nombre > self.taille:
+                return self._exception(fc, 2)
+            return bytes((fc, 2 * nombre)) + bytes(self.image[2 * adresse:2 * (adresse + nombre)])
+
+        if fc == 6:
+            if len(pdu) != 5:
+                return self._exception(fc, 3)
+            adresse, valeur = struct.unpack_from(">HH", pdu, 1)
+            if adresse not in self.ecriture:
+                return self._exception(fc, 2)
+            self.ecriture[adresse](valeur)
+            return bytes(pdu)
+
+        if fc == 16:
+            if len(pdu) < 6:
+                return self._exception(fc, 3)
+            adresse, nombre, octets = struct.unpack_from(">HHB", pdu, 1)
+            if not 1 <= nombre <= 123 or octets != 2 * nombre or len(pdu) != 6 + octets:
+                return self._exception(fc, 3)
+            if any(a not in self.ecriture for a in range(adresse, adresse + nombre)):
+                return self._exception(fc, 2)
+            for k, valeur in enumerate(struct.unpack_from(f">{nombre}H", pdu, 6)):
+                self.ecriture[adresse + k](valeur)
+            return bytes(pdu[:5])
+
+        return self._exception(fc, 1)
+
+    async def session(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        """Une connexion : trames MBAP traitées dans l'ordre d'arrivée."""
+        while True:
+            entete = await asyncio.wait_for(reader.readexactly(7), self.idle_s)
+            tid, pid, longueur, unite = struct.unpack(">HHHB", entete)
+            if pid != 0 or not 2 <= longueur <= 254:
+                return
+            pdu = await reader.readexactly(longueur - 1)
+            t0 = time.perf_counter()
+            rep = self.traiter(pdu)
+            trame = struct.pack(">HHHB", tid, 0, len(rep) + 1, unite) + rep
+            self.servi(t0)
+            writer.write(trame)
+            await writer.drain()
+
+    def avant_ecoute(self, port: int) -> None:
+        if port == MODBUS_PORT:
+            _setup_iptables_redirect()
+
+    def get_metrics(self) -> Dict[str, Any]:
+        return dict(super().get_metrics(), registres=self.taille)
+
+
+class ModbusAsyncThread(Passerelle):
+    """Passerelle réduite au seul serveur Modbus."""
+
+    def __init__(self, serveur: ModbusServeur, host: str = "0.0.0.0", port: int = MODBUS_PORT) -> None:
+        super().__init__(host)
+        self.ajouter(serveur, port)
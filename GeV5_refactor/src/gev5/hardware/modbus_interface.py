@@ -1,34 +1,17 @@
 import datetime
-import os
-import platform
-import shutil
 import threading
 from time import sleep
 
 from pyModbusTCP.server import ModbusServer
 
 from ..core.alarmes.alarmes import AlarmeThread
+from ..core.alarmes.fond_stats import FondStats
 from ..core.comptage.comptage import ComptageThread
 from ..core.defauts.defauts import DefautThread
 from . import etat_cellule_1, etat_cellule_2
 from . import Check_open_cell
-
-
-def _setup_iptables_redirect() -> None:
-    if platform.system().lower() != "linux":
-        return
-    if shutil.which("iptables") is None:
-        return
-    try:
-        if os.geteuid() != 0:
-            return
-    except Exception:
-        return
-
-    os.system("iptables -A PREROUTING -t nat -p tcp --dport 502 -j REDIRECT --to-port 5200")
-
-
-ETAT_ACQ_MODBUS = {i: 0 for i in range(1, 13)}
+# meme dict d'acquittement et meme plan que le serveur asyncio (modbus_async)
+from .modbus_async import ETAT_ACQ_MODBUS, REG_FOND_STATS, _setup_iptables_redirect
 
 
 class ModbusThread(threading.Thread):
@@ -113,6 +96,14 @@ class ModbusThread(threading.Thread):
         Update.append(int(Check_open_cell.etat_cellule_check.defaut_cell.get(1, 0)))
         self.server.data_bank.set_holding_registers(0, Update)
 
+        stats = FondStats.snapshot()
+        RegFondStats = [
+            int(stats.get(i, {}).get(k, 0.0))
+            for k in ("avg", "min", "max")
+            for i in range(1, 13)
+        ]
+        self.server.data_bank.set_holding_registers(REG_FOND_STATS, RegFondStats)
+
         try:
             words = self.server.data_bank.get_holding_registers(99)
             self.words = int(words[0]) if words else 0
@@ -24,7 +24,27 @@ class PassageConfig:
     min_off_s: float = 0.2
 
 
-class PassageService:
+@dataclass(frozen=True)
+class PassageEdges:
+    """
+    Résultat d'une lecture des cellules (PassageService.poll) :
+    niveaux, fronts individuels (montants / descendants) et fronts de
+    passage, datés d'un même instant (monotonic + horloge murale).
+    """
+    t: float
+    wall_ts: float
+    s1: int
+    s2: int
+    s1_rise: bool = False
+    s2_rise: bool = False
+    s1_fall: bool = False
+    s2_fall: bool = False
+    start: bool = False
+    stop: bool = False
+    active: bool = False
+
+
+class PassageService:
     """
     Service central de gestion de passage basé sur 2 cellules (S1/S2).
 
@@ -63,6 +83,10 @@ class PassageService:
         s2 = 1 if int(self.hw.read_cellule(2) or 0) else 0
         return s1, s2
 
+    def is_armed(self) -> bool:
+        """True une fois le délai d’armement du boot écoulé."""
+        return time.monotonic() >= self._armed_at
+
     def is_passage(self) -> bool:
         """
         True si passage actif (niveau), False sinon.
@@ -75,7 +99,7 @@ class PassageService:
         s1, s2 = self.get_cells()
         return (s1 == 1) or (s2 == 1)
 
-    def passage_edges(self) -> tuple[bool, bool]:
+    def passage_edges(self) -> tuple[bool, bool]:
         """
         Détection d’événements (fronts) :
           - start_edge = passage commence (front montant)
@@ -85,7 +109,17 @@ class PassageService:
           - arm_delay au boot
           - anti-spam : un start n’est accepté que si on est resté OFF >= min_off_s
         """
+        edges = self.poll()
+        return edges.start, edges.stop
+
+    def poll(self) -> PassageEdges:
+        """
+        Une lecture des cellules et la détection de fronts associée
+        (passage_edges + fronts S1 / S2). Un seul appelant doit
+        s'en servir : PassageBus, qui diffuse les événements.
+        """
         now = time.monotonic()
+        wall = time.time()
 
         # armement boot : on initialise les derniers états sans générer d’événement
         if now < self._armed_at:
@@ -93,13 +127,15 @@ class PassageService:
             self._last_s1, self._last_s2 = s1, s2
             self._active = False
             self._last_stop_t = now
-            return False, False
+            return PassageEdges(now, wall, s1, s2)
 
         s1, s2 = self.get_cells()
 
-        # fronts montants individuels
+        # fronts individuels
         s1_rise = (s1 == 1 and self._last_s1 == 0)
         s2_rise = (s2 == 1 and self._last_s2 == 0)
+        s1_fall = (s1 == 0 and self._last_s1 == 1)
+        s2_fall = (s2 == 0 and self._last_s2 == 1)
 
         # état niveau courant
         active_now = (s1 == 1) or (s2 == 1)
@@ -128,16 +164,21 @@ class PassageService:
         # mise à jour des états précédents
         self._last_s1, self._last_s2 = s1, s2
 
-        return start_edge, stop_edge
-
-    def are_cells_free_and_stable(self, stable_s: float = 0.2) -> bool:
-        """
-        True si les cellules sont libres (S1=0 et S2=0) et stables
-        depuis au moins stable_s secondes.
-        """
-        now = time.monotonic()
-        s1, s2 = self.get_cells()
-        if s1 != self._last_s1 or s2 != self._last_s2:
-            self._last_s1, self._last_s2 = s1, s2
-            self._last_edge_t = now
-        return (s1 == 0 and s2 == 0) and ((now - self._last_edge_t) >= float(stable_s))
+        return PassageEdges(
+            now, wall, s1, s2,
+            s1_rise=s1_rise, s2_rise=s2_rise,
+            s1_fall=s1_fall, s2_fall=s2_fall,
+            start=start_edge, stop=stop_edge, active=self._active,
+        )
+
+    def are_cells_free_and_stable(self, stable_s: float = 0.2) -> bool:
+        """
+        True si les cellules sont libres (S1=0 et S2=0) et stables
+        depuis au moins stable_s secondes.
+        """
+        now = time.monotonic()
+        s1, s2 = self.get_cells()
+        if s1 != self._last_s1 or s2 != self._last_s2:
+            self._last_s1, self._last_s2 = s1, s2
+            self._last_edge_t = now
+        return (s1 == 0 and s2 == 0) and ((now - self._last_edge_t) >= float(stable_s))
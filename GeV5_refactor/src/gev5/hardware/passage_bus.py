@@ -0,0 +1,191 @@
+# src/gev5/hardware/passage_bus.py
+from __future__ import annotations
+
+"""
+Bus d'événements de passage.
+
+Un seul thread lit les cellules (PassageService.poll, 100 Hz par défaut)
+et diffuse des événements datés aux abonnés :
+
+    START    début de passage (armement et anti-rebond du service)
+    STOP     fin de passage
+    S1_RISE  front montant cellule 1     S1_FALL  front descendant cellule 1
+    S2_RISE  front montant cellule 2     S2_FALL  front descendant cellule 2
+
+Chaque abonné a sa file bornée et bloque dessus au lieu de scruter les
+cellules : tous voient les mêmes fronts, avec les mêmes dates. File
+pleine → l'événement le plus ancien de cette file est perdu (compté).
+
+Le bus expose aussi l'état de la dernière lecture (get_cells, is_passage,
+are_cells_free_and_stable) pour les lecteurs de niveau (alarmes,
+acquittement, API) : mêmes noms que PassageService, sans relire le
+matériel ni toucher à la détection de fronts du service.
+"""
+
+import queue
+import threading
+import time
+from dataclasses import dataclass
+from typing import Dict, FrozenSet, Iterable, List, Optional, Tuple
+
+from .passage import PassageEdges, PassageService
+
+START = "START"
+STOP = "STOP"
+S1_RISE = "S1_RISE"
+S2_RISE = "S2_RISE"
+S1_FALL = "S1_FALL"
+S2_FALL = "S2_FALL"
+KINDS: Tuple[str, ...] = (START, STOP, S1_RISE, S2_RISE, S1_FALL, S2_FALL)
+
+
+@dataclass(frozen=True)
+class PassageEvent:
+    kind: str
+    t: float            # time.monotonic() de la lecture
+    wall_ts: float      # time.time() de la même lecture
+    s1: int
+    s2: int
+    passage: int        # n° de passage (incrémenté à chaque START)
+
+
+class Subscription:
+    """File d'événements d'un abonné (créée par PassageBus.subscribe)."""
+
+    def __init__(self, bus: "PassageBus", name: str, kinds: Iterable[str], maxsize: int) -> None:
+        self.bus = bus
+        self.name = name
+        self.kinds: FrozenSet[str] = frozenset(kinds)
+        self.dropped = 0
+        self._q: "queue.Queue[PassageEvent]" = queue.Queue(maxsize=max(1, int(maxsize)))
+
+    def _offer(self, ev: PassageEvent) -> None:
+        while True:
+            try:
+                self._q.put_nowait(ev)
+                return
+            except queue.Full:
+                try:
+                    self._q.get_nowait()
+                    self.dropped += 1
+                except queue.Empty:
+                    pass
+
+    def get(self, timeout: Optional[float] = None) -> Optional[PassageEvent]:
+        """Prochain événement ; None si rien avant timeout (None = attente infinie)."""
+        try:
+            return self._q.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+    def drain(self) -> List[PassageEvent]:
+        out: List[PassageEvent] = []
+        while True:
+            try:
+                out.append(self._q.get_nowait())
+            except queue.Empty:
+                return out
+
+    def close(self) -> None:
+        self.bus.unsubscribe(self)
+
+
+class PassageBus(threading.Thread):
+    def __init__(self, service: PassageService, period_s: float = 0.01) -> None:
+        super().__init__(name="PassageBus", daemon=True)
+        self.service = service
+        self.period_s = float(period_s)
+        self.running = True
+
+        self._lock = threading.Lock()
+        self._subs: List[Subscription] = []
+        self._last: Optional[PassageEdges] = None
+        self._last_change_t = time.monotonic()
+        self._passage = 0
+        self.metrics: Dict[str, int] = {"polls": 0, "events": 0, "dropped": 0}
+
+    # ------------------------------------------------------------------ #
+    # Abonnements
+    # ------------------------------------------------------------------ #
+    def subscribe(self, name: str, kinds: Iterable[str] = KINDS, maxsize: int = 64) -> Subscription:
+        sub = Subscription(self, name, kinds, maxsize)
+        with self._lock:
+            self._subs = self._subs + [sub]
+        return sub
+
+    def unsubscribe(self, sub: Subscription) -> None:
+        with self._lock:
+            self._subs = [s for s in self._subs if s is not sub]
+
+    # ------------------------------------------------------------------ #
+    # Lecture / diffusion
+    # ------------------------------------------------------------------ #
+    def step(self) -> List[PassageEvent]:
+        """Une lecture des cellules ; diffuse et retourne les événements."""
+        e = self.service.poll()
+        prev = self._last
+        if prev is None or (e.s1, e.s2) != (prev.s1, prev.s2):
+            self._last_change_t = e.t
+        self._last = e
+        self.metrics["polls"] += 1
+
+        kinds: List[str] = []
+        if e.s1_rise:
+            kinds.append(S1_RISE)
+        if e.s2_rise:
+            kinds.append(S2_RISE)
+        if e.s1_fall:
+            kinds.append(S1_FALL)
+        if e.s2_fall:
+            kinds.append(S2_FALL)
+        if e.start:
+            self._passage += 1
+            kinds.append(START)
+        if e.stop:
+            kinds.append(STOP)
+        if not kinds:
+            return []
+
+        events = [PassageEvent(k, e.t, e.wall_ts, e.s1, e.s2, self._passage) for k in kinds]
+        subs = self._subs
+        for ev in events:
+            for sub in subs:
+                if ev.kind in sub.kinds:
+                    sub._offer(ev)
+        self.metrics["events"] += len(events)
+        self.metrics["dropped"] = sum(s.dropped for s in subs)
+        return events
+
+    def run(self) -> None:
+        print(f"[PASSAGE_BUS] Démarré ({1.0 / self.period_s:.0f} Hz)")
+        while self.running:
+            try:
+                self.step()
+            except Exception as e:
+                print(f"[PASSAGE_BUS][ERR] {e}")
+                time.sleep(0.25)
+            time.sleep(self.period_s)
+
+    def stop(self) -> None:
+        self.running = False
+
+    def get_metrics(self) -> Dict[str, int]:
+        return dict(self.metrics, subscribers=len(self._subs))
+
+    # ------------------------------------------------------------------ #
+    # État courant (mêmes noms que PassageService)
+    # ------------------------------------------------------------------ #
+    def get_cells(self) -> tuple[int, int]:
+        e = self._last
+        return (e.s1, e.s2) if e is not None else (0, 0)
+
+    def is_passage(self) -> bool:
+        """Niveau : une cellule coupée, service armé."""
+        e = self._last
+        return e is not None and self.service.is_armed() and (e.s1 == 1 or e.s2 == 1)
+
+    def are_cells_free_and_stable(self, stable_s: float = 0.2) -> bool:
+        e = self._last
+        if e is None:
+            return False
+        return e.s1 == 0 and e.s2 == 0 and (time.monotonic() - self._last_change_t) >= float(stable_s)
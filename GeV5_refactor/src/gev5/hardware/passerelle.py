@@ -0,0 +1,149 @@
+# src/gev5/hardware/passerelle.py
+from __future__ import annotations
+
+"""
+Passerelle protocoles : Modbus, eVx, F2C sur une seule boucle asyncio.
+
+Un seul thread, une seule attente de snapshot (SnapshotStore.wait_new)
+pour tous les protocoles : chaque nouveau snapshot est passé une fois à
+chaque encodeur (maj), qui prépare ses registres / réponses ; les
+requêtes des clients sont ensuite servies depuis ce cache. Le coût CPU
+suit la cadence des snapshots, pas protocoles × clients.
+
+Encodeurs enfichables : tout ServeurProtocole (protocole_async) ajouté
+avec son port avant start(). Métriques par protocole : requêtes / s,
+latence de traitement, clients connectés / refusés.
+
+Chaque écoute échoue seule (port occupé...) : l'erreur est comptée
+(listen_errors, echecs) et les autres protocoles restent servis.
+"""
+
+import asyncio
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from ..core.snapshot import Snapshot, SnapshotStore
+from .protocole_async import ServeurProtocole
+
+REFRESH_S = 0.5              # maj sans nouveau snapshot (heure, défaut cellule)
+TAUX_S = 1.0                 # période de calcul des requêtes / s
+
+
+class Passerelle(threading.Thread):
+    def __init__(self, host: str = "0.0.0.0", refresh_s: float = REFRESH_S) -> None:
+        super().__init__(name="Passerelle", daemon=True)
+        self.host = host
+        self.refresh_s = float(refresh_s)
+        self.serveurs: List[Tuple[ServeurProtocole, int]] = []
+        self.ports: Dict[str, int] = {}
+        self.echecs: Dict[str, str] = {}        # protocole → erreur d'écoute
+        self.version = -1
+        self.running = True
+        self.metrics: Dict[str, Any] = {
+            "snapshots": 0, "refresh": 0, "errors": 0, "listen_errors": 0,
+            "maj_ms": 0.0, "maj_max_ms": 0.0,
+        }
+
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._stop_evt: Optional[asyncio.Event] = None
+        self._pret = threading.Event()
+
+    def ajouter(self, serveur: ServeurProtocole, port: int) -> ServeurProtocole:
+        if self.is_alive():
+            raise RuntimeError("Passerelle déjà démarrée")
+        self.serveurs.append((serveur, int(port)))
+        return serveur
+
+    # ------------------------------------------------------------------ #
+    # Diffusion
+    # ------------------------------------------------------------------ #
+    def diffuser(self, snap: Snapshot) -> None:
+        """Passe le snapshot à chaque encodeur (dans la boucle)."""
+        t0 = time.perf_counter()
+        for serveur, _port in self.serveurs:
+            try:
+                serveur.maj(snap)
+            except Exception as e:
+                self.metrics["errors"] += 1
+                print(f"[PASSERELLE] Erreur maj {serveur.nom} : {e}")
+        ms = round((time.perf_counter() - t0) * 1000.0, 3)
+        self.metrics["maj_ms"] = ms
+        self.metrics["maj_max_ms"] = max(self.metrics["maj_max_ms"], ms)
+        if snap.version != self.version:
+            self.metrics["snapshots"] += 1
+        else:
+            self.metrics["refresh"] += 1
+        self.version = snap.version
+
+    async def _suivre(self) -> None:
+        loop = asyncio.get_running_loop()
+        prochain_taux = time.monotonic() + TAUX_S
+        while self.running:
+            snap = await loop.run_in_executor(None, SnapshotStore.wait_new, self.version, self.refresh_s)
+            self.diffuser(snap)
+            now = time.monotonic()
+            if now >= prochain_taux:
+                prochain_taux = now + TAUX_S
+                for serveur, _port in self.serveurs:
+                    serveur.taux(now)
+
+    # ------------------------------------------------------------------ #
+    # Boucle
+    # ------------------------------------------------------------------ #
+    def run(self) -> None:
+        try:
+            asyncio.run(self._main())
+        except Exception as e:
+            print(f"[PASSERELLE] Arrêtée : {e}")
+        finally:
+            self._pret.set()
+
+    async def _main(self) -> None:
+        self._loop = asyncio.get_running_loop()
+        self._stop_evt = asyncio.Event()
+        ecoutes = []
+        for serveur, port in self.serveurs:
+            try:
+                serveur.avant_ecoute(port)
+                srv = await asyncio.start_server(serveur.client, self.host, port)
+            except Exception as e:
+                self.metrics["listen_errors"] += 1
+                self.echecs[serveur.nom] = str(e)
+                print(f"[PASSERELLE] {serveur.nom} : écoute impossible sur {self.host}:{port} : {e}")
+                continue
+            self.ports[serveur.nom] = srv.sockets[0].getsockname()[1]
+            ecoutes.append(srv)
+            print(f"[PASSERELLE] {serveur.nom} actif sur {self.host}:{self.ports[serveur.nom]}")
+        suivi = asyncio.create_task(self._suivre())
+        self._pret.set()
+        try:
+            await self._stop_evt.wait()
+        finally:
+            self.running = False
+            suivi.cancel()
+            for srv in ecoutes:
+                srv.close()
+                await srv.wait_closed()
+
+    def attendre_pret(self, timeout: Optional[float] = None) -> bool:
+        """
+        Vrai quand chaque écoute a été tentée : ports réels dans self.ports,
+        échecs dans self.echecs.
+        """
+        return self._pret.wait(timeout)
+
+    def stop(self) -> None:
+        self.running = False
+        if self._loop is not None and self._stop_evt is not None:
+            self._loop.call_soon_threadsafe(self._stop_evt.set)
+
+    def get_metrics(self) -> Dict[str, Any]:
+        return dict(
+            self.metrics,
+            version=self.version,
+            protocoles={
+                s.nom: dict(s.get_metrics(), port=self.ports.get(s.nom, p), erreur=self.echecs.get(s.nom))
+                for s, p in self.serveurs
+            },
+        )
@@ -6,16 +6,19 @@ import subprocess
 import time
 import datetime
 from pathlib import Path
+from typing import Optional
 
 from ..core.alarmes.alarmes import AlarmeThread
 from ..utils.paths import PHOTO_DIR
 from . import etat_cellule_1, etat_cellule_2
+from .passage_bus import START, PassageBus, Subscription
 
 
 class PrisePhoto(threading.Thread):
     """
     Snapshot RTSP -> JPEG (one-shot) fiable et rapide.
-    Declenchement sur front montant des cellules, si alarmes inactives.
+    Declenchement sur front montant des cellules (START du bus de passage
+    si fourni), si alarmes inactives.
     Expose:
       - PrisePhoto.filename[1]  -> chemin du dernier .jpg
       - PrisePhoto.timestamp[1] -> YYYYMMDD_HHMMSS
@@ -45,7 +48,7 @@ class PrisePhoto(threading.Thread):
     # Declenchement
     COOL_DOWN_S = 1.2
 
-    def __init__(self, snapshot_url: str, Mode_sans_cellules: int) -> None:
+    def __init__(self, snapshot_url: str, Mode_sans_cellules: int, bus: Optional[PassageBus] = None) -> None:
         """
         snapshot_url: lien RTSP complet -- ideal: H.264 sub + port 554.
           ex: rtsp://user:pwd@IP:554/h264Preview_01_sub
@@ -53,7 +56,13 @@ class PrisePhoto(threading.Thread):
         super().__init__(daemon=True)
         self.snapshot_url = snapshot_url
         self.mss = Mode_sans_cellules
+        self.bus = bus
         self.running = True
+        # abonnement des la construction : aucun START perdu si le bus
+        # demarre avant run()
+        self._sub: Optional[Subscription] = (
+            bus.subscribe("prise_photo", kinds=(START,), maxsize=4) if bus is not None else None
+        )
 
         self.OUT_DIR.mkdir(parents=True, exist_ok=True)
 
@@ -133,7 +142,36 @@ class PrisePhoto(threading.Thread):
 
     # ------------------ Thread loop ------------------
 
+    def _shoot(self) -> None:
+        print("Condition remplie, snapshot RTSP en cours...")
+        with self._shot_lock:
+            with self.lock:
+                self.cam_dispo[1] = 0
+            try:
+                if self.mss == 0:
+                    self.capture_photo()
+            finally:
+                with self.lock:
+                    self.cam_dispo[1] = 1
+
+    def _run_bus(self, sub: Subscription) -> None:
+        """Attente bloquante des START du bus (plus de scrutation a 10 Hz)."""
+        while self.running:
+            ev = sub.get(timeout=1.0)
+            if ev is None:
+                continue
+            # START restes en file pendant une capture : deja couverts
+            sub.drain()
+            try:
+                if self._alarmes_inactives():
+                    self._shoot()
+            except Exception as e:
+                print(f"[THREAD_ERR] {e}")
+
     def run(self) -> None:
+        if self._sub is not None:
+            self._run_bus(self._sub)
+            return
         try:
             while self.running:
                 try:
@@ -145,16 +183,7 @@ class PrisePhoto(threading.Thread):
                     self._prev_cellules = cells_now
 
                     if rising_edge and alarmes_ok:
-                        print("Condition remplie, snapshot RTSP en cours...")
-                        with self._shot_lock:
-                            with self.lock:
-                                self.cam_dispo[1] = 0
-                            try:
-                                if self.mss == 0:
-                                    self.capture_photo()
-                            finally:
-                                with self.lock:
-                                    self.cam_dispo[1] = 1
+                        self._shoot()
 
                     if not cells_now:
                         self.photo_prise = False
@@ -0,0 +1,87 @@
+# src/gev5/hardware/protocole_async.py
+from __future__ import annotations
+
+"""
+Base commune des serveurs de protocole asyncio (Modbus, eVx, F2C).
+
+Un serveur reçoit les snapshots du moteur (maj, appelé par la passerelle
+dans sa boucle asyncio) et sert ses clients depuis l'état préparé à ce
+moment-là : aucune lecture des dicts de classe par requête, aucun
+thread par client.
+
+    maj(snap)                prépare les réponses / registres
+    session(reader, writer)  une connexion (protocole) ; appelle servi()
+                             quand la réponse est prête (latence)
+    client(reader, writer)   callback asyncio.start_server : limite du
+                             nombre de connexions, fermeture, compteurs
+    avant_ecoute(port)       préparation système avant l'écoute
+"""
+
+import asyncio
+import time
+from abc import ABC, abstractmethod
+from typing import Any, Dict
+
+from ..core.snapshot import Snapshot
+from ..utils.latency import LatencyHistogram
+
+MAX_CLIENTS = 32
+IDLE_S = 120.0               # client muet fermé au-delà
+# latence de traitement (requête lue → réponse prête), en ms
+LATENCE_BUCKETS_MS = (0.05, 0.1, 0.2, 0.5, 1, 2, 5, 10, 50)
+
+
+class ServeurProtocole(ABC):
+    nom = "protocole"
+
+    def __init__(self, max_clients: int = MAX_CLIENTS, idle_s: float = IDLE_S) -> None:
+        self.max_clients = int(max_clients)
+        self.idle_s = float(idle_s)
+        self.version = -1
+        self.running = True
+        self.latence = LatencyHistogram(LATENCE_BUCKETS_MS)
+        self.metrics: Dict[str, Any] = {"clients": 0, "refused": 0, "requests": 0, "updates": 0, "req_s": 0.0}
+        self._taux_ref = (time.monotonic(), 0)
+
+    @abstractmethod
+    def maj(self, snap: Snapshot) -> int:
+        """Prépare l'état servi si la version a changé ; renvoie le nombre d'éléments refaits."""
+        raise NotImplementedError
+
+    @abstractmethod
+    async def session(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        """Sert une connexion ; appelle servi() quand la réponse est prête."""
+        raise NotImplementedError
+
+    def avant_ecoute(self, port: int) -> None:
+        pass
+
+    def servi(self, t0: float) -> None:
+        self.latence.add((time.perf_counter() - t0) * 1000.0)
+
+    def taux(self, now: float) -> float:
+        """Requêtes / s depuis l'appel précédent (appelé par la passerelle)."""
+        t, n = self._taux_ref
+        if now > t:
+            self.metrics["req_s"] = round((self.metrics["requests"] - n) / (now - t), 1)
+            self._taux_ref = (now, self.metrics["requests"])
+        return self.metrics["req_s"]
+
+    async def client(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        if self.metrics["clients"] >= self.max_clients:
+            self.metrics["refused"] += 1
+            writer.close()
+            return
+        self.metrics["clients"] += 1
+        try:
+            await self.session(reader, writer)
+        except (asyncio.IncompleteReadError, asyncio.TimeoutError, ConnectionError):
+            pass
+        except Exception as e:
+            print(f"[{self.nom.upper()}] Erreur client : {e}")
+        finally:
+            self.metrics["clients"] -= 1
+            writer.close()
+
+    def get_metrics(self) -> Dict[str, Any]:
+        return dict(self.metrics, version=self.version, latency_ms=self.latence.snapshot())
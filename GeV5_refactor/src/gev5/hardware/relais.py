@@ -1,95 +1,186 @@
+import json
 import time
 import threading
+from typing import Dict, Iterable, List, Mapping, Optional, Tuple
 
 import websocket
 
-from ..core.alarmes.alarmes import AlarmeThread
-from ..core.defauts.defauts import DefautThread
-from . import etat_cellule_1, etat_cellule_2
+from ..core.snapshot import SnapshotStore
 from . import Check_open_cell
 
+# Sorties relais Unipi (RO), pilotees via le WebSocket EVOK.
+#
+# Etat voulu = masque de bits (bit c-1 = circuit c), recalcule a chaque
+# nouveau snapshot (donc dans le tick moteur qui a change les alarmes,
+# defauts ou cellules). Seuls les circuits qui different du dernier etat
+# envoye avec succes partent, en une seule trame. Apres une (re)connexion
+# l'etat du module est inconnu : tous les circuits sont renvoyes.
+
+WS_URL = "ws://127.0.0.1:8080/ws"
+CIRCUITS = tuple(range(1, 9))
+WAIT_S = 0.5                 # reveil max sans nouveau snapshot (defaut cellule, reconnexion)
+RECONNECT_S = (0.5, 10.0)    # backoff de reconnexion (min, max)
+BATCH = True                 # une trame JSON (liste de "set") par mise a jour
+PING_S = 5.0                 # ping WS au repos : detecte un EVOK redemarre sans attendre un changement
+
+
+def bit(c: int) -> int:
+    return 1 << (c - 1)
+
+
+AL_ANY = bit(3) | bit(5) | bit(6)    # alarme (N1 ou N2)
+AL_N2 = bit(4) | bit(7)              # alarme N2, maintenue jusqu'a retour a 0 de toutes les voies
+DEF_OK = bit(1)                      # defaut : relais colle hors defaut (securite positive)
+CELL = bit(2) | bit(8)               # cellule occupee
+ALL = sum(bit(c) for c in CIRCUITS)
+
+
+def etat_voulu(
+    alarmes: Iterable[int],
+    defauts: Iterable[int],
+    cellules: Iterable[int],
+    n2_memo: bool = False,
+) -> Tuple[int, bool]:
+    """(masque des sorties, memoire N2) pour un etat alarmes / defauts / cellules."""
+    alarmes = [int(v) for v in alarmes]
+    if all(v == 0 for v in alarmes):
+        n2_memo = False
+    elif 2 in alarmes:
+        n2_memo = True
+
+    mask = 0
+    if any(alarmes):
+        mask |= AL_ANY
+    if n2_memo:
+        mask |= AL_N2
+    if not any(int(v) in (1, 2) for v in defauts):
+        mask |= DEF_OK
+    if 1 in [int(v) for v in cellules]:
+        mask |= CELL
+    return mask, n2_memo
+
+
+def commandes(mask: int, changed: int) -> List[Dict[str, str]]:
+    return [
+        {"cmd": "set", "dev": "relay", "circuit": str(c), "value": "1" if mask & bit(c) else "0"}
+        for c in CIRCUITS if changed & bit(c)
+    ]
+
 
 class Relais(threading.Thread):
-    def __init__(self) -> None:
-        super().__init__(daemon=True)
-
-        self.liste_alarm = []
-        self.liste_defaut = []
-        self.list_cell = []
-        self.flag_al_1 = 0
-        self.flag_al_2 = 0
-        self.flag_def_1 = 0
-        self.flag_cell = 0
-
-        self.ws = websocket.WebSocket()  # Ouverture du socket vers les relais Unipi
-        self.ws.connect("ws://127.0.0.1:8080/ws")
-
-        self.ws.send('{"cmd":"set","dev":"relay","circuit":"3","value":"0"}')  # al1
-        self.ws.send('{"cmd":"set","dev":"relay","circuit":"4","value":"0"}')  # al2
-        self.ws.send('{"cmd":"set","dev":"relay","circuit":"6","value":"0"}')  # al
-        self.ws.send('{"cmd":"set","dev":"relay","circuit":"1","value":"1"}')  # def
-        self.ws.send('{"cmd":"set","dev":"relay","circuit":"5","value":"1"}')  # def
-        self.ws.send('{"cmd":"set","dev":"relay","circuit":"2","value":"0"}')  # cell
+    def __init__(self, url: str = WS_URL) -> None:
+        super().__init__(name="Relais", daemon=True)
+        self.url = url
+        self.ws = None
+        self.running = True
 
+        self.voulu = 0
+        self.acquis: Optional[int] = None    # dernier etat envoye ; None = inconnu
+        self.n2_memo = False
+        self.version = 0
+        self.metrics = {"updates": 0, "frames": 0, "commands": 0, "reconnects": 0, "errors": 0}
+
+        self._retry_at = 0.0
+        self._backoff = RECONNECT_S[0]
+        self._last_io = 0.0
+
+    # ------------------------------------------------------------------ #
+    # Etat voulu
+    # ------------------------------------------------------------------ #
+    def calculer(self, alarmes: Mapping[int, int], defauts: Mapping[int, int], cells: Tuple[int, int]) -> int:
+        liste_defaut = [int(defauts.get(i, 0)) for i in range(1, 13)]
+        liste_defaut.append(int(Check_open_cell.etat_cellule_check.defaut_cell.get(1, 0)))
+        self.voulu, self.n2_memo = etat_voulu(
+            (alarmes.get(i, 0) for i in range(1, 13)), liste_defaut, cells, self.n2_memo
+        )
+        return self.voulu
+
+    # ------------------------------------------------------------------ #
+    # WebSocket
+    # ------------------------------------------------------------------ #
+    def _connect(self) -> bool:
+        now = time.monotonic()
+        if now < self._retry_at:
+            return False
+        try:
+            ws = websocket.WebSocket()
+            ws.connect(self.url, timeout=2.0)
+        except Exception as e:
+            self._retry_at = now + self._backoff
+            self._backoff = min(self._backoff * 2.0, RECONNECT_S[1])
+            self.metrics["errors"] += 1
+            print(f"[RELAIS][WS] Connexion impossible : {e}")
+            return False
+        self.ws = ws
+        self.acquis = None
+        self._backoff = RECONNECT_S[0]
+        self.metrics["reconnects"] += 1
+        print("[RELAIS] WebSocket connecte.")
+        return True
+
+    def _drop(self, e: Exception) -> None:
+        print(f"[RELAIS][WS] Erreur envoi : {e} (reconnexion)")
+        self.metrics["errors"] += 1
+        ws, self.ws = self.ws, None
+        try:
+            if ws is not None:
+                ws.close()
+        except Exception:
+            pass
+        self.acquis = None
+
+    def _send(self, cmds: List[Dict[str, str]]) -> None:
+        ws = self.ws
+        assert ws is not None
+        if BATCH:
+            ws.send(json.dumps(cmds))
+            self.metrics["frames"] += 1
+        else:
+            for cmd in cmds:
+                ws.send(json.dumps(cmd))
+                self.metrics["frames"] += 1
+        self.metrics["commands"] += len(cmds)
+
+    def appliquer(self) -> int:
+        """Envoie les circuits modifies ; retourne le nombre de commandes."""
+        if self.ws is None and not self._connect():
+            return 0
+        changed = (self.voulu ^ self.acquis) if self.acquis is not None else ALL
+        if not changed:
+            return 0
+        cmds = commandes(self.voulu, changed)
+        try:
+            self._send(cmds)
+        except Exception as e:
+            self._drop(e)
+            return 0
+        self.acquis = self.voulu
+        self._last_io = time.monotonic()
+        self.metrics["updates"] += 1
+        return len(cmds)
+
+    def _ping(self) -> None:
+        if self.ws is None or time.monotonic() - self._last_io < PING_S:
+            return
+        try:
+            self.ws.ping()
+            self._last_io = time.monotonic()
+        except Exception as e:
+            self._drop(e)
+
+    # ------------------------------------------------------------------ #
+    # Boucle
+    # ------------------------------------------------------------------ #
     def run(self) -> None:
-        while True:
-            self.liste_alarm = [
-                int(AlarmeThread.alarme_resultat.get(i, 0)) for i in range(1, 13)
-            ]
-            self.liste_defaut = [
-                int(DefautThread.defaut_resultat.get(i, 0)) for i in range(1, 13)
-            ] + [int(Check_open_cell.etat_cellule_check.defaut_cell.get(1, 0))]
-            self.list_cell = [
-                int(etat_cellule_1.InputWatcher.cellules.get(1, 0)),
-                int(etat_cellule_2.InputWatcher.cellules.get(2, 0)),
-            ]
-
-            if 1 in self.liste_alarm and self.flag_al_1 == 0:  # Test des alarmes
-                self.ws.send('{"cmd":"set","dev":"relay","circuit":"3","value":"1"}')
-                self.ws.send('{"cmd":"set","dev":"relay","circuit":"6","value":"1"}')
-                self.ws.send('{"cmd":"set","dev":"relay","circuit":"5","value":"1"}')
-                self.flag_al_1 = 1
-            else:
-                if all(val == 0 for val in self.liste_alarm) and (self.flag_al_1 == 1 or self.flag_al_2 == 1):
-                    self.ws.send('{"cmd":"set","dev":"relay","circuit":"3","value":"0"}')
-                    self.ws.send('{"cmd":"set","dev":"relay","circuit":"6","value":"0"}')
-                    self.ws.send('{"cmd":"set","dev":"relay","circuit":"5","value":"0"}')
-                    self.flag_al_1 = 0
-
-            if 2 in self.liste_alarm and self.flag_al_2 == 0:  # Test des alarmes
-                self.ws.send('{"cmd":"set","dev":"relay","circuit":"4","value":"1"}')
-                self.ws.send('{"cmd":"set","dev":"relay","circuit":"7","value":"1"}')
-                self.ws.send('{"cmd":"set","dev":"relay","circuit":"3","value":"1"}')
-                self.ws.send('{"cmd":"set","dev":"relay","circuit":"6","value":"1"}')
-                self.ws.send('{"cmd":"set","dev":"relay","circuit":"5","value":"1"}')
-
-                self.flag_al_1 = 1
-                self.flag_al_2 = 1
-            else:
-                if all(val == 0 for val in self.liste_alarm) and (self.flag_al_1 == 1 or self.flag_al_2 == 1):
-                    self.ws.send('{"cmd":"set","dev":"relay","circuit":"3","value":"0"}')
-                    self.ws.send('{"cmd":"set","dev":"relay","circuit":"4","value":"0"}')
-                    self.ws.send('{"cmd":"set","dev":"relay","circuit":"6","value":"0"}')
-                    self.ws.send('{"cmd":"set","dev":"relay","circuit":"7","value":"0"}')
-                    self.ws.send('{"cmd":"set","dev":"relay","circuit":"5","value":"0"}')
-                    self.flag_al_2 = 0
-
-            if (1 in self.liste_defaut or 2 in self.liste_defaut) and self.flag_def_1 == 0:
-                self.ws.send('{"cmd":"set","dev":"relay","circuit":"1","value":"0"}')
-                self.flag_def_1 = 1
-            else:
-                if all(val == 0 for val in self.liste_defaut) and self.flag_def_1 == 1:
-                    self.ws.send('{"cmd":"set","dev":"relay","circuit":"1","value":"1"}')
-                    self.flag_def_1 = 0
-
-            if 1 in self.list_cell:  # Test des cellules
-                self.ws.send('{"cmd":"set","dev":"relay","circuit":"2","value":"1"}')
-                self.ws.send('{"cmd":"set","dev":"relay","circuit":"8","value":"1"}')
-                self.flag_cell = 1
-            else:
-                if all(val == 0 for val in self.list_cell) and self.flag_cell == 1:
-                    self.ws.send('{"cmd":"set","dev":"relay","circuit":"2","value":"0"}')
-                    self.ws.send('{"cmd":"set","dev":"relay","circuit":"8","value":"0"}')
-                    self.flag_cell = 0
-
-            time.sleep(1)
+        while self.running:
+            snap = SnapshotStore.wait_new(self.version, timeout=WAIT_S)
+            self.version = snap.version
+            self.calculer(snap.alarm_states, snap.defauts, snap.cells)
+            if not self.appliquer():
+                self._ping()
+
+    def stop(self) -> None:
+        self.running = False
+
+    def get_metrics(self) -> Dict[str, int]:
+        return dict(self.metrics, voulu=self.voulu, acquis=-1 if self.acquis is None else self.acquis)
@@ -0,0 +1,208 @@
+# src/gev5/hardware/storage/bdf_tiers.py
+from __future__ import annotations
+
+"""
+Historique du bruit de fond par paliers (Bruit_de_fond.db).
+
+    brut   bdf_history  1 ligne / 30 s        conservé raw_days
+    5 min  bdf_5m       min / moy / max        conservé m5_days
+    1 h    bdf_1h       min / moy / max        conservé h1_days (0 = toujours)
+
+- écriture : chaque ligne brute est accompagnée d'un UPSERT par palier
+  (rollup_rows) déposé dans la même file d'écriture → mêmes transactions,
+  agrégats toujours à jour, aucun recalcul périodique
+- rétention : prune() supprime par tranches les lignes trop anciennes
+- lecture : select_tier() prend le premier palier (du plus fin au plus
+  grossier) qui couvre la plage demandée en au plus max_points points ;
+  trend() / window_stats() lisent ce palier (index sur la clé de temps)
+
+Schéma et création des tables : schema.py (migration bdf v3).
+"""
+
+import sqlite3
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from .schema import BDF_RAW_STEP_S, BDF_ROLLUPS, CHANNELS, _commit
+
+PRUNE_CHUNK = 5000
+
+# (nom, table, colonne de temps, pas en s)
+TIERS: Tuple[Tuple[str, str, str, int], ...] = (
+    ("raw", "bdf_history", "ts_epoch", BDF_RAW_STEP_S),
+    *((table[4:], table, "bucket", step) for table, step in BDF_ROLLUPS),
+)
+
+
+@dataclass
+class RetentionPolicy:
+    """Durées de conservation par palier, en jours (0 = illimité)."""
+    raw_days: int = 30
+    m5_days: int = 400
+    h1_days: int = 0
+
+    def days(self, tier: str) -> int:
+        return {"raw": self.raw_days, "5m": self.m5_days, "1h": self.h1_days}.get(tier, 0)
+
+
+# --------------------------------------------------------------------------- #
+# Écriture
+# --------------------------------------------------------------------------- #
+def _upsert_sql(table: str) -> str:
+    cols = [f"{kind}{i}" for kind in ("min", "avg", "max") for i in CHANNELS]
+    sets = ["n = n + 1"]
+    for i in CHANNELS:
+        sets.append(f"min{i} = MIN(min{i}, excluded.min{i})")
+        # moyenne glissante : les expressions du SET voient l'ancien n
+        sets.append(f"avg{i} = avg{i} + (excluded.avg{i} - avg{i}) / (n + 1)")
+        sets.append(f"max{i} = MAX(max{i}, excluded.max{i})")
+    return (
+        f"INSERT INTO {table} (bucket, n, {', '.join(cols)}) "
+        f"VALUES (?, 1, {', '.join('?' * len(cols))}) "
+        f"ON CONFLICT(bucket) DO UPDATE SET {', '.join(sets)}"
+    )
+
+
+UPSERT_SQL: Dict[str, str] = {table: _upsert_sql(table) for table, _ in BDF_ROLLUPS}
+
+
+def rollup_rows(ts_epoch: int, values: Sequence[float]) -> List[Tuple[str, Tuple[Any, ...]]]:
+    """(sql, params) des UPSERT d'une mesure brute dans chaque palier."""
+    vals = tuple(values)
+    out = []
+    for table, step in BDF_ROLLUPS:
+        bucket = (int(ts_epoch) // step) * step
+        out.append((UPSERT_SQL[table], (bucket, *vals, *vals, *vals)))
+    return out
+
+
+def prune(
+    conn: sqlite3.Connection,
+    policy: RetentionPolicy,
+    now: Optional[float] = None,
+    chunk: int = PRUNE_CHUNK,
+) -> Dict[str, int]:
+    """
+    Supprime les lignes antérieures à la rétention de chaque palier, par
+    tranches (une transaction par tranche). Retourne {palier: lignes}.
+    """
+    _commit(conn)
+    now = time.time() if now is None else now
+    removed: Dict[str, int] = {}
+    for name, table, col, _step in TIERS:
+        days = policy.days(name)
+        if days <= 0:
+            continue
+        limit = int(now) - days * 86400
+        total = 0
+        while True:
+            conn.execute("BEGIN")
+            n = conn.execute(
+                f"DELETE FROM {table} WHERE rowid IN "
+                f"(SELECT rowid FROM {table} WHERE {col} < ? LIMIT ?)",
+                (limit, chunk),
+            ).rowcount
+            conn.execute("COMMIT")
+            total += n
+            if n < chunk:
+                break
+        removed[name] = total
+    return removed
+
+
+# --------------------------------------------------------------------------- #
+# Lecture
+# --------------------------------------------------------------------------- #
+def _oldest(conn: sqlite3.Connection, table: str, col: str) -> Optional[int]:
+    row = conn.execute(f"SELECT MIN({col}) FROM {table}").fetchone()
+    return None if row is None or row[0] is None else int(row[0])
+
+
+def select_tier(
+    conn: sqlite3.Connection, t0: float, t1: float, max_points: int = 500
+) -> Tuple[str, str, str, int]:
+    """
+    Premier palier (fin → grossier) dont le nombre de points sur [t0, t1[
+    tient dans max_points et dont les données remontent jusqu'à t0.
+    À défaut, le palier le plus grossier.
+    """
+    span = max(0.0, float(t1) - float(t0))
+    for tier in TIERS:
+        _name, table, col, step = tier
+        if span / step > max_points:
+            continue
+        oldest = _oldest(conn, table, col)
+        if oldest is not None and oldest <= t0 + step:
+            return tier
+    return TIERS[-1]
+
+
+def trend(
+    conn: sqlite3.Connection,
+    t0: float,
+    t1: float,
+    max_points: int = 500,
+    channels: Optional[Iterable[int]] = None,
+) -> Dict[str, Any]:
+    """
+    Tendance du bruit de fond sur [t0, t1[ :
+    {"tier", "step_s", "t": [...], "channels": {ch: {"min", "avg", "max"}}}
+    (au palier brut, min = moy = max = valeur mesurée).
+    """
+    name, table, col, step = select_tier(conn, t0, t1, max_points)
+    chs = [c for c in (channels or CHANNELS) if c in CHANNELS]
+    if name == "raw":
+        cols = [f"bdf{c}" for c in chs]
+    else:
+        cols = [f"{kind}{c}" for c in chs for kind in ("min", "avg", "max")]
+    rows = conn.execute(
+        f"SELECT {col}{''.join(', ' + c for c in cols)} FROM {table} "
+        f"WHERE {col} >= ? AND {col} < ? ORDER BY {col}",
+        (int(t0), int(t1)),
+    ).fetchall()
+
+    out: Dict[int, Dict[str, List[float]]] = {}
+    for k, c in enumerate(chs):
+        if name == "raw":
+            v = [r[1 + k] for r in rows]
+            out[c] = {"min": v, "avg": v, "max": v}
+        else:
+            base = 1 + 3 * k
+            out[c] = {
+                "min": [r[base] for r in rows],
+                "avg": [r[base + 1] for r in rows],
+                "max": [r[base + 2] for r in rows],
+            }
+    return {"tier": name, "step_s": step, "t": [r[0] for r in rows], "channels": out}
+
+
+def window_stats(
+    conn: sqlite3.Connection, t0: float, t1: float, max_points: int = 500
+) -> Optional[Dict[int, Dict[str, float]]]:
+    """
+    {voie: {"avg", "min", "max"}} sur [t0, t1[, calculé par SQLite sur le
+    palier choisi par select_tier (moyenne pondérée par n). None si vide.
+    """
+    name, table, col, _step = select_tier(conn, t0, t1, max_points)
+    if name == "raw":
+        aggs = [f"AVG(bdf{c}), MIN(bdf{c}), MAX(bdf{c})" for c in CHANNELS]
+        count = "COUNT(*)"
+    else:
+        aggs = [f"SUM(avg{c} * n) / SUM(n), MIN(min{c}), MAX(max{c})" for c in CHANNELS]
+        count = "SUM(n)"
+    row = conn.execute(
+        f"SELECT {count}, {', '.join(aggs)} FROM {table} WHERE {col} >= ? AND {col} < ?",
+        (int(t0), int(t1)),
+    ).fetchone()
+    if row is None or not row[0]:
+        return None
+    stats: Dict[int, Dict[str, float]] = {}
+    for k, c in enumerate(CHANNELS):
+        avg, mn, mx = row[1 + 3 * k: 4 + 3 * k]
+        stats[c] = {
+            "avg": float(avg or 0.0),
+            "min": float(mn or 0.0),
+            "max": float(mx or 0.0),
+        }
+    return stats
@@ -1,96 +1,106 @@
-# src/gev5/hardware/storage/collect_bdf_v2.py
-from __future__ import annotations
-
-import threading
-import time
-import sqlite3
-from typing import Optional, Union
-from pathlib import Path
-
-from ...core.alarmes.alarmes import AlarmeThread
-from ...utils.paths import BRUIT_FOND_DB_PATH, ensure_partage_structure
-
-
-class BdfCollectorV2(threading.Thread):
-    """
-    Collecteur V2 du bruit de fond.
-
-    - lit périodiquement AlarmeThread.fond[1..12]
-    - écrit dans Bruit_de_fond.db, table bdf_history :
-        timestamp | bdf1..bdf12
-    """
-
-    def __init__(
-        self,
-        interval: int = 30,
-        db_path: Optional[Union[str, Path]] = None,
-    ) -> None:
-        super().__init__(daemon=True)
-        self.interval = interval
-        self.db_path = str(db_path or BRUIT_FOND_DB_PATH)
-
-    # ------------------------------------------------------------------ #
-    # Boucle principale
-    # ------------------------------------------------------------------ #
-    def run(self) -> None:
-        ensure_partage_structure()
-        self._init_db()
-
-        while True:
-            try:
-                self._collect()
-            except Exception as e:
-                print(f"[BDF_V2] Erreur collecte : {e}")
-            time.sleep(self.interval)
-
-    # ------------------------------------------------------------------ #
-    # DB
-    # ------------------------------------------------------------------ #
-    def _init_db(self) -> None:
-        """Crée la table bdf_history si nécessaire."""
-        with sqlite3.connect(self.db_path) as conn:
-            cur = conn.cursor()
-            cur.execute(
-                """
-                CREATE TABLE IF NOT EXISTS bdf_history (
-                    timestamp   TEXT,
-                    bdf1        REAL,
-                    bdf2        REAL,
-                    bdf3        REAL,
-                    bdf4        REAL,
-                    bdf5        REAL,
-                    bdf6        REAL,
-                    bdf7        REAL,
-                    bdf8        REAL,
-                    bdf9        REAL,
-                    bdf10       REAL,
-                    bdf11       REAL,
-                    bdf12       REAL
-                )
-                """
-            )
-            conn.commit()
-
-    def _collect(self) -> None:
-        """Lit les fonds et insère une ligne."""
-        ts = time.strftime("%Y-%m-%d %H:%M:%S")
-        row = [ts]
-
-        for ch in range(1, 13):
-            val = float(AlarmeThread.fond.get(ch, 0.0))
-            row.append(val)
-
-        with sqlite3.connect(self.db_path) as conn:
-            cur = conn.cursor()
-            cur.execute(
-                """
-                INSERT INTO bdf_history (
-                    timestamp,
-                    bdf1, bdf2, bdf3, bdf4, bdf5, bdf6,
-                    bdf7, bdf8, bdf9, bdf10, bdf11, bdf12
-                )
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                """,
-                row,
-            )
-            conn.commit()
+# src/gev5/hardware/storage/collect_bdf_v2.py
+from __future__ import annotations
+
+import threading
+import time
+from typing import List, Optional, Union
+from pathlib import Path
+
+from ...core.alarmes.alarmes import AlarmeThread
+from ...utils.paths import BRUIT_FOND_DB_PATH, ensure_partage_structure
+from .bdf_tiers import RetentionPolicy, prune, rollup_rows
+from .schema import migrate_bdf
+from .sqlite_pool import SqliteWriter, get_writer
+
+INSERT_BDF_HISTORY = """
+    INSERT INTO bdf_history (
+        timestamp,
+        bdf1, bdf2, bdf3, bdf4, bdf5, bdf6,
+        bdf7, bdf8, bdf9, bdf10, bdf11, bdf12,
+        ts_epoch
+    )
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+
+class BdfCollectorV2(threading.Thread):
+    """
+    Collecteur V2 du bruit de fond.
+
+    - lit périodiquement AlarmeThread.fond[1..12]
+    - écrit dans Bruit_de_fond.db, table bdf_history :
+        timestamp | bdf1..bdf12
+      + agrégats 5 min / 1 h mis à jour à chaque ligne (bdf_tiers)
+    - écritures via l'écrivain partagé de la base (sqlite_pool) :
+      la boucle ne bloque jamais sur le disque
+    - purge selon `retention` toutes les `prune_every_s` secondes
+    """
+
+    def __init__(
+        self,
+        interval: int = 30,
+        db_path: Optional[Union[str, Path]] = None,
+        retention: Optional[RetentionPolicy] = None,
+        prune_every_s: float = 3600.0,
+    ) -> None:
+        super().__init__(daemon=True)
+        self.interval = interval
+        self.db_path = str(db_path or BRUIT_FOND_DB_PATH)
+        self.retention = retention or RetentionPolicy()
+        self.prune_every_s = float(prune_every_s)
+        self._next_prune = 0.0
+        self._db: Optional[SqliteWriter] = None
+
+    # ------------------------------------------------------------------ #
+    # Boucle principale
+    # ------------------------------------------------------------------ #
+    def run(self) -> None:
+        ensure_partage_structure()
+        self._init_db()
+
+        while True:
+            try:
+                self._collect()
+            except Exception as e:
+                print(f"[BDF_V2] Erreur collecte : {e}")
+            if time.monotonic() >= self._next_prune:
+                self._next_prune = time.monotonic() + self.prune_every_s
+                self._prune()
+            time.sleep(self.interval)
+
+    # ------------------------------------------------------------------ #
+    # DB
+    # ------------------------------------------------------------------ #
+    def _init_db(self) -> None:
+        """Crée / migre la table bdf_history (schema.migrate_bdf)."""
+        self._db = get_writer(self.db_path)
+        self._db.call(migrate_bdf).result()
+
+    def _collect(self) -> None:
+        """Lit les fonds et dépose une ligne dans la file d'écriture."""
+        db = self._db
+        assert db is not None
+        now = time.time()
+        ts = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(now))
+        values: List[float] = [float(AlarmeThread.fond.get(ch, 0.0)) for ch in range(1, 13)]
+
+        db.execute(INSERT_BDF_HISTORY, [ts, *values, int(now)])
+        for sql, params in rollup_rows(int(now), values):
+            db.execute(sql, params)
+
+    def _prune(self) -> None:
+        """Purge de rétention, exécutée dans le thread écrivain (non bloquant)."""
+        db = self._db
+        assert db is not None
+        fut = db.call(lambda conn: prune(conn, self.retention))
+
+        def _done(f) -> None:
+            try:
+                removed = f.result()
+            except Exception as e:
+                print(f"[BDF_V2] Erreur purge : {e}")
+                return
+            if any(removed.values()):
+                print(f"[BDF_V2] Purge rétention : {removed}")
+
+        fut.add_done_callback(_done)
@@ -1,237 +1,352 @@
-# src/gev5/hardware/storage/db_write_v2.py
-from __future__ import annotations
-
-import threading
-import time
-import datetime
-import sqlite3
-from typing import Dict, Optional
-
-from ...core.comptage.comptage import ComptageThread
-from ...core.alarmes.alarmes import AlarmeThread
-from ...core.defauts.defauts import DefautThread
-from ...utils.paths import GEV5_DB_PATH, ensure_partage_structure
-
-from ...hardware import etat_cellule_1, etat_cellule_2  # type: ignore
-
-try:
-    # si vitesse_chargement existe et fournit ListWatcher.vitesse[1]
-    from ...hardware import vitesse_chargement  # type: ignore
-except Exception:  # pragma: no cover - optionnel
-    vitesse_chargement = None
-
-
-def passage_actif() -> bool:
-    """
-    Détection de passage basée sur etat_cellule_1 / etat_cellule_2.
-
-    Hypothèse : InputWatcher.cellules[1] / [2] == 1 quand faisceau coupé.
-    """
-    try:
-        c1 = getattr(etat_cellule_1.InputWatcher, "cellules", {}).get(1, 0)
-    except Exception:
-        c1 = 0
-
-    try:
-        c2 = getattr(etat_cellule_2.InputWatcher, "cellules", {}).get(2, 0)
-    except Exception:
-        c2 = 0
-
-    return (c1 == 1) or (c2 == 1)
-
-
-class PassageRecorderV2(threading.Thread):
-    """
-    Writer V2 des passages :
-
-    - Sur front montant de passage_actif():
-        * snapshot des fonds AlarmeThread.fond[1..12]
-        * reset des maxima de comptage
-    - Pendant le passage :
-        * max1..12 = max(max, ComptageThread.compteur[ch])
-    - Sur front descendant (ou timeout) :
-        * écrit une ligne dans Db_GeV5.db, table passages_v2
-    """
-
-    TICK_S = 0.1
-    END_STABLE_S = 0.2     # durée sans passage avant de considérer la fin
-    TIMEOUT_S = 10.0       # si passage trop long sans fin → on force
-
-    def __init__(self, db_path: Optional[str] = None) -> None:
-        super().__init__(daemon=True)
-        ensure_partage_structure()
-        self.db_path = db_path or str(GEV5_DB_PATH)
-
-        self._active_prev = False
-        self._inactive_since: Optional[float] = None
-        self._start_ts: Optional[float] = None
-
-        self._bdf_start: Dict[int, float] = {i: 0.0 for i in range(1, 13)}
-        self._max_vals: Dict[int, float] = {i: 0.0 for i in range(1, 13)}
-
-        self._init_db()
-
-    # ------------------------------------------------------------------ #
-    # DB
-    # ------------------------------------------------------------------ #
-    def _init_db(self) -> None:
-        with sqlite3.connect(self.db_path) as conn:
-            cur = conn.cursor()
-            cur.execute(
-                """
-                CREATE TABLE IF NOT EXISTS passages_v2 (
-                    id          INTEGER PRIMARY KEY AUTOINCREMENT,
-                    ts_start    TEXT,
-                    ts_end      TEXT,
-                    duration_s  REAL,
-                    bdf1        REAL, bdf2 REAL, bdf3 REAL, bdf4 REAL,
-                    bdf5        REAL, bdf6 REAL, bdf7 REAL, bdf8 REAL,
-                    bdf9        REAL, bdf10 REAL, bdf11 REAL, bdf12 REAL,
-                    max1        REAL, max2 REAL, max3 REAL, max4 REAL,
-                    max5        REAL, max6 REAL, max7 REAL, max8 REAL,
-                    max9        REAL, max10 REAL, max11 REAL, max12 REAL,
-                    alarm1      INTEGER, alarm2 INTEGER, alarm3 INTEGER, alarm4 INTEGER,
-                    alarm5      INTEGER, alarm6 INTEGER, alarm7 INTEGER, alarm8 INTEGER,
-                    alarm9      INTEGER, alarm10 INTEGER, alarm11 INTEGER, alarm12 INTEGER,
-                    defaut1     INTEGER, defaut2 INTEGER, defaut3 INTEGER, defaut4 INTEGER,
-                    defaut5     INTEGER, defaut6 INTEGER, defaut7 INTEGER, defaut8 INTEGER,
-                    defaut9     INTEGER, defaut10 INTEGER, defaut11 INTEGER, defaut12 INTEGER,
-                    vitesse     REAL,
-                    comment     TEXT
-                )
-                """
-            )
-            conn.commit()
-
-    # ------------------------------------------------------------------ #
-    # Helpers
-    # ------------------------------------------------------------------ #
-    def _snapshot_bdf_start(self) -> None:
-        for ch in range(1, 13):
-            self._bdf_start[ch] = float(AlarmeThread.fond.get(ch, 0.0))
-
-    def _reset_max_vals(self) -> None:
-        for ch in range(1, 13):
-            self._max_vals[ch] = 0.0
-
-    def _update_max_vals(self) -> None:
-        for ch in range(1, 13):
-            val = float(ComptageThread.compteur.get(ch, 0.0))
-            if val > self._max_vals[ch]:
-                self._max_vals[ch] = val
-
-    def _get_vitesse(self) -> float:
-        if vitesse_chargement is None:
-            return 0.0
-        try:
-            return float(vitesse_chargement.ListWatcher.vitesse.get(1, 0.0))
-        except Exception:
-            return 0.0
-
-    def _write_passage(self, reason: str) -> None:
-        if self._start_ts is None:
-            return
-
-        ts_start = datetime.datetime.fromtimestamp(self._start_ts)
-        ts_end = datetime.datetime.now()
-        duration_s = (ts_end - ts_start).total_seconds()
-
-        # snapshot états alarmes/défauts au moment de la fin
-        alarms = [int(AlarmeThread.alarme_resultat.get(ch, 0)) for ch in range(1, 13)]
+# src/gev5/hardware/storage/db_write_v2.py
+from __future__ import annotations
+
+import threading
+import time
+import datetime
+from typing import Dict, Optional
+
+from ...core.comptage.comptage import ComptageThread
+from ...core.alarmes.alarmes import AlarmeThread
+from ...core.defauts.defauts import DefautThread
+from ...utils.paths import GEV5_DB_PATH, ensure_partage_structure
+from .profil import INSERT_PROFIL, ProfilBuffer, encode_profil
+from .registre_passages import RegistrePassages
+from .schema import migrate_passages
+from .sqlite_pool import get_writer
+
+from ...core.vitesse.estimation import MesureVitesse
+from ...hardware import etat_cellule_1, etat_cellule_2  # type: ignore
+from ...hardware.cell_edges import PassageFronts
+from ...hardware.passage_bus import START, STOP, PassageBus, Subscription
+from ...hardware.prise_photo import PrisePhoto
+
+try:
+    # si vitesse_chargement existe et fournit ListWatcher.vitesse[1]
+    from ...hardware import vitesse_chargement  # type: ignore
+except Exception:  # pragma: no cover - optionnel
+    vitesse_chargement = None
+
+INSERT_PASSAGES_V2 = """
+    INSERT INTO passages_v2 (
+        ts_start, ts_end, duration_s,
+        bdf1, bdf2, bdf3, bdf4, bdf5, bdf6, bdf7, bdf8, bdf9, bdf10, bdf11, bdf12,
+        max1, max2, max3, max4, max5, max6, max7, max8, max9, max10, max11, max12,
+        alarm1, alarm2, alarm3, alarm4, alarm5, alarm6, alarm7, alarm8, alarm9, alarm10, alarm11, alarm12,
+        defaut1, defaut2, defaut3, defaut4, defaut5, defaut6, defaut7, defaut8, defaut9, defaut10, defaut11, defaut12,
+        vitesse,
+        comment,
+        ts_start_epoch, ts_end_epoch, alarm_any,
+        sens, longueur_m, vitesse_qualite, vitesse_source, vitesse_incertitude
+    )
+    VALUES (
+        ?, ?, ?,
+        ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?,
+        ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?,
+        ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?,
+        ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?,
+        ?,
+        ?,
+        ?, ?, ?,
+        ?, ?, ?, ?, ?
+    )
+"""
+
+
+def passage_actif() -> bool:
+    """
+    Détection de passage basée sur etat_cellule_1 / etat_cellule_2.
+
+    Hypothèse : InputWatcher.cellules[1] / [2] == 1 quand faisceau coupé.
+    """
+    try:
+        c1 = getattr(etat_cellule_1.InputWatcher, "cellules", {}).get(1, 0)
+    except Exception:
+        c1 = 0
+
+    try:
+        c2 = getattr(etat_cellule_2.InputWatcher, "cellules", {}).get(2, 0)
+    except Exception:
+        c2 = 0
+
+    return (c1 == 1) or (c2 == 1)
+
+
+class PassageRecorderV2(threading.Thread):
+    """
+    Writer V2 des passages :
+
+    - Sur START du bus de passage (ou, sans bus, front montant de
+      passage_actif()) :
+        * snapshot des fonds AlarmeThread.fond[1..12]
+        * reset des maxima de comptage
+    - Pendant le passage :
+        * max1..12 = max(max, ComptageThread.compteur[ch])
+        * profil de comptage : relevé des 12 voies toutes les sample_s
+    - Sur STOP (ou timeout) :
+        * écrit une ligne dans Db_GeV5.db, table passages_v2, et son
+          profil (+ photo PrisePhoto du passage) dans passages_v2_profil,
+          même transaction (via l'écrivain partagé de la base,
+          sqlite_pool ; schéma et migrations dans schema.py)
+        * publie l'id de la ligne écrite (RegistrePassages) : le rapport
+          d'une alarme levée pendant le passage porte sur ce passage
+        * avec un bus et distance_m : vitesse, sens, longueur et qualité
+          de la mesure, à partir des fronts S1/S2 du passage datés à la
+          source (cell_edges.PassageFronts)
+    """
+
+    TICK_S = 0.1
+    END_STABLE_S = 0.2     # sans bus : durée sans passage avant de considérer la fin
+    TIMEOUT_S = 10.0       # si passage trop long sans fin → on force
+
+    def __init__(
+        self,
+        db_path: Optional[str] = None,
+        sample_s: Optional[float] = None,
+        bus: Optional[PassageBus] = None,
+        distance_m: Optional[float] = None,
+    ) -> None:
+        super().__init__(daemon=True)
+        ensure_partage_structure()
+        self.db_path = db_path or str(GEV5_DB_PATH)
+        self.bus = bus
+        self.distance_m = float(distance_m) if distance_m else None
+        self._fronts = PassageFronts(bus.period_s) if bus is not None else None
+        # abonnement dès la construction : aucun événement perdu si le bus
+        # démarre avant run()
+        self._sub: Optional[Subscription] = (
+            bus.subscribe("passage_v2", kinds=(STOP,) + PassageFronts.KINDS) if bus is not None else None
+        )
+
+        # profil au pas d'acquisition (sample_time), boucle au moins aussi rapide
+        self.sample_s = float(sample_s) if sample_s else self.TICK_S
+        self._tick_s = min(self.TICK_S, self.sample_s)
+        self._profil = ProfilBuffer(self.sample_s, max_s=self.TIMEOUT_S + 2.0)
+
+        self._active_prev = False
+        self._inactive_since: Optional[float] = None
+        self._start_ts: Optional[float] = None
+        self._seq = 0           # numéro RegistrePassages du passage courant
+
+        self._bdf_start: Dict[int, float] = {i: 0.0 for i in range(1, 13)}
+        self._max_vals: Dict[int, float] = {i: 0.0 for i in range(1, 13)}
+
+        self._init_db()
+
+    # ------------------------------------------------------------------ #
+    # DB
+    # ------------------------------------------------------------------ #
+    def _init_db(self) -> None:
+        self._db = get_writer(self.db_path)
+        self._db.call(migrate_passages).result()
+
+    # ------------------------------------------------------------------ #
+    # Helpers
+    # ------------------------------------------------------------------ #
+    def _snapshot_bdf_start(self) -> None:
+        for ch in range(1, 13):
+            self._bdf_start[ch] = float(AlarmeThread.fond.get(ch, 0.0))
+
+    def _reset_max_vals(self) -> None:
+        for ch in range(1, 13):
+            self._max_vals[ch] = 0.0
+
+    def _update_max_vals(self) -> None:
+        for ch in range(1, 13):
+            val = float(ComptageThread.compteur.get(ch, 0.0))
+            if val > self._max_vals[ch]:
+                self._max_vals[ch] = val
+
+    def _sample_profil(self, now_ts: float) -> None:
+        if self._profil.due(now_ts):
+            compteur = ComptageThread.compteur
+            self._profil.add(now_ts, [float(compteur.get(ch, 0.0)) for ch in range(1, 13)])
+
+    def _photo_du_passage(self, ts_end: float) -> Optional[str]:
+        """Dernière photo PrisePhoto si elle a été prise pendant le passage."""
+        with PrisePhoto.lock:
+            path = PrisePhoto.filename.get(1)
+            stamp = PrisePhoto.timestamp.get(1)
+        if not path or not stamp or self._start_ts is None:
+            return None
+        try:
+            shot = datetime.datetime.strptime(str(stamp), "%Y%m%d_%H%M%S").timestamp()
+        except ValueError:
+            return None
+        # horodatage photo à la seconde
+        return path if int(self._start_ts) - 1 <= shot <= ts_end + 1 else None
+
+    def _get_vitesse(self) -> float:
+        if vitesse_chargement is None:
+            return 0.0
+        try:
+            return float(vitesse_chargement.ListWatcher.vitesse.get(1, 0.0))
+        except Exception:
+            return 0.0
+
+    def _begin_passage(self, ts: float) -> None:
+        self._start_ts = ts
+        self._seq = RegistrePassages.debut()
+        self._inactive_since = None
+        self._snapshot_bdf_start()
+        self._reset_max_vals()
+        self._profil.reset()
+        print("[DB_V2] Passage détecté (start).")
+
+    def _end_passage(self, reason: str, ts_end: Optional[float] = None) -> None:
+        try:
+            self._write_passage(reason, ts_end, self._mesure_vitesse())
+        except Exception as e:
+            print(f"[DB_V2][ERR] écriture {reason}: {e}")
+        finally:
+            self._start_ts = None
+            self._inactive_since = None
+
+    def _mesure_vitesse(self) -> Optional[MesureVitesse]:
+        if self._fronts is None or self.distance_m is None:
+            return None
+        return self._fronts.mesure(self.distance_m)
+
+    def _write_passage(
+        self,
+        reason: str,
+        ts_end_s: Optional[float] = None,
+        mesure: Optional[MesureVitesse] = None,
+    ) -> None:
+        if self._start_ts is None:
+            return
+
+        ts_start = datetime.datetime.fromtimestamp(self._start_ts)
+        ts_end = datetime.datetime.fromtimestamp(ts_end_s) if ts_end_s is not None else datetime.datetime.now()
+        duration_s = (ts_end - ts_start).total_seconds()
+
+        # snapshot états alarmes/défauts au moment de la fin
+        alarms = [int(AlarmeThread.alarme_resultat.get(ch, 0)) for ch in range(1, 13)]
         defauts = [int(DefautThread.defaut_resultat.get(ch, 0)) for ch in range(1, 13)]
-
-        bdf = [self._bdf_start[ch] for ch in range(1, 13)]
-        maxv = [self._max_vals[ch] for ch in range(1, 13)]
-
-        vitesse = self._get_vitesse()
-        comment = f"fin={reason}"
-
-        row = [
-            ts_start.strftime("%Y-%m-%d %H:%M:%S"),
-            ts_end.strftime("%Y-%m-%d %H:%M:%S"),
-            duration_s,
-            *bdf,
-            *maxv,
-            *alarms,
-            *defauts,
-            vitesse,
-            comment,
-        ]
-
-        with sqlite3.connect(self.db_path) as conn:
-            cur = conn.cursor()
-            cur.execute(
-                """
-                INSERT INTO passages_v2 (
-                    ts_start, ts_end, duration_s,
-                    bdf1, bdf2, bdf3, bdf4, bdf5, bdf6, bdf7, bdf8, bdf9, bdf10, bdf11, bdf12,
-                    max1, max2, max3, max4, max5, max6, max7, max8, max9, max10, max11, max12,
-                    alarm1, alarm2, alarm3, alarm4, alarm5, alarm6, alarm7, alarm8, alarm9, alarm10, alarm11, alarm12,
-                    defaut1, defaut2, defaut3, defaut4, defaut5, defaut6, defaut7, defaut8, defaut9, defaut10, defaut11, defaut12,
-                    vitesse,
-                    comment
-                )
-                VALUES (
-                    ?, ?, ?,
-                    ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?,
-                    ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?,
-                    ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?,
-                    ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?,
-                    ?,
-                    ?
-                )
-                """,
-                row,
-            )
-            conn.commit()
-
-        print(f"[DB_V2] Passage écrit ({reason}), durée={duration_s:.2f}s.")
-
-    # ------------------------------------------------------------------ #
-    # Boucle principale
-    # ------------------------------------------------------------------ #
-    def run(self) -> None:
-        print(f"[DB_V2] Writer démarré sur {self.db_path}")
-        while True:
-            now_active = passage_actif()
-            now_ts = time.time()
-
-            # Front montant = début de passage
-            if now_active and not self._active_prev:
-                self._start_ts = now_ts
-                self._inactive_since = None
-                self._snapshot_bdf_start()
-                self._reset_max_vals()
-                print("[DB_V2] Passage détecté (start).")
-
-            # Pendant le passage → met à jour les maxima
-            if now_active:
-                self._update_max_vals()
-
-            # Front descendant = fin potentielle
-            if (not now_active) and self._active_prev:
-                if self._inactive_since is None:
-                    self._inactive_since = now_ts
-                elif (now_ts - self._inactive_since) >= self.END_STABLE_S:
-                    # fin confirmée
-                    try:
-                        self._write_passage("fin de passage")
-                    except Exception as e:
-                        print(f"[DB_V2][ERR] écriture fin: {e}")
-                    finally:
-                        self._start_ts = None
-                        self._inactive_since = None
-
-            # Timeout (passage trop long sans fin)
-            if self._start_ts is not None and now_active:
-                if (now_ts - self._start_ts) >= self.TIMEOUT_S:
-                    try:
-                        self._write_passage("timeout")
-                    except Exception as e:
-                        print(f"[DB_V2][ERR] écriture timeout: {e}")
-                    finally:
-                        self._start_ts = None
-                        self._inactive_since = None
-
-            self._active_prev = now_active
-            time.sleep(self.TICK_S)
+
+        bdf = [self._bdf_start[ch] for ch in range(1, 13)]
+        maxv = [self._max_vals[ch] for ch in range(1, 13)]
+
+        if mesure is not None and mesure.valide:
+            vitesse = mesure.vitesse_kmh
+        else:
+            vitesse = self._get_vitesse()
+        comment = f"fin={reason}"
+
+        profil = encode_profil(self._profil.curves()) if len(self._profil) else None
+        photo = self._photo_du_passage(ts_end.timestamp())
+        profil_row = (self.sample_s, len(self._profil), profil, photo)
+
+        row = [
+            ts_start.strftime("%Y-%m-%d %H:%M:%S"),
+            ts_end.strftime("%Y-%m-%d %H:%M:%S"),
+            duration_s,
+            *bdf,
+            *maxv,
+            *alarms,
+            *defauts,
+            vitesse,
+            comment,
+            int(self._start_ts),
+            int(ts_end.timestamp()),
+            int(any(alarms)),
+            mesure.sens if mesure else None,
+            mesure.longueur_m if mesure else None,
+            mesure.qualite if mesure else None,
+            mesure.source if mesure else None,
+            mesure.incertitude_kmh if mesure else None,
+        ]
+
+        def _insert(conn):
+            passage_id = conn.execute(INSERT_PASSAGES_V2, row).lastrowid
+            conn.execute(INSERT_PROFIL, (passage_id, *profil_row))
+            return passage_id
+
+        seq = self._seq
+
+        def _done(f) -> None:
+            try:
+                passage_id = f.result()
+            except Exception as e:
+                print(f"[DB_V2][ERR] écriture passage : {e}")
+                return
+            RegistrePassages.ecrit(seq, passage_id)
+
+        # écriture déléguée au thread écrivain : la détection de fin ne
+        # dépend pas de la latence du disque
+        self._db.call(_insert).add_done_callback(_done)
+
+        print(f"[DB_V2] Passage écrit ({reason}), durée={duration_s:.2f}s.")
+
+    # ------------------------------------------------------------------ #
+    # Boucle principale
+    # ------------------------------------------------------------------ #
+    def run(self) -> None:
+        print(f"[DB_V2] Writer démarré sur {self.db_path}")
+        if self._sub is not None:
+            self._run_bus(self._sub)
+            return
+
+        while True:
+            now_active = passage_actif()
+            now_ts = time.time()
+
+            # Front montant = début de passage
+            if now_active and not self._active_prev:
+                self._begin_passage(now_ts)
+
+            # Pendant le passage → met à jour les maxima et le profil
+            if now_active:
+                self._update_max_vals()
+            if self._start_ts is not None:
+                self._sample_profil(now_ts)
+
+            # Fin potentielle : plus de passage depuis END_STABLE_S
+            if (not now_active) and self._start_ts is not None:
+                if self._inactive_since is None:
+                    self._inactive_since = now_ts
+                elif (now_ts - self._inactive_since) >= self.END_STABLE_S:
+                    # fin confirmée
+                    self._end_passage("fin de passage", self._inactive_since)
+            elif now_active:
+                self._inactive_since = None
+
+            # Timeout (passage trop long sans fin)
+            if self._start_ts is not None and now_active:
+                if (now_ts - self._start_ts) >= self.TIMEOUT_S:
+                    self._end_passage("timeout")
+
+            self._active_prev = now_active
+            time.sleep(self._tick_s)
+
+    def _run_bus(self, sub: Subscription) -> None:
+        """
+        Boucle sur les événements du bus : attente bloquante au repos,
+        relevés au pas _tick_s pendant un passage. Début et fin datés par
+        le bus (mêmes instants que les autres abonnés) ; l'anti-rebond
+        est celui de PassageService (min_off_s). Les fronts S1/S2 suivent
+        le même chemin pour la mesure de vitesse.
+        """
+        fronts = self._fronts
+        assert fronts is not None
+        while True:
+            ev = sub.get(timeout=self._tick_s if self._start_ts is not None else None)
+            now_ts = time.time()
+            if ev is not None and ev.kind == START and self._start_ts is not None:
+                self._end_passage("fin de passage", ev.wall_ts)
+            if ev is not None:
+                fronts.feed(ev)
+
+            if ev is not None and ev.kind == START:
+                self._begin_passage(ev.wall_ts)
+            elif ev is not None and ev.kind == STOP:
+                if self._start_ts is not None:
+                    self._update_max_vals()
+                    self._end_passage("fin de passage", ev.wall_ts)
+                continue
+
+            if self._start_ts is not None:
+                self._update_max_vals()
+                self._sample_profil(now_ts)
+                if (now_ts - self._start_ts) >= self.TIMEOUT_S:
+                    self._end_passage("timeout", now_ts)
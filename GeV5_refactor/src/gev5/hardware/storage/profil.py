@@ -0,0 +1,172 @@
+# src/gev5/hardware/storage/profil.py
+from __future__ import annotations
+
+"""
+Profil de comptage d'un passage (table passages_v2_profil, schéma v3).
+
+- enregistrement : PassageRecorderV2 relève ComptageThread.compteur toutes
+  les sample_s pendant le passage (ProfilBuffer, tableau préalloué)
+- stockage : trame GV5C "delta" (core.courbes.codec) compressée zlib,
+  quelques centaines d'octets par passage ; chemin de la photo PrisePhoto
+- rendu : trace() réduit chaque voie à la résolution de la page (min et
+  max par colonne de 1 pt, vectorisé) et la convertit une fois en
+  opérateurs de tracé PDF ; le rapport n'a plus qu'à les insérer (pas de
+  matplotlib)
+"""
+
+import math
+import sqlite3
+import zlib
+from dataclasses import dataclass, field
+from typing import Dict, Optional, Sequence
+
+import numpy as np
+
+from ...core.courbes.codec import CODAGE_DELTA, Curves, decode, encode
+
+PROFIL_SCALE = 10.0         # résolution stockée : 0.1 c/s
+PROFIL_MAX_S = 15.0         # au-delà du TIMEOUT_S du recorder : tampon plein
+
+INSERT_PROFIL = """
+    INSERT OR REPLACE INTO passages_v2_profil (passage_id, sample_s, n, profil, photo)
+    VALUES (?, ?, ?, ?, ?)
+"""
+
+
+class ProfilBuffer:
+    """Relevés (t, voies 1..12) d'un passage, tableau préalloué."""
+
+    def __init__(self, sample_s: float, max_s: float = PROFIL_MAX_S) -> None:
+        self.sample_s = max(0.001, float(sample_s))
+        capacity = int(math.ceil(max_s / self.sample_s)) + 1
+        self._ts = np.empty(capacity, dtype=np.float64)
+        self._vals = np.empty((capacity, 12), dtype=np.float64)
+        self._n = 0
+        self._next_ts = 0.0
+
+    def __len__(self) -> int:
+        return self._n
+
+    def reset(self) -> None:
+        self._n = 0
+        self._next_ts = 0.0
+
+    def due(self, ts: float) -> bool:
+        """Un relevé est attendu à ts (cadence sample_s, tampon non plein)."""
+        return ts >= self._next_ts and self._n < len(self._ts)
+
+    def add(self, ts: float, values: Sequence[float]) -> None:
+        if self._n >= len(self._ts):
+            return
+        self._ts[self._n] = ts
+        self._vals[self._n] = values
+        self._n += 1
+        # cadence sample_s ; après un retard (ou au 1er relevé) on repart de ts,
+        # sans rattrapage en rafale
+        base = self._next_ts if ts - self._next_ts < self.sample_s else ts
+        self._next_ts = base + self.sample_s
+
+    def curves(self) -> Curves:
+        n = self._n
+        ts = self._ts[:n].copy()
+        return {ch: (ts, self._vals[:n, ch - 1].copy()) for ch in range(1, 13)}
+
+
+def encode_profil(curves: Curves) -> bytes:
+    return zlib.compress(encode(curves, CODAGE_DELTA, scale=PROFIL_SCALE), 6)
+
+
+def decode_profil(blob: bytes) -> Curves:
+    return decode(zlib.decompress(blob))
+
+
+@dataclass
+class Profil:
+    passage_id: int
+    sample_s: float
+    curves: Curves
+    photo: Optional[str] = None
+
+
+def fetch_profil(conn: sqlite3.Connection, passage_id: int) -> Optional[Profil]:
+    """Profil du passage, ou None (pas de profil / base pas encore migrée)."""
+    try:
+        row = conn.execute(
+            "SELECT sample_s, profil, photo FROM passages_v2_profil WHERE passage_id = ?",
+            (int(passage_id),),
+        ).fetchone()
+    except sqlite3.OperationalError:
+        return None
+    if row is None:
+        return None
+    sample_s, blob, photo = row
+    curves = decode_profil(blob) if blob else {}
+    return Profil(int(passage_id), float(sample_s or 0.0), curves, photo)
+
+
+# --------------------------------------------------------------------------- #
+# Tracé
+# --------------------------------------------------------------------------- #
+def _nice_ceil(v: float) -> float:
+    """Borne d'axe : 1, 2 ou 5 × 10^k immédiatement supérieur."""
+    if v <= 0:
+        return 1.0
+    k = 10.0 ** math.floor(math.log10(v))
+    for m in (1.0, 2.0, 5.0, 10.0):
+        if v <= m * k:
+            return m * k
+    return 10.0 * k
+
+
+def _colonnes(x: np.ndarray, v: np.ndarray, n_cols: int):
+    """
+    (x, v) triés par x ∈ [0, n_cols] → min puis max de chaque colonne
+    entière non vide, au centre de la colonne : 2 points par pt au plus,
+    les pics restent visibles.
+    """
+    col = np.minimum(x.astype(np.int64), n_cols - 1)
+    starts = np.flatnonzero(np.r_[True, col[1:] != col[:-1]])
+    xc = col[starts] + 0.5
+    lo = np.minimum.reduceat(v, starts)
+    hi = np.maximum.reduceat(v, starts)
+    return np.repeat(xc, 2), np.column_stack((lo, hi)).ravel()
+
+
+@dataclass
+class Trace:
+    """Polylines d'un profil, en coordonnées du cadre (origine bas gauche)."""
+    width: float
+    height: float
+    t_span: float = 0.0
+    v_max: float = 1.0
+    paths: Dict[int, str] = field(default_factory=dict)
+
+
+def trace(curves: Curves, width: float, height: float) -> Trace:
+    """
+    Opérateurs PDF ("x y m x y l ... S") de chaque voie non nulle, réduite
+    à 2 points (min, max) par pt de largeur dès qu'elle en a plus : le
+    tracé garde les pics quelle que soit la durée du passage ou sample_s.
+    """
+    series = {ch: (np.asarray(ts, dtype=np.float64), np.asarray(v, dtype=np.float64))
+              for ch, (ts, v) in curves.items() if len(ts) > 1 and np.any(v)}
+    out = Trace(width, height)
+    if not series:
+        return out
+
+    t0 = min(float(ts[0]) for ts, _ in series.values())
+    t1 = max(float(ts[-1]) for ts, _ in series.values())
+    out.t_span = max(t1 - t0, 1e-6)
+    out.v_max = _nice_ceil(max(float(v.max()) for _, v in series.values()))
+
+    n_cols = max(2, int(width))
+    for ch, (ts, v) in sorted(series.items()):
+        x = (ts - t0) * (width / out.t_span)
+        if len(x) > 2 * n_cols:
+            x, v = _colonnes(x, v, n_cols)
+        y = np.clip(v, 0.0, out.v_max) * (height / out.v_max)
+        xy = np.column_stack((x, y)).ravel().tolist()
+        # 0.1 pt : résolution de la page, flux de page plus court
+        lines = "%.1f %.1f l " * (len(x) - 1) % tuple(xy[2:])
+        out.paths[ch] = "%.1f %.1f m " % (xy[0], xy[1]) + lines + "S"
+    return out
@@ -4,13 +4,16 @@ import os
 import time
 import threading
 import sqlite3
+from dataclasses import replace
 from pathlib import Path
 from datetime import datetime
-from typing import Dict, Any, Optional, List
+from typing import Dict, Any, Optional, List, Tuple
 
+from reportlab import rl_config
 from reportlab.lib.pagesizes import A4
 from reportlab.pdfgen import canvas
 from reportlab.lib.units import mm
+from reportlab.pdfbase.pdfmetrics import stringWidth
 
 from ...utils.paths import (
     GEV5_DB_PATH,
@@ -19,7 +22,13 @@ from ...utils.paths import (
     ensure_partage_structure,
 )
 from ...core.alarmes.alarmes import AlarmeThread
+from ...core.alarmes.fond_stats import FondStats
 from ...core.defauts.defauts import DefautThread
+from .bdf_tiers import window_stats
+from .profil import Profil, Trace, fetch_profil, trace
+from .rapport_pool import ReportJob, ReportPool
+from .registre_passages import RegistrePassages
+from .schema import BDF_RAW_STEP_S
 
 
 # ---------------------------------------------------------------------------
@@ -53,44 +62,39 @@ def _fetch_last_passage(db_path: str, passage_id: Optional[int] = None) -> Optio
 
 def _fetch_bdf_stats(limit: int = 50) -> Optional[Dict[int, Dict[str, float]]]:
     """
-    Statistiques récentes de bruit de fond (bdf_history) sur N lignes.
+    Statistiques récentes de bruit de fond.
     Retourne {voie: {"avg": x, "min": y, "max": z}, ...}
+
+    Source : statistiques glissantes en mémoire (FondStats) ; juste après
+    le démarrage (fenêtre vide), les N dernières périodes de collecte
+    (30 s) de l'historique (bdf_tiers).
     """
+    live = FondStats.snapshot()
+    if live:
+        return live
+
     db_path = str(BRUIT_FOND_DB_PATH)
     if not os.path.exists(db_path):
         return None
 
     conn = sqlite3.connect(db_path)
     try:
-        cur = conn.cursor()
-        cur.execute(
-            "SELECT * FROM bdf_history ORDER BY timestamp DESC LIMIT ?",
-            (limit,),
-        )
-        rows = cur.fetchall()
-        if not rows:
-            return None
+        now = time.time()
+        return window_stats(conn, now - limit * BDF_RAW_STEP_S, now + 1)
+    except sqlite3.OperationalError:
+        # base pas encore migrée par le collecteur
+        return None
+    finally:
+        conn.close()
 
-        stats: Dict[int, Dict[str, float]] = {}
-        for voie in range(1, 13):
-            values: List[float] = []
-            idx = voie  # 0 = timestamp, 1..12 = bdf1..bdf12
-            for r in rows:
-                try:
-                    v = float(r[idx])
-                    values.append(v)
-                except Exception:
-                    continue
-
-            if not values:
-                stats[voie] = {"avg": 0.0, "min": 0.0, "max": 0.0}
-            else:
-                stats[voie] = {
-                    "avg": sum(values) / len(values),
-                    "min": min(values),
-                    "max": max(values),
-                }
-        return stats
+
+def _fetch_profil(db_path: str, passage_id: Optional[int]) -> Optional[Profil]:
+    """Profil de comptage + photo du passage (passages_v2_profil)."""
+    if passage_id is None or not os.path.exists(db_path):
+        return None
+    conn = sqlite3.connect(db_path)
+    try:
+        return fetch_profil(conn, passage_id)
     finally:
         conn.close()
 
@@ -114,149 +118,310 @@ def _build_pdf_filename(passage: Dict[str, Any]) -> Path:
     return RAPPORTS_DIR / filename
 
 
-def generate_rapport_pdf_v2(passage_id: Optional[int] = None) -> Optional[Path]:
-    """
-    Génère un rapport PDF V2 :
+# ---------------------------------------------------------------------------
+# Gabarit : mise en page calculée une fois à l'import
+# ---------------------------------------------------------------------------
+# flux binaires (JPEG, tracés) écrits tels quels : sans l'accélérateur C
+# de reportlab, l'encodage ASCII85 d'une photo de 500 Ko coûte ~0.3 s
+rl_config.useA85 = 0
+
+PAGE_W, PAGE_H = A4
+MARGIN_LEFT = 20 * mm
+MARGIN_TOP = 20 * mm
+MARGIN_BOTTOM = 20 * mm
+
+FONT = "Helvetica"
+FONT_BOLD = "Helvetica-Bold"
+
+TITRE = "Rapport de passage GeV5 - V2"
+ENTETE_LABELS = (
+    "Début de passage : ",
+    "Fin de passage   : ",
+    "Durée (s)        : ",
+    "Vitesse          : ",
+    "Commentaire      : ",
+)
+ENTETE_VALUE_X = MARGIN_LEFT + max(stringWidth(l, FONT, 10) for l in ENTETE_LABELS)
+
+# (x du libellé, libellé) des en-têtes de colonnes
+COLS_VOIES = (
+    (0, "Voie"),
+    (20 * mm, "BDF début"),
+    (50 * mm, "Max passage"),
+    (80 * mm, "Alarme"),
+    (100 * mm, "Défaut"),
+)
+COL_STATS_VOIES = (125 * mm, "BDF moy. (N derniers)")
+COLS_STATS = ((0, "Voie"), (20 * mm, "BDF moy."), (50 * mm, "BDF min."), (80 * mm, "BDF max."))
+
+# bord droit des valeurs alignées à droite (hors colonne "Voie")
+RIGHT_VOIES = (45 * mm, 75 * mm, 95 * mm, 115 * mm)
+RIGHT_VOIES_STATS = RIGHT_VOIES + (170 * mm,)
+RIGHT_STATS = (45 * mm, 75 * mm, 105 * mm)
+
+# profil de comptage et photo
+CHART_W = 170 * mm
+CHART_H = 60 * mm
+PHOTO_H_MAX = 90 * mm
+COULEURS_VOIES = (
+    (0.12, 0.47, 0.71), (1.00, 0.50, 0.05), (0.17, 0.63, 0.17), (0.84, 0.15, 0.16),
+    (0.58, 0.40, 0.74), (0.55, 0.34, 0.29), (0.89, 0.47, 0.76), (0.50, 0.50, 0.50),
+    (0.74, 0.74, 0.13), (0.09, 0.75, 0.81), (0.00, 0.00, 0.50), (0.40, 0.20, 0.00),
+)
 
-      - lit 1 enregistrement de passages_v2 dans Db_GeV5.db
-      - lit des stats de bdf_history dans Bruit_de_fond.db
-      - écrit le PDF dans RAPPORTS_DIR
 
-    Retourne le Path du PDF, ou None si aucun passage.
-    """
-    ensure_partage_structure()
+def _right(text: str, right: float, size: float = 9) -> float:
+    """x de départ d'un texte aligné à droite sur MARGIN_LEFT + right."""
+    return MARGIN_LEFT + right - stringWidth(text, FONT, size)
 
-    db_path = str(GEV5_DB_PATH)
-    passage = _fetch_last_passage(db_path, passage_id=passage_id)
-    if passage is None:
-        print("[rapport_pdf_v2] Aucun passage trouvé dans passages_v2.")
-        return None
 
-    bdf_stats = _fetch_bdf_stats(limit=50)
+def _head(to: Any, cols: Tuple[Tuple[float, str], ...], y: float) -> None:
+    to.setFont(FONT_BOLD, 9)
+    for x, label in cols:
+        to.setTextOrigin(MARGIN_LEFT + x, y)
+        to.textOut(label)
+    to.setFont(FONT, 9)
 
-    RAPPORTS_DIR.mkdir(parents=True, exist_ok=True)
-    pdf_path = _build_pdf_filename(passage)
 
-    c = canvas.Canvas(str(pdf_path), pagesize=A4)
-    width, height = A4
+def _rows(to: Any, rows: List[Tuple[str, ...]], rights: Tuple[float, ...], y: float) -> None:
+    """Lignes d'un tableau : 1re cellule à gauche, les suivantes à droite."""
+    for row in rows:
+        to.setTextOrigin(MARGIN_LEFT, y)
+        to.textOut(row[0])
+        for text, right in zip(row[1:], rights):
+            to.setTextOrigin(_right(text, right), y)
+            to.textOut(text)
+        y -= 10
 
-    margin_left = 20 * mm
-    margin_top = 20 * mm
+
+def _draw_trace(c: canvas.Canvas, tr: Trace, y: float) -> float:
+    """
+    Profil de comptage sous y : cadre, graduations extrêmes, légende et
+    polylines déjà réduites (Trace) insérées telles quelles.
+    Retourne le y disponible sous le bloc.
+    """
+    x0 = MARGIN_LEFT
+    y0 = y - 14 - tr.height
+    to = c.beginText()
+    to.setFont(FONT_BOLD, 11)
+    to.setTextOrigin(x0, y)
+    to.textOut("Profil de comptage (c/s)")
+    to.setFont(FONT, 8)
+    v_max = f"{tr.v_max:g}"
+    to.setTextOrigin(x0 - 2 - stringWidth(v_max, FONT, 8), y0 + tr.height - 3)
+    to.textOut(v_max)
+    to.setTextOrigin(x0 - 2 - stringWidth("0", FONT, 8), y0)
+    to.textOut("0")
+    to.setTextOrigin(x0, y0 - 10)
+    to.textOut("0 s")
+    t_span = f"{tr.t_span:.1f} s"
+    to.setTextOrigin(x0 + tr.width - stringWidth(t_span, FONT, 8), y0 - 10)
+    to.textOut(t_span)
+    for k, ch in enumerate(tr.paths):
+        to.setFillColorRGB(*COULEURS_VOIES[(ch - 1) % len(COULEURS_VOIES)])
+        to.setTextOrigin(x0 + 35 * mm + 10 * mm * k, y0 - 10)
+        to.textOut(f"V{ch}")
+    to.setFillColorRGB(0, 0, 0)
+    c.drawText(to)
+
+    c.saveState()
+    c.setLineWidth(0.5)
+    c.rect(x0, y0, tr.width, tr.height)
+    c.translate(x0, y0)
+    c.setLineWidth(0.8)
+    c.setLineJoin(1)
+    for ch, path in tr.paths.items():
+        c.setStrokeColorRGB(*COULEURS_VOIES[(ch - 1) % len(COULEURS_VOIES)])
+        c.addLiteral(path)
+    c.restoreState()
+    return y0 - 24
+
+
+def _draw_photo(c: canvas.Canvas, photo: str, y: float) -> float:
+    """
+    Photo du passage sous y (nouvelle page si la place manque). Le JPEG
+    est recopié tel quel dans le PDF (pas de décodage).
+    """
+    if y - 14 - PHOTO_H_MAX < MARGIN_BOTTOM:
+        c.showPage()
+        y = PAGE_H - MARGIN_TOP
+    try:
+        c.drawImage(
+            photo, MARGIN_LEFT, y - 14 - PHOTO_H_MAX, CHART_W, PHOTO_H_MAX,
+            preserveAspectRatio=True, anchor="nw",
+        )
+    except Exception as e:
+        print(f"[rapport_pdf_v2] Photo illisible ({photo}) : {e}")
+        return y
+    c.setFont(FONT_BOLD, 11)
+    c.drawString(MARGIN_LEFT, y, "Photo du passage")
+    return y - 14 - PHOTO_H_MAX - 10
+
+
+def render_rapport_pdf(
+    pdf_path: Path,
+    passage: Dict[str, Any],
+    bdf_stats: Optional[Dict[int, Dict[str, float]]],
+    profil: Optional[Trace] = None,
+    photo: Optional[str] = None,
+) -> Path:
+    """
+    Dessine le rapport d'un passage (données déjà lues) dans pdf_path.
+
+    Chaque bloc est un seul objet texte (positions précalculées) plutôt
+    qu'un drawString par cellule ; flux de page non compressés : le
+    rapport fait quelques Ko et l'encodage coûte plus que l'écriture.
+    Le profil (Trace) arrive déjà réduit et converti en tracés PDF.
+    """
+    c = canvas.Canvas(str(pdf_path), pagesize=A4, pageCompression=0)
+    top = PAGE_H - MARGIN_TOP
 
     # ---------------- En-tête ----------------
-    c.setFont("Helvetica-Bold", 14)
-    c.drawString(margin_left, height - margin_top, "Rapport de passage GeV5 - V2")
-
-    c.setFont("Helvetica", 10)
-    ts_start = passage.get("ts_start", "")
-    ts_end = passage.get("ts_end", "")
-    duration_s = float(passage.get("duration_s", 0.0))
-    comment = str(passage.get("comment", ""))
-    vitesse = float(passage.get("vitesse", 0.0))
-
-    y = height - margin_top - 15
-    c.drawString(margin_left, y, f"Début de passage : {ts_start}")
-    y -= 12
-    c.drawString(margin_left, y, f"Fin de passage   : {ts_end}")
-    y -= 12
-    c.drawString(margin_left, y, f"Durée (s)        : {duration_s:.2f}")
-    y -= 12
-    c.drawString(margin_left, y, f"Vitesse          : {vitesse:.2f}")
-    y -= 12
-    c.drawString(margin_left, y, f"Commentaire      : {comment}")
-    y -= 20
+    y = top
+    to = c.beginText()
+    to.setFont(FONT_BOLD, 14)
+    to.setTextOrigin(MARGIN_LEFT, y)
+    to.textOut(TITRE)
+    to.setFont(FONT, 10)
+    values = (
+        str(passage.get("ts_start", "")),
+        str(passage.get("ts_end", "")),
+        f"{float(passage.get('duration_s', 0.0)):.2f}",
+        f"{float(passage.get('vitesse', 0.0)):.2f}",
+        str(passage.get("comment", "")),
+    )
+    for k, (label, value) in enumerate(zip(ENTETE_LABELS, values)):
+        yk = y - 15 - 12 * k
+        to.setTextOrigin(MARGIN_LEFT, yk)
+        to.textOut(label)
+        to.setTextOrigin(ENTETE_VALUE_X, yk)
+        to.textOut(value)
+    y -= 15 + 12 * len(values) + 8
 
     # ---------------- Tableau par voie ----------------
-    c.setFont("Helvetica-Bold", 11)
-    c.drawString(margin_left, y, "Synthèse par voie")
-    y -= 14
-
-    c.setFont("Helvetica-Bold", 9)
-    c.drawString(margin_left, y, "Voie")
-    c.drawString(margin_left + 20 * mm, y, "BDF début")
-    c.drawString(margin_left + 50 * mm, y, "Max passage")
-    c.drawString(margin_left + 80 * mm, y, "Alarme")
-    c.drawString(margin_left + 100 * mm, y, "Défaut")
     if bdf_stats is not None:
-        c.drawString(margin_left + 125 * mm, y, "BDF moy. (N derniers)")
-    y -= 10
-    c.setFont("Helvetica", 9)
+        cols, rights = COLS_VOIES + (COL_STATS_VOIES,), RIGHT_VOIES_STATS
+    else:
+        cols, rights = COLS_VOIES, RIGHT_VOIES
 
+    rows: List[Tuple[str, ...]] = []
     for voie in range(1, 13):
-        if y < 40 * mm:
-            c.showPage()
-            width, height = A4
-            y = height - margin_top
-            c.setFont("Helvetica-Bold", 11)
-            c.drawString(margin_left, y, "Synthèse par voie (suite)")
-            y -= 14
-            c.setFont("Helvetica-Bold", 9)
-            c.drawString(margin_left, y, "Voie")
-            c.drawString(margin_left + 20 * mm, y, "BDF début")
-            c.drawString(margin_left + 50 * mm, y, "Max passage")
-            c.drawString(margin_left + 80 * mm, y, "Alarme")
-            c.drawString(margin_left + 100 * mm, y, "Défaut")
-            if bdf_stats is not None:
-                c.drawString(margin_left + 125 * mm, y, "BDF moy. (N derniers)")
-            y -= 10
-            c.setFont("Helvetica", 9)
-
-        bdf_col = f"bdf{voie}"
-        max_col = f"max{voie}"
-        alarm_col = f"alarm{voie}"
-        defaut_col = f"defaut{voie}"
-
-        bdf_val = float(passage.get(bdf_col, 0.0))
-        max_val = float(passage.get(max_col, 0.0))
-        alarm_val = int(passage.get(alarm_col, 0))
-        defaut_val = int(passage.get(defaut_col, 0))
-
-        c.drawString(margin_left, y, f"{voie}")
-        c.drawRightString(margin_left + 45 * mm, y, f"{bdf_val:.1f}")
-        c.drawRightString(margin_left + 75 * mm, y, f"{max_val:.1f}")
-        c.drawRightString(margin_left + 95 * mm, y, f"{alarm_val}")
-        c.drawRightString(margin_left + 115 * mm, y, f"{defaut_val}")
-
+        row: Tuple[str, ...] = (
+            f"{voie}",
+            f"{float(passage.get(f'bdf{voie}', 0.0)):.1f}",
+            f"{float(passage.get(f'max{voie}', 0.0)):.1f}",
+            f"{int(passage.get(f'alarm{voie}', 0))}",
+            f"{int(passage.get(f'defaut{voie}', 0))}",
+        )
         if bdf_stats is not None:
-            stats = bdf_stats.get(voie, {"avg": 0.0})
-            c.drawRightString(margin_left + 170 * mm, y, f"{stats['avg']:.1f}")
-
+            row += (f"{bdf_stats.get(voie, {'avg': 0.0})['avg']:.1f}",)
+        rows.append(row)
+
+    title = "Synthèse par voie"
+    while rows:
+        to.setFont(FONT_BOLD, 11)
+        to.setTextOrigin(MARGIN_LEFT, y)
+        to.textOut(title)
+        y -= 14
+        _head(to, cols, y)
         y -= 10
+        n = max(1, int((y - 40 * mm) // 10) + 1)
+        _rows(to, rows[:n], rights, y)
+        y -= 10 * len(rows[:n])
+        rows = rows[n:]
+        if rows:
+            c.drawText(to)
+            c.showPage()
+            to = c.beginText()
+            y = top
+            title = "Synthèse par voie (suite)"
 
     # ---------------- Stat global BDF ----------------
     if bdf_stats is not None:
         if y < 60 * mm:
+            c.drawText(to)
             c.showPage()
-            width, height = A4
-            y = height - margin_top
+            to = c.beginText()
+            y = top
 
-        c.setFont("Helvetica-Bold", 11)
-        c.drawString(margin_left, y, "Statistiques récentes de bruit de fond")
+        to.setFont(FONT_BOLD, 11)
+        to.setTextOrigin(MARGIN_LEFT, y)
+        to.textOut("Statistiques récentes de bruit de fond")
         y -= 14
-
-        c.setFont("Helvetica-Bold", 9)
-        c.drawString(margin_left, y, "Voie")
-        c.drawString(margin_left + 20 * mm, y, "BDF moy.")
-        c.drawString(margin_left + 50 * mm, y, "BDF min.")
-        c.drawString(margin_left + 80 * mm, y, "BDF max.")
+        _head(to, COLS_STATS, y)
         y -= 10
-        c.setFont("Helvetica", 9)
 
+        rows = []
         for voie in range(1, 13):
             stats = bdf_stats.get(voie, {"avg": 0.0, "min": 0.0, "max": 0.0})
-            c.drawString(margin_left, y, f"{voie}")
-            c.drawRightString(margin_left + 45 * mm, y, f"{stats['avg']:.1f}")
-            c.drawRightString(margin_left + 75 * mm, y, f"{stats['min']:.1f}")
-            c.drawRightString(margin_left + 105 * mm, y, f"{stats['max']:.1f}")
-            y -= 10
-            if y < 40 * mm:
+            rows.append((f"{voie}", f"{stats['avg']:.1f}", f"{stats['min']:.1f}", f"{stats['max']:.1f}"))
+        while rows:
+            n = max(1, int((y - 40 * mm) // 10) + 1)
+            _rows(to, rows[:n], RIGHT_STATS, y)
+            y -= 10 * len(rows[:n])
+            rows = rows[n:]
+            if rows:
+                c.drawText(to)
                 c.showPage()
-                width, height = A4
-                y = height - margin_top
-                c.setFont("Helvetica", 9)
+                to = c.beginText()
+                to.setFont(FONT, 9)
+                y = top
+
+    c.drawText(to)
+
+    # ---------------- Profil de comptage / photo ----------------
+    if profil is not None:
+        if y - 14 - profil.height - 24 < MARGIN_BOTTOM:
+            c.showPage()
+            y = top
+        y = _draw_trace(c, profil, y)
+
+    if photo:
+        y = _draw_photo(c, photo, y)
 
     c.showPage()
     c.save()
+    return pdf_path
+
+
+def render_job(job: ReportJob) -> Optional[Path]:
+    """Rendu d'une demande capturée par ReportThread (exécuté par le pool)."""
+    return generate_rapport_pdf_v2(passage_id=job.passage_id, bdf_stats=job.bdf_stats)
+
+
+def generate_rapport_pdf_v2(
+    passage_id: Optional[int] = None,
+    bdf_stats: Optional[Dict[int, Dict[str, float]]] = None,
+) -> Optional[Path]:
+    """
+    Génère un rapport PDF V2 :
+
+      - lit 1 enregistrement de passages_v2 dans Db_GeV5.db
+      - statistiques de fond : bdf_stats si fourni (capturé au
+        déclenchement), sinon _fetch_bdf_stats()
+      - profil de comptage et photo du passage (passages_v2_profil),
+        réduits à la résolution de la page avant le rendu
+      - écrit le PDF dans RAPPORTS_DIR
+
+    Retourne le Path du PDF, ou None si aucun passage.
+    """
+    ensure_partage_structure()
+
+    db_path = str(GEV5_DB_PATH)
+    passage = _fetch_last_passage(db_path, passage_id=passage_id)
+    if passage is None:
+        print("[rapport_pdf_v2] Aucun passage trouvé dans passages_v2.")
+        return None
+
+    if bdf_stats is None:
+        bdf_stats = _fetch_bdf_stats(limit=50)
+
+    profil = _fetch_profil(db_path, passage.get("id"))
+    tr = trace(profil.curves, CHART_W, CHART_H) if profil is not None and profil.curves else None
+    photo = profil.photo if profil is not None and profil.photo and os.path.exists(profil.photo) else None
+
+    RAPPORTS_DIR.mkdir(parents=True, exist_ok=True)
+    pdf_path = render_rapport_pdf(_build_pdf_filename(passage), passage, bdf_stats, tr, photo)
 
     print(f"[rapport_pdf_v2] Rapport généré : {pdf_path}")
     return pdf_path
@@ -275,37 +440,96 @@ class ReportThread(threading.Thread):
       - ReportThread.email_send_rapport[10] -> chemin du PDF
 
     Envoi_email.py continue donc de fonctionner sans modification.
+
+    La demande est capturée (voies, statistiques de fond) et pdf_gen
+    libéré tout de suite ; le rendu se fait dans ReportPool (rapport_pool).
+    La demande est rattachée au passage en cours (RegistrePassages) et
+    n'est confiée au pool qu'une fois la ligne de ce passage écrite :
+    le rapport porte sur le passage qui a déclenché l'alarme.
     """
 
     # 1 -> trigger email ; 10 -> path fichier PDF
     email_send_rapport: Dict[int, Any] = {1: 0, 10: None}
 
+    # fin de passage (TIMEOUT_S du recorder) + écriture : au-delà, rapport
+    # sur le dernier passage en base plutôt que pas de rapport
+    ATTENTE_PASSAGE_S = 15.0
+
     def __init__(self, Nom_portique: str, Mode_sans_cellules: int,
-                 noms_detecteurs: Dict[int, str], seuil2: int, language: str) -> None:
+                 noms_detecteurs: Dict[int, str], seuil2: int, language: str,
+                 workers: int = 1, max_pending: int = 4) -> None:
         super().__init__(daemon=True)
         self.nom_portique = Nom_portique
         self.mode_sans_cellules = Mode_sans_cellules
         self.noms_detecteurs = noms_detecteurs
         self.seuil2 = seuil2
         self.language = language
+        self.pool = ReportPool(
+            render_job, on_done=self._on_report_done, workers=workers, max_pending=max_pending
+        )
+        self._attente: List[Tuple[int, ReportJob]] = []   # (n° de passage, demande)
+
+    @staticmethod
+    def _on_report_done(job: ReportJob, pdf_path: Optional[Path]) -> None:
+        if pdf_path is None:
+            return
+        ReportThread.email_send_rapport[10] = str(pdf_path)
+        ReportThread.email_send_rapport[1] = 1
+        print(f"[rapport_pdf_v2] email_send_rapport armé pour {pdf_path}")
+
+    def poll_once(self) -> Optional[ReportJob]:
+        """
+        Capture une demande pdf_gen en attente ; elle est confiée au pool
+        dès que son passage est écrit (aussitôt si aucun passage enregistré,
+        ex. mode sans cellules : dernier passage en base).
+        """
+        self._liberer_attente()
+
+        pdf_gen = AlarmeThread.pdf_gen
+        channels = tuple(i for i in range(1, 13) if pdf_gen.get(i, 0) == 1)
+        if not channels:
+            return None
 
-    def run(self) -> None:
-        while True:
-            try:
-                # Comme avant : dès qu'une voie demande un PDF -> on génère
-                if any(AlarmeThread.pdf_gen.get(i, 0) == 1 for i in range(1, 13)):
-                    pdf_path = generate_rapport_pdf_v2()
+        job = ReportJob(channels=channels, bdf_stats=FondStats.snapshot() or None)
 
-                    if pdf_path is not None:
-                        ReportThread.email_send_rapport[10] = str(pdf_path)
-                        ReportThread.email_send_rapport[1] = 1
-                        print(f"[rapport_pdf_v2] email_send_rapport armé pour {pdf_path}")
+        # Reset des flags pdf_gen (toutes voies) dès la capture
+        for i in range(1, 13):
+            if i in pdf_gen:
+                pdf_gen[i] = 0
 
-                    # Reset des flags pdf_gen (toutes voies)
-                    for i in range(1, 13):
-                        if i in AlarmeThread.pdf_gen:
-                            AlarmeThread.pdf_gen[i] = 0
+        seq = RegistrePassages.courant()
+        if seq == 0:
+            self._submit(job)
+        elif len(self._attente) >= self.pool.max_pending:
+            print("[rapport_pdf_v2] File de rapports pleine, demande ignorée.")
+        else:
+            self._attente.append((seq, job))
+            self._liberer_attente()
+        return job
+
+    def _liberer_attente(self) -> None:
+        """Confie au pool les demandes dont le passage est écrit (ou expirées)."""
+        now = time.time()
+        reste: List[Tuple[int, ReportJob]] = []
+        for seq, job in self._attente:
+            passage_id = RegistrePassages.id_de(seq)
+            if passage_id is not None:
+                self._submit(replace(job, passage_id=passage_id))
+            elif now - job.ts >= self.ATTENTE_PASSAGE_S:
+                print(f"[rapport_pdf_v2] Passage {seq} non écrit, rapport sur le dernier passage en base.")
+                self._submit(job)
+            else:
+                reste.append((seq, job))
+        self._attente = reste
+
+    def _submit(self, job: ReportJob) -> None:
+        if self.pool.submit(job) is None:
+            print("[rapport_pdf_v2] File de rapports pleine, demande ignorée.")
 
+    def run(self) -> None:
+        while True:
+            try:
+                self.poll_once()
                 time.sleep(0.1)
             except Exception as e:
                 print(f"[rapport_pdf_v2] Erreur dans ReportThread.run : {e}")
@@ -0,0 +1,93 @@
+# src/gev5/hardware/storage/rapport_pool.py
+from __future__ import annotations
+
+"""
+Génération des rapports PDF hors du thread de surveillance.
+
+ReportThread capture une demande (ReportJob : voies, statistiques de fond
+du moment) puis la dépose dans ReportPool ; les flags pdf_gen sont libérés
+immédiatement, le rendu reportlab se fait dans un worker.
+
+- file bornée (max_pending) : au-delà, la demande est ignorée et comptée
+  (les alarmes d'un même passage donnent le même rapport)
+- on_done(job, path) est appelé dans le worker à la fin du rendu
+- métriques : submitted / done / failed / dropped / pending / last_ms / max_ms
+
+Workers = threads : le rendu d'un rapport est court et un process fils
+réimporterait les modules hardware (effets de bord au chargement).
+"""
+
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable, Dict, Optional, Tuple
+
+
+@dataclass(frozen=True)
+class ReportJob:
+    """Demande de rapport, figée au déclenchement."""
+    channels: Tuple[int, ...]
+    ts: float = field(default_factory=time.time)
+    passage_id: Optional[int] = None        # None : dernier passage en base
+    bdf_stats: Optional[Dict[int, Dict[str, float]]] = None
+
+
+class ReportPool:
+    def __init__(
+        self,
+        render: Callable[[ReportJob], Optional[Path]],
+        on_done: Optional[Callable[[ReportJob, Optional[Path]], None]] = None,
+        workers: int = 1,
+        max_pending: int = 4,
+    ) -> None:
+        self._render = render
+        self._on_done = on_done
+        self.max_pending = max(1, int(max_pending))
+        self._executor = ThreadPoolExecutor(max_workers=max(1, int(workers)), thread_name_prefix="Rapport")
+        self._lock = threading.Lock()
+        self.metrics: Dict[str, float] = {
+            "submitted": 0, "done": 0, "failed": 0, "dropped": 0,
+            "pending": 0, "last_ms": 0.0, "max_ms": 0.0,
+        }
+
+    def submit(self, job: ReportJob) -> Optional[Future]:
+        """Dépose la demande ; None si la file est pleine (demande ignorée)."""
+        with self._lock:
+            if self.metrics["pending"] >= self.max_pending:
+                self.metrics["dropped"] += 1
+                return None
+            self.metrics["pending"] += 1
+            self.metrics["submitted"] += 1
+        return self._executor.submit(self._run, job)
+
+    def _run(self, job: ReportJob) -> Optional[Path]:
+        t0 = time.perf_counter()
+        path: Optional[Path] = None
+        try:
+            path = self._render(job)
+        except Exception as e:
+            print(f"[rapport_pdf_v2] Erreur génération rapport : {e}")
+            with self._lock:
+                self.metrics["failed"] += 1
+        else:
+            if self._on_done is not None:
+                self._on_done(job, path)
+            with self._lock:
+                self.metrics["done"] += 1
+        finally:
+            dt_ms = (time.perf_counter() - t0) * 1000.0
+            with self._lock:
+                self.metrics["pending"] -= 1
+                self.metrics["last_ms"] = dt_ms
+                if dt_ms > self.metrics["max_ms"]:
+                    self.metrics["max_ms"] = dt_ms
+        return path
+
+    def get_metrics(self) -> Dict[str, float]:
+        with self._lock:
+            return dict(self.metrics)
+
+    def shutdown(self, wait: bool = True) -> None:
+        self._executor.shutdown(wait=wait)
@@ -0,0 +1,61 @@
+# src/gev5/hardware/storage/registre_passages.py
+from __future__ import annotations
+
+"""
+Numérotation des passages et id passages_v2 une fois la ligne écrite.
+
+La ligne d'un passage n'est écrite qu'au STOP, de façon asynchrone
+(sqlite_pool) ; une alarme, elle, se déclenche pendant le passage. Pour
+que le rapport porte sur CE passage (et non sur la dernière ligne déjà en
+base, celle du véhicule précédent) :
+
+- PassageRecorderV2 ouvre un numéro au START (debut) puis publie l'id
+  renvoyé par l'écrivain (ecrit)
+- ReportThread rattache la demande au numéro courant (courant) et ne la
+  confie au pool qu'une fois l'id connu (id_de)
+"""
+
+import threading
+from collections import OrderedDict
+from typing import Optional
+
+
+class RegistrePassages:
+    MAX_IDS = 64        # numéros récents conservés (rapports en attente)
+
+    _lock = threading.Lock()
+    _seq = 0
+    _ids: "OrderedDict[int, int]" = OrderedDict()
+
+    @classmethod
+    def debut(cls) -> int:
+        """Nouveau passage ; renvoie son numéro (≥ 1)."""
+        with cls._lock:
+            cls._seq += 1
+            return cls._seq
+
+    @classmethod
+    def courant(cls) -> int:
+        """Passage en cours ou dernier passage ; 0 si aucun depuis le démarrage."""
+        with cls._lock:
+            return cls._seq
+
+    @classmethod
+    def ecrit(cls, seq: int, passage_id: int) -> None:
+        """Ligne passages_v2 du passage `seq` écrite (appelé par l'écrivain)."""
+        with cls._lock:
+            cls._ids[seq] = int(passage_id)
+            while len(cls._ids) > cls.MAX_IDS:
+                cls._ids.popitem(last=False)
+
+    @classmethod
+    def id_de(cls, seq: int) -> Optional[int]:
+        """Id passages_v2 du passage `seq`, None tant qu'il n'est pas écrit."""
+        with cls._lock:
+            return cls._ids.get(seq)
+
+    @classmethod
+    def reset(cls) -> None:
+        with cls._lock:
+            cls._seq = 0
+            cls._ids.clear()
@@ -0,0 +1,317 @@
+# src/gev5/hardware/storage/schema.py
+from __future__ import annotations
+
+"""
+Schéma et migrations des bases V2 (passages_v2, bdf_history).
+
+La version du schéma est portée par `PRAGMA user_version` de chaque base ;
+migrate_*() applique dans l'ordre les étapes manquantes et peut être
+rappelée sans effet (au démarrage de chaque writer).
+
+Version 2 :
+- horodatages en entier epoch (secondes UTC) à côté des colonnes TEXT
+  historiques : passages_v2.ts_start_epoch / ts_end_epoch,
+  bdf_history.ts_epoch
+- passages_v2.alarm_any (1 si au moins une voie en alarme)
+- index sur les epochs + index partiel sur les passages en alarme :
+  les requêtes "N derniers" et par plage restent en O(log n)
+- remplissage des lignes existantes par tranches (une transaction par
+  tranche : le writer ne garde pas la base verrouillée des minutes)
+
+Version 3 (passages) :
+- table passages_v2_profil (1 ligne par passage, clé = passages_v2.id) :
+  profil de comptage compressé (profil.py) et chemin de la photo ; à part
+  pour que les SELECT * sur passages_v2 ne chargent pas les blobs
+
+Version 4 (passages) :
+- mesure de vitesse à partir des fronts datés à la source
+  (core.vitesse.estimation) : passages_v2.sens, longueur_m,
+  vitesse_qualite (ok / degradee / invalide), vitesse_source (ws, rest,
+  bus...), vitesse_incertitude (km/h) ; NULL pour les passages antérieurs
+
+Version 3 (bdf) :
+- tables d'agrégats bdf_5m / bdf_1h (min / moyenne / max par voie, n
+  mesures), clé = début de tranche epoch ; alimentées ligne à ligne par
+  le collecteur (bdf_tiers.rollup_rows), remplies ici depuis bdf_history
+  par tranches de 7 jours
+
+Requêtes indexées : passages_between(), last_bdf() ; lecture par palier
+dans bdf_tiers.
+"""
+
+import sqlite3
+from typing import Any, Callable, List, Optional, Sequence, Tuple
+
+BACKFILL_CHUNK = 5000
+ROLLUP_CHUNK_S = 7 * 86400
+
+CHANNELS = range(1, 13)
+
+# paliers d'agrégation du bruit de fond : (table, pas en s)
+BDF_RAW_STEP_S = 30
+BDF_ROLLUPS: Tuple[Tuple[str, int], ...] = (("bdf_5m", 300), ("bdf_1h", 3600))
+
+CREATE_PASSAGES_V2 = """
+    CREATE TABLE IF NOT EXISTS passages_v2 (
+        id          INTEGER PRIMARY KEY AUTOINCREMENT,
+        ts_start    TEXT,
+        ts_end      TEXT,
+        duration_s  REAL,
+        bdf1        REAL, bdf2 REAL, bdf3 REAL, bdf4 REAL,
+        bdf5        REAL, bdf6 REAL, bdf7 REAL, bdf8 REAL,
+        bdf9        REAL, bdf10 REAL, bdf11 REAL, bdf12 REAL,
+        max1        REAL, max2 REAL, max3 REAL, max4 REAL,
+        max5        REAL, max6 REAL, max7 REAL, max8 REAL,
+        max9        REAL, max10 REAL, max11 REAL, max12 REAL,
+        alarm1      INTEGER, alarm2 INTEGER, alarm3 INTEGER, alarm4 INTEGER,
+        alarm5      INTEGER, alarm6 INTEGER, alarm7 INTEGER, alarm8 INTEGER,
+        alarm9      INTEGER, alarm10 INTEGER, alarm11 INTEGER, alarm12 INTEGER,
+        defaut1     INTEGER, defaut2 INTEGER, defaut3 INTEGER, defaut4 INTEGER,
+        defaut5     INTEGER, defaut6 INTEGER, defaut7 INTEGER, defaut8 INTEGER,
+        defaut9     INTEGER, defaut10 INTEGER, defaut11 INTEGER, defaut12 INTEGER,
+        vitesse     REAL,
+        comment     TEXT
+    )
+"""
+
+CREATE_BDF_HISTORY = """
+    CREATE TABLE IF NOT EXISTS bdf_history (
+        timestamp   TEXT,
+        bdf1        REAL,
+        bdf2        REAL,
+        bdf3        REAL,
+        bdf4        REAL,
+        bdf5        REAL,
+        bdf6        REAL,
+        bdf7        REAL,
+        bdf8        REAL,
+        bdf9        REAL,
+        bdf10       REAL,
+        bdf11       REAL,
+        bdf12       REAL
+    )
+"""
+
+# texte local "AAAA-MM-JJ HH:MM:SS" → epoch UTC (NULL si illisible)
+_EPOCH = "CAST(strftime('%s', {col}, 'utc') AS INTEGER)"
+_ALARM_ANY = "(" + " OR ".join(f"COALESCE(alarm{i}, 0) > 0" for i in range(1, 13)) + ")"
+
+Migration = Callable[[sqlite3.Connection], None]
+
+
+# --------------------------------------------------------------------------- #
+# Outils
+# --------------------------------------------------------------------------- #
+def _commit(conn: sqlite3.Connection) -> None:
+    if conn.in_transaction:
+        conn.execute("COMMIT")
+
+
+def _columns(conn: sqlite3.Connection, table: str) -> List[str]:
+    return [r[1] for r in conn.execute(f"PRAGMA table_info({table})")]
+
+
+def _add_column(conn: sqlite3.Connection, table: str, col: str, decl: str) -> None:
+    if col not in _columns(conn, table):
+        conn.execute(f"ALTER TABLE {table} ADD COLUMN {col} {decl}")
+
+
+def _backfill(conn: sqlite3.Connection, table: str, assign: str, chunk: int = BACKFILL_CHUNK) -> int:
+    """
+    UPDATE table SET <assign> par tranches de rowid, une transaction par
+    tranche. Reprend sans dommage après une interruption.
+    """
+    lo, hi = conn.execute(f"SELECT MIN(rowid), MAX(rowid) FROM {table}").fetchone()
+    if lo is None:
+        return 0
+    done = 0
+    start = lo
+    while start <= hi:
+        conn.execute("BEGIN")
+        done += conn.execute(
+            f"UPDATE {table} SET {assign} WHERE rowid >= ? AND rowid < ?",
+            (start, start + chunk),
+        ).rowcount
+        conn.execute("COMMIT")
+        start += chunk
+    return done
+
+
+def schema_version(conn: sqlite3.Connection) -> int:
+    return int(conn.execute("PRAGMA user_version").fetchone()[0])
+
+
+def apply_migrations(conn: sqlite3.Connection, migrations: Sequence[Migration], name: str = "") -> int:
+    """
+    Applique migrations[v:] (v = user_version courant) ; la version est
+    enregistrée après chaque étape. Retourne la version finale.
+    """
+    _commit(conn)
+    version = schema_version(conn)
+    for target in range(version + 1, len(migrations) + 1):
+        migrations[target - 1](conn)
+        _commit(conn)
+        conn.execute(f"PRAGMA user_version = {target}")
+        print(f"[DB_SCHEMA] {name} : schéma v{target}")
+    return max(version, len(migrations))
+
+
+# --------------------------------------------------------------------------- #
+# passages_v2 (Db_GeV5.db)
+# --------------------------------------------------------------------------- #
+def _passages_v1(conn: sqlite3.Connection) -> None:
+    conn.execute(CREATE_PASSAGES_V2)
+
+
+def _passages_v2(conn: sqlite3.Connection) -> None:
+    _add_column(conn, "passages_v2", "ts_start_epoch", "INTEGER")
+    _add_column(conn, "passages_v2", "ts_end_epoch", "INTEGER")
+    _add_column(conn, "passages_v2", "alarm_any", "INTEGER NOT NULL DEFAULT 0")
+    _backfill(
+        conn,
+        "passages_v2",
+        f"ts_start_epoch = {_EPOCH.format(col='ts_start')}, "
+        f"ts_end_epoch = {_EPOCH.format(col='ts_end')}, "
+        f"alarm_any = {_ALARM_ANY}",
+    )
+    conn.execute(
+        "CREATE INDEX IF NOT EXISTS idx_passages_v2_ts_start "
+        "ON passages_v2 (ts_start_epoch)"
+    )
+    conn.execute(
+        "CREATE INDEX IF NOT EXISTS idx_passages_v2_alarm "
+        "ON passages_v2 (ts_start_epoch) WHERE alarm_any = 1"
+    )
+
+
+CREATE_PASSAGES_PROFIL = """
+    CREATE TABLE IF NOT EXISTS passages_v2_profil (
+        passage_id  INTEGER PRIMARY KEY REFERENCES passages_v2 (id),
+        sample_s    REAL,
+        n           INTEGER,
+        profil      BLOB,
+        photo       TEXT
+    )
+"""
+
+
+def _passages_v3(conn: sqlite3.Connection) -> None:
+    conn.execute(CREATE_PASSAGES_PROFIL)
+
+
+PASSAGES_VITESSE_COLUMNS: Tuple[Tuple[str, str], ...] = (
+    ("sens", "TEXT"),
+    ("longueur_m", "REAL"),
+    ("vitesse_qualite", "TEXT"),
+    ("vitesse_source", "TEXT"),
+    ("vitesse_incertitude", "REAL"),
+)
+
+
+def _passages_v4(conn: sqlite3.Connection) -> None:
+    for col, decl in PASSAGES_VITESSE_COLUMNS:
+        _add_column(conn, "passages_v2", col, decl)
+
+
+PASSAGES_MIGRATIONS: Tuple[Migration, ...] = (_passages_v1, _passages_v2, _passages_v3, _passages_v4)
+
+
+def migrate_passages(conn: sqlite3.Connection) -> int:
+    return apply_migrations(conn, PASSAGES_MIGRATIONS, "passages_v2")
+
+
+def passages_between(
+    conn: sqlite3.Connection,
+    t0: Optional[float] = None,
+    t1: Optional[float] = None,
+    alarm_only: bool = False,
+    limit: Optional[int] = None,
+) -> List[Any]:
+    """
+    Passages avec t0 <= ts_start_epoch < t1, du plus récent au plus ancien.
+    alarm_only → index partiel idx_passages_v2_alarm.
+    """
+    sql = "SELECT * FROM passages_v2 WHERE ts_start_epoch >= ? AND ts_start_epoch < ?"
+    params: List[Any] = [int(t0) if t0 is not None else 0, int(t1) if t1 is not None else 1 << 62]
+    if alarm_only:
+        sql += " AND alarm_any = 1"
+    sql += " ORDER BY ts_start_epoch DESC"
+    if limit is not None:
+        sql += " LIMIT ?"
+        params.append(int(limit))
+    return conn.execute(sql, params).fetchall()
+
+
+# --------------------------------------------------------------------------- #
+# bdf_history (Bruit_de_fond.db)
+# --------------------------------------------------------------------------- #
+def _bdf_v1(conn: sqlite3.Connection) -> None:
+    conn.execute(CREATE_BDF_HISTORY)
+
+
+def _bdf_v2(conn: sqlite3.Connection) -> None:
+    _add_column(conn, "bdf_history", "ts_epoch", "INTEGER")
+    _backfill(conn, "bdf_history", f"ts_epoch = {_EPOCH.format(col='timestamp')}")
+    conn.execute(
+        "CREATE INDEX IF NOT EXISTS idx_bdf_history_ts "
+        "ON bdf_history (ts_epoch)"
+    )
+
+
+def create_rollup_sql(table: str) -> str:
+    cols = ", ".join(
+        f"{kind}{i} REAL" for kind in ("min", "avg", "max") for i in CHANNELS
+    )
+    return (
+        f"CREATE TABLE IF NOT EXISTS {table} ("
+        f"bucket INTEGER PRIMARY KEY, n INTEGER NOT NULL, {cols})"
+    )
+
+
+def _rollup_from_raw(conn: sqlite3.Connection, table: str, step: int) -> None:
+    """Agrégats de bdf_history → table, par tranches alignées de 7 jours."""
+    lo, hi = conn.execute("SELECT MIN(ts_epoch), MAX(ts_epoch) FROM bdf_history").fetchone()
+    if lo is None:
+        return
+    aggs = ", ".join(
+        f"{fn}(bdf{i})" for fn in ("MIN", "AVG", "MAX") for i in CHANNELS
+    )
+    sql = (
+        f"INSERT OR REPLACE INTO {table} "
+        f"SELECT (ts_epoch / {step}) * {step}, COUNT(*), {aggs} "
+        f"FROM bdf_history WHERE ts_epoch >= ? AND ts_epoch < ? GROUP BY 1"
+    )
+    start = (lo // ROLLUP_CHUNK_S) * ROLLUP_CHUNK_S
+    while start <= hi:
+        conn.execute("BEGIN")
+        conn.execute(sql, (start, start + ROLLUP_CHUNK_S))
+        conn.execute("COMMIT")
+        start += ROLLUP_CHUNK_S
+
+
+def _bdf_v3(conn: sqlite3.Connection) -> None:
+    for table, step in BDF_ROLLUPS:
+        conn.execute(create_rollup_sql(table))
+        _rollup_from_raw(conn, table, step)
+
+
+BDF_MIGRATIONS: Tuple[Migration, ...] = (_bdf_v1, _bdf_v2, _bdf_v3)
+
+
+def migrate_bdf(conn: sqlite3.Connection) -> int:
+    return apply_migrations(conn, BDF_MIGRATIONS, "bdf_history")
+
+
+SELECT_LAST_BDF = """
+    SELECT timestamp,
+           bdf1, bdf2, bdf3, bdf4, bdf5, bdf6,
+           bdf7, bdf8, bdf9, bdf10, bdf11, bdf12
+    FROM bdf_history
+    ORDER BY ts_epoch DESC
+    LIMIT ?
+"""
+
+
+def last_bdf(conn: sqlite3.Connection, limit: int = 50) -> List[Any]:
+    """N dernières lignes (timestamp, bdf1..bdf12), via idx_bdf_history_ts."""
+    return conn.execute(SELECT_LAST_BDF, (int(limit),)).fetchall()
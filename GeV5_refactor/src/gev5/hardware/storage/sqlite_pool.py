@@ -0,0 +1,439 @@
+# src/gev5/hardware/storage/sqlite_pool.py
+from __future__ import annotations
+
+"""
+Couche de stockage SQLite partagée.
+
+- UNE connexion longue durée par base pour les écritures, détenue par un
+  thread écrivain dédié (SqliteWriter) : les threads temps réel déposent
+  leurs requêtes dans une file et ne touchent jamais le disque.
+- Écriture différée par lots (taille ou délai), file bornée, métriques
+  (get_metrics / writers_metrics), vidage à l'arrêt du process (atexit).
+- Connexions de lecture par thread (read_connection), mêmes PRAGMA.
+- PRAGMA : journal_mode=WAL, synchronous=NORMAL, busy_timeout.
+- Requêtes préparées : le cache de statements de sqlite3 (cached_statements)
+  réutilise la requête compilée tant que le texte SQL est identique.
+
+Usage :
+    w = get_writer(GEV5_DB_PATH)
+    w.execute("INSERT INTO t VALUES (?, ?)", (a, b))      # non bloquant
+    w.call(lambda conn: conn.execute(...)).result()       # init / migration
+"""
+
+import atexit
+import os
+import sqlite3
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+from pathlib import Path
+from typing import Any, Callable, Deque, Dict, Iterable, List, Optional, Sequence, Tuple, Union
+
+BUSY_TIMEOUT_MS = 5000
+CACHED_STATEMENTS = 128
+
+PathLike = Union[str, Path]
+
+
+def _db_id(path: PathLike) -> str:
+    try:
+        return os.path.abspath(str(path))
+    except Exception:
+        return str(path)
+
+
+def open_connection(path: PathLike) -> sqlite3.Connection:
+    """Connexion configurée (WAL, synchronous=NORMAL, busy_timeout)."""
+    conn = sqlite3.connect(
+        str(path),
+        timeout=BUSY_TIMEOUT_MS / 1000.0,
+        check_same_thread=False,
+        cached_statements=CACHED_STATEMENTS,
+    )
+    conn.execute("PRAGMA journal_mode=WAL;")
+    conn.execute("PRAGMA synchronous=NORMAL;")
+    conn.execute(f"PRAGMA busy_timeout={BUSY_TIMEOUT_MS};")
+    conn.execute("PRAGMA temp_store=MEMORY;")
+    return conn
+
+
+# --------------------------------------------------------------------------- #
+# Écrivain unique par base (write-behind par lots)
+# --------------------------------------------------------------------------- #
+_TRANSIENT = ("locked", "busy", "disk i/o", "disk is full", "unable to open")
+
+
+def _is_transient(e: sqlite3.OperationalError) -> bool:
+    """Erreur liée au support (verrou, carte SD...) plutôt qu'à la requête."""
+    msg = str(e).lower()
+    return any(t in msg for t in _TRANSIENT)
+
+
+class _Op:
+    __slots__ = ("kind", "sql", "params", "fut", "done")
+
+    def __init__(self, kind: str, sql: Any, params: Any, fut: Optional[Future]) -> None:
+        self.kind = kind        # "one" | "many" | "call"
+        self.sql = sql          # texte SQL, ou callable pour "call"
+        self.params = params
+        self.fut = fut
+        self.done = False       # déjà validée (un "call" a fait COMMIT après elle)
+
+    def fail(self, reason: str) -> None:
+        """Opération abandonnée : l'appelant qui attend .result() est libéré."""
+        if self.fut is not None and not self.fut.done():
+            self.fut.set_exception(RuntimeError(reason))
+
+
+class SqliteWriter(threading.Thread):
+    """
+    Thread écrivain d'une base : file en mémoire + écriture par lots.
+
+    - execute(sql, params)   : dépose une ligne, ne bloque jamais
+    - executemany(sql, rows) : idem, plusieurs lignes
+    - call(fn)               : fn(conn) exécutée dans le thread écrivain,
+                               dans l'ordre de la file → Future
+
+    Le thread se réveille quand `batch_size` opérations sont en attente ou
+    `flush_interval_s` après la première ; il vide la file en UNE
+    transaction (les INSERT consécutifs identiques passent en executemany).
+
+    Si le disque bloque (OperationalError : I/O, verrou...), le lot est
+    remis en tête de file et retenté avec un délai croissant. La file est
+    bornée à `max_pending` opérations : au-delà, les plus anciennes sont
+    abandonnées (compteur `dropped`) plutôt que de bloquer un producteur.
+    Toute opération abandonnée (file saturée, arrêt du thread) voit sa
+    Future échouer en RuntimeError.
+    """
+
+    def __init__(
+        self,
+        db_path: PathLike,
+        batch_size: int = 200,
+        flush_interval_s: float = 1.0,
+        max_pending: int = 50_000,
+    ) -> None:
+        super().__init__(name=f"SqliteWriter[{Path(str(db_path)).name}]", daemon=True)
+        self.db_path = str(db_path)
+        self.batch_size = max(1, int(batch_size))
+        self.flush_interval_s = float(flush_interval_s)
+        self.max_pending = max(1, int(max_pending))
+
+        self._pending: Deque[_Op] = deque()
+        self._cv = threading.Condition()
+        self._first_pending_at: Optional[float] = None
+        self._stopping = False
+        self._closed = False
+        self._conn: Optional[sqlite3.Connection] = None
+
+        self.metrics: Dict[str, float] = {
+            "enqueued": 0, "written": 0, "batches": 0, "dropped": 0,
+            "errors": 0, "retries": 0, "pending": 0, "pending_max": 0,
+            "last_batch_rows": 0, "last_batch_ms": 0.0, "max_batch_ms": 0.0,
+        }
+
+    @property
+    def errors(self) -> int:
+        return int(self.metrics["errors"])
+
+    # ------------------------------------------------------------------ #
+    # API producteurs (tous threads)
+    # ------------------------------------------------------------------ #
+    def _put(self, op: _Op) -> None:
+        with self._cv:
+            if self._closed:
+                self.metrics["dropped"] += 1
+                op.fail("écrivain arrêté")
+                return
+            if len(self._pending) >= self.max_pending:
+                self._pending.popleft().fail("file d'écriture saturée")
+                self.metrics["dropped"] += 1
+            self._pending.append(op)
+            n = len(self._pending)
+            self.metrics["enqueued"] += 1
+            self.metrics["pending"] = n
+            if n > self.metrics["pending_max"]:
+                self.metrics["pending_max"] = n
+            if self._first_pending_at is None:
+                self._first_pending_at = time.monotonic()
+            if n >= self.batch_size or op.kind == "call" or op.fut is not None:
+                self._cv.notify()
+
+    def execute(self, sql: str, params: Sequence[Any] = (), wait: bool = False) -> Optional[Future]:
+        fut: Optional[Future] = Future() if wait else None
+        self._put(_Op("one", sql, tuple(params), fut))
+        return fut
+
+    def executemany(self, sql: str, rows: Iterable[Sequence[Any]], wait: bool = False) -> Optional[Future]:
+        fut: Optional[Future] = Future() if wait else None
+        self._put(_Op("many", sql, [tuple(r) for r in rows], fut))
+        return fut
+
+    def call(self, fn: Callable[[sqlite3.Connection], Any]) -> Future:
+        fut: Future = Future()
+        self._put(_Op("call", fn, None, fut))
+        return fut
+
+    def flush(self, timeout: Optional[float] = 5.0) -> bool:
+        """Force l'écriture de ce qui est en attente ; True si la file est vide."""
+        try:
+            self.call(lambda conn: None).result(timeout)
+            return True
+        except Exception:
+            return False
+
+    def stop(self, timeout: Optional[float] = 5.0) -> None:
+        """Termine après avoir vidé la file."""
+        with self._cv:
+            self._stopping = True
+            self._cv.notify()
+        if self.is_alive():
+            self.join(timeout)
+
+    def get_metrics(self) -> Dict[str, float]:
+        with self._cv:
+            return dict(self.metrics)
+
+    # ------------------------------------------------------------------ #
+    # Thread écrivain
+    # ------------------------------------------------------------------ #
+    def _take_batch(self) -> List[_Op]:
+        """Attend un déclencheur (taille / délai / arrêt) puis prend la file."""
+        with self._cv:
+            while True:
+                n = len(self._pending)
+                if self._stopping:
+                    break
+                if n:
+                    urgent = any(op.kind == "call" or op.fut is not None for op in self._pending)
+                    age = time.monotonic() - (self._first_pending_at or 0.0)
+                    if urgent or n >= self.batch_size or age >= self.flush_interval_s:
+                        break
+                    self._cv.wait(self.flush_interval_s - age)
+                else:
+                    self._cv.wait()
+            batch = list(self._pending)
+            self._pending.clear()
+            self._first_pending_at = None
+            self.metrics["pending"] = 0
+            return batch
+
+    def _requeue(self, batch: List[_Op]) -> None:
+        """Lot non écrit → remis en tête (dans la limite de max_pending)."""
+        with self._cv:
+            self._pending.extendleft(reversed([op for op in batch if not op.done]))
+            while len(self._pending) > self.max_pending:
+                self._pending.popleft().fail("file d'écriture saturée")
+                self.metrics["dropped"] += 1
+            self.metrics["pending"] = len(self._pending)
+            if self._first_pending_at is None:
+                self._first_pending_at = time.monotonic()
+
+    def _write_batch(self, batch: List[_Op]) -> List[Tuple[Optional[Future], Any]]:
+        """
+        Écrit le lot en une transaction. Les "call" sont exécutés à leur
+        place dans l'ordre. Retourne les résultats à publier aux Futures.
+        """
+        conn = self._conn
+        assert conn is not None
+        results: List[Tuple[Optional[Future], Any]] = []
+        i = 0
+        conn.execute("BEGIN")
+        try:
+            while i < len(batch):
+                op = batch[i]
+                if op.kind == "call":
+                    results.append((op.fut, op.sql(conn)))
+                    i += 1
+                    if not conn.in_transaction:
+                        # le "call" a validé lui-même : tout ce qui précède est
+                        # écrit, un échec plus loin ne doit pas le rejouer
+                        for prev in batch[:i]:
+                            prev.done = True
+                        self._publish(results)
+                        results = []
+                        conn.execute("BEGIN")
+                    continue
+                if op.kind == "many":
+                    conn.executemany(op.sql, op.params)
+                    results.append((op.fut, None))
+                    i += 1
+                    continue
+                # INSERT consécutifs identiques sans Future → executemany
+                j = i
+                while (
+                    j < len(batch) and batch[j].kind == "one"
+                    and batch[j].sql == op.sql and batch[j].fut is None
+                ):
+                    j += 1
+                if j - i > 1:
+                    conn.executemany(op.sql, [b.params for b in batch[i:j]])
+                    i = j
+                else:
+                    results.append((op.fut, conn.execute(op.sql, op.params).lastrowid))
+                    i += 1
+            if conn.in_transaction:
+                conn.execute("COMMIT")
+        except Exception:
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+            raise
+        return results
+
+    @staticmethod
+    def _publish(results: List[Tuple[Optional[Future], Any]]) -> None:
+        for fut, res in results:
+            if fut is not None:
+                fut.set_result(res)
+
+    def _rows(self, batch: List[_Op]) -> int:
+        return sum(len(op.params) if op.kind == "many" else (op.kind == "one") for op in batch)
+
+    def run(self) -> None:
+        self._conn = open_connection(self.db_path)
+        self._conn.isolation_level = None      # transactions explicites
+        backoff = 0.05
+        try:
+            while True:
+                batch = self._take_batch()
+                if not batch:
+                    if self._stopping:
+                        break
+                    continue
+
+                t0 = time.perf_counter()
+                try:
+                    results = self._write_batch(batch)
+                except sqlite3.OperationalError as e:
+                    if not _is_transient(e):
+                        if not self._replay_one_by_one(batch, e):
+                            time.sleep(backoff)
+                            backoff = min(backoff * 2, 5.0)
+                        continue
+                    # disque lent / verrou / I/O : on garde le lot et on réessaie
+                    with self._cv:
+                        self.metrics["retries"] += 1
+                    print(f"[SQLITE] {Path(self.db_path).name} écriture différée : {e}")
+                    self._requeue(batch)
+                    if self._stopping and backoff >= 2.0:
+                        print(f"[SQLITE] {Path(self.db_path).name} arrêt : {len(self._pending)} opérations perdues")
+                        break
+                    time.sleep(backoff)
+                    backoff = min(backoff * 2, 5.0)
+                    continue
+                except Exception as e:
+                    # erreur de requête : le lot est rejoué opération par opération
+                    if not self._replay_one_by_one(batch, e):
+                        time.sleep(backoff)
+                        backoff = min(backoff * 2, 5.0)
+                    continue
+
+                backoff = 0.05
+                dt_ms = (time.perf_counter() - t0) * 1000.0
+                with self._cv:
+                    self.metrics["batches"] += 1
+                    self.metrics["written"] += self._rows(batch)
+                    self.metrics["last_batch_rows"] = self._rows(batch)
+                    self.metrics["last_batch_ms"] = dt_ms
+                    if dt_ms > self.metrics["max_batch_ms"]:
+                        self.metrics["max_batch_ms"] = dt_ms
+                self._publish(results)
+        finally:
+            with self._cv:
+                self._closed = True
+                lost = list(self._pending)
+                self._pending.clear()
+                self.metrics["dropped"] += len(lost)
+                self.metrics["pending"] = 0
+            for op in lost:
+                op.fail("écrivain arrêté")
+            self._conn.close()
+            self._conn = None
+
+    def _replay_one_by_one(self, batch: List[_Op], first_error: Exception) -> bool:
+        """
+        Isole l'opération fautive : les autres sont écrites normalement.
+        Les opérations déjà validées par un "call" ne sont pas rejouées.
+        Retourne False si une erreur transitoire a remis le reste en file.
+        """
+        print(f"[SQLITE] {Path(self.db_path).name} lot rejeté ({first_error}), rejeu unitaire")
+        for k, op in enumerate(batch):
+            if op.done:
+                with self._cv:
+                    self.metrics["written"] += self._rows([op])
+                continue
+            try:
+                results = self._write_batch([op])
+            except Exception as e:
+                if isinstance(e, sqlite3.OperationalError) and _is_transient(e):
+                    # support indisponible : ce n'est pas la requête, on réessaie
+                    with self._cv:
+                        self.metrics["retries"] += 1
+                    print(f"[SQLITE] {Path(self.db_path).name} écriture différée : {e}")
+                    self._requeue(batch[k:])
+                    return False
+                with self._cv:
+                    self.metrics["errors"] += 1
+                print(f"[SQLITE] {Path(self.db_path).name} erreur écriture : {e}")
+                if op.fut is not None:
+                    op.fut.set_exception(e)
+                continue
+            with self._cv:
+                self.metrics["written"] += self._rows([op])
+            self._publish(results)
+        return True
+
+
+_WRITERS: Dict[str, SqliteWriter] = {}
+_WRITERS_LOCK = threading.Lock()
+
+
+def get_writer(db_path: PathLike) -> SqliteWriter:
+    """Écrivain (démarré) de la base ; un seul par chemin absolu."""
+    key = _db_id(db_path)
+    with _WRITERS_LOCK:
+        w = _WRITERS.get(key)
+        if w is None or not w.is_alive():
+            w = SqliteWriter(key)
+            w.start()
+            _WRITERS[key] = w
+        return w
+
+
+def stop_all_writers(timeout: Optional[float] = 5.0) -> None:
+    """Vide et arrête tous les écrivains (arrêt propre)."""
+    with _WRITERS_LOCK:
+        writers = list(_WRITERS.values())
+        _WRITERS.clear()
+    for w in writers:
+        w.stop(timeout)
+
+
+def writers_metrics() -> Dict[str, Dict[str, float]]:
+    """Métriques de file par base (nom de fichier → compteurs)."""
+    with _WRITERS_LOCK:
+        writers = list(_WRITERS.values())
+    return {Path(w.db_path).name: w.get_metrics() for w in writers}
+
+
+# les threads écrivains sont "daemon" : on vide les files avant la sortie
+atexit.register(stop_all_writers)
+
+
+# --------------------------------------------------------------------------- #
+# Lecture : une connexion par (thread, base)
+# --------------------------------------------------------------------------- #
+_LOCAL = threading.local()
+
+
+def read_connection(db_path: PathLike) -> sqlite3.Connection:
+    """Connexion de lecture réutilisée par le thread appelant."""
+    conns: Dict[str, sqlite3.Connection] = getattr(_LOCAL, "conns", None) or {}
+    _LOCAL.conns = conns
+    key = _db_id(db_path)
+    conn = conns.get(key)
+    if conn is None:
+        conn = open_connection(key)
+        conns[key] = conn
+    return conn
@@ -2,10 +2,13 @@ from __future__ import annotations
 
 import threading
 import time
-from typing import Dict
+from typing import Dict, Optional
 
+from .cell_edges import PassageFronts
 from .passage import PassageService
+from .passage_bus import STOP, PassageBus, Subscription
 from ..core.alarmes.alarmes import AlarmeThread
+from ..core.vitesse.estimation import MesureVitesse
 
 
 class ListWatcher(threading.Thread):
@@ -13,6 +16,10 @@ class ListWatcher(threading.Thread):
     V2 — Surveille les cellules S1/S2 via PassageService et estime la vitesse
     de passage + le sens de circulation.
 
+    Avec un bus de passage : fronts S1/S2 (montants et descendants) datés
+    à la source (cell_edges), mesure à la fin du passage
+    (core.vitesse.estimation) : vitesse, sens, longueur, qualité.
+
     - distance_cellules : distance (en mètres) entre S1 et S2
     - mode_sans_cellules (mss) :
         1 -> pas de cellules, on ne calcule pas de vitesse
@@ -21,15 +28,29 @@ class ListWatcher(threading.Thread):
     Expose :
       - ListWatcher.vitesse[1]  : vitesse en km/h ou message ("Vitesse N.A.", "Pas de vitesse mesurée", "Defaut vitesse")
       - ListWatcher.vitesse[10] : sens détecté ("1 -> 2", "2 -> 1", "Pas de détection de sens")
+      - ListWatcher.mesure[1]   : dernière MesureVitesse complète (avec bus)
     """
 
     vitesse: Dict[int, str | float] = {1: "Vitesse N.A.", 10: "Pas de détection de sens"}
-
-    def __init__(self, distance_cellules: float, mode_sans_cellules: int, passage_service: PassageService) -> None:
+    mesure: Dict[int, Optional[MesureVitesse]] = {1: None}
+
+    def __init__(
+        self,
+        distance_cellules: float,
+        mode_sans_cellules: int,
+        passage_service: PassageService,
+        bus: Optional[PassageBus] = None,
+    ) -> None:
         super().__init__(name="ListWatcher_Vitesse")
         self.distance_cellules = float(distance_cellules)
         self.mss = int(mode_sans_cellules)
         self.passage_service = passage_service
+        self.bus = bus
+        # abonnement dès la construction : aucun front perdu si le bus
+        # démarre avant run()
+        self._sub: Optional[Subscription] = None
+        if bus is not None and self.mss == 0:
+            self._sub = bus.subscribe("vitesse", kinds=(STOP,) + PassageFronts.KINDS)
 
         self.time_cellule1: float | None = None
         self.time_cellule2: float | None = None
@@ -66,17 +87,89 @@ class ListWatcher(threading.Thread):
         """
         return list(AlarmeThread.alarme_resultat.values())
 
+    def _publier(self, m: MesureVitesse) -> None:
+        """Mesure de fin de passage → ListWatcher.vitesse (mêmes messages qu'avant)."""
+        # Si une alarme N2 est active, on ignore la mesure
+        if any(val == 2 for val in self.get_alarm_list()):
+            return
+        ListWatcher.mesure[1] = m
+        vitesse_kmh = m.vitesse_kmh
+        if not m.valide or vitesse_kmh is None:
+            self.vitesse[1] = "Pas de vitesse mesurée"
+            self.vitesse[10] = "Pas de détection de sens"
+            return
+        # Seuil historique : > 10 km/h → considéré comme défaut
+        self.vitesse[1] = "Defaut vitesse" if vitesse_kmh > 10 else round(vitesse_kmh, 1)
+        self.vitesse[10] = m.sens or "Pas de détection de sens"
+
+    def _evaluer(self, now: float) -> None:
+        """Mesure à partir des fronts captés (time_cellule1 / 2), même horloge que now."""
+        # Cas de mesure de passage (2 fronts captés)
+        if self.time_cellule1 is not None and self.time_cellule2 is not None:
+            delta = abs(self.time_cellule1 - self.time_cellule2)
+
+            # Trop court = probablement rebond
+            if delta < 0.03:
+                self.time_cellule1 = None
+                self.time_cellule2 = None
+                return
+
+            # Si une alarme N2 est active, on ignore la mesure
+            if any(val == 2 for val in self.get_alarm_list()):
+                self.time_cellule1 = None
+                self.time_cellule2 = None
+                return
+
+            # Détection du sens
+            if self.time_cellule1 < self.time_cellule2:
+                sens = "1 -> 2"
+            else:
+                sens = "2 -> 1"
+
+            self.vitesse[10] = sens
+            self.vitesse[1] = self.calculer_vitesse()
+            self.derniere_mesure = now
+
+            # Reset pour prochaine mesure
+            self.time_cellule1 = None
+            self.time_cellule2 = None
+
+        # Cellule 1 seule active trop longtemps
+        elif self.time_cellule1 is not None and self.time_cellule2 is None:
+            if now - self.time_cellule1 > 5 and self.time_cellule1 > self.derniere_mesure:
+                self.vitesse[1] = "Pas de vitesse mesurée"
+                self.vitesse[10] = "Pas de détection de sens"
+                self.time_cellule1 = None
+
+        # Cellule 2 seule active trop longtemps
+        elif self.time_cellule2 is not None and self.time_cellule1 is None:
+            if now - self.time_cellule2 > 5 and self.time_cellule2 > self.derniere_mesure:
+                self.vitesse[1] = "Pas de vitesse mesurée"
+                self.vitesse[10] = "Pas de détection de sens"
+                self.time_cellule2 = None
+
     # ------------------------------------------------------------------ #
     # Boucle principale
     # ------------------------------------------------------------------ #
     def run(self) -> None:
-        while True:
-            # Mode sans cellules -> pas de calcul de vitesse, on sort
-            if self.mss == 1:
-                self.vitesse[1] = "Vitesse N.A."
-                self.vitesse[10] = "Pas de détection de sens"
-                break
+        # Mode sans cellules -> pas de calcul de vitesse, on sort
+        if self.mss == 1:
+            self.vitesse[1] = "Vitesse N.A."
+            self.vitesse[10] = "Pas de détection de sens"
+            return
+
+        if self.bus is not None and self._sub is not None:
+            fronts = PassageFronts(self.bus.period_s)
+            while True:
+                ev = self._sub.get()
+                if ev is None:
+                    continue
+                fronts.feed(ev)
+                if ev.kind == STOP:
+                    self._publier(fronts.mesure(self.distance_cellules))
+                    fronts.reset()
 
+        while True:
             # Lecture des cellules via PassageService
             c1, c2 = self.passage_service.get_cells()
             now = time.perf_counter()
@@ -93,50 +186,5 @@ class ListWatcher(threading.Thread):
             self.last_cellule1 = c1
             self.last_cellule2 = c2
 
-            # Cas de mesure de passage (2 fronts captés)
-            if self.time_cellule1 is not None and self.time_cellule2 is not None:
-                delta = abs(self.time_cellule1 - self.time_cellule2)
-
-                # Trop court = probablement rebond
-                if delta < 0.03:
-                    self.time_cellule1 = None
-                    self.time_cellule2 = None
-                    time.sleep(0.01)
-                    continue
-
-                # Si une alarme N2 est active, on ignore la mesure
-                if any(val == 2 for val in self.get_alarm_list()):
-                    self.time_cellule1 = None
-                    self.time_cellule2 = None
-                    time.sleep(0.01)
-                    continue
-
-                # Détection du sens
-                if self.time_cellule1 < self.time_cellule2:
-                    sens = "1 -> 2"
-                else:
-                    sens = "2 -> 1"
-
-                self.vitesse[10] = sens
-                self.vitesse[1] = self.calculer_vitesse()
-                self.derniere_mesure = now
-
-                # Reset pour prochaine mesure
-                self.time_cellule1 = None
-                self.time_cellule2 = None
-
-            # Cellule 1 seule active trop longtemps
-            elif self.time_cellule1 is not None and self.time_cellule2 is None:
-                if now - self.time_cellule1 > 5 and self.time_cellule1 > self.derniere_mesure:
-                    self.vitesse[1] = "Pas de vitesse mesurée"
-                    self.vitesse[10] = "Pas de détection de sens"
-                    self.time_cellule1 = None
-
-            # Cellule 2 seule active trop longtemps
-            elif self.time_cellule2 is not None and self.time_cellule1 is None:
-                if now - self.time_cellule2 > 5 and self.time_cellule2 > self.derniere_mesure:
-                    self.vitesse[1] = "Pas de vitesse mesurée"
-                    self.vitesse[10] = "Pas de détection de sens"
-                    self.time_cellule2 = None
-
+            self._evaluer(now)
             time.sleep(0.01)
@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark : 12 x AlarmeThread.step() vs AlarmesVectorisees.step().
+
+Mesure uniquement le calcul (pas le coût des réveils / du GIL des 12
+threads). À 12 voies, le surcoût fixe des appels NumPy domine : le gain
+attendu vient surtout de la suppression des threads (moteur tick).
+
+Usage (depuis GeV5_refactor/src) :
+    python -m gev5.tests.bench_alarmes [n_pas]
+"""
+
+from __future__ import annotations
+
+import random
+import sys
+import time
+
+from gev5.core.alarmes import AlarmeConfig, AlarmeThread
+from gev5.core.alarmes.vectorise import AlarmesVectorisees
+
+
+def _build(vals):
+    threads = []
+    for ch in range(1, 13):
+        cfg = AlarmeConfig(
+            channel_id=ch,
+            seuil_haut=120.0,
+            seuil_bas=96.0,
+            tempo_s=0.0,
+            multiple=1.2,
+            mode_sans_cellules=1,
+        )
+        threads.append(AlarmeThread(cfg, get_val=lambda i=ch - 1: vals[i], period_s=0.1))
+    return threads
+
+
+def main(n_steps: int = 20000) -> None:
+    rng = random.Random(0)
+    vals = [50.0] * 12
+    series = [[rng.uniform(20, 200) for _ in range(12)] for _ in range(1000)]
+
+    threads = _build(vals)
+    t0 = time.perf_counter()
+    for k in range(n_steps):
+        vals[:] = series[k % 1000]
+        for t in threads:
+            t.step()
+    dt_scalar = time.perf_counter() - t0
+
+    for d in (AlarmeThread.alarme_resultat, AlarmeThread.fond, AlarmeThread.pdf_gen,
+              AlarmeThread.email_send_alarm, AlarmeThread.alarme_mesure):
+        d.clear()
+
+    vect = AlarmesVectorisees.from_threads(_build(vals))
+    t0 = time.perf_counter()
+    for k in range(n_steps):
+        vals[:] = series[k % 1000]
+        vect.step()
+    dt_vect = time.perf_counter() - t0
+
+    print(f"pas (12 voies)        : {n_steps}")
+    print(f"AlarmeThread x12      : {dt_scalar / n_steps * 1e6:8.1f} µs/pas")
+    print(f"AlarmesVectorisees    : {dt_vect / n_steps * 1e6:8.1f} µs/pas")
+    print(f"ratio scalaire/vecto. : {dt_scalar / dt_vect:8.2f}")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 20000)
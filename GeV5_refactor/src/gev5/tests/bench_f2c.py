@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark du serveur F2C : trames FR21 par seconde.
+
+1. Encodage seul : trame refaite à chaque requête (chemin de F2CThread :
+   12 voies reconstruites, {:.4e}, checksum) vs trame servie du cache.
+2. Bout en bout : n clients TCP locaux qui interrogent chacun un membre
+   en boucle (requête → réponse) pendant d secondes, sur une seule
+   boucle asyncio avec le serveur.
+
+Usage (depuis GeV5_refactor/src) :
+    python -m gev5.tests.bench_f2c [n_clients] [duree_s]
+"""
+
+from __future__ import annotations
+
+import asyncio
+import sys
+import time
+
+from gev5.core.snapshot import Snapshot
+from gev5.hardware.f2c_async import F2CServeur, calculate_checksum, corps_voie, get_system_datetime
+
+
+def _requete(mbr: int) -> bytes:
+    return f"*0001900101{mbr:02d}0001FEEF3FFF70*".encode()
+
+
+def _snap() -> Snapshot:
+    return Snapshot(
+        version=1,
+        counts={i: 100.0 + 7.3 * i for i in range(1, 13)},
+        fond={i: 80.0 + i for i in range(1, 13)},
+        alarm_states={4: 1},
+        cells=(1, 0),
+    )
+
+
+def bench_encodage(n: int = 20000) -> None:
+    snap = _snap()
+
+    t0 = time.perf_counter()
+    for k in range(n):
+        mbr = k % 12 + 1
+        corps = [corps_voie(snap, i) for i in range(1, 13)]          # recover_values
+        trame = f"*9001000101{mbr:02d}0001FEEF3FFF70{get_system_datetime()} {corps[mbr - 1]}*"
+        (trame + calculate_checksum(trame) + "*\r\n").encode()
+    dt_brut = time.perf_counter() - t0
+
+    srv = F2CServeur()
+    srv.maj(snap)
+    reqs = [_requete(i) for i in range(1, 13)]
+    t0 = time.perf_counter()
+    for k in range(n):
+        srv.traiter(reqs[k % 12])
+    dt_cache = time.perf_counter() - t0
+
+    print(f"requêtes                  : {n}")
+    print(f"trame refaite (F2CThread) : {dt_brut / n * 1e6:8.1f} µs  ({n / dt_brut:9.0f} trames/s)")
+    print(f"trame en cache            : {dt_cache / n * 1e6:8.1f} µs  ({n / dt_cache:9.0f} trames/s)")
+    print(f"ratio                     : {dt_brut / dt_cache:8.1f}")
+
+
+async def _client(port: int, mbr: int, fin: float, lat: list) -> int:
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    req = _requete(mbr)
+    n = 0
+    while time.perf_counter() < fin:
+        t = time.perf_counter()
+        writer.write(req)
+        await reader.readuntil(b"*\r\n")
+        lat.append(time.perf_counter() - t)
+        n += 1
+    writer.close()
+    return n
+
+
+async def _bout_en_bout(n_clients: int, duree_s: float) -> None:
+    srv = F2CServeur(max_clients=n_clients)
+    srv.maj(_snap())
+    server = await asyncio.start_server(srv.client, "127.0.0.1", 0)
+    port = server.sockets[0].getsockname()[1]
+    lat: list = []
+    fin = time.perf_counter() + duree_s
+    counts = await asyncio.gather(*(_client(port, i % 12 + 1, fin, lat) for i in range(n_clients)))
+    server.close()
+    await server.wait_closed()
+
+    total = sum(counts)
+    lat.sort()
+    print(f"clients                   : {n_clients}")
+    print(f"trames servies            : {total}  ({total / duree_s:9.0f} trames/s)")
+    print(f"latence p50 / p99         : {lat[len(lat) // 2] * 1e3:6.2f} / {lat[int(len(lat) * 0.99)] * 1e3:6.2f} ms")
+    print(f"trames construites        : {srv.metrics['frames_built']}")
+
+
+def main(n_clients: int = 8, duree_s: float = 3.0) -> None:
+    bench_encodage()
+    print()
+    asyncio.run(_bout_en_bout(n_clients, duree_s))
+
+
+if __name__ == "__main__":
+    main(
+        int(sys.argv[1]) if len(sys.argv) > 1 else 8,
+        float(sys.argv[2]) if len(sys.argv) > 2 else 3.0,
+    )
@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark : rapports PDF par seconde.
+
+- rendu seul (render_rapport_pdf, données déjà en mémoire)
+- rendu avec profil de comptage (passage de 10 s échantillonné à 0.1 s,
+  et à 1 ms pour la réduction) et photo JPEG
+- débit du pool (ReportPool) avec 1 et 2 workers
+- temps de capture d'une demande par ReportThread (pdf_gen → libéré)
+
+Aucune base n'est lue : passage et statistiques sont synthétiques, les PDF
+sont écrits dans un répertoire temporaire.
+
+Usage (depuis GeV5_refactor/src) :
+    python -m gev5.tests.bench_rapport [n_rapports]
+"""
+
+from __future__ import annotations
+
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+from gev5.core.alarmes import AlarmeThread
+from gev5.hardware.storage import rapport_pdf
+from gev5.hardware.storage.profil import decode_profil, encode_profil, trace
+from gev5.hardware.storage.rapport_pool import ReportJob, ReportPool
+
+
+def _passage(rng: random.Random) -> dict:
+    p = {
+        "id": 1,
+        "ts_start": "2024-01-01 10:00:00",
+        "ts_end": "2024-01-01 10:00:04",
+        "duration_s": 4.2,
+        "vitesse": 5.1,
+        "comment": "fin=fin de passage",
+    }
+    for ch in range(1, 13):
+        p[f"bdf{ch}"] = rng.uniform(40, 60)
+        p[f"max{ch}"] = rng.uniform(60, 300)
+        p[f"alarm{ch}"] = int(p[f"max{ch}"] > 250)
+        p[f"defaut{ch}"] = 0
+    return p
+
+
+def _stats(rng: random.Random) -> dict:
+    return {
+        ch: {"avg": rng.uniform(40, 60), "min": 35.0, "max": rng.uniform(60, 80)}
+        for ch in range(1, 13)
+    }
+
+
+def _curves(rng: random.Random, duration_s: float, sample_s: float) -> dict:
+    ts = np.arange(0.0, duration_s, sample_s) + 1.7e9
+    x = np.linspace(-1.0, 1.0, len(ts))
+    out = {}
+    for ch in range(1, 13):
+        peak = rng.uniform(50, 400) * np.exp(-(x / 0.3) ** 2)
+        out[ch] = (ts, 50.0 + peak + np.asarray([rng.gauss(0, 5) for _ in ts]))
+    return out
+
+
+def _photo(path: Path) -> str:
+    from PIL import Image
+
+    Image.new("RGB", (1280, 720), (90, 110, 130)).save(path, quality=80)
+    return str(path)
+
+
+def main(n: int = 200) -> None:
+    rng = random.Random(0)
+    passage = _passage(rng)
+    stats = _stats(rng)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        out = Path(tmp)
+
+        t0 = time.perf_counter()
+        for k in range(n):
+            rapport_pdf.render_rapport_pdf(out / f"r{k}.pdf", passage, stats)
+        dt = time.perf_counter() - t0
+        print(f"rendu seul      : {n / dt:7.1f} rapports/s  ({dt / n * 1000:.2f} ms/rapport)")
+
+        photo = _photo(out / "photo.jpg")
+        for label, duration_s, sample_s in (("10 s / 0.1 s", 10.0, 0.1), ("10 s / 1 ms  ", 10.0, 0.001)):
+            blob = encode_profil(_curves(rng, duration_s, sample_s))
+            tr = trace(decode_profil(blob), rapport_pdf.CHART_W, rapport_pdf.CHART_H)
+            t0 = time.perf_counter()
+            for k in range(n):
+                tr = trace(decode_profil(blob), rapport_pdf.CHART_W, rapport_pdf.CHART_H)
+                rapport_pdf.render_rapport_pdf(out / f"g{k}.pdf", passage, stats, tr, photo)
+            dt = time.perf_counter() - t0
+            print(
+                f"profil {label} : {n / dt:7.1f} rapports/s  ({dt / n * 1000:.2f} ms/rapport, "
+                f"blob {len(blob)} o, {sum(len(p) for p in tr.paths.values()) // 1024} Ko de tracé)"
+            )
+
+        for workers in (1, 2):
+            pool = ReportPool(
+                lambda job: rapport_pdf.render_rapport_pdf(
+                    out / f"p{workers}_{job.passage_id}.pdf", passage, job.bdf_stats
+                ),
+                workers=workers,
+                max_pending=n,
+            )
+            t0 = time.perf_counter()
+            for k in range(n):
+                pool.submit(ReportJob(channels=(1,), passage_id=k, bdf_stats=stats))
+            pool.shutdown(wait=True)
+            dt = time.perf_counter() - t0
+            print(f"pool {workers} worker(s) : {n / dt:7.1f} rapports/s")
+
+        # capture : ReportThread ne fait plus que figer la demande
+        rt = rapport_pdf.ReportThread("bench", 1, {}, 100, "fr", max_pending=n)
+        rt.pool._render = lambda job: None
+        t_capture = 0.0
+        for _ in range(n):
+            AlarmeThread.pdf_gen[3] = 1
+            t0 = time.perf_counter()
+            rt.poll_once()
+            t_capture += time.perf_counter() - t0
+        rt.pool.shutdown(wait=True)
+        print(f"capture pdf_gen : {t_capture / n * 1e6:7.1f} µs/demande")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 200)
@@ -1,5 +1,5 @@
-"""Utilitaires communs pour GeV5 (config, logging, chemins)."""
+"""Utilitaires communs pour GeV5 (config, logging, chemins, latences)."""
 
-from . import config, logging, paths
+from . import config, latency, logging, paths
 
-__all__ = ["config", "logging", "paths"]
\ No newline at end of file
+__all__ = ["config", "latency", "logging", "paths"]
\ No newline at end of file
@@ -96,3 +96,31 @@ class SystemConfig:
 
     # Divers
     db_path: str
+
+    # Moteur temps réel : 0 = threads par voie (historique), 1 = moteur tick
+    tick_engine: int = 0
+    # Alarmes évaluées en un seul pas NumPy (moteur tick uniquement)
+    alarmes_vectorisees: int = 0
+    # Cadences du moteur tick, en s (comptage / alarmes / défauts / courbes)
+    moteur_comptage_s: float = 0.01
+    moteur_alarmes_s: float = 0.1
+    moteur_defauts_s: float = 60.0
+    moteur_courbes_s: float = 1.0
+    # Source d'impulsions du comptage : "" (polling 10 ms), "gpio", "evok", "sim"
+    comptage_source: str = ""
+    # Fenêtres de comptage à échéances fixes (monotonic_ns) : 0/1
+    comptage_monotone: int = 0
+    # Période de diffusion de l'état (SSE / WebSocket de l'API), en s
+    stream_period_s: float = 0.5
+    # Rétention de l'historique du bruit de fond, en jours (0 = illimité)
+    bdf_retention_brut_j: int = 30
+    bdf_retention_5m_j: int = 400
+    bdf_retention_1h_j: int = 0
+    # Statistiques glissantes du fond en mémoire : fenêtre (s), percentiles ("50,95")
+    fond_stats_fenetre_s: float = 1500.0
+    fond_stats_percentiles: str = ""
+    # Rapports PDF : workers de rendu, demandes en attente max
+    rapport_workers: int = 1
+    rapport_file_max: int = 4
+    # Serveur F2C (trames FR21, port 9000) : 0/1
+    f2c: int = 0
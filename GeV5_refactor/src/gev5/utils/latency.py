@@ -0,0 +1,39 @@
+# gev5/utils/latency.py
+"""
+Histogramme de latences à seaux fixes (ms).
+
+Partagé par le client REST EVOK (Svr_Unipi, durée des polls) et les
+serveurs de protocole (protocole_async, temps de traitement des requêtes).
+"""
+
+from __future__ import annotations
+
+import bisect
+from typing import Dict, Iterable
+
+DEFAULT_BUCKETS_MS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000)
+
+
+class LatencyHistogram:
+    """Histogramme cumulé des durées (ms), seaux fixes."""
+
+    def __init__(self, bounds_ms: Iterable[float] = DEFAULT_BUCKETS_MS) -> None:
+        self.bounds_ms = tuple(bounds_ms)
+        self.counts = [0] * (len(self.bounds_ms) + 1)
+        self.n = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+
+    def add(self, ms: float) -> None:
+        self.counts[bisect.bisect_left(self.bounds_ms, ms)] += 1
+        self.n += 1
+        self.total_ms += ms
+        if ms > self.max_ms:
+            self.max_ms = ms
+
+    def snapshot(self) -> Dict[str, float]:
+        out: Dict[str, float] = {f"<={b}ms": c for b, c in zip(self.bounds_ms, self.counts)}
+        out[f">{self.bounds_ms[-1]}ms"] = self.counts[-1]
+        out.update(n=self.n, avg_ms=round(self.total_ms / self.n, 2) if self.n else 0.0,
+                   max_ms=round(self.max_ms, 2))
+        return out
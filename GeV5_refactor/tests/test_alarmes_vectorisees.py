@@ -0,0 +1,126 @@
+from __future__ import annotations
+
+import random
+from typing import Dict, List, Tuple
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from gev5.core.alarmes import AlarmeConfig, AlarmeThread, FondStats
+from gev5.core.alarmes.vectorise import AlarmesVectorisees
+
+
+def _reset_dicts() -> None:
+    for d in (
+        AlarmeThread.alarme_resultat,
+        AlarmeThread.alarme_mesure,
+        AlarmeThread.email_send_alarm,
+        AlarmeThread.pdf_gen,
+        AlarmeThread.fond,
+        AlarmeThread.seuil_effectif,
+    ):
+        d.clear()
+    FondStats.configure(window_s=1e9)
+
+
+def _configs() -> List[AlarmeConfig]:
+    cfgs = []
+    for ch in range(1, 13):
+        cfgs.append(AlarmeConfig(
+            channel_id=ch,
+            seuil_haut=100.0 + 5 * ch,
+            seuil_bas=80.0 + 4 * ch,
+            hysteresis=2.0 if ch % 3 == 0 else 0.0,
+            tempo_s=0.3 if ch % 4 == 0 else 0.0,
+            n2_factor=1.5,
+            multiple=1.2 if ch % 2 else 0.0,
+            mode_sans_cellules=1 if ch > 9 else 0,
+        ))
+    return cfgs
+
+
+def _scenario(n_steps: int, seed: int) -> List[Tuple[List[float], List[bool], List[bool], int]]:
+    """Entrées par pas : valeurs, activation, passage, voie à acquitter (0 = aucune)."""
+    rng = random.Random(seed)
+    steps = []
+    vals = [50.0] * 12
+    passage = False
+    for k in range(n_steps):
+        if rng.random() < 0.05:
+            passage = not passage
+        for i in range(12):
+            if rng.random() < 0.02:
+                vals[i] = rng.uniform(150, 400)       # pic
+            else:
+                vals[i] = max(0.0, vals[i] + rng.gauss(0, 8))
+        enabled = [rng.random() > 0.03 for _ in range(12)]
+        ack = rng.randint(1, 12) if rng.random() < 0.02 else 0
+        steps.append((list(vals), enabled, [passage] * 12, ack))
+    return steps
+
+
+def _snapshot() -> Dict[str, Dict[int, float]]:
+    return {
+        "etat": dict(AlarmeThread.alarme_resultat),
+        "email": dict(AlarmeThread.email_send_alarm),
+        "pdf": dict(AlarmeThread.pdf_gen),
+        "fond": dict(AlarmeThread.fond),
+        "mesure": dict(AlarmeThread.alarme_mesure),
+        "seuil": dict(AlarmeThread.seuil_effectif),
+    }
+
+
+def _run(vectorise: bool, scenario) -> List[Dict[str, Dict[int, float]]]:
+    _reset_dicts()
+    cur: Dict[str, list] = {"vals": [0.0] * 12, "en": [True] * 12, "pa": [False] * 12}
+
+    threads = [
+        AlarmeThread(
+            cfg,
+            get_val=lambda i=i: cur["vals"][i],
+            enabled_flag=lambda i=i: cur["en"][i],
+            get_passage=lambda i=i: cur["pa"][i],
+            period_s=0.1,
+        )
+        for i, cfg in enumerate(_configs())
+    ]
+    vect = AlarmesVectorisees.from_threads(threads) if vectorise else None
+
+    history = []
+    for vals, enabled, passage, ack in scenario:
+        cur["vals"], cur["en"], cur["pa"] = vals, enabled, passage
+        if vect is not None:
+            vect.step()
+        else:
+            for t in threads:
+                t.step()
+        # consommation externe : ReportThread remet pdf_gen à 0, acquittement
+        for ch in range(1, 13):
+            AlarmeThread.pdf_gen[ch] = 0 if ch % 5 == 0 else AlarmeThread.pdf_gen[ch]
+        if ack:
+            AlarmeThread.reset_alarm(ack)
+        history.append(_snapshot())
+    return history
+
+
+def test_vectorise_identique_a_alarme_thread():
+    scenario = _scenario(3000, seed=1234)
+    ref = _run(False, scenario)
+    ref_stats = FondStats.snapshot()
+    vec = _run(True, scenario)
+    vec_stats = FondStats.snapshot()
+
+    # le scénario doit effectivement déclencher des transitions
+    assert any(h["etat"][ch] == 2 for h in ref for ch in range(1, 13))
+    assert any(h["email"][ch] == 1 for h in ref for ch in range(1, 13))
+
+    for k, (a, b) in enumerate(zip(ref, vec)):
+        assert a == b, f"divergence au pas {k}"
+
+    # statistiques du fond alimentées par les mêmes mises à jour
+    assert ref_stats and ref_stats.keys() == vec_stats.keys()
+    for ch, st in ref_stats.items():
+        assert st["n"] == vec_stats[ch]["n"]
+        assert st["avg"] == pytest.approx(vec_stats[ch]["avg"])
+        assert (st["min"], st["max"]) == (vec_stats[ch]["min"], vec_stats[ch]["max"])
@@ -0,0 +1,99 @@
+from __future__ import annotations
+
+import sqlite3
+
+import pytest
+
+from gev5.hardware.storage import bdf_tiers
+from gev5.hardware.storage.bdf_tiers import RetentionPolicy, prune, rollup_rows, select_tier, trend, window_stats
+from gev5.hardware.storage.schema import BDF_MIGRATIONS, migrate_bdf
+
+T0 = 1_700_000_000 - 1_700_000_000 % 3600      # début d'heure
+
+INSERT = (
+    "INSERT INTO bdf_history (timestamp, bdf1, bdf2, bdf3, bdf4, bdf5, bdf6, "
+    "bdf7, bdf8, bdf9, bdf10, bdf11, bdf12, ts_epoch) "
+    "VALUES ('', ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)"
+)
+
+
+def _collect(conn, ts, value):
+    vals = [value] + [0.0] * 11
+    conn.execute(INSERT, (*vals, ts))
+    for sql, params in rollup_rows(ts, vals):
+        conn.execute(sql, params)
+
+
+@pytest.fixture
+def conn(tmp_path):
+    c = sqlite3.connect(tmp_path / "Bruit_de_fond.db")
+    migrate_bdf(c)
+    yield c
+    c.close()
+
+
+def test_agregats_incrementaux(conn):
+    # 2 h de mesures à 30 s, valeur = minute courante
+    for k in range(240):
+        _collect(conn, T0 + 30 * k, float(k // 2))
+    conn.commit()
+
+    n, mn, avg, mx = conn.execute(
+        "SELECT n, min1, avg1, max1 FROM bdf_5m WHERE bucket = ?", (T0 + 300,)
+    ).fetchone()
+    assert (n, mn, mx) == (10, 5.0, 9.0)
+    assert avg == pytest.approx(7.0)
+
+    rows = conn.execute("SELECT bucket, n, avg1 FROM bdf_1h ORDER BY bucket").fetchall()
+    assert [(b, n) for b, n, _ in rows] == [(T0, 120), (T0 + 3600, 120)]
+    assert rows[0][2] == pytest.approx(29.5)
+
+
+def test_choix_du_palier_et_lecture(conn):
+    for k in range(240):
+        _collect(conn, T0 + 30 * k, float(k))
+    conn.commit()
+
+    assert select_tier(conn, T0, T0 + 600, 500)[0] == "raw"
+    assert select_tier(conn, T0, T0 + 7200, 100)[0] == "5m"
+    assert select_tier(conn, T0, T0 + 7200, 10)[0] == "1h"
+
+    data = trend(conn, T0, T0 + 7200, max_points=30, channels=[1])
+    assert data["tier"] == "5m" and data["step_s"] == 300
+    assert len(data["t"]) == 24
+    assert data["channels"][1]["min"][0] == 0.0
+    assert data["channels"][1]["max"][0] == 9.0
+
+    stats = window_stats(conn, T0, T0 + 7200, max_points=10)
+    assert stats[1]["min"] == 0.0 and stats[1]["max"] == 239.0
+    assert stats[1]["avg"] == pytest.approx(119.5)
+
+
+def test_retention_et_repli_sur_palier_grossier(conn):
+    now = T0 + 40 * 86400
+    for day in range(40):
+        _collect(conn, T0 + day * 86400, float(day))
+    conn.commit()
+
+    removed = prune(conn, RetentionPolicy(raw_days=10, m5_days=20, h1_days=0), now=now, chunk=7)
+    assert removed == {"raw": 30, "5m": 20}
+    assert conn.execute("SELECT COUNT(*) FROM bdf_1h").fetchone()[0] == 40
+
+    # plage de 30 jours : le brut ne remonte plus assez loin → palier 1 h
+    assert select_tier(conn, now - 30 * 86400, now, 5000)[0] == "1h"
+
+
+def test_migration_remplit_les_paliers(tmp_path):
+    c = sqlite3.connect(tmp_path / "ancienne.db")
+    for step in BDF_MIGRATIONS[:2]:
+        step(c)
+    c.execute("PRAGMA user_version = 2")
+    for k in range(20):
+        c.execute(INSERT, (float(k),) + (0.0,) * 11 + (T0 + 30 * k,))
+    c.commit()
+
+    assert migrate_bdf(c) == len(BDF_MIGRATIONS)
+    assert c.execute("SELECT n, max1 FROM bdf_5m WHERE bucket = ?", (T0,)).fetchone() == (10, 9.0)
+    assert c.execute("SELECT n, min1, max1 FROM bdf_1h").fetchone() == (20, 0.0, 19.0)
+    assert [t[0] for t in bdf_tiers.TIERS] == ["raw", "5m", "1h"]
+    c.close()
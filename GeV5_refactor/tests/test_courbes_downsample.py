@@ -0,0 +1,54 @@
+from __future__ import annotations
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from gev5.core.courbes import codec
+from gev5.core.courbes.downsample import downsample, lttb, minmax
+
+
+def _serie(n: int = 3600):
+    ts = 1_700_000_000.0 + np.arange(n, dtype=np.float64)
+    vals = 50.0 + 5.0 * np.sin(np.arange(n) / 60.0)
+    vals[n // 3] = 900.0        # pic de passage
+    return ts, vals
+
+
+def test_lttb_garde_bornes_et_pic():
+    ts, vals = _serie()
+    t_out, v_out = lttb(ts, vals, 300)
+    assert len(t_out) == 300
+    assert t_out[0] == ts[0] and t_out[-1] == ts[-1]
+    assert np.all(np.diff(t_out) > 0)
+    assert 900.0 in v_out
+
+
+def test_minmax_garde_extremes():
+    ts, vals = _serie()
+    t_out, v_out = minmax(ts, vals, 200)
+    assert len(t_out) <= 200
+    assert v_out.max() == vals.max() and v_out.min() == vals.min()
+    assert np.all(np.diff(t_out) > 0)
+
+
+def test_downsample_inchange_si_peu_de_points():
+    ts, vals = _serie(50)
+    assert downsample(ts, vals, 100)[0] is ts
+    assert downsample(ts, vals, 0)[0] is ts
+    with pytest.raises(ValueError):
+        downsample(ts, vals, 10, method="moyenne")
+
+
+@pytest.mark.parametrize("fmt", ["f32", "delta"])
+def test_codec_aller_retour(fmt):
+    ts, vals = _serie(500)
+    vals = np.round(vals, 2)
+    payload = codec.encode({1: (ts, vals), 7: (ts[:0], vals[:0])}, codec.FORMATS[fmt])
+    out = codec.decode(payload)
+
+    assert sorted(out) == [1, 7] and len(out[7][0]) == 0
+    np.testing.assert_allclose(out[1][0], ts, atol=1e-3)
+    np.testing.assert_allclose(out[1][1], vals, atol=1e-2)
+    # binaire bien plus compact que du JSON
+    assert len(payload) < 500 * 8 + 64
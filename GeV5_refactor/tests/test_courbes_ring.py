@@ -0,0 +1,46 @@
+from __future__ import annotations
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from gev5.core.courbes import CurveRing
+
+
+def test_ring_rebouclage_vue_contigue():
+    ring = CurveRing(capacity=5, levels_s=())
+    for k in range(12):
+        ring.append(float(k), ts=1000.0 + k)
+
+    ts, vals = ring.view()
+    assert vals.tolist() == [7.0, 8.0, 9.0, 10.0, 11.0]
+    assert ts.tolist() == [1007.0, 1008.0, 1009.0, 1010.0, 1011.0]
+    # vue sans copie sur le tampon
+    assert np.shares_memory(vals, ring._ring.data)
+    assert len(ring) == 5 and list(ring) == vals.tolist() and ring[-1] == 11.0
+
+
+def test_ring_curseur_et_intervalle():
+    ring = CurveRing(capacity=100, levels_s=())
+    for k in range(10):
+        ring.append(float(k), ts=float(k))
+
+    assert ring.since(6.0)[1].tolist() == [7.0, 8.0, 9.0]
+    assert ring.between(2.0, 4.0)[1].tolist() == [2.0, 3.0, 4.0]
+    assert ring.last_ts == 9.0
+
+
+def test_ring_decimation_min_max_moyenne():
+    ring = CurveRing(capacity=1000, levels_s=(10, 60))
+    for k in range(125):
+        ring.append(float(k % 7), ts=1200.0 + k)
+
+    ts, vmin, vmax, vmean = ring.level(10)
+    # 12 tranches closes (1200..1319), la 13e est en cours
+    assert len(ts) == 12
+    assert ts[0] == 1200.0 and ts[-1] == 1310.0
+    first = [float(k % 7) for k in range(10)]
+    assert vmin[0] == min(first) and vmax[0] == max(first)
+    assert vmean[0] == pytest.approx(sum(first) / 10)
+
+    assert ring.level(60)[0].tolist() == [1200.0, 1260.0]
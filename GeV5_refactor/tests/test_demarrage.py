@@ -0,0 +1,49 @@
+from __future__ import annotations
+
+import time
+
+from gev5.boot.profil_demarrage import Phases, parser_importtime, profiler_imports, rapport_imports
+
+
+def test_import_sans_effet_de_bord():
+    mesures, threads = profiler_imports("gev5.boot")
+    assert threads == 0
+    noms = {m.module for m in mesures}
+    assert {"gev5.boot.starter", "gev5.hardware.etat_cellule_1", "gev5.hardware.storage.db_write_v2"} <= noms
+    assert "gev5.boot.starter" in rapport_imports(mesures, "gev5.boot", threads, n=5)
+
+
+def test_watcher_demarre_explicitement():
+    from gev5.hardware import etat_cellule_1
+
+    assert etat_cellule_1.watcher is None
+    w = etat_cellule_1.demarrer(sim=0)
+    try:
+        assert etat_cellule_1.demarrer(sim=0) is w and w.is_alive()
+        assert w.name == "InputWatcher_1"
+    finally:
+        etat_cellule_1.arreter()
+        w.join(1.0)
+        etat_cellule_1.watcher = None
+    assert not w.is_alive()
+
+
+def test_phases_et_parser():
+    p = Phases()
+    with p.mesure("start_a"):
+        time.sleep(0.01)
+    with p.mesure("start_b"):
+        pass
+    assert list(p.durees) == ["start_a", "start_b"]
+    assert p.durees["start_a"] >= 10.0 and p.total_ms() >= p.durees["start_a"]
+    assert p.resume().startswith(f"{p.total_ms():.0f} ms (start_a ")
+
+    texte = (
+        "import time: self [us] | cumulative | imported package\n"
+        "import time:       120 |        120 |     gev5.utils\n"
+        "import time:      1500 |       1620 |   gev5.boot\n"
+    )
+    m = parser_importtime(texte)
+    assert [(x.module, x.propre_us, x.cumul_us, x.profondeur) for x in m] == [
+        ("gev5.utils", 120, 120, 2), ("gev5.boot", 1500, 1620, 1),
+    ]
@@ -0,0 +1,90 @@
+from __future__ import annotations
+
+import asyncio
+import socket
+
+from gev5.core.alarmes.alarmes import AlarmeThread
+from gev5.core.comptage.comptage import ComptageThread
+from gev5.core.snapshot import Snapshot
+from gev5.hardware.evx_async import DISPATCH, EvxServeur
+from gev5.hardware.eVx_interface import eVx_Thread
+
+FOND = {1: 12.7, 2: 30.0, 3: 4.0, 4: 1.0}
+COUNTS = {1: 150.2, 2: 80.0, 3: 9.0, 4: 2.0}
+ALARMES = {2: 1, 4: 2}
+
+
+def _legacy(cmd: bytes) -> bytes:
+    a, b = socket.socketpair()
+    t = eVx_Thread(b, ("test", 0))
+    t.start()
+    try:
+        a.sendall(cmd)
+        a.settimeout(1.0)
+        out = b""
+        try:
+            while True:
+                chunk = a.recv(4096)
+                if not chunk:
+                    break
+                out += chunk
+                a.settimeout(0.1)
+        except socket.timeout:
+            pass
+        return out
+    finally:
+        a.close()
+        t.join(1.0)
+
+
+def test_reponses_identiques_a_evx_thread(monkeypatch):
+    monkeypatch.setattr(AlarmeThread, "fond", dict(FOND))
+    monkeypatch.setattr(ComptageThread, "compteur", dict(COUNTS))
+    monkeypatch.setattr(AlarmeThread, "alarme_resultat", dict(ALARMES))
+    srv = EvxServeur()
+    srv.maj(Snapshot(version=1, fond=FOND, counts=COUNTS, alarm_states=ALARMES))
+    for nom in DISPATCH:
+        rep, _ = srv.traiter(nom.encode())
+        assert rep == _legacy(nom.encode()), nom
+
+
+def test_rafale_commande_coupee_et_cache_par_version():
+    srv = EvxServeur()
+    snap = Snapshot(version=1, fond=FOND, counts=COUNTS, alarm_states=ALARMES)
+    assert srv.maj(snap) == len(DISPATCH)
+    assert srv.maj(snap) == 0
+
+    rep, reste = srv.traiter(b"CON_TESTbruitFondV1\r\nxxAlerteV")
+    assert rep == b"OK12" and reste.endswith(b"AlerteV")
+    rep, reste = srv.traiter(reste + b"Somme\n")
+    assert rep == b"3" and reste == b"\n"
+    rep, _ = srv.traiter(b"LireValeursRadioactivite_2")
+    assert rep == srv.reponses[b"LireValeursRadioactivite"] * 2
+    assert srv.traiter(b"z" * 5000)[1] == b"z" * (len("LireValeursRadioactivite_2") - 1)
+    assert srv.get_metrics()["requests"] == 4
+
+
+def test_limite_de_connexions_et_client_muet():
+    srv = EvxServeur(max_clients=1, idle_s=0.2)
+
+    async def scenario():
+        server = await asyncio.start_server(srv.client, "127.0.0.1", 0)
+        port = server.sockets[0].getsockname()[1]
+        r1, w1 = await asyncio.open_connection("127.0.0.1", port)
+        w1.write(b"CON_TEST")
+        assert await r1.readexactly(2) == b"OK"
+
+        r2, w2 = await asyncio.open_connection("127.0.0.1", port)
+        assert await asyncio.wait_for(r2.read(), 1.0) == b""      # refusée
+        # muet plus de idle_s : fermé par le serveur
+        assert await asyncio.wait_for(r1.read(), 1.0) == b""
+        await asyncio.sleep(0.05)
+        clients = srv.metrics["clients"]
+        for w in (w1, w2):
+            w.close()
+        server.close()
+        await server.wait_closed()
+        return clients
+
+    assert asyncio.run(scenario()) == 0
+    assert srv.metrics["refused"] == 1
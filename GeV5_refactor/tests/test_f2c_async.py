@@ -0,0 +1,82 @@
+from __future__ import annotations
+
+import asyncio
+
+from gev5.core.snapshot import Snapshot
+from gev5.hardware import f2c_async as f2c
+
+
+def _req(mbr: str, code: str = "0001") -> bytes:
+    return f"*0001900101{mbr}{code}FEEF3FFF70*".encode()
+
+
+def _snap(version=1, count=1234.5):
+    return Snapshot(version=version, counts={3: count}, fond={3: 56.0}, alarm_states={3: 2}, defauts={3: 1}, cells=(0, 1))
+
+
+def test_trame_fr21_et_checksum(monkeypatch):
+    monkeypatch.setattr(f2c, "get_system_datetime", lambda: "261016120000")
+    srv = f2c.F2CServeur()
+    srv.maj(_snap())
+    corps = " ".join(
+        ["261016120000", "00000001", "00000002", "00000002", "1.2345e+003", "0.0000e+000", "5.6000e+001",
+         "00002215", "00182221", "00316578"]
+        + ["0.0000e+000"] * 6 + list(f2c.STATUTS)
+    )
+    sans_csm = f"*9001000101030001FEEF3FFF70{corps}*"
+    attendu = f"{sans_csm}{f2c.calculate_checksum(sans_csm)}*\r\n".encode()
+    assert srv.traiter(_req("03")) == attendu
+
+    suiv = "*9001000101030002*"
+    assert srv.traiter(_req("03", "0002")) == f"{suiv}{f2c.calculate_checksum(suiv)}*\r\n".encode()
+    assert srv.traiter(b"n'importe quoi") == f"{f2c.NO_REPLY}{f2c.calculate_checksum(f2c.NO_REPLY)}*\r\n".encode()
+    # membre hors 1..12 : voie bornée, mbr renvoyé tel quel
+    assert srv.traiter(_req("40")).startswith(b"*9001000101400001FEEF3FFF70")
+
+
+def test_cache_par_snapshot_et_par_seconde(monkeypatch):
+    monkeypatch.setattr(f2c, "get_system_datetime", lambda: "261016120000")
+    t = [1000.0]
+    srv = f2c.F2CServeur(horloge=lambda: t[0])
+    srv.maj(_snap())
+    a = srv.traiter(_req("03") + _req("05"))
+    assert srv.traiter(_req("03") + _req("05")) == a
+    assert srv.metrics["frames_built"] == 2
+
+    assert srv.maj(_snap()) == 0                          # même version : rien à refaire
+    srv.maj(_snap(version=2, count=99.0))
+    b = srv.traiter(_req("03"))
+    assert b"9.9000e+001" in b and srv.metrics["frames_built"] == 3
+
+    t[0] += 0.5                                           # même seconde
+    srv.traiter(_req("03"))
+    assert srv.metrics["frames_built"] == 3
+    t[0] += 0.5                                           # seconde suivante : date refaite
+    srv.traiter(_req("03"))
+    assert srv.metrics["frames_built"] == 4
+
+
+def test_clients_simultanes():
+    srv = f2c.F2CServeur()
+    srv.maj(_snap())
+
+    async def poller(port, mbr):
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        out = []
+        for _ in range(5):
+            writer.write(_req(mbr))
+            out.append(await reader.readuntil(b"*\r\n"))
+        writer.close()
+        return out
+
+    async def scenario():
+        server = await asyncio.start_server(srv.client, "127.0.0.1", 0)
+        port = server.sockets[0].getsockname()[1]
+        res = await asyncio.gather(*(poller(port, f"{i:02d}") for i in range(1, 9)))
+        server.close()
+        await server.wait_closed()
+        return res
+
+    res = asyncio.run(scenario())
+    assert all(len(r) == 5 and r[0].startswith(f"*9001000101{i:02d}0001".encode()) for i, r in enumerate(res, 1))
+    assert srv.metrics["requests"] == 40
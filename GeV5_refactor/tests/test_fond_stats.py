@@ -0,0 +1,54 @@
+from __future__ import annotations
+
+import math
+import random
+import statistics
+
+import pytest
+
+from gev5.core.alarmes import AlarmeConfig, AlarmeThread, FondStats, RunningStats
+
+
+def test_fenetre_glissante_identique_au_calcul_complet():
+    rng = random.Random(7)
+    rs = RunningStats(window_s=10.0, percentiles=(50, 95))
+    hist = []
+    t = 0.0
+    for k in range(3000):
+        t += rng.choice((0.0, 0.05, 0.1, 0.7))     # dates égales incluses
+        x = rng.gauss(100.0, 15.0) if k % 97 else 400.0
+        rs.push(x, ts=t)
+        hist.append((t, x))
+
+        if k % 50 == 0:
+            win = [v for ts, v in hist if ts >= t - 10.0]
+            s = rs.summary()
+            assert s["n"] == len(win)
+            assert s["avg"] == pytest.approx(statistics.fmean(win), rel=1e-9)
+            if len(win) > 1:
+                assert s["std"] == pytest.approx(statistics.stdev(win), rel=1e-6)
+            assert (s["min"], s["max"], s["last"]) == (min(win), max(win), x)
+            srt = sorted(win)
+            assert s["p50"] == srt[math.ceil(0.5 * len(srt)) - 1]
+            assert s["p95"] == srt[math.ceil(0.95 * len(srt)) - 1]
+
+
+def test_alimentation_par_la_mise_a_jour_du_fond():
+    FondStats.configure(window_s=60.0)
+    AlarmeThread.fond.pop(7, None)
+    AlarmeThread.alarme_resultat.pop(7, None)
+    cfg = AlarmeConfig(channel_id=7, seuil_haut=500.0, seuil_bas=400.0, mode_sans_cellules=1)
+    vals = iter([100.0, 120.0, 900.0, 80.0])
+    t = AlarmeThread(cfg, get_val=lambda: next(vals), period_s=0.1)
+    for _ in range(4):
+        t.step()
+
+    s = FondStats.get(7)
+    assert s["n"] == 2                      # 900 puis 80 (sous alarme) : fond figé
+    assert s["min"] == 100.0
+    assert s["last"] == pytest.approx(AlarmeThread.fond[7])
+    assert FondStats.get(8) is None
+    for d in (AlarmeThread.fond, AlarmeThread.alarme_resultat,
+              AlarmeThread.email_send_alarm, AlarmeThread.pdf_gen):
+        d.pop(7, None)
+    FondStats.configure()
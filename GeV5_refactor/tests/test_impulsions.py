@@ -0,0 +1,119 @@
+from __future__ import annotations
+
+from gev5.core.alarmes import AlarmeThread
+from gev5.core.comptage import (
+    ComptageConfig,
+    ComptageThread,
+    EvokCounterSource,
+    PulseRing,
+    PulseSource,
+)
+from gev5.core.defauts import DefautThread
+
+
+class _Source(PulseSource):
+    def start(self) -> None:
+        pass
+
+
+class _Evok(EvokCounterSource):
+    """Compteur EVOK simulé ; pas de thread de lecture (relevés à la main)."""
+
+    def __init__(self, valeurs) -> None:
+        super().__init__(circuit=1)
+        self._valeurs = iter(valeurs)
+
+    def _read_counter(self):
+        return next(self._valeurs)
+
+    def _run_reader(self) -> None:
+        pass
+
+
+def test_pulse_ring_count_between():
+    ring = PulseRing(capacity=16)
+    for k in range(10):
+        ring.push(float(k))
+    ring.push(10.0, 5)          # lecture groupée : 5 impulsions en une case
+
+    assert ring.count_between(0.0, 10.0) == 10
+    assert ring.count_between(2.0, 4.0) == 2
+    assert ring.count_between(9.5, 11.0) == 5
+    assert ring.count_between(20.0, 30.0) == 0
+
+
+def test_pulse_ring_wraparound():
+    ring = PulseRing(capacity=8)
+    for k in range(100):
+        ring.push(float(k))
+    assert len(ring) == 8
+    assert ring.pulses == 100
+    assert ring.count_between(95.0, 100.0) == 5
+    # fenêtre plus ancienne que le tampon : compte ce qui reste disponible
+    assert ring.count_between(0.0, 100.0) == 8
+
+
+def test_comptage_source_frequence_haute():
+    ComptageThread.compteur.clear()
+    AlarmeThread.pdf_gen.pop(1, None)
+    DefautThread.defaut_resultat.pop(1, None)
+    src = _Source(PulseRing())
+    cfg = ComptageConfig(channel_id=1, raw_key=10, sampling=1.0, pin=0, sim=0)
+    t = ComptageThread(cfg, source=src)
+
+    # 5 kHz sur 0.5 s : impossible en polling 10 ms
+    for k in range(2500):
+        src.ring.push(100.0 + k * 0.0002)
+    t._close_window_source(100.0, 100.5)
+
+    assert ComptageThread.compteur_brut[10] == 2500
+    assert ComptageThread.compteur[1] == 5000.0
+
+
+def test_comptage_echeances_fixes_sans_derive():
+    ComptageThread.compteur.clear()
+    ComptageThread.jitter.clear()
+    AlarmeThread.pdf_gen.pop(2, None)
+    DefautThread.defaut_resultat.pop(2, None)
+    cfg = ComptageConfig(channel_id=2, raw_key=20, sampling=1.0, pin=0, sim=1, monotonic=True)
+    t = ComptageThread(cfg)
+
+    sec = 1_000_000_000
+    t._arm_deadline(0)
+    # clôtures en retard de 30 ms : l'échéance suivante reste sur la grille
+    for k in range(1, 4):
+        ComptageThread.cpt_impulsions[2] = 100
+        t._deadline_step(k * sec + 30_000_000)
+        assert t._next_deadline_ns == (k + 1) * sec
+
+    jit = ComptageThread.jitter[2]
+    assert jit["windows"] == 3
+    assert abs(jit["last_ms"] - 30.0) < 1e-9
+    # fenêtre réelle 1.0 s (30 ms → 30 ms) : fréquence normalisée
+    assert ComptageThread.compteur[2] == 100.0
+
+    # échéances ratées : sautées et comptées
+    t._deadline_step(7 * sec + 500)
+    assert t._next_deadline_ns == 8 * sec
+    assert ComptageThread.jitter[2]["missed"] == 3
+
+
+def test_evok_delta_dans_la_fenetre_fermee():
+    ComptageThread.compteur.clear()
+    AlarmeThread.pdf_gen.pop(3, None)
+    DefautThread.defaut_resultat.pop(3, None)
+    src = _Evok([0, 100, 300, 600])
+    cfg = ComptageConfig(channel_id=3, raw_key=30, sampling=1.0, pin=0, sim=0)
+    t = ComptageThread(cfg, source=src)
+    src.start()
+    src._last_poll = 0.0
+
+    # chaque fenêtre compte les impulsions relevées pendant elle-même
+    for k, attendu in enumerate((100, 200, 300)):
+        src._lire()
+        t._close_window_source(float(k), float(k + 1))
+        assert ComptageThread.compteur_brut[30] == attendu
+
+    # pas de nouveau relevé : fenêtre vide, aucune lecture bloquante
+    t._close_window_source(3.0, 4.0)
+    assert ComptageThread.compteur_brut[30] == 0
@@ -0,0 +1,108 @@
+from __future__ import annotations
+
+import asyncio
+import struct
+import time
+
+import pytest
+
+from gev5.core.snapshot import Snapshot
+from gev5.hardware import modbus_async as mb
+
+
+def _snap(version=1, **kw):
+    base = dict(
+        version=version,
+        ts=time.time(),
+        counts={i: 10.0 * i for i in range(1, 13)},
+        fond={i: 5.0 for i in range(1, 13)},
+        alarm_states={3: 2},
+        defauts={},
+        cells=(1, 0),
+    )
+    base.update(kw)
+    return Snapshot(**base)
+
+
+def _serveur(**kw):
+    return mb.ModbusServeur(echeance=42, defaut_cell=lambda: 1, fond_stats=lambda: {1: {"avg": 4.5, "min": 3.0, "max": 7.0}}, **kw)
+
+
+def test_plan_compatible_et_paires_32_bits():
+    srv = _serveur()
+    srv.maj(_snap(counts={1: 70000.0, 2: -1.0}))
+    assert srv.lire(0, 2) == (65535, 0)              # 16 bits borné, -1 → 0
+    assert srv.lire(12) == (5,) and srv.lire(48, 2) == (1, 0)
+    assert srv.lire(52) == (2,) and srv.lire(89) == (1,)
+    assert srv.lire(88) == (60,) and srv.lire(90) == (42,) and srv.lire(97) == (1,)
+    assert srv.lire(93) == (time.localtime().tm_year,)
+    assert srv.lire(mb.REG_FOND_STATS) == (4,) and srv.lire(mb.REG_FOND_STATS + 24) == (7,)
+
+    hi, lo = srv.lire(mb.REG_32, 2)
+    assert (hi << 16) | lo == 70000
+    f = struct.unpack(">f", struct.pack(">HH", *srv.lire(mb.REG_32 + 26, 2)))[0]
+    assert f == pytest.approx(70000.0)
+
+    with pytest.raises(ValueError):
+        mb.verifier_layout([mb.Registre("a", 10, mb._zero, mb.U32), mb.Registre("b", 11, mb._zero)])
+
+
+def test_mise_a_jour_en_place_des_seuls_champs_modifies():
+    srv = _serveur()
+    ctx = srv.contexte()
+    assert srv.maj(_snap(), ctx) > 100
+    assert srv.maj(_snap(version=2), ctx) == 0
+    counts = {i: 10.0 * i for i in range(1, 13)}
+    counts[5] = 51.0
+    # count5 (16 bits), somme, paires U32 / F32 de la voie et de la somme
+    assert srv.maj(_snap(version=3, counts=counts), ctx) == 1 + 1 + 2 + 2 + 2
+    assert srv.lire(4) == (51,)
+
+
+def test_requetes_et_exceptions():
+    acks = []
+    srv = _serveur(on_ack=acks.append)
+    srv.maj(_snap())
+    rep = srv.traiter(struct.pack(">BHH", 3, 0, 3))
+    assert rep == bytes((3, 6)) + struct.pack(">HHH", 10, 20, 30)
+    assert srv.traiter(struct.pack(">BHH", 3, srv.taille - 1, 2)) == bytes((0x83, 2))
+    assert srv.traiter(struct.pack(">BHH", 3, 0, 200)) == bytes((0x83, 3))
+    assert srv.traiter(struct.pack(">BHH", 6, 10, 1)) == bytes((0x86, 2))
+    assert srv.traiter(bytes((5, 0, 0, 0xFF, 0))) == bytes((0x85, 1))
+
+    try:
+        req = struct.pack(">BHH", 6, mb.REG_ACQ, 1)
+        assert srv.traiter(req) == req
+        assert acks == [1] and set(mb.ETAT_ACQ_MODBUS.values()) == {1}
+        assert srv.lire(mb.REG_ACQ) == (0,)
+        req = struct.pack(">BHHBH", 16, mb.REG_ACQ, 1, 2, 2)
+        assert srv.traiter(req) == req[:5] and acks == [1, 2]
+    finally:
+        srv._fin_acquittement()
+    assert srv.get_metrics()["exceptions"] == 4
+
+
+def test_client_tcp_requetes_en_rafale():
+    srv = _serveur()
+    srv.maj(_snap())
+
+    async def scenario():
+        server = await asyncio.start_server(srv.client, "127.0.0.1", 0)
+        port = server.sockets[0].getsockname()[1]
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        pdus = [struct.pack(">BHH", 3, 0, 1), struct.pack(">BHH", 4, 12, 1), struct.pack(">BHH", 6, mb.REG_ACQ, 3)]
+        writer.write(b"".join(struct.pack(">HHHB", tid, 0, len(p) + 1, 1) + p for tid, p in enumerate(pdus, 1)))
+        reps = []
+        for _ in pdus:
+            tid, _pid, n, _u = struct.unpack(">HHHB", await reader.readexactly(7))
+            reps.append((tid, await reader.readexactly(n - 1)))
+        assert mb.ETAT_ACQ_MODBUS[1] == 3
+        await asyncio.sleep(mb.ACK_PULSE_S + 0.05)
+        assert mb.ETAT_ACQ_MODBUS[1] == 0
+        writer.close()
+        server.close()
+        await server.wait_closed()
+        return reps
+
+    reps = asyncio.run(scenario())
+    assert reps == [(1, bytes((3, 2, 0, 10))), (2, bytes((4, 2, 0, 5))), (3, struct.pack(">BHH", 6, mb.REG_ACQ, 3))]
@@ -0,0 +1,53 @@
+from __future__ import annotations
+
+from gev5.core.moteur import MoteurConfig, MoteurThread
+
+
+class _FakeComptage:
+    def __init__(self) -> None:
+        self.calls = 0
+
+    def step(self, now: float) -> None:
+        self.calls += 1
+
+
+class _FakeStep:
+    def __init__(self) -> None:
+        self.calls = 0
+
+    def step(self) -> None:
+        self.calls += 1
+
+
+def test_moteur_cadences_sans_derive():
+    comptage = [_FakeComptage() for _ in range(12)]
+    alarmes = [_FakeStep() for _ in range(12)]
+    defauts = [_FakeStep() for _ in range(12)]
+    courbes = [_FakeStep() for _ in range(12)]
+
+    moteur = MoteurThread(
+        MoteurConfig(comptage_period_s=1 / 128, alarme_period_s=1 / 8,
+                     defaut_period_s=60.0, courbe_period_s=1.0),
+        comptages=comptage, alarmes=alarmes, defauts=defauts, courbes=courbes,
+    )
+
+    # 2 s simulées (périodes binaires exactes → comptes exacts)
+    for k in range(0, 257):
+        moteur.tick(1000.0 + k / 128)
+
+    assert comptage[0].calls == 256
+    assert alarmes[0].calls == 16
+    assert courbes[0].calls == 2
+    assert defauts[0].calls == 1          # testé dès le démarrage
+    assert all(c.calls == comptage[0].calls for c in comptage)
+
+
+def test_moteur_saute_les_echeances_manquees():
+    alarmes = [_FakeStep()]
+    moteur = MoteurThread(MoteurConfig(alarme_period_s=0.1), alarmes=alarmes)
+
+    moteur.tick(0.0)
+    moteur.tick(1.05)   # ~10 échéances ratées → une seule exécution
+    assert alarmes[0].calls == 1
+    moteur.tick(1.1)
+    assert alarmes[0].calls == 2
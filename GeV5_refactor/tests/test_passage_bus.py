@@ -0,0 +1,98 @@
+from __future__ import annotations
+
+import time
+
+from gev5.hardware.passage import PassageConfig, PassageService
+from gev5.hardware.passage_bus import KINDS, S1_FALL, S1_RISE, S2_FALL, S2_RISE, START, STOP, PassageBus
+
+
+class FakeHw:
+    def __init__(self) -> None:
+        self.cells = {1: 0, 2: 0}
+
+    def read_cellule(self, idx: int) -> int:
+        return self.cells[idx]
+
+
+def _bus(min_off_s: float = 0.0):
+    hw = FakeHw()
+    svc = PassageService(hw, PassageConfig(arm_delay_s=0.0, min_off_s=min_off_s))
+    return hw, PassageBus(svc)
+
+
+def test_diffusion_memes_evenements_memes_dates():
+    hw, bus = _bus()
+    a = bus.subscribe("a")
+    b = bus.subscribe("b", kinds=(START, STOP))
+    bus.step()
+
+    hw.cells[1] = 1
+    assert [e.kind for e in bus.step()] == [S1_RISE, START]
+    assert bus.is_passage() and bus.get_cells() == (1, 0)
+    hw.cells[2] = 1
+    bus.step()
+    hw.cells = {1: 0, 2: 0}
+    bus.step()
+
+    ev_a = a.drain()
+    ev_b = b.drain()
+    assert [e.kind for e in ev_a] == [S1_RISE, START, S2_RISE, S1_FALL, S2_FALL, STOP]
+    assert [e.kind for e in ev_b] == [START, STOP]
+    assert (ev_a[1].t, ev_a[1].wall_ts) == (ev_b[0].t, ev_b[0].wall_ts)
+    assert ev_a[0].t == ev_a[1].t and ev_a[3].t == ev_a[5].t
+    assert {e.passage for e in ev_a} == {1}
+    assert not bus.is_passage()
+    assert a.get(timeout=0.01) is None
+
+    m = bus.get_metrics()
+    assert (m["polls"], m["events"], m["subscribers"]) == (4, 6, 2)
+
+
+def test_file_pleine_perd_le_plus_ancien():
+    hw, bus = _bus()
+    sub = bus.subscribe("lent", kinds=KINDS, maxsize=2)
+    for _ in range(3):
+        hw.cells[1] = 1
+        bus.step()
+        hw.cells[1] = 0
+        bus.step()
+    # 3 passages x (S1_RISE, START, S1_FALL, STOP) = 12 événements, 2 gardés
+    assert [(e.kind, e.passage) for e in sub.drain()] == [(S1_FALL, 3), (STOP, 3)]
+    assert sub.dropped == 10
+    assert bus.get_metrics()["dropped"] == 10
+
+    sub.close()
+    hw.cells[1] = 1
+    bus.step()
+    assert sub.drain() == [] and bus.get_metrics()["subscribers"] == 0
+
+
+def test_anti_rebond_et_compat_passage_edges():
+    hw, bus = _bus(min_off_s=60.0)
+    sub = bus.subscribe("s", kinds=(START,))
+    hw.cells[2] = 1
+    bus.step()
+    # resté OFF moins de min_off_s depuis le boot : pas de START
+    assert sub.drain() == []
+
+    hw2 = FakeHw()
+    svc = PassageService(hw2, PassageConfig(arm_delay_s=0.0, min_off_s=0.0))
+    hw2.cells[1] = 1
+    assert svc.passage_edges() == (True, False)
+    hw2.cells[1] = 0
+    assert svc.passage_edges() == (False, True)
+
+
+def test_cellules_libres_et_stables():
+    hw, bus = _bus()
+    assert not bus.are_cells_free_and_stable()     # pas encore de lecture
+    bus.step()
+    assert bus.are_cells_free_and_stable(stable_s=0.0)
+    hw.cells[1] = 1
+    bus.step()
+    assert not bus.are_cells_free_and_stable(stable_s=0.0)
+    hw.cells[1] = 0
+    bus.step()
+    assert not bus.are_cells_free_and_stable(stable_s=60.0)
+    time.sleep(0.02)
+    assert bus.are_cells_free_and_stable(stable_s=0.01)
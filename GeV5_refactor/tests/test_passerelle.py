@@ -0,0 +1,100 @@
+from __future__ import annotations
+
+import socket
+import struct
+import time
+
+from gev5.core.comptage.comptage import ComptageThread
+from gev5.core.snapshot import Snapshot, SnapshotStore
+from gev5.hardware.evx_async import EvxServeur
+from gev5.hardware.f2c_async import F2CServeur
+from gev5.hardware.modbus_async import ModbusServeur
+from gev5.hardware.passerelle import Passerelle
+
+
+def _serveurs():
+    return ModbusServeur(fond_stats=dict), EvxServeur(), F2CServeur()
+
+
+def test_un_snapshot_diffuse_une_fois_par_encodeur():
+    p = Passerelle()
+    mb, evx, f2c = (p.ajouter(s, 0) for s in _serveurs())
+    snap = Snapshot(version=7, counts={1: 70000.0})
+    p.diffuser(snap)
+    p.diffuser(snap)                                   # rafraîchissement, même version
+    assert p.metrics["snapshots"] == 1 and p.metrics["refresh"] == 1
+    assert evx.metrics["rebuilds"] == 2 and f2c.metrics["rebuilds"] == 2      # + état initial
+    assert mb.metrics["updates"] == 2 and mb.lire(200, 2) == (1, 4464)
+    assert evx.version == f2c.version == mb.version == 7
+
+
+def _echange(port: int, req: bytes, fin) -> bytes:
+    """Réponse complète : fin = terminateur (bytes) ou longueur (int)."""
+    with socket.create_connection(("127.0.0.1", port), timeout=2.0) as s:
+        s.sendall(req)
+        out = b""
+        while not (len(out) >= fin if isinstance(fin, int) else out.endswith(fin)):
+            out += s.recv(4096)
+        return out
+
+
+def test_passerelle_une_boucle_trois_protocoles(monkeypatch):
+    monkeypatch.setattr(ComptageThread, "compteur", {1: 321.0})
+    p = Passerelle(host="127.0.0.1")
+    for s in _serveurs():
+        p.ajouter(s, 0)
+    p.start()
+    try:
+        assert p.attendre_pret(2.0)
+        snap = SnapshotStore.publish()
+        deadline = time.monotonic() + 2.0
+        while p.version < snap.version and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert p.version == snap.version
+
+        rep = _echange(p.ports["modbus"], struct.pack(">HHHBBHH", 1, 0, 6, 1, 3, 0, 1), 11)
+        assert rep[-3:] == bytes((2,)) + struct.pack(">H", 321)
+        assert _echange(p.ports["evx"], b"MesureMaxVoie1", b"321") == b"321"
+        assert b"3.2100e+002" in _echange(p.ports["f2c"], b"*0001900101010001FEEF3FFF70*", b"*\r\n")
+
+        m = p.get_metrics()
+        assert set(m["protocoles"]) == {"modbus", "evx", "f2c"}
+        for nom in ("evx", "f2c"):
+            assert m["protocoles"][nom]["requests"] == 1
+            assert m["protocoles"][nom]["latency_ms"]["n"] == 1
+        assert m["protocoles"]["evx"]["port"] == p.ports["evx"]
+    finally:
+        p.stop()
+        p.join(2.0)
+        SnapshotStore._current = Snapshot()
+    assert not p.is_alive()
+
+
+def test_port_occupe_n_arrete_pas_les_autres(monkeypatch):
+    monkeypatch.setattr(ComptageThread, "compteur", {1: 42.0})
+    occupe = socket.socket()
+    occupe.bind(("127.0.0.1", 0))
+    occupe.listen()
+    p = Passerelle(host="127.0.0.1")
+    mb, evx, f2c = _serveurs()
+    p.ajouter(mb, 0)
+    p.ajouter(evx, 0)
+    p.ajouter(f2c, occupe.getsockname()[1])
+    p.start()
+    try:
+        assert p.attendre_pret(2.0)
+        assert set(p.ports) == {"modbus", "evx"} and set(p.echecs) == {"f2c"}
+        assert p.get_metrics()["listen_errors"] == 1
+        assert p.get_metrics()["protocoles"]["f2c"]["erreur"]
+        assert p.is_alive()
+        snap = SnapshotStore.publish()
+        deadline = time.monotonic() + 2.0
+        while p.version < snap.version and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert _echange(p.ports["evx"], b"MesureMaxVoie1", b"42") == b"42"
+    finally:
+        p.stop()
+        p.join(2.0)
+        occupe.close()
+        SnapshotStore._current = Snapshot()
+    assert not p.is_alive()
@@ -0,0 +1,72 @@
+from __future__ import annotations
+
+import sqlite3
+
+import numpy as np
+import pytest
+
+from gev5.hardware.storage.profil import (
+    INSERT_PROFIL, ProfilBuffer, decode_profil, encode_profil, fetch_profil, trace,
+)
+from gev5.hardware.storage.rapport_pdf import CHART_H, CHART_W, render_rapport_pdf
+from gev5.hardware.storage.schema import migrate_passages
+
+
+def test_tampon_cadence_et_codage():
+    buf = ProfilBuffer(sample_s=0.5, max_s=3.0)
+    t = 100.0
+    while t < 110.0:
+        if buf.due(t):
+            buf.add(t, [t - 100.0 + ch for ch in range(1, 13)])
+        t += 0.1
+    assert len(buf) == 7                        # tampon plein (3 s / 0.5 s + 1)
+    curves = buf.curves()
+    assert np.diff(curves[1][0]) == pytest.approx(np.full(6, 0.5), abs=0.11)
+
+    back = decode_profil(encode_profil(curves))
+    for ch in (1, 12):
+        assert back[ch][0] == pytest.approx(curves[ch][0], abs=1e-3)
+        assert back[ch][1] == pytest.approx(curves[ch][1], abs=0.05)
+
+
+def test_trace_reduit_a_la_page_sans_perdre_les_pics():
+    ts = np.arange(0.0, 10.0, 0.001)
+    v = np.full(len(ts), 50.0)
+    v[7777] = 430.0                             # pic d'un seul échantillon
+    tr = trace({1: (ts, v), 2: (ts, np.zeros(len(ts)))}, CHART_W, CHART_H)
+
+    assert list(tr.paths) == [1]                # voie nulle non tracée
+    assert tr.v_max == 500.0 and tr.t_span == pytest.approx(9.999)
+    ops = tr.paths[1].split()
+    pts = np.asarray([ops[k:k + 2] for k in range(0, len(ops) - 1, 3)], dtype=float)
+    assert len(pts) <= 2 * int(CHART_W)
+    assert pts[:, 1].max() == pytest.approx(430.0 / 500.0 * CHART_H, abs=0.1)
+    assert np.all(np.diff(pts[:, 0]) >= 0)
+
+
+def test_profil_stocke_et_rendu(tmp_path):
+    from PIL import Image
+
+    photo = tmp_path / "photo_20240101_100000.jpg"
+    Image.new("RGB", (64, 48), (200, 10, 10)).save(photo)
+
+    conn = sqlite3.connect(tmp_path / "Db_GeV5.db")
+    migrate_passages(conn)
+    pid = conn.execute("INSERT INTO passages_v2 (ts_start) VALUES ('2024-01-01 10:00:00')").lastrowid
+    ts = np.arange(0.0, 4.0, 0.1)
+    curves = {ch: (ts, 50.0 + 10.0 * ch * np.sin(ts)) for ch in range(1, 13)}
+    conn.execute(INSERT_PROFIL, (pid, 0.1, len(ts), encode_profil(curves), str(photo)))
+    conn.commit()
+
+    prof = fetch_profil(conn, pid)
+    assert prof.sample_s == 0.1 and prof.photo == str(photo)
+    assert prof.curves[3][1] == pytest.approx(curves[3][1], abs=0.05)
+    assert fetch_profil(conn, pid + 1) is None
+    conn.close()
+
+    passage = {"id": pid, "ts_start": "2024-01-01 10:00:00"}
+    out = render_rapport_pdf(tmp_path / "r.pdf", passage, None, trace(prof.curves, CHART_W, CHART_H), prof.photo)
+    data = out.read_bytes()
+    assert b"/Subtype /Image" in data and b"/DCTDecode" in data
+    assert b"(Profil de comptage \\(c/s\\)) Tj" in data
+    assert data.count(b" l S") == 12
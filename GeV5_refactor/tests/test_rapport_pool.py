@@ -0,0 +1,126 @@
+from __future__ import annotations
+
+import threading
+
+from gev5.core.alarmes import AlarmeThread, FondStats
+from gev5.hardware.storage.rapport_pdf import ReportThread, render_rapport_pdf
+from gev5.hardware.storage.rapport_pool import ReportJob, ReportPool
+from gev5.hardware.storage.registre_passages import RegistrePassages
+
+
+def _passage():
+    p = {"id": 1, "ts_start": "2024-01-01 10:00:00", "ts_end": "2024-01-01 10:00:04",
+         "duration_s": 4.2, "vitesse": 5.1, "comment": "test"}
+    for i in range(1, 13):
+        p.update({f"bdf{i}": 100.0 + i, f"max{i}": 150.0 + i, f"alarm{i}": int(i == 3), f"defaut{i}": 0})
+    return p
+
+
+def test_pool_borne_et_metriques():
+    release = threading.Event()
+    done = []
+
+    def render(job):
+        release.wait(5.0)
+        if job.channels == (2,):
+            raise RuntimeError("rendu impossible")
+        return job.channels
+
+    pool = ReportPool(render, on_done=lambda job, path: done.append(path), workers=1, max_pending=2)
+    futs = [pool.submit(ReportJob(channels=(k,))) for k in (1, 2, 3)]
+    assert futs[2] is None                          # file pleine : demande ignorée
+    release.set()
+    futs[0].result(5.0)
+    futs[1].result(5.0)
+    pool.shutdown()
+
+    m = pool.get_metrics()
+    assert (m["submitted"], m["done"], m["failed"], m["dropped"], m["pending"]) == (2, 1, 1, 1, 0)
+    assert done == [(1,)]
+
+
+def test_capture_libere_pdf_gen_avant_le_rendu():
+    FondStats.configure(window_s=60.0)
+    FondStats.update(4, 120.0)
+    release = threading.Event()
+    started = threading.Event()
+    seen = []
+
+    RegistrePassages.reset()        # aucun passage : rendu du dernier en base
+    rt = ReportThread("test", 1, {}, 100, "fr")
+
+    def render(job):
+        started.set()
+        seen.append(job)
+        release.wait(5.0)
+        return None
+
+    rt.pool._render = render
+    saved = dict(AlarmeThread.pdf_gen)
+    AlarmeThread.pdf_gen.clear()
+    try:
+        AlarmeThread.pdf_gen.update({4: 1, 9: 1})
+        job = rt.poll_once()
+        assert job.channels == (4, 9)
+        assert job.bdf_stats[4]["avg"] == 120.0
+        assert started.wait(5.0)
+        # rendu en cours, flags déjà libérés
+        assert AlarmeThread.pdf_gen[4] == 0 and AlarmeThread.pdf_gen[9] == 0
+        assert rt.poll_once() is None
+    finally:
+        release.set()
+        rt.pool.shutdown()
+        AlarmeThread.pdf_gen.clear()
+        AlarmeThread.pdf_gen.update(saved)
+        FondStats.configure()
+    assert seen == [job]
+
+
+def test_rapport_attend_le_passage_de_l_alarme():
+    RegistrePassages.reset()
+    rendered = []
+    rt = ReportThread("test", 0, {}, 100, "fr")
+    rt.pool._render = lambda job: rendered.append(job.passage_id)
+    saved = dict(AlarmeThread.pdf_gen)
+    AlarmeThread.pdf_gen.clear()
+    try:
+        precedent = RegistrePassages.debut()
+        RegistrePassages.ecrit(precedent, 41)
+        seq = RegistrePassages.debut()          # alarme pendant ce passage
+        AlarmeThread.pdf_gen[3] = 1
+        job = rt.poll_once()
+        assert job.passage_id is None
+        assert rt.pool.get_metrics()["submitted"] == 0    # ligne pas encore écrite
+
+        RegistrePassages.ecrit(seq, 42)         # STOP : id connu
+        rt.poll_once()
+        rt.pool.shutdown()
+        assert rendered == [42]
+    finally:
+        AlarmeThread.pdf_gen.clear()
+        AlarmeThread.pdf_gen.update(saved)
+        RegistrePassages.reset()
+
+
+def test_recorder_publie_l_id_du_passage(tmp_path):
+    from gev5.hardware.storage.db_write_v2 import PassageRecorderV2
+    from gev5.hardware.storage.sqlite_pool import stop_all_writers
+
+    RegistrePassages.reset()
+    rec = PassageRecorderV2(db_path=str(tmp_path / "Db_GeV5.db"))
+    for k in range(2):
+        rec._begin_passage(1_700_000_000.0 + 10 * k)
+        rec._end_passage("test", 1_700_000_002.0 + 10 * k)
+    stop_all_writers()          # vide la file : les callbacks ont publié les ids
+    assert [RegistrePassages.id_de(seq) for seq in (1, 2)] == [1, 2]
+    RegistrePassages.reset()
+
+
+def test_rendu_pdf(tmp_path):
+    stats = {i: {"avg": 10.0 * i, "min": 1.0, "max": 20.0 * i} for i in range(1, 13)}
+    for bdf_stats in (None, stats):
+        out = render_rapport_pdf(tmp_path / "r.pdf", _passage(), bdf_stats)
+        data = out.read_bytes()
+        assert data.startswith(b"%PDF")
+        assert b"(Synth\\350se par voie) Tj" in data
+        assert (b"Statistiques r" in data) == (bdf_stats is not None)
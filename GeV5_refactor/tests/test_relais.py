@@ -0,0 +1,113 @@
+from __future__ import annotations
+
+import json
+
+from gev5.hardware import relais
+from gev5.hardware.relais import AL_ANY, AL_N2, ALL, CELL, DEF_OK, Relais, bit, etat_voulu
+
+
+class _FakeWs:
+    """WebSocket EVOK simulé : garde les trames, peut échouer à l'envoi."""
+
+    def __init__(self) -> None:
+        self.trames = []
+        self.panne = False
+
+    def connect(self, url, timeout=None) -> None:
+        pass
+
+    def send(self, data: str) -> None:
+        if self.panne:
+            raise ConnectionError("EVOK redémarré")
+        self.trames.append(json.loads(data))
+
+    def close(self) -> None:
+        pass
+
+
+def _fake_evok(monkeypatch):
+    """Remplace websocket.WebSocket ; renvoie la liste des sockets ouvertes."""
+    wss = []
+
+    def ouvrir():
+        wss.append(_FakeWs())
+        return wss[-1]
+
+    monkeypatch.setattr(relais.websocket, "WebSocket", ouvrir)
+    return wss
+
+
+def _circuits(trame):
+    return {int(c["circuit"]): c["value"] for c in trame}
+
+
+def test_etat_voulu_n2_maintenu_jusqu_au_retour_a_zero():
+    mask, memo = etat_voulu([0, 2, 0], [], [])
+    assert memo and mask & AL_N2 == AL_N2 and mask & AL_ANY == AL_ANY
+
+    # N2 retombé en N1 sur une voie : la mémoire N2 tient
+    mask, memo = etat_voulu([1, 0, 0], [], [], memo)
+    assert memo and mask & AL_N2 == AL_N2
+
+    # toutes les voies à 0 : mémoire et sorties alarme libérées
+    mask, memo = etat_voulu([0, 0, 0], [], [], memo)
+    assert not memo and mask & (AL_N2 | AL_ANY) == 0
+
+    # N1 seul : pas de sortie N2
+    mask, memo = etat_voulu([1, 0], [], [])
+    assert not memo and mask & AL_N2 == 0 and mask & AL_ANY == AL_ANY
+
+
+def test_etat_voulu_defaut_et_cellules():
+    assert etat_voulu([], [0, 0], [])[0] == DEF_OK
+    assert etat_voulu([], [0, 1], [])[0] & DEF_OK == 0
+    assert etat_voulu([], [2, 0], [])[0] & DEF_OK == 0
+    assert etat_voulu([], [3], [])[0] & DEF_OK == DEF_OK
+
+    assert CELL == bit(2) | bit(8)
+    assert etat_voulu([], [1], [0, 1])[0] == CELL
+    assert etat_voulu([], [1], [0, 0])[0] == 0
+
+
+def test_appliquer_n_envoie_que_les_circuits_modifies(monkeypatch):
+    wss = _fake_evok(monkeypatch)
+    r = Relais()
+
+    # connexion : état du module inconnu → les 8 circuits en une trame
+    r.voulu = DEF_OK
+    assert r.appliquer() == 8
+    ws = wss[0]
+    assert len(ws.trames) == 1
+    assert _circuits(ws.trames[0]) == {c: "1" if c == 1 else "0" for c in range(1, 9)}
+
+    # état inchangé : rien n'est envoyé
+    assert r.appliquer() == 0
+    assert len(ws.trames) == 1
+
+    # alarme : seuls les circuits 3, 5, 6 partent, en une trame
+    r.voulu = DEF_OK | AL_ANY
+    assert r.appliquer() == 3
+    assert len(ws.trames) == 2
+    assert _circuits(ws.trames[1]) == {3: "1", 5: "1", 6: "1"}
+    assert r.metrics["frames"] == 2 and r.metrics["commands"] == 11
+
+
+def test_appliquer_renvoie_tout_apres_reconnexion(monkeypatch):
+    wss = _fake_evok(monkeypatch)
+    r = Relais()
+    r.voulu = DEF_OK
+    r.appliquer()
+
+    # envoi en échec : socket abandonnée, état acquis inconnu
+    wss[0].panne = True
+    r.voulu = DEF_OK | CELL
+    assert r.appliquer() == 0
+    assert r.ws is None and r.acquis is None
+    assert r.metrics["errors"] == 1
+
+    # reconnexion : l'ensemble ALL est renvoyé, pas seulement le delta
+    assert r.appliquer() == bin(ALL).count("1")
+    assert len(wss) == 2
+    assert _circuits(wss[1].trames[0]) == {c: "1" if bit(c) & (DEF_OK | CELL) else "0" for c in range(1, 9)}
+    assert r.acquis == DEF_OK | CELL
+    assert r.metrics["reconnects"] == 2
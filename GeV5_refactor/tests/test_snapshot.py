@@ -0,0 +1,58 @@
+from __future__ import annotations
+
+import dataclasses
+import threading
+
+import pytest
+
+from gev5.core.comptage import ComptageThread
+from gev5.core.alarmes import AlarmeThread
+from gev5.core.snapshot import Snapshot, SnapshotStore
+from gev5.core.system_state import SystemState
+
+
+def test_version_uniquement_si_changement():
+    SnapshotStore.set_sources(cells=lambda: (1, 0), speed=lambda: {1: 2.5})
+    ComptageThread.compteur[1] = 10.0
+    s1 = SnapshotStore.publish()
+    assert s1.version >= 1
+    assert s1.cells == (1, 0) and s1.speed == {1: 2.5}
+
+    # rien n'a changé → même objet, même version
+    assert SnapshotStore.publish() is s1
+
+    ComptageThread.compteur[1] = 11.0
+    AlarmeThread.alarme_resultat[1] = 2
+    s2 = SnapshotStore.publish()
+    assert s2.version == s1.version + 1
+    assert s2.counts[1] == 11.0 and s2.alarm_states[1] == 2
+
+    # l'ancien snapshot n'a pas bougé (copie au moment de la publication)
+    assert s1.counts[1] == 10.0
+    with pytest.raises(dataclasses.FrozenInstanceError):
+        s2.version = 0  # type: ignore[misc]
+
+    # lecteurs : référence, sans copie
+    assert SystemState.get_counts() is s2.counts
+    assert SystemState.get_version() == s2.version
+
+    AlarmeThread.alarme_resultat[1] = 0
+    SnapshotStore.set_sources()
+    SnapshotStore._current = Snapshot()
+
+
+def test_wait_new_reveille_a_la_publication():
+    SnapshotStore._current = Snapshot()
+    v0 = SnapshotStore.version()
+    assert SnapshotStore.wait_new(v0, timeout=0.01).version == v0      # rien de publié : timeout
+
+    got = []
+    t = threading.Thread(target=lambda: got.append(SnapshotStore.wait_new(v0, timeout=5.0)))
+    t.start()
+    ComptageThread.compteur[2] = 123.0
+    snap = SnapshotStore.publish()
+    t.join(5.0)
+    assert got == [snap] and snap.version == v0 + 1
+
+    ComptageThread.compteur[2] = 0.0
+    SnapshotStore._current = Snapshot()
@@ -0,0 +1,216 @@
+from __future__ import annotations
+
+import sqlite3
+import threading
+
+import pytest
+
+from gev5.core.alarmes import AlarmeThread
+from gev5.hardware.storage.collect_bdf_v2 import BdfCollectorV2
+from gev5.hardware.storage.sqlite_pool import get_writer, read_connection, stop_all_writers
+
+
+def test_writer_unique_wal_et_ordre(tmp_path):
+    db = tmp_path / "t.db"
+    w = get_writer(db)
+    assert get_writer(str(db)) is w
+
+    w.call(lambda c: c.execute("CREATE TABLE t (k INTEGER, v TEXT)")).result()
+    for k in range(50):
+        w.execute("INSERT INTO t VALUES (?, ?)", (k, f"v{k}"))
+    w.executemany("INSERT INTO t VALUES (?, ?)", [(100, "a"), (101, "b")])
+    rowid = w.execute("INSERT INTO t VALUES (?, ?)", (200, "z"), wait=True).result(timeout=5)
+    assert rowid == 53
+
+    conn = read_connection(db)
+    assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+    ks = [r[0] for r in conn.execute("SELECT k FROM t ORDER BY rowid")]
+    assert ks == list(range(50)) + [100, 101, 200]
+    stop_all_writers()
+
+
+def test_bdf_collector_ecrit_via_writer(tmp_path):
+    db = tmp_path / "bdf.db"
+    AlarmeThread.fond[3] = 42.5
+    col = BdfCollectorV2(interval=30, db_path=db)
+    col._init_db()
+    col._collect()
+    stop_all_writers()      # vide la file avant lecture
+
+    with sqlite3.connect(db) as conn:
+        row = conn.execute("SELECT bdf3 FROM bdf_history").fetchone()
+    assert row == (42.5,)
+
+
+def test_writer_par_lots_et_metriques(tmp_path):
+    from gev5.hardware.storage.sqlite_pool import SqliteWriter
+
+    db = tmp_path / "lots.db"
+    w = SqliteWriter(db, batch_size=100, flush_interval_s=0.2)
+    w.start()
+    w.call(lambda c: c.execute("CREATE TABLE t (k INTEGER PRIMARY KEY)")).result()
+    for k in range(1000):
+        w.execute("INSERT INTO t VALUES (?)", (k,))
+    w.execute("INSERT INTO t VALUES (?)", (5,))       # doublon : isolé, le reste passe
+    w.execute("INSERT INTO t VALUES (?)", (1000,))
+    w.stop()
+
+    m = w.get_metrics()
+    assert m["written"] == 1001
+    assert m["errors"] == 1
+    assert m["batches"] < 100
+    with sqlite3.connect(db) as conn:
+        assert conn.execute("SELECT COUNT(*) FROM t").fetchone()[0] == 1001
+
+
+def test_writer_file_bornee(tmp_path):
+    from gev5.hardware.storage.sqlite_pool import SqliteWriter
+
+    w = SqliteWriter(tmp_path / "borne.db", max_pending=10)    # non démarré : rien ne s'écrit
+    for k in range(25):
+        w.execute("INSERT INTO t VALUES (?)", (k,))
+    m = w.get_metrics()
+    assert m["pending"] == 10
+    assert m["dropped"] == 15
+    assert [op.params[0] for op in w._pending] == list(range(15, 25))
+
+
+def test_writer_futures_abandonnees_echouent(tmp_path):
+    from gev5.hardware.storage.sqlite_pool import SqliteWriter
+
+    class DisqueBloque(SqliteWriter):
+        """Chaque lot échoue en erreur transitoire (support indisponible)."""
+
+        def __init__(self, *a, **kw):
+            super().__init__(*a, **kw)
+            self.en_ecriture = threading.Event()
+            self.liberer = threading.Event()
+
+        def _write_batch(self, batch):
+            self.en_ecriture.set()
+            self.liberer.wait(5)
+            raise sqlite3.OperationalError("disk I/O error")
+
+    w = DisqueBloque(tmp_path / "ko.db", max_pending=3)
+    w.start()
+    premiere = w.call(lambda c: None)
+    assert w.en_ecriture.wait(5)
+    # lot en vol : la file se remplit, la remise en tête déborde
+    suivantes = [w.execute("INSERT INTO t VALUES (?)", (k,), wait=True) for k in range(3)]
+    w.liberer.set()
+    with pytest.raises(RuntimeError):
+        premiere.result(timeout=5)
+
+    # disque toujours KO à l'arrêt : les opérations restantes échouent aussi
+    w.stop(timeout=10)
+    assert not w.is_alive()
+    for fut in suivantes:
+        with pytest.raises(RuntimeError):
+            fut.result(timeout=1)
+    with pytest.raises(RuntimeError):
+        w.call(lambda c: None).result(timeout=1)
+    assert w.get_metrics()["dropped"] == 5
+
+
+def test_migration_schema_epoch_et_index(tmp_path):
+    from gev5.hardware.storage.schema import (
+        BDF_MIGRATIONS, PASSAGES_MIGRATIONS, last_bdf, migrate_bdf,
+        migrate_passages, passages_between, schema_version,
+    )
+
+    # bases V2 existantes, sans epoch (user_version propre à chaque base)
+    conn = sqlite3.connect(tmp_path / "Db_GeV5.db")
+    bdf = sqlite3.connect(tmp_path / "Bruit_de_fond.db")
+    PASSAGES_MIGRATIONS[0](conn)
+    BDF_MIGRATIONS[0](bdf)
+    for k in range(12):
+        conn.execute(
+            "INSERT INTO passages_v2 (ts_start, ts_end, alarm3) VALUES (?, ?, ?)",
+            (f"2024-01-01 10:00:{k:02d}", f"2024-01-01 10:00:{k:02d}", k % 4 == 0),
+        )
+        bdf.execute(
+            "INSERT INTO bdf_history (timestamp, bdf1) VALUES (?, ?)",
+            (f"2024-01-01 10:{k:02d}:00", float(k)),
+        )
+    conn.commit()
+    bdf.commit()
+
+    assert migrate_passages(conn) == len(PASSAGES_MIGRATIONS)
+    assert migrate_bdf(bdf) == len(BDF_MIGRATIONS)
+    assert schema_version(conn) == len(PASSAGES_MIGRATIONS)
+    assert migrate_passages(conn) == len(PASSAGES_MIGRATIONS)    # rejouable
+
+    t0 = int(__import__("time").mktime((2024, 1, 1, 10, 0, 0, 0, 0, -1)))
+    rows = passages_between(conn, t0, t0 + 12)
+    assert [r[0] for r in rows] == list(range(12, 0, -1))
+    alarm = passages_between(conn, t0, t0 + 12, alarm_only=True)
+    assert [r[0] for r in alarm] == [9, 5, 1]
+    assert [r[1] for r in last_bdf(bdf, 3)] == [11.0, 10.0, 9.0]
+
+    plan = " ".join(str(r) for r in conn.execute(
+        "EXPLAIN QUERY PLAN SELECT * FROM passages_v2 WHERE alarm_any = 1 "
+        "AND ts_start_epoch >= 0 ORDER BY ts_start_epoch DESC LIMIT 5"))
+    assert "idx_passages_v2_alarm" in plan
+    plan = " ".join(str(r) for r in bdf.execute(
+        "EXPLAIN QUERY PLAN SELECT * FROM bdf_history ORDER BY ts_epoch DESC LIMIT 5"))
+    assert "idx_bdf_history_ts" in plan
+    conn.close()
+    bdf.close()
+
+
+def test_rejeu_sans_doubler_un_call_valide(tmp_path):
+    from gev5.hardware.storage.sqlite_pool import SqliteWriter
+
+    w = SqliteWriter(tmp_path / "call.db")
+    w.start()
+    w.call(lambda c: c.execute("CREATE TABLE t (k INTEGER PRIMARY KEY)")).result()
+    appels = []
+
+    def valide(c):
+        appels.append(1)
+        c.execute("INSERT INTO t VALUES (2)")
+        c.execute("COMMIT")
+
+    with w._cv:     # un seul lot : INSERT, call qui valide lui-même, doublon
+        w.execute("INSERT INTO t VALUES (?)", (1,))
+        fut = w.call(valide)
+        w.execute("INSERT INTO t VALUES (?)", (1,))
+    fut.result(timeout=5)
+    w.stop()
+
+    assert appels == [1]
+    m = w.get_metrics()
+    assert m["errors"] == 1
+    with sqlite3.connect(tmp_path / "call.db") as conn:
+        assert [r[0] for r in conn.execute("SELECT k FROM t ORDER BY k")] == [1, 2]
+
+
+def test_rejeu_erreur_transitoire_remise_en_file(tmp_path):
+    from gev5.hardware.storage.sqlite_pool import SqliteWriter
+
+    class VerrouPendantRejeu(SqliteWriter):
+        """Le lot échoue sur une requête, puis le rejeu tombe sur un verrou."""
+
+        verrous = 0
+
+        def _write_batch(self, batch):
+            if len(batch) > 1:
+                raise sqlite3.IntegrityError("UNIQUE constraint failed")
+            if self.verrous:
+                self.verrous -= 1
+                raise sqlite3.OperationalError("database is locked")
+            return super()._write_batch(batch)
+
+    w = VerrouPendantRejeu(tmp_path / "verrou.db")
+    w.start()
+    w.call(lambda c: c.execute("CREATE TABLE t (k INTEGER)")).result()
+    w.verrous = 1
+    with w._cv:
+        futs = [w.execute("INSERT INTO t VALUES (?)", (k,), wait=True) for k in range(3)]
+    assert [f.result(timeout=5) for f in futs] == [1, 2, 3]
+    w.stop()
+
+    m = w.get_metrics()
+    assert m["errors"] == 0
+    assert m["retries"] == 1
+    assert m["written"] == 3
@@ -0,0 +1,63 @@
+from __future__ import annotations
+
+import asyncio
+import json
+
+from gev5.api_server.stream import StateStream, diff_state
+
+
+def test_diff_state_uniquement_les_changements():
+    prev = {"counts": {"1": 10.0, "2": 20.0}, "cells": {"1": 0}}
+    cur = {"counts": {"1": 10.0, "2": 25.0}, "cells": {"1": 0}, "speed": {"1": 3.2}}
+    assert diff_state(prev, cur) == {"counts": {"2": 25.0}, "speed": {"1": 3.2}}
+
+
+def test_stream_message_partage_et_resync():
+    state = {"counts": {"1": 1.0}}
+    stream = StateStream(lambda: {k: dict(v) for k, v in state.items()}, queue_max=2)
+
+    async def scenario():
+        stream.publish_once()
+        a, b = stream.subscribe(), stream.subscribe()
+
+        # connexion : snapshot complet d'abord
+        first = json.loads(a.get_nowait())
+        assert first["type"] == "snapshot" and first["data"] == {"counts": {"1": 1.0}}
+        b.get_nowait()
+
+        # rien de changé → rien de diffusé
+        assert stream.publish_once() is None
+
+        state["counts"]["1"] = 2.0
+        msg = stream.publish_once()
+        # une seule sérialisation, même objet dans toutes les files
+        assert a.get_nowait() is msg and b.get_nowait() is msg
+        assert json.loads(msg)["data"] == {"counts": {"1": 2.0}}
+
+        # abonné lent : file pleine → resynchronisé par un snapshot
+        for v in (3.0, 4.0, 5.0):
+            state["counts"]["1"] = v
+            stream.publish_once()
+        last = json.loads(b.get_nowait())
+        assert last["type"] == "snapshot" and last["data"]["counts"]["1"] >= 4.0
+        assert stream.stats["resyncs"] >= 1
+
+    asyncio.run(scenario())
+
+
+def test_stream_saute_si_version_inchangee():
+    calls = []
+    version = [1]
+
+    def collect():
+        calls.append(1)
+        return {"counts": {"1": float(len(calls))}}
+
+    stream = StateStream(collect, version=lambda: version[0])
+    assert stream.publish_once() is not None
+    assert stream.publish_once() is None
+    assert len(calls) == 1
+
+    version[0] = 2
+    assert stream.publish_once() is not None
+    assert len(calls) == 2
@@ -0,0 +1,91 @@
+from __future__ import annotations
+
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from gev5.hardware import Svr_Unipi as su
+from gev5.hardware.cell_edges import journal
+
+
+class _Evok(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    ok_paths = {"/rest/input"}
+    requests = []
+    connections = 0
+
+    def setup(self):
+        type(self).connections += 1
+        super().setup()
+
+    def do_GET(self):
+        type(self).requests.append(self.path)
+        if self.path not in self.ok_paths:
+            self.send_error(404)
+            return
+        body = json.dumps([{"dev": "input", "circuit": "3", "value": 1}, {"dev": "relay", "circuit": "1"}]).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def test_client_rest_keep_alive_cache_et_backoff():
+    srv = ThreadingHTTPServer(("127.0.0.1", 0), _Evok)
+    threading.Thread(target=srv.serve_forever, daemon=True).start()
+    client = su.RestClient(f"http://127.0.0.1:{srv.server_address[1]}")
+    try:
+        assert client.get_all_di() == {3: 0}
+        assert _Evok.requests == ["/rest/di", "/rest/input"]
+        assert client.endpoint == "/rest/input"
+
+        _Evok.requests.clear()
+        for _ in range(5):
+            assert client.get_all_di() == {3: 0}
+        assert _Evok.requests == ["/rest/input"] * 5
+        assert _Evok.connections == 2               # 404 ferme la 1re, puis keep-alive
+
+        # endpoint en cache perdu : /rest/di encore en backoff, /rest/all sondé
+        _Evok.ok_paths = {"/rest/all"}
+        _Evok.requests.clear()
+        assert client.get_all_di() == {3: 0}
+        assert _Evok.requests == ["/rest/input", "/rest/all"]
+        assert client.endpoint == "/rest/all"
+
+        m = client.get_metrics()
+        assert m["polls"] == 7 and m["latency_ms"]["n"] == 7
+        assert sum(v for k, v in m["latency_ms"].items() if k.endswith("ms") and k[0] in "<>") == 7
+    finally:
+        client.close()
+        srv.shutdown()
+        srv.server_close()
+
+
+def test_evenement_ws_date_a_l_arrivee():
+    rec = su.Svr_Unipi_rec()
+    saved = list(su.Svr_Unipi_rec.Inp_3)
+    try:
+        rec._di_stable[3] = None
+        rec._on_ws_message(json.dumps({"dev": "input", "circuit": "3", "value": 0}), time.monotonic())
+        assert rec._di_stable[3] is None              # état initial laissé au REST
+
+        rec._boot_ts = time.time() - su.WARMUP_S
+        rec._di_stable[3] = 0
+        t = time.monotonic()
+        # value 0 → _coerce01 = 1 → INVERT_DI[3] → 0 : inchangé
+        rec._on_ws_message(json.dumps([{"dev": "input", "circuit": "3", "value": 0}]), t)
+        assert su.Svr_Unipi_rec.Inp_3[1] == saved[1]
+        rec._on_ws_message(json.dumps([{"dev": "input", "circuit": "3", "value": 1}]), t)
+        assert su.Svr_Unipi_rec.Inp_3[1] == 1 and rec._di_stable[3] == 1
+
+        f = journal.lookup(1, 1, t + 0.001)
+        assert f is not None and (f.t, f.source, f.res_s) == (t, "ws", su.WS_RES_S)
+    finally:
+        su.Svr_Unipi_rec.Inp_3[:] = saved
+        rec._di_stable[3] = None
+        rec._di_last[3] = None
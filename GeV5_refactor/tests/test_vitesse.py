@@ -0,0 +1,128 @@
+from __future__ import annotations
+
+import sqlite3
+import time
+
+import pytest
+
+from gev5.core.alarmes import AlarmeThread
+from gev5.core.vitesse import QUALITE_DEGRADEE, QUALITE_INVALIDE, QUALITE_OK, Front, estimer
+from gev5.hardware.cell_edges import EdgeJournal, PassageFronts
+from gev5.hardware.passage import PassageConfig, PassageService
+from gev5.hardware.passage_bus import PassageBus
+from gev5.hardware.storage.schema import PASSAGES_VITESSE_COLUMNS, migrate_passages
+
+
+def _camion(t0=100.0, v_ms=2.5, d=0.75, longueur=6.0, sens=1, res=0.002, source="ws"):
+    """Fronts d'un véhicule à vitesse constante franchissant S1 puis S2 (ou l'inverse)."""
+    a, b = (1, 2) if sens == 1 else (2, 1)
+    dt, occ = d / v_ms, longueur / v_ms
+    return [
+        Front(a, 1, t0, res, source), Front(b, 1, t0 + dt, res, source),
+        Front(a, 0, t0 + occ, res, source), Front(b, 0, t0 + dt + occ, res, source),
+    ]
+
+
+def test_vitesse_sens_longueur():
+    m = estimer(_camion(), 0.75)
+    assert m.qualite == QUALITE_OK and m.source == "ws"
+    assert m.vitesse_kmh == pytest.approx(9.0)
+    assert m.longueur_m == pytest.approx(6.0)
+    assert m.sens == "1 -> 2"
+    assert m.incertitude_kmh < 0.2
+
+    assert estimer(_camion(sens=2), 0.75).sens == "2 -> 1"
+
+
+def test_qualite():
+    # date au pas de scrutation REST : ±0.2 s sur 0.3 s → dégradée
+    assert estimer(_camion(res=0.2, source="rest"), 0.75).qualite == QUALITE_DEGRADEE
+    # arrêt entre les cellules : descendants dans l'autre ordre
+    f = _camion()
+    f[2], f[3] = Front(1, 0, 110.0), Front(2, 0, 109.0)
+    m = estimer(f, 0.75)
+    assert m.qualite == QUALITE_DEGRADEE and m.vitesse_kmh == pytest.approx(9.0)
+    # une seule cellule / rebond
+    assert estimer(_camion()[::2], 0.75).qualite == QUALITE_INVALIDE
+    assert estimer([Front(1, 1, 0.0), Front(2, 1, 0.01)], 0.75).qualite == QUALITE_INVALIDE
+    # fronts montants seuls
+    assert estimer(_camion()[:2], 0.75).qualite == QUALITE_DEGRADEE
+
+
+class FakeHw:
+    def __init__(self) -> None:
+        self.cells = {1: 0, 2: 0}
+
+    def read_cellule(self, idx: int) -> int:
+        return self.cells[idx]
+
+
+def test_fronts_du_bus_dates_a_la_source():
+    hw = FakeHw()
+    bus = PassageBus(PassageService(hw, PassageConfig(arm_delay_s=0.0, min_off_s=0.0)))
+    journal = EdgeJournal()
+    fronts = PassageFronts(bus.period_s, journal)
+    sub = bus.subscribe("v", kinds=PassageFronts.KINDS)
+
+    bus.step()
+    hw.cells[2] = 1                      # front hors passage (pas de START) : oublié
+    bus.step()
+    hw.cells = {1: 0, 2: 0}
+    bus.step()
+
+    seq = [({1: 1, 2: 0}, (1, 1)), ({1: 1, 2: 1}, (2, 1)), ({1: 0, 2: 1}, (1, 0)), ({1: 0, 2: 0}, (2, 0))]
+    stamps = []
+    for cells, (cell, level) in seq:
+        hw.cells = cells
+        t = time.monotonic()
+        stamps.append(t)
+        # S2 descendant jamais vu par la source → date du bus
+        if (cell, level) != (2, 0):
+            journal.record(cell, level, t, "ws", 0.001)
+        bus.step()
+    for ev in sub.drain():
+        fronts.feed(ev)
+
+    got = fronts.fronts()
+    assert [(f.cell, f.level) for f in got] == [c for _, c in seq]
+    assert [f.source for f in got] == ["ws", "ws", "ws", "bus"]
+    assert [f.t for f in got[:3]] == stamps[:3]
+    assert got[3].res_s == bus.period_s
+    assert journal.get_metrics()["matched"] == 3
+    # fronts à quelques µs d'écart : rebond
+    assert fronts.mesure(0.75).qualite == QUALITE_INVALIDE
+
+
+def test_abonnement_des_la_construction():
+    from gev5.hardware.vitesse_chargement import ListWatcher
+
+    hw = FakeHw()
+    bus = PassageBus(PassageService(hw, PassageConfig(arm_delay_s=0.0, min_off_s=0.0)))
+    w = ListWatcher(0.75, 0, bus.service, bus=bus)
+    w.daemon = True
+    saved = ListWatcher.mesure[1]
+    saved_alarmes = dict(AlarmeThread.alarme_resultat)
+    ListWatcher.mesure[1] = None
+    AlarmeThread.alarme_resultat.clear()        # pas d'alarme N2 : mesure publiée
+    try:
+        # passage complet publié AVANT run() : rien n'est perdu
+        bus.step()
+        for cells in ({1: 1, 2: 0}, {1: 1, 2: 1}, {1: 0, 2: 1}, {1: 0, 2: 0}):
+            hw.cells = cells
+            bus.step()
+        w.start()
+        deadline = time.monotonic() + 5.0
+        while ListWatcher.mesure[1] is None and time.monotonic() < deadline:
+            time.sleep(0.01)
+        m = ListWatcher.mesure[1]
+        assert m is not None, "START et fronts perdus avant run()"
+    finally:
+        ListWatcher.mesure[1] = saved
+        AlarmeThread.alarme_resultat.update(saved_alarmes)
+
+
+def test_migration_colonnes_vitesse():
+    conn = sqlite3.connect(":memory:", isolation_level=None)
+    migrate_passages(conn)
+    cols = {r[1] for r in conn.execute("PRAGMA table_info(passages_v2)")}
+    assert {c for c, _ in PASSAGES_VITESSE_COLUMNS} <= cols